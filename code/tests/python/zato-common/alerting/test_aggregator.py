@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# stdlib
+from datetime import timedelta
+
+# pytest
+import pytest
+
+# Zato
+from zato.common.alerting.aggregator import live_aggregator, LiveAggregator, ModuleCtx
+from zato.common.alerting.collectors import collect_auth_failure_facts, collect_consecutive_failure_facts, \
+    collect_error_rate_facts, collect_latency_facts, start_live_aggregator
+from zato.common.audit_log.api import get_audit_engine, AuditEvent, AuditLog, AuditOutcome, AuditSource
+from zato.common.util.api import utcnow
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if 0:
+    from zato.common.typing_ import any_, dictlist
+    any_ = any_
+    dictlist = dictlist
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+# The server name all the test events are written under
+_server_name = 'test-alerting-server'
+
+# The connection the tests seed events for
+_connection_name = 'crm.orders.api'
+
+# The window the measures cover in these tests, in seconds
+_window_seconds = 600
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+@pytest.fixture(autouse=True)
+def stopped_aggregator() -> 'any_':
+    """ Makes sure no test leaves the process-wide aggregator running for the next one.
+    """
+    live_aggregator.stop()
+    yield
+    live_aggregator.stop()
+
+# ################################################################################################################################
+
+def _start_long_ago() -> 'None':
+    """ Starts the aggregator as though it had been running for longer than any window the tests measure.
+    """
+    live_aggregator.start({}, utcnow() - timedelta(seconds=ModuleCtx.Max_Window_Seconds))
+
+# ################################################################################################################################
+
+def _seed_exchange(audit_log:'AuditLog', cid:'str', outcome:'str', duration_ms:'int') -> 'None':
+    """ Stores the request/response pair an outgoing connection leaves behind.
+    """
+    _ = audit_log.insert(AuditSource.REST_Outgoing, AuditEvent.Request_Sent, _connection_name, cid=cid, outcome=AuditOutcome.OK)
+    _ = audit_log.insert(AuditSource.REST_Outgoing, AuditEvent.Response_Received, _connection_name, cid=cid,
+        outcome=outcome, duration_ms=duration_ms)
+
+# ################################################################################################################################
+
+def _collect_all() -> 'dictlist':
+    """ Runs every rate collector over the test window, each one's facts sorted by their pair.
+    """
+    engine = get_audit_engine()
+    now = utcnow()
+
+    fact_lists = [
+        collect_error_rate_facts(engine, _window_seconds, now),
+        collect_latency_facts(engine, _window_seconds, now),
+        collect_consecutive_failure_facts(engine, now),
+        collect_auth_failure_facts(engine, _window_seconds, now),
+    ]
+
+    # The collectors promise no order, so each list is put in one before it is compared
+    out = [sorted(fact_list, key=lambda fact: (fact['source'], fact['object_name'])) for fact_list in fact_lists]
+
+    return out
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class TestMeasuresFromMemory:
+
+    def test_memory_and_the_database_give_the_same_measures(self) -> 'None':
+        _start_long_ago()
+
+        audit_log = AuditLog(_server_name)
+
+        _seed_exchange(audit_log, 'agg-same-1', AuditOutcome.OK, 100)
+        _seed_exchange(audit_log, 'agg-same-2', AuditOutcome.Error, 300)
+        _seed_exchange(audit_log, 'agg-same-3', AuditOutcome.Error, 200)
+
+        _ = audit_log.insert(AuditSource.REST_Channel, AuditEvent.Auth_Failed, 'api.orders', outcome=AuditOutcome.Error)
+
+        from_memory = _collect_all()
+
+        # The same collectors, with nothing in memory to read, go to the database for everything
+        live_aggregator.stop()
+        from_database = _collect_all()
+
+        assert from_memory == from_database
+
+        error_rate_facts, latency_facts, consecutive_facts, auth_failure_facts = from_memory
+
+        by_source = {fact['source']: fact for fact in error_rate_facts}
+        assert by_source[AuditSource.REST_Outgoing]['error_count'] == 2
+        assert by_source[AuditSource.REST_Outgoing]['total_count'] == 6
+
+        assert latency_facts[0]['avg_duration_ms'] == 200
+
+        by_source = {fact['source']: fact for fact in consecutive_facts}
+        assert by_source[AuditSource.REST_Outgoing]['consecutive_failures'] == 2
+
+        assert auth_failure_facts[0]['auth_failure_count'] == 1
+
+# ################################################################################################################################
+
+    def test_a_window_older_than_the_aggregator_is_read_from_the_database(self) -> 'None':
+        audit_log = AuditLog(_server_name)
+
+        # Nothing folds these in, the aggregator is not running yet ..
+        _seed_exchange(audit_log, 'agg-warm-1', AuditOutcome.Error, 100)
+
+        # .. so a freshly started one cannot answer for the window ..
+        live_aggregator.start({}, utcnow())
+
+        facts = collect_error_rate_facts(get_audit_engine(), _window_seconds, utcnow())
+        assert facts[0]['error_count'] == 1
+
+        # .. while one that has been running all along answers from memory, which never saw the event.
+        _start_long_ago()
+
+        facts = collect_error_rate_facts(get_audit_engine(), _window_seconds, utcnow())
+        assert facts == []
+
+# ################################################################################################################################
+
+    def test_a_window_longer_than_memory_holds_is_read_from_the_database(self) -> 'None':
+        audit_log = AuditLog(_server_name)
+
+        _seed_exchange(audit_log, 'agg-long-1', AuditOutcome.Error, 100)
+
+        _start_long_ago()
+
+        window_seconds = ModuleCtx.Max_Window_Seconds * 2
+        facts = collect_error_rate_facts(get_audit_engine(), window_seconds, utcnow())
+
+        assert facts[0]['error_count'] == 1
+
+# ################################################################################################################################
+
+    def test_scheduler_events_are_always_read_from_the_database(self) -> 'None':
+        _start_long_ago()
+
+        audit_log = AuditLog(_server_name)
+        _ = audit_log.insert(AuditSource.Scheduler, AuditEvent.Request_Sent, 'nightly.export', outcome=AuditOutcome.Error)
+
+        # Memory ignored the event, but the fact is there all the same
+        assert live_aggregator.get_window_counts(utcnow(), _window_seconds) == []
+
+        facts = collect_error_rate_facts(get_audit_engine(), _window_seconds, utcnow())
+
+        assert len(facts) == 1
+        assert facts[0]['source'] == AuditSource.Scheduler
+        assert facts[0]['error_count'] == 1
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class TestStreaks:
+
+    def test_a_streak_from_before_the_start_carries_on_in_memory(self) -> 'None':
+        audit_log = AuditLog(_server_name)
+        engine = get_audit_engine()
+
+        _seed_exchange(audit_log, 'agg-streak-1', AuditOutcome.Error, 100)
+        _seed_exchange(audit_log, 'agg-streak-2', AuditOutcome.Error, 100)
+
+        assert start_live_aggregator(engine, utcnow(), is_only_writer=True) is True
+
+        _seed_exchange(audit_log, 'agg-streak-3', AuditOutcome.Error, 100)
+
+        facts = collect_consecutive_failure_facts(engine, utcnow())
+        assert facts[0]['consecutive_failures'] == 3
+
+        # A success ends the streak, visibly
+        _seed_exchange(audit_log, 'agg-streak-4', AuditOutcome.OK, 100)
+
+        facts = collect_consecutive_failure_facts(engine, utcnow())
+        assert facts[0]['consecutive_failures'] == 0
+
+# ################################################################################################################################
+
+    def test_the_aggregator_stays_off_when_the_environment_says_so(self, monkeypatch:'any_') -> 'None':
+        monkeypatch.setenv(ModuleCtx.Env_Enabled, 'false')
+
+        assert start_live_aggregator(get_audit_engine(), utcnow(), is_only_writer=True) is False
+        assert live_aggregator.is_running is False
+
+# ################################################################################################################################
+
+    def test_the_aggregator_stays_off_with_other_writers(self, monkeypatch:'any_') -> 'None':
+        monkeypatch.delenv(ModuleCtx.Env_Enabled, raising=False)
+
+        assert start_live_aggregator(get_audit_engine(), utcnow(), is_only_writer=False) is False
+        assert live_aggregator.is_running is False
+
+# ################################################################################################################################
+
+    def test_the_environment_turns_the_aggregator_on_with_other_writers(self, monkeypatch:'any_') -> 'None':
+        monkeypatch.setenv(ModuleCtx.Env_Enabled, 'true')
+
+        assert start_live_aggregator(get_audit_engine(), utcnow(), is_only_writer=False) is True
+        assert live_aggregator.is_running is True
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class TestSlots:
+
+    def test_slots_older_than_the_longest_window_are_dropped(self) -> 'None':
+        aggregator = LiveAggregator(max_window_seconds=60)
+
+        now = utcnow()
+        aggregator.start({}, now - timedelta(seconds=300))
+
+        aggregator.add_event(AuditSource.REST_Outgoing, AuditEvent.Response_Received, _connection_name,
+            AuditOutcome.Error, 0, now - timedelta(seconds=200))
+
+        aggregator.add_event(AuditSource.REST_Outgoing, AuditEvent.Response_Received, _connection_name,
+            AuditOutcome.OK, 0, now - timedelta(seconds=10))
+
+        counts = aggregator.get_window_counts(now, 60)
+
+        assert len(counts) == 1
+        assert counts[0].total == 1
+        assert counts[0].errors == 0
+
+        # Only the newest slot is still held
+        slots = aggregator.slots[(AuditSource.REST_Outgoing, _connection_name)]
+        assert len(slots) == 1
+
+# ################################################################################################################################
+
+    def test_a_pair_that_went_quiet_is_forgotten(self) -> 'None':
+        aggregator = LiveAggregator(max_window_seconds=60)
+
+        now = utcnow()
+        aggregator.start({}, now - timedelta(seconds=300))
+
+        aggregator.add_event(AuditSource.REST_Outgoing, AuditEvent.Response_Received, _connection_name,
+            AuditOutcome.OK, 0, now - timedelta(seconds=200))
+
+        assert aggregator.get_window_counts(now, 60) == []
+        assert aggregator.slots == {}
+
+# ################################################################################################################################
+# ################################################################################################################################
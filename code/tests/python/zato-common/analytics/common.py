@@ -16,21 +16,23 @@ from sqlalchemy import select
 from live_sql.asserts import assert_mysql_connection_encrypted as assert_mysql_engine_encrypted, \
     assert_postgresql_connection_encrypted as assert_postgresql_engine_encrypted
 from live_sql.env import database_env
-from zato.common.analytics.api import get_analytics_engine, get_latency_bucket_index, usage_table, watermark_table, \
-    Latency_Bucket_Count, Latency_Buckets_Ms
+from zato.common.analytics.api import get_analytics_engine, get_latency_bucket_index, unpack_latency_buckets, \
+    usage_day_table, usage_minute_table, usage_table, watermark_table, Latency_Bucket_Count, Latency_Buckets_Ms
 from zato.common.analytics.query import get_percentile
 from zato.common.analytics.rollup import run_rollup
 from zato.common.audit_log.api import event_table, get_audit_engine, AuditEvent, AuditLog, AuditOutcome, AuditSource
-from zato.common.json_internal import loads
+from zato.common.json_internal import dumps
 
 # ################################################################################################################################
 # ################################################################################################################################
 
 if 0:
     from collections.abc import Iterator
+    from sqlalchemy import Table
     from zato.common.typing_ import anydict, anylist, intlist, stranydict
 
     envgen = Iterator[None]
+    Table = Table
     anylist = anylist
     intlist = intlist
 
@@ -54,10 +56,13 @@ _caller_alice = 'analytics.test.alice'
 _caller_bob   = 'analytics.test.bob'
 _caller_carol = 'analytics.test.carol'
 
-# The hourly periods the controlled events land in
+# The hourly periods the controlled events land in ..
 _period_one = '2026-07-14T10'
 _period_two = '2026-07-14T11'
 
+# .. and the day both of them are in.
+_day = '2026-07-14'
+
 # ################################################################################################################################
 # ################################################################################################################################
 
@@ -127,28 +132,31 @@ def _clean_tables() -> 'None':
     analytics_engine = get_analytics_engine()
 
     with analytics_engine.begin() as connection:
+        _ = connection.execute(usage_minute_table.delete())
         _ = connection.execute(usage_table.delete())
+        _ = connection.execute(usage_day_table.delete())
         _ = connection.execute(watermark_table.delete())
 
 # ################################################################################################################################
 
-def _load_usage_rows() -> 'anydict':
-    """ Reads all the hourly rows, keyed by (period, channel, caller, status class).
+def _load_usage_rows(table:'Table'=usage_table) -> 'anydict':
+    """ Reads all the rows of one tier, the hourly one by default, keyed by (period, channel, caller, status class).
     """
     statement = select(
-        usage_table.c.period,
-        usage_table.c.source,
-        usage_table.c.channel,
-        usage_table.c.caller,
-        usage_table.c.status_class,
-        usage_table.c.request_count,
-        usage_table.c.error_count_auth,
-        usage_table.c.error_count_rate_limit,
-        usage_table.c.error_count_upstream,
-        usage_table.c.error_count_gateway,
-        usage_table.c.size_sum,
-        usage_table.c.duration_sum_ms,
-        usage_table.c.latency_buckets,
+        table.c.period,
+        table.c.source,
+        table.c.channel,
+        table.c.caller,
+        table.c.status_class,
+        table.c.request_count,
+        table.c.error_count_auth,
+        table.c.error_count_rate_limit,
+        table.c.error_count_upstream,
+        table.c.error_count_gateway,
+        table.c.size_sum,
+        table.c.duration_sum_ms,
+        table.c.latency_histogram,
+        table.c.last_seen,
     )
 
     engine = get_analytics_engine()
@@ -160,7 +168,7 @@ def _load_usage_rows() -> 'anydict':
         result = connection.execute(statement)
 
         for period, source, channel, caller, status_class, request_count, count_auth, count_rate_limit, \
-            count_upstream, count_gateway, size_sum, duration_sum_ms, latency_buckets_json in result:
+            count_upstream, count_gateway, size_sum, duration_sum_ms, latency_histogram, last_seen in result:
 
             key = (period, channel, caller, status_class)
 
@@ -173,7 +181,8 @@ def _load_usage_rows() -> 'anydict':
                 'error_count_gateway': count_gateway,
                 'size_sum': size_sum,
                 'duration_sum_ms': duration_sum_ms,
-                'latency_buckets': loads(latency_buckets_json),
+                'latency_buckets': unpack_latency_buckets(latency_histogram),
+                'last_seen': last_seen,
             }
 
     return out
@@ -315,6 +324,22 @@ def run_rollup_scenario() -> 'None':
     assert bob_ok['duration_sum_ms'] == 200
     assert bob_ok['latency_buckets'] == _expected_buckets(100, 100)
 
+    # The daily tier holds the same traffic, with both hours folded into their day ..
+    day_rows = _load_usage_rows(usage_day_table)
+    assert len(day_rows) == 4, f'Expected 4 daily rows, got {len(day_rows)}: {sorted(day_rows)}'
+
+    alice_day = day_rows[(_day, _channel_a, _caller_alice, '2xx')]
+    assert alice_day['request_count'] == 3
+    assert alice_day['latency_buckets'] == _expected_buckets(10, 30, 3000)
+    assert alice_day['last_seen'] == _period_one
+
+    bob_day = day_rows[(_day, _channel_b, _caller_bob, '2xx')]
+    assert bob_day['request_count'] == 2
+    assert bob_day['last_seen'] == _period_two
+
+    # .. while the per-minute tier does not keep anything older than its retention.
+    assert _load_usage_rows(usage_minute_table) == {}
+
     # Rerunning from the same watermark changes nothing - there is nothing new to read ..
     rerun_result = run_rollup()
     assert rerun_result.event_count == 0
@@ -338,6 +363,11 @@ def run_rollup_scenario() -> 'None':
     assert alice_ok['duration_sum_ms'] == 3050
     assert alice_ok['latency_buckets'] == _expected_buckets(10, 30, 3000, 10)
 
+    day_rows = _load_usage_rows(usage_day_table)
+    alice_day = day_rows[(_day, _channel_a, _caller_alice, '2xx')]
+    assert alice_day['request_count'] == 4
+    assert alice_day['latency_buckets'] == _expected_buckets(10, 30, 3000, 10)
+
     # Percentiles come out of bucket counts by linear interpolation inside the target bucket ..
     buckets = [0] * Latency_Bucket_Count
     buckets[0] = 100
@@ -381,6 +411,58 @@ def run_rollup_scenario() -> 'None':
     assert carol['size_sum'] == 7
     assert carol['latency_buckets'] == _expected_buckets(42)
 
+    # A current event lands in the per-minute tier too
+    minute_rows = _load_usage_rows(usage_minute_table)
+    assert len(minute_rows) == 1, f'Expected one per-minute row, got {len(minute_rows)}'
+
+    carol_minute = list(minute_rows.values())[0]
+    assert carol_minute['request_count'] == 1
+    assert carol_minute['latency_buckets'] == _expected_buckets(42)
+
+    # A store written by an earlier release has hourly rows with JSON histograms and no daily rows,
+    # which the next run converts and backfills before it adds the new events ..
+    _clean_tables()
+
+    legacy_row_statement = usage_table.insert().values(
+        period=_period_one,
+        source=AuditSource.REST_Channel,
+        channel=_channel_a,
+        caller=_caller_alice,
+        status_class='2xx',
+        request_count=2,
+        error_count_auth=0,
+        error_count_rate_limit=0,
+        error_count_upstream=0,
+        error_count_gateway=0,
+        size_sum=20,
+        duration_sum_ms=20,
+        latency_buckets=dumps(_expected_buckets(10, 10)),
+    )
+
+    analytics_engine = get_analytics_engine()
+
+    with analytics_engine.begin() as connection:
+        _ = connection.execute(legacy_row_statement)
+        _ = connection.execute(watermark_table.insert().values(last_event_id=0))
+
+    _insert_event(source=AuditSource.REST_Channel, event_type=AuditEvent.Response_Sent, channel=_channel_a,
+        caller=_caller_alice, event_time_iso=_period_one, status='200 OK', duration_ms=10, size=10)
+
+    upgrade_result = run_rollup()
+    assert upgrade_result.event_count == 1
+
+    # .. so the hourly row holds both the earlier and the new traffic ..
+    rows = _load_usage_rows()
+    alice_ok = rows[(_period_one, _channel_a, _caller_alice, '2xx')]
+    assert alice_ok['request_count'] == 3
+    assert alice_ok['latency_buckets'] == _expected_buckets(10, 10, 10)
+
+    # .. and so does its daily row.
+    day_rows = _load_usage_rows(usage_day_table)
+    alice_day = day_rows[(_day, _channel_a, _caller_alice, '2xx')]
+    assert alice_day['request_count'] == 3
+    assert alice_day['latency_buckets'] == _expected_buckets(10, 10, 10)
+
 # ################################################################################################################################
 
 def assert_mysql_connection_encrypted() -> 'None':
@@ -12,20 +12,23 @@ from datetime import datetime, timezone
 
 # Zato
 from live_sql.env import database_env
-from zato.common.analytics.api import get_analytics_engine, usage_table, Caller_Anonymous, Latency_Bucket_Count
+from zato.common.analytics.api import get_analytics_engine, get_usage_key_hash, pack_latency_buckets, usage_day_table, \
+    usage_table, Caller_Anonymous, Latency_Bucket_Count, Period_Len
 from zato.common.analytics.csv_export import channel_csv, consumer_csv, overview_csv
-from zato.common.analytics.query import get_channel, get_consumer, get_overview, period_to_ms, Range_Day
+from zato.common.analytics.query import get_channel, get_consumer, get_overview, get_resolution, period_to_ms, Range_Day, \
+    Range_Month
 from zato.common.audit_log.api import AuditSource, ModuleCtx as AuditLogCtx
-from zato.common.json_internal import dumps
 
 # ################################################################################################################################
 # ################################################################################################################################
 
 if 0:
+    from sqlalchemy import Table
     from zato.common.typing_ import intlist
 
     # Dummy assignments to satisfy type checkers
     intlist = intlist
+    Table = Table
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -76,16 +79,18 @@ def _insert_usage_row(
     request_count:'int',
     error_count_auth:'int'=0,
     error_count_rate_limit:'int'=0,
+    table:'Table'=usage_table,
+    last_seen:'str'='',
 ) -> 'None':
-    """ Seeds one hourly row the way the rollup would have written it.
+    """ Seeds one row of a tier, the hourly one by default, the way the rollup would have written it.
     """
     size_sum = request_count * 10
     duration_sum_ms = request_count * 75
 
     latency_buckets = _seed_buckets(request_count)
-    latency_buckets_json = dumps(latency_buckets)
+    latency_histogram = pack_latency_buckets(latency_buckets)
 
-    insert_statement = usage_table.insert().values(
+    insert_statement = table.insert().values(
         period=period,
         source=AuditSource.REST_Channel,
         channel=channel,
@@ -98,7 +103,9 @@ def _insert_usage_row(
         error_count_gateway=0,
         size_sum=size_sum,
         duration_sum_ms=duration_sum_ms,
-        latency_buckets=latency_buckets_json,
+        latency_histogram=latency_histogram,
+        last_seen=last_seen or period[:Period_Len],
+        key_hash=get_usage_key_hash(period, AuditSource.REST_Channel, channel, caller, status_class),
     )
 
     engine = get_analytics_engine()
@@ -272,6 +279,70 @@ def test_analytics_views(tmp_path:'os.PathLike') -> 'None':
 
 # ################################################################################################################################
 
+def test_analytics_views_day_tier(tmp_path:'os.PathLike') -> 'None':
+    """ A month is read from the daily tier, except for the part of its first day
+    that is in the window, which comes from the hourly one.
+    """
+    db_path = os.path.join(str(tmp_path), 'analytics-day-tier.db')
+
+    details = {
+        'type': AuditLogCtx.Type_SQLite,
+        'name': db_path,
+    }
+
+    # The month window of _now starts at 2026-06-16T12, so the hourly rows of that day count from then on only ..
+    first_day = '2026-06-16'
+    hour_before_window = '2026-06-16T11'
+    hour_in_window = '2026-06-16T12'
+
+    # .. while the days after it count in full.
+    day_in_window = '2026-07-15'
+
+    assert get_resolution(Range_Month) == 'day'
+
+    with database_env('Zato_Analytics_DB_', details):
+
+        # The daily rows of the first day are never read, the hourly ones that make it up are ..
+        _insert_usage_row(period=first_day, channel=_channel_a, caller=_caller_alice, status_class='2xx',
+            request_count=1000, table=usage_day_table, last_seen=hour_in_window)
+
+        _insert_usage_row(period=hour_before_window, channel=_channel_a, caller=_caller_alice, status_class='2xx',
+            request_count=7)
+
+        _insert_usage_row(period=hour_in_window, channel=_channel_a, caller=_caller_alice, status_class='2xx',
+            request_count=3)
+
+        # .. and the later days are read from their daily rows.
+        _insert_usage_row(period=day_in_window, channel=_channel_a, caller=_caller_alice, status_class='2xx',
+            request_count=20, table=usage_day_table, last_seen='2026-07-15T09')
+
+        _insert_usage_row(period=day_in_window, channel=_channel_b, caller=_caller_bob, status_class='4xx',
+            request_count=5, error_count_auth=5, table=usage_day_table, last_seen='2026-07-15T23')
+
+        overview = get_overview(_now, Range_Month)
+        totals = overview['totals']
+
+        assert totals['request_count'] == 28
+        assert totals['error_count'] == 5
+        assert totals['p95_ms'] == _expected_p95_ms
+        assert totals['last_seen'] == '2026-07-15T23'
+
+        top_channels = overview['top_channels']
+        assert top_channels[0]['name'] == _channel_a
+        assert top_channels[0]['request_count'] == 23
+        assert top_channels[0]['last_seen'] == '2026-07-15T09'
+
+        # The sparklines have one point per day of the window, 2026-06-16 through 2026-07-16
+        spark = top_channels[0]['spark']
+        assert len(spark) == 31
+        assert spark[0] == 3
+        assert spark[-2] == 20
+
+        channel_data = get_channel(_now, Range_Month, _channel_b)
+        assert channel_data['error_sources'] == {'auth': 5, 'rate_limit': 0, 'upstream': 0, 'gateway': 0}
+
+# ################################################################################################################################
+
 def test_analytics_views_empty_store(tmp_path:'os.PathLike') -> 'None':
     """ A fresh install has an empty store - every screen still answers, with zeros
     and empty tables, never with an error.
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# stdlib
+import os
+from shutil import rmtree
+from tempfile import mkdtemp
+
+# SQLAlchemy
+from sqlalchemy import select
+
+# Zato
+from common import delete_all_events
+from zato.common.audit_log.api import event_attr_table, event_body_table, event_link_table, event_table, \
+    get_audit_engine, AuditBody, AuditEvent, AuditLink, AuditLog, AuditOutcome, AuditSource, ModuleCtx as AuditLogCtx
+from zato.common.audit_log.attachment import build_attachment
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if 0:
+    from zato.common.typing_ import any_, anydict, intlist
+
+    # Dummy assignments to satisfy type checkers
+    any_ = any_
+    anydict = anydict
+    intlist = intlist
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+# The server name all the test events are written under
+_server_name = 'test-audit-log-batch-server'
+
+# The channel the batched events belong to
+_channel_name = 'audit.test.batch-channel'
+
+# How many events one batch holds - more than one multi-row statement carries, so chunking is exercised too
+_batch_size = 1200
+
+# How many events are written in total - a full batch and a partial one left for an explicit flush
+_event_count = 1500
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def _get_event_ids_by_cid() -> 'anydict':
+    """ Returns the ids of all the batched events, keyed by their cids.
+    """
+    engine = get_audit_engine()
+
+    query = select(event_table.c.cid, event_table.c.id)
+    query = query.where(event_table.c.object_name == _channel_name)
+
+    with engine.connect() as connection:
+        out = {row[0]: row[1] for row in connection.execute(query)}
+
+    return out
+
+# ################################################################################################################################
+
+def _get_companion_event_ids(table:'any_', event_id_column:'str', value_column:'str') -> 'anydict':
+    """ Returns which event each companion row points to, keyed by the value the row carries.
+    """
+    engine = get_audit_engine()
+
+    query = select(table.c[value_column], table.c[event_id_column])
+
+    with engine.connect() as connection:
+        out = {row[0]: row[1] for row in connection.execute(query)}
+
+    return out
+
+# ################################################################################################################################
+
+def _run_companion_id_checks(parent_id:'int') -> 'None':
+    """ Confirms every companion row of the batch points to the event it was written for.
+    """
+    event_ids_by_cid = _get_event_ids_by_cid()
+    assert len(event_ids_by_cid) == _event_count, len(event_ids_by_cid)
+
+    # Each attribute carries the cid of its event, so a mismatched id would show at once ..
+    attr_event_ids = _get_companion_event_ids(event_attr_table, 'event_id', 'value')
+
+    # .. the same goes for bodies ..
+    body_event_ids = _get_companion_event_ids(event_body_table, 'event_id', 'data')
+
+    for cid, event_id in event_ids_by_cid.items():
+        assert attr_event_ids[cid] == event_id, (cid, attr_event_ids[cid], event_id)
+        assert body_event_ids[f'body-{cid}'] == event_id, (cid, body_event_ids[f'body-{cid}'], event_id)
+
+    # .. every event has a link to the parent ..
+    engine = get_audit_engine()
+
+    link_query = select(event_link_table.c.child_event_id)
+    link_query = link_query.where(event_link_table.c.parent_event_id == parent_id)
+
+    with engine.connect() as connection:
+        child_ids = {row[0] for row in connection.execute(link_query)}
+
+    assert child_ids == set(event_ids_by_cid.values())
+
+    # .. and the attachments landed next to the bodies, one per event.
+    attachment_query = select(event_body_table.c.event_id)
+    attachment_query = attachment_query.where(event_body_table.c.kind == AuditBody.Attachment)
+
+    with engine.connect() as connection:
+        attachment_event_ids = [row[0] for row in connection.execute(attachment_query)]
+
+    assert sorted(attachment_event_ids) == sorted(event_ids_by_cid.values())
+
+# ################################################################################################################################
+
+def _run_synchronous_id_checks(audit_log:'AuditLog') -> 'None':
+    """ Confirms a synchronous writer still returns the id of the very event it wrote.
+    """
+    event_ids:'intlist' = []
+
+    for idx in range(3):
+        event_id = audit_log.insert(AuditSource.REST_Channel, AuditEvent.Request_Received, 'audit.test.batch-sync',
+            cid=f'cid-batch-sync-{idx}')
+        event_ids.append(event_id)
+
+    engine = get_audit_engine()
+
+    query = select(event_table.c.id, event_table.c.cid)
+    query = query.where(event_table.c.object_name == 'audit.test.batch-sync')
+
+    with engine.connect() as connection:
+        cid_by_id = {row[0]: row[1] for row in connection.execute(query)}
+
+    for idx, event_id in enumerate(event_ids):
+        assert cid_by_id[event_id] == f'cid-batch-sync-{idx}'
+
+# ################################################################################################################################
+
+def run_batch_writer_scenario() -> 'None':
+    """ The batched writer scenario every backend must pass - whole batches with all their
+    companion rows land in the database with each row pointing to the right event,
+    and the spool is empty once everything is written.
+    """
+    delete_all_events()
+
+    spool_dir = mkdtemp(prefix='zato-audit-log-spool-')
+    os.environ[AuditLogCtx.Env_Spool_Dir] = spool_dir
+
+    try:
+
+        # A synchronous writer provides the parent all the batched events link to ..
+        audit_log = AuditLog(_server_name)
+        parent_id = audit_log.insert(AuditSource.REST_Channel, AuditEvent.Request_Received, 'audit.test.batch-parent')
+
+        _run_synchronous_id_checks(audit_log)
+
+        # .. the buffered one is never flushed by time during the scenario ..
+        buffered = AuditLog(_server_name, flush_max_size=_batch_size, flush_max_wait_ms=600_000)
+
+        for idx in range(_event_count):
+
+            cid = f'cid-batch-{idx}'
+            attachment = build_attachment(f'{cid}.txt', 'text/plain', cid.encode('utf8'))
+
+            result = buffered.insert(AuditSource.REST_Channel, AuditEvent.Request_Received, _channel_name,
+                cid=cid, outcome=AuditOutcome.OK, attrs={'cid_attr': cid}, bodies={AuditBody.Request: f'body-{cid}'},
+                attachments=[attachment], parents=[parent_id], parent_link_type=AuditLink.Resubmit_Of)
+
+            assert result is None
+
+        # .. what is left after the first full batch is still only in the spool ..
+        assert len(_get_event_ids_by_cid()) == _batch_size
+        assert len(os.listdir(spool_dir)) == 1
+
+        # .. until an explicit flush writes it out ..
+        buffered.flush()
+
+        _run_companion_id_checks(parent_id)
+
+        # .. and nothing is left in the spool afterwards.
+        assert os.listdir(spool_dir) == []
+
+    finally:
+        _ = os.environ.pop(AuditLogCtx.Env_Spool_Dir, None)
+        rmtree(spool_dir, ignore_errors=True)
+
+# ################################################################################################################################
+# ################################################################################################################################
@@ -19,6 +19,7 @@ from live_sql.env import database_env
 from zato.common.audit_log.api import event_attr_table, event_body_table, event_link_table, event_table, \
     get_audit_engine, AuditEvent, AuditLog, AuditOutcome, AuditSource
 from zato.common.audit_log.common import event_dedup_table
+from zato.common.audit_log.search import delete_search_rows, get_search_condition, Search_Field_Columns
 from zato.common.util.api import utcnow
 
 # ################################################################################################################################
@@ -66,6 +67,7 @@ def delete_all_events() -> 'None':
     engine = get_audit_engine()
 
     with engine.begin() as connection:
+        delete_search_rows(connection, select(event_table.c.id))
         _ = connection.execute(event_attr_table.delete())
         _ = connection.execute(event_body_table.delete())
         _ = connection.execute(event_link_table.delete())
@@ -83,7 +85,8 @@ def _escape_like(query:'str') -> 'str':
 # ################################################################################################################################
 
 def _count_events(source:'str', object_name:'str', query:'str'='') -> 'int':
-    """ Runs the same count query the web-admin poll view runs.
+    """ Runs the same count query the web-admin poll view runs, through the search index
+    wherever the database holds one.
     """
     engine = get_audit_engine()
 
@@ -104,6 +107,9 @@ def _count_events(source:'str', object_name:'str', query:'str'='') -> 'int':
 
         where_conditions.append(or_(*like_parts))
 
+        if (index_condition := get_search_condition(engine, event_table.c.id, query, Search_Field_Columns)) is not None:
+            where_conditions.append(index_condition)
+
     count_query = select(func.count())
     count_query = count_query.select_from(event_table)
     count_query = count_query.where(*where_conditions)
@@ -202,6 +208,9 @@ def run_audit_log_scenario() -> 'None':
     # .. same for underscores - value_a must not match valuexa ..
     assert _count_events(AuditSource.REST_Channel, _channel_name, 'value_a') == 1
 
+    # .. a search for an identifier finds the one event carrying it ..
+    assert _count_events(AuditSource.REST_Channel, _channel_name, 'INV-2026-002') == 1
+
     # .. retention deletes events older than the window and keeps the recent ones ..
     expired_insert = event_table.insert().values(
         cid='cid-expired',
@@ -21,6 +21,7 @@ from zato.common.audit_log.api import event_attr_table, event_body_table, event_
     get_audit_engine, get_source_env_suffix, register_prunability, AuditEvent, AuditLink, AuditLog, AuditOutcome, \
     AuditSource, Env_Retention_Days_Prefix
 from zato.common.audit_log.retention import Env_Archive_Dir, Env_Content_Retention_Days
+from zato.common.audit_log.search import get_search_condition, has_search_index, Search_Field_Columns, Search_Table_Name
 from zato.common.util.api import utcnow
 
 # ################################################################################################################################
@@ -142,6 +143,51 @@ def _count_rows(table:'any_', event_id_column:'any_', event_id:'int') -> 'int':
 
 # ################################################################################################################################
 
+def _is_found_by_index(event_id:'int', query:'str') -> 'bool':
+    """ Whether the search index by itself, without the LIKE conditions it narrows down, leads a search
+    for the query to one event.
+    """
+    engine = get_audit_engine()
+    index_condition = get_search_condition(engine, event_table.c.id, query, Search_Field_Columns)
+
+    count_query = select(func.count())
+    count_query = count_query.select_from(event_table)
+    count_query = count_query.where(event_table.c.id == event_id, index_condition)
+
+    with engine.connect() as connection:
+        result = connection.execute(count_query)
+        out = result.scalar() == 1
+
+    return out
+
+# ################################################################################################################################
+
+def _count_index_rows() -> 'int':
+    """ Counts the rows of the search index, whichever database holds it.
+    """
+    engine = get_audit_engine()
+
+    with engine.connect() as connection:
+        result = connection.exec_driver_sql(f'SELECT COUNT(*) FROM {Search_Table_Name}')
+        out = result.scalar()
+
+    return out
+
+# ################################################################################################################################
+
+def _count_all_events() -> 'int':
+    """ Counts every event there is.
+    """
+    engine = get_audit_engine()
+
+    with engine.connect() as connection:
+        result = connection.execute(select(func.count()).select_from(event_table))
+        out = result.scalar()
+
+    return out
+
+# ################################################################################################################################
+
 def _never_prune(row:'anydict') -> 'bool':
     """ The predicate of a source that never allows its content to be pruned.
     """
@@ -153,7 +199,8 @@ def _never_prune(row:'anydict') -> 'bool':
 def run_retention_tiers_scenario() -> 'None':
     """ The tiered-retention scenario every backend must pass: content pruning ahead
     of row deletion, per-source prunability predicates protecting what must not be pruned,
-    companion rows deleted together with their events, and archive files written before anything is lost.
+    companion rows deleted together with their events, the search index following both,
+    and archive files written before anything is lost.
     """
     delete_all_events()
 
@@ -199,6 +246,12 @@ def run_retention_tiers_scenario() -> 'None':
         recent_id = _insert_event_at(audit_log, 0, data='a recent payload retention never touches')
         audit_log.add_links(recent_id, [expired_id], AuditLink.Resubmit_Of)
 
+        # .. the payload about to be pruned is in the search index, where the database has one ..
+        is_searchable = has_search_index(get_audit_engine())
+
+        if is_searchable:
+            assert _is_found_by_index(prunable_id, 'payload retention prunes')
+
         # .. run retention the same way periodic inserts do ..
         now = utcnow()
         audit_log._run_retention(now)
@@ -230,6 +283,11 @@ def run_retention_tiers_scenario() -> 'None':
         # .. the AS2 event of the same age is still there, because its source outlives the others ..
         assert _get_event_row(evidence_id) is not None
 
+        # .. the index forgot the pruned payload and the deleted events ..
+        if is_searchable:
+            assert not _is_found_by_index(prunable_id, 'payload retention prunes')
+            assert _count_index_rows() == _count_all_events()
+
         # .. the recent event was never touched ..
         row = _get_event_row(recent_id)
         assert row is not None
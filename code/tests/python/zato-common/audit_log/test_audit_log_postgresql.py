@@ -8,6 +8,7 @@ Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
 
 # Zato
 from attachments import run_attachment_scenario
+from batch_writer import run_batch_writer_scenario
 from common import audit_log_env, run_audit_log_scenario
 from config_audit import run_config_audit_scenario
 from flow_resolve import run_flow_resolve_scenario
@@ -38,6 +39,7 @@ def test_audit_log_postgresql(postgresql_server:'DatabaseServer') -> 'None':
         run_attachment_scenario()
         run_flow_resolve_scenario()
         run_scheduler_history_scenario()
+        run_batch_writer_scenario()
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -14,6 +14,7 @@ from sqlalchemy.exc import DBAPIError
 
 # Zato
 from attachments import run_attachment_scenario
+from batch_writer import run_batch_writer_scenario
 from common import assert_postgresql_connection_encrypted, audit_log_env, run_audit_log_scenario
 from config_audit import run_config_audit_scenario
 from flow_resolve import run_flow_resolve_scenario
@@ -46,6 +47,7 @@ def test_audit_log_postgresql_ssl(postgresql_ssl_server:'DatabaseServer') -> 'No
         run_attachment_scenario()
         run_flow_resolve_scenario()
         run_scheduler_history_scenario()
+        run_batch_writer_scenario()
         assert_postgresql_connection_encrypted()
 
 # ################################################################################################################################
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# stdlib
+import os
+from time import monotonic, sleep
+
+# SQLAlchemy
+from sqlalchemy import func, select
+
+# Zato
+from common import audit_log_env
+from zato.common.audit_log import spool as spool_module
+from zato.common.audit_log.api import event_attr_table, event_table, get_audit_engine, AuditEvent, AuditLog, AuditSource
+from zato.common.audit_log.api import ModuleCtx as AuditLogCtx
+from zato.common.audit_log.buffer import PendingEvent
+from zato.common.audit_log.spool import EventSpool
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+# The server name all the test events are written under
+_server_name = 'test-audit-log-spool-server'
+
+# The channel the spooled events belong to
+_channel_name = 'audit.test.spool-channel'
+
+# How many events the killed process left behind
+_orphaned_count = 25
+
+# How long the replay may take before the test gives up
+_replay_wait_seconds = 5.0
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def _new_event(idx:'int') -> 'PendingEvent':
+    """ Builds one event the way the writer buffers it.
+    """
+    out = PendingEvent()
+
+    out.attrs = {'idx': idx}
+    out.bodies = {}
+    out.attachments = []
+    out.parents = []
+    out.parent_link_type = ''
+
+    out.values = {
+        'cid': f'cid-spool-{idx}',
+        'cid_sequence': 1,
+        'source': AuditSource.REST_Channel,
+        'event_type': AuditEvent.Request_Received,
+        'object_name': _channel_name,
+        'msg_id': '',
+        'correl_id': '',
+        'ext_client_id': '',
+        'pub_time_iso': '',
+        'event_time_iso': '2026-01-01T00:00:00+00:00',
+        'server_name': _server_name,
+        'endpoint': '',
+        'sub_key': '',
+        'size': 0,
+        'priority': 0,
+        'outcome': '',
+        'application_outcome': '',
+        'classification': '',
+        'status': '',
+        'duration_ms': 0,
+        'data': '',
+    }
+
+    return out
+
+# ################################################################################################################################
+
+def _count_spooled_events() -> 'int':
+    """ Counts the events of the spool channel that made it to the database.
+    """
+    engine = get_audit_engine()
+
+    query = select(func.count()).select_from(event_table)
+    query = query.where(event_table.c.object_name == _channel_name)
+
+    with engine.connect() as connection:
+        out = connection.execute(query).scalar()
+
+    return out # type: ignore
+
+# ################################################################################################################################
+
+def _leave_orphaned_segment(spool_dir:'str') -> 'str':
+    """ Spools events the way a writer does and then abandons them, the way a process killed
+    before its flush would, with the last line cut off in the middle.
+    """
+    spool = EventSpool(spool_dir)
+
+    for idx in range(_orphaned_count):
+        spool.append(_new_event(idx))
+
+    # The kill comes in the middle of the next write ..
+    line = spool_module.event_to_line(_new_event(_orphaned_count))
+    _ = os.write(spool._fd, line[:len(line) // 2])
+
+    out = spool.rotate()
+
+    # .. and the next process to start has the same pid, which is what containers usually do.
+    spool_module._live_segment_names.discard(os.path.basename(out))
+
+    return out
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def test_audit_log_spool_replay(tmp_path:'os.PathLike') -> 'None':
+    """ Events a killed process buffered but never wrote out are replayed from the spool
+    by the next buffered writer to start, and their segment is deleted afterwards.
+    """
+    db_path = os.path.join(str(tmp_path), 'audit.db')
+    spool_dir = os.path.join(str(tmp_path), 'spool')
+
+    details = {
+        'type': AuditLogCtx.Type_SQLite,
+        'name': db_path,
+    }
+
+    os.environ[AuditLogCtx.Env_Spool_Dir] = spool_dir
+
+    try:
+        with audit_log_env(details):
+
+            # Make sure the tables exist before anything is replayed into them
+            _ = AuditLog(_server_name).insert(AuditSource.REST_Channel, AuditEvent.Request_Received, 'audit.test.init')
+
+            segment_path = _leave_orphaned_segment(spool_dir)
+            assert os.path.exists(segment_path)
+
+            # A new buffered writer replays what it finds as soon as it starts ..
+            _ = AuditLog(_server_name, flush_max_size=10, flush_max_wait_ms=100)
+
+            deadline = monotonic() + _replay_wait_seconds
+
+            while monotonic() < deadline:
+                if _count_spooled_events() == _orphaned_count:
+                    break
+                sleep(0.05)
+
+            # .. every complete event is in the database, with its attributes ..
+            assert _count_spooled_events() == _orphaned_count
+
+            engine = get_audit_engine()
+
+            attr_query = select(func.count()).select_from(event_attr_table)
+            attr_query = attr_query.where(event_attr_table.c.name == 'idx')
+
+            with engine.connect() as connection:
+                assert connection.execute(attr_query).scalar() == _orphaned_count
+
+            # .. and the spool is empty again, with no trace of the incomplete line.
+            deadline = monotonic() + _replay_wait_seconds
+
+            while monotonic() < deadline:
+                if not os.listdir(spool_dir):
+                    break
+                sleep(0.05)
+
+            assert os.listdir(spool_dir) == []
+
+    finally:
+        _ = os.environ.pop(AuditLogCtx.Env_Spool_Dir, None)
+
+# ################################################################################################################################
+
+def test_audit_log_spool_live_segments_are_left_alone(tmp_path:'os.PathLike') -> 'None':
+    """ A segment that is still being written to by a running writer is never claimed.
+    """
+    spool_dir = str(tmp_path)
+
+    writer_spool = EventSpool(spool_dir)
+    writer_spool.append(_new_event(1))
+
+    other_spool = EventSpool(spool_dir)
+
+    assert other_spool.claim_orphans() == []
+    assert len(os.listdir(spool_dir)) == 1
+
+    # Once the writer is done with it, the segment goes away
+    segment_path = writer_spool.rotate()
+    writer_spool.remove(segment_path)
+
+    assert os.listdir(spool_dir) == []
+
+# ################################################################################################################################
+# ################################################################################################################################
@@ -11,6 +11,7 @@ import os
 
 # Zato
 from attachments import run_attachment_scenario
+from batch_writer import run_batch_writer_scenario
 from common import audit_log_env, run_audit_log_scenario
 from config_audit import run_config_audit_scenario
 from flow_resolve import run_flow_resolve_scenario
@@ -42,6 +43,7 @@ def test_audit_log_sqlite(tmp_path:'os.PathLike') -> 'None':
         run_attachment_scenario()
         run_flow_resolve_scenario()
         run_scheduler_history_scenario()
+        run_batch_writer_scenario()
 
     # The database file was created under the path the environment pointed at
     assert os.path.exists(db_path)
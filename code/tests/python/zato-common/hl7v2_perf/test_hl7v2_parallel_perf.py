@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# stdlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from time import monotonic
+
+# humanize
+from humanize import intcomma
+
+# Zato
+from zato.hl7v2 import iter_batch, iter_batch_parallel, ParallelOutput
+from zato.hl7v2.tests.fakers import fake_evn, fake_msh, fake_pid, fake_pv1
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if 0:
+    from pathlib import Path
+
+    Path = Path
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+# How many messages the measured batch carries.
+Message_Count = 50_000
+
+# How many messages each worker parses before the measured window.
+Warm_Up_Messages_Per_Worker = 4
+
+# How many distinct messages the batch is built from - generating each one would take longer than parsing.
+Template_Count = 500
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def _get_worker_counts() -> 'list[int]':
+    """ One, then doubling up to the number of CPUs, which is always measured too.
+    """
+    cpu_count = os.cpu_count() or 1
+
+    out = []
+    workers = 1
+
+    while workers < cpu_count:
+        out.append(workers)
+        workers *= 2
+
+    out.append(cpu_count)
+    return out
+
+# ################################################################################################################################
+
+def _build_batch(templates:'list[str]', message_count:'int') -> 'str':
+    """ Builds a batch of message_count messages out of the templates given on input.
+    """
+    parts = ['BHS|^~\\&|||SendApp|SendFac|20240101120000']
+
+    for index in range(message_count):
+        parts.append(templates[index % len(templates)])
+
+    parts.append(f'BTS|{message_count}')
+
+    out = '\r'.join(parts)
+    return out
+
+# ################################################################################################################################
+
+def _write_batch(path:'Path', templates:'list[str]') -> 'None':
+    """ Writes a batch of Message_Count messages to disk.
+    """
+    batch = _build_batch(templates, Message_Count)
+
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        _ = f.write(batch)
+
+# ################################################################################################################################
+
+def _report(label:'str', elapsed:'float') -> 'float':
+    rate = Message_Count / elapsed
+    print(f'{label:<28} {intcomma(int(rate)):>10} messages/s ({elapsed:.2f}s)', flush=True)
+    return rate
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def test_hl7v2_parallel_perf(tmp_path:'Path') -> 'None':
+    """ Messages per second of parsing and validating one large batch in a single process,
+    then across a pool of 1, 2, 4 .. worker processes, up to the number of CPUs.
+
+    Each pool size is measured twice - yielding typed messages, which the calling process
+    parses once more, and yielding results, which keeps all of the parsing in the workers.
+    """
+    templates = []
+
+    for _ in range(Template_Count):
+        message = fake_msh('ADT', 'A01', 'ADT_A01') + fake_evn('A01') + fake_pid() + fake_pv1()
+        templates.append(message.rstrip('\r'))
+
+    path = tmp_path / 'batch.hl7'
+    _write_batch(path, templates)
+
+    print(f'\nHL7 batch of {intcomma(Message_Count)} messages', flush=True)
+
+    # The baseline is the streaming parser, one message after another ..
+    start = monotonic()
+    serial_count = sum(1 for _ in iter_batch(str(path)))
+    _ = _report('Single process', monotonic() - start)
+
+    assert serial_count == Message_Count
+
+    # .. and each pool size gets its own executor, started before the measured window,
+    # .. so that what is measured is parsing rather than spawning processes.
+    for workers in _get_worker_counts():
+
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) as executor:
+
+            # Warm the workers up - each imports the message definitions the first time it parses anything
+            warm_up_batch = _build_batch(templates, workers * Warm_Up_Messages_Per_Worker)
+            _ = list(iter_batch_parallel(warm_up_batch.encode('utf-8'), workers=workers, executor=executor, chunk_messages=1))
+
+            start = monotonic()
+            parallel_count = sum(1 for _ in iter_batch_parallel(str(path), workers=workers, executor=executor))
+            _ = _report(f'{workers} worker(s)', monotonic() - start)
+
+            start = monotonic()
+            result_count = sum(1 for _ in iter_batch_parallel(
+                str(path), workers=workers, executor=executor, output=ParallelOutput.Result))
+            _ = _report(f'{workers} worker(s), results', monotonic() - start)
+
+        assert parallel_count == Message_Count
+        assert result_count == Message_Count
+
+# ################################################################################################################################
+# ################################################################################################################################
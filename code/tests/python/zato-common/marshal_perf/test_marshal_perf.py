@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# stdlib
+from dataclasses import asdict, make_dataclass
+from time import monotonic
+
+# humanize
+from humanize import intcomma
+
+# Zato
+from zato.common.ext.dataclasses import dataclass
+from zato.common.marshal_.api import MarshalAPI, Model, model_to_dict
+from zato.common.typing_ import list_, optional
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if 0:
+    from zato.common.typing_ import any_, anydict, callable_
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+# How many top-level fields the wide model has ..
+Wide_Field_Count = 50
+
+# .. how many orders and items per order the deep one has ..
+Deep_Order_Count = 20
+Deep_Item_Count = 20
+
+# .. and how long each path is measured for, in seconds.
+Measure_Time = 1.0
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+@dataclass(init=False)
+class Item(Model):
+    id: int
+    name: str
+    price: optional[str]
+
+@dataclass(init=False)
+class Order(Model):
+    id: int
+    items: list_[Item]
+
+@dataclass(init=False)
+class Deep(Model):
+    orders: list_[Order]
+
+# A mix of integers that need converting, optional and required strings
+Wide = make_dataclass('Wide', [
+    (f'field{idx}', int if idx % 3 == 0 else (optional[str] if idx % 3 == 1 else str)) for idx in range(Wide_Field_Count)
+], bases=(Model,), init=False)
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def _get_wide_data() -> 'anydict':
+    out = {f'field{idx}': (str(idx) if idx % 3 == 0 else 'abc') for idx in range(Wide_Field_Count)}
+    return out
+
+# ################################################################################################################################
+
+def _get_deep_data() -> 'anydict':
+
+    orders = []
+
+    for order_id in range(Deep_Order_Count):
+        items = [{'id': item_id, 'name': 'abc', 'price': '1.23'} for item_id in range(Deep_Item_Count)]
+        orders.append({'id': order_id, 'items': items})
+
+    out = {'orders': orders}
+    return out
+
+# ################################################################################################################################
+
+def _measure(label:'str', func:'callable_', *args:'any_') -> 'float':
+    """ Calls a function for Measure_Time seconds, returning how many times per second it ran.
+    """
+    _ = func(*args)
+
+    count = 0
+    start = monotonic()
+
+    while (elapsed := monotonic() - start) < Measure_Time:
+        _ = func(*args)
+        count += 1
+
+    rate = count / elapsed
+    print(f'{label:<32} {intcomma(int(rate)):>10} calls/s', flush=True)
+
+    return rate
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def test_marshal_perf() -> 'None':
+    """ Calls per second of deserializing and serializing a wide and a deep model, through the compiled path
+    and through the interpreter and dataclasses.asdict that it replaces.
+    """
+    api = MarshalAPI()
+
+    for name, class_, data in (('Wide', Wide, _get_wide_data()), ('Deep', Deep, _get_deep_data())):
+
+        print(f'\n{name} model', flush=True)
+
+        compiled = api.from_dict(None, data, class_)
+        interpreted = api.from_dict_interpreted(None, data, class_)
+
+        # Both paths need to agree before their speed is worth comparing ..
+        assert model_to_dict(compiled) == asdict(interpreted)
+
+        # .. deserializing ..
+        interpreted_rate = _measure('from_dict (interpreted)', api.from_dict_interpreted, None, data, class_)
+        compiled_rate = _measure('from_dict (compiled)', api.from_dict, None, data, class_)
+
+        assert compiled_rate > interpreted_rate
+
+        # .. and serializing.
+        asdict_rate = _measure('asdict', asdict, compiled)
+        to_dict_rate = _measure('to_dict', model_to_dict, compiled)
+
+        assert to_dict_rate > asdict_rate
+
+# ################################################################################################################################
+# ################################################################################################################################
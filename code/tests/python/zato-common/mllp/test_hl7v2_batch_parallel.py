@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# stdlib
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+# Zato
+from zato.hl7v2 import HL7ValidationError, ParallelOutput, iter_batch, iter_batch_parallel, iter_file_parallel
+from zato.hl7v2.tests.fakers import fake_evn, fake_msh, fake_pid, fake_pv1
+from zato.hl7v2_rs import RawMessage
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+# How many worker processes the tests use.
+_Workers = 2
+
+# How many messages each test batch carries - several chunks' worth for each worker.
+_Messages_Per_Batch = 60
+
+# How many messages a worker gets at a time - small, so that results from many chunks need reordering.
+_Chunk_Messages = 7
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def _make_batch(msg_count:'int'=_Messages_Per_Batch, trailer:'str | None'=None) -> 'str':
+    parts = ['BHS|^~\\&|||SendApp|SendFac|20240101120000']
+    for _ in range(msg_count):
+        message = fake_msh('ADT', 'A01', 'ADT_A01') + fake_evn('A01') + fake_pid() + fake_pv1()
+        parts.append(message.rstrip('\r'))
+    parts.append(trailer if trailer is not None else f'BTS|{msg_count}')
+    out = '\r'.join(parts)
+    return out
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class TestIterBatchParallel(unittest.TestCase):
+    """ Parsing in worker processes yields the same messages, in the same order, as parsing in one process.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> 'None':
+        cls.executor = ProcessPoolExecutor(max_workers=_Workers, mp_context=get_context('spawn'))
+
+    @classmethod
+    def tearDownClass(cls) -> 'None':
+        cls.executor.shutdown()
+
+    def _iter(self, raw:'str', **kwargs:'object') -> 'list':
+        out = list(iter_batch_parallel(
+            raw.encode('utf-8'), workers=_Workers, chunk_messages=_Chunk_Messages, executor=self.executor, **kwargs))
+        return out
+
+    def test_messages_in_order(self) -> 'None':
+        raw = _make_batch()
+
+        expected = [message.serialize() for message in iter_batch(raw.encode('utf-8'))]
+        parallel = [message.serialize() for message in self._iter(raw)]
+
+        self.assertEqual(parallel, expected)
+
+    def test_raw_output(self) -> 'None':
+        out = self._iter(_make_batch(), output=ParallelOutput.Raw)
+
+        self.assertEqual(len(out), _Messages_Per_Batch)
+        self.assertTrue(all(isinstance(message, RawMessage) for message in out))
+
+    def test_result_output(self) -> 'None':
+        out = self._iter(_make_batch(), output=ParallelOutput.Result)
+
+        self.assertEqual([result.index for result in out], list(range(_Messages_Per_Batch)))
+        self.assertTrue(all(result.is_valid for result in out))
+        self.assertTrue(all(result.structure_id == 'ADT_A01' for result in out))
+
+    def test_invalid_message(self) -> 'None':
+
+        # A message with no PID at all cannot be an ADT_A01 ..
+        no_pid_message = 'MSH|^~\\&|App|Fac|App|Fac|20240101120000||ADT^A01^ADT_A01|X1|P|2.9'
+        raw = _make_batch(msg_count=1, trailer=f'{no_pid_message}\rBTS|2')
+
+        # .. which surfaces as the same error parse_hl7 raises ..
+        with self.assertRaises((HL7ValidationError, ValueError)):
+            _ = self._iter(raw)
+
+        # .. or as a result to inspect, with everything else still delivered.
+        out = self._iter(raw, output=ParallelOutput.Result)
+
+        self.assertEqual(len(out), 2)
+        self.assertTrue(out[0].is_valid)
+        self.assertFalse(out[1].is_valid)
+
+    def test_trailer_checked_after_all_messages(self) -> 'None':
+        messages = []
+
+        with self.assertRaises(ValueError) as ctx:
+            for message in iter_batch_parallel(_make_batch(trailer='BTS|999').encode('utf-8'),
+                workers=_Workers, chunk_messages=_Chunk_Messages, executor=self.executor):
+                messages.append(message)
+
+        self.assertEqual(len(messages), _Messages_Per_Batch)
+        self.assertIn('BTS declares 999 messages', str(ctx.exception))
+
+    def test_own_executor(self) -> 'None':
+        raw = 'FHS|^~\\&\r' + _make_batch(msg_count=3) + '\rFTS|1'
+
+        out = list(iter_file_parallel(raw.encode('utf-8'), workers=_Workers))
+        self.assertEqual(len(out), 3)
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if __name__ == '__main__':
+    _ = unittest.main()
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# stdlib
+import io
+import mmap
+import os
+import tempfile
+import unittest
+
+# Zato
+from zato.hl7v2 import iter_batch, iter_batch_or_file, iter_file, parse_batch, parse_file
+from zato.hl7v2.tests.fakers import fake_evn, fake_msh, fake_pid, fake_pv1
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+# How many messages each test batch carries.
+_Messages_Per_Batch = 5
+
+# A chunk size small enough for segments and multi-byte characters to be split across chunks.
+_Small_Chunk_Size = 7
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def _make_message() -> 'str':
+    out = fake_msh('ADT', 'A01', 'ADT_A01') + fake_evn('A01') + fake_pid() + fake_pv1()
+    out = out.rstrip('\r')
+    return out
+
+# ################################################################################################################################
+
+def _make_batch(msg_count:'int'=_Messages_Per_Batch, trailer:'str | None'=None) -> 'str':
+    parts = ['BHS|^~\\&|||SendApp|Städtisches KH|20240101120000']
+    for _ in range(msg_count):
+        parts.append(_make_message())
+    parts.append(trailer if trailer is not None else f'BTS|{msg_count}')
+    out = '\r'.join(part for part in parts if part)
+    return out
+
+# ################################################################################################################################
+
+def _make_file(batch_count:'int', trailer:'str | None'=None) -> 'str':
+    parts = ['FHS|^~\\&|||FileApp|FileFac|20240101120000']
+    for _ in range(batch_count):
+        parts.append(_make_batch())
+    parts.append(trailer if trailer is not None else f'FTS|{batch_count}')
+    out = '\r'.join(part for part in parts if part)
+    return out
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class TestIterBatch(unittest.TestCase):
+    """ Streaming a batch yields the same messages parse_batch builds, whatever the source is.
+    """
+
+    def test_same_messages_as_parse_batch(self) -> 'None':
+        raw = _make_batch()
+
+        expected = [message.serialize() for message in parse_batch(raw)]
+        streamed = [message.serialize() for message in iter_batch(raw.encode('utf-8'), chunk_size=_Small_Chunk_Size)]
+
+        self.assertEqual(streamed, expected)
+
+    def test_text_file_object(self) -> 'None':
+        raw = _make_batch()
+
+        out = list(iter_batch(io.StringIO(raw), chunk_size=_Small_Chunk_Size))
+        self.assertEqual(len(out), _Messages_Per_Batch)
+
+    def test_crlf_line_endings(self) -> 'None':
+        raw = _make_batch().replace('\r', '\r\n')
+
+        out = list(iter_batch(io.BytesIO(raw.encode('utf-8')), chunk_size=_Small_Chunk_Size))
+        self.assertEqual(len(out), _Messages_Per_Batch)
+
+    def test_is_lazy(self) -> 'None':
+        raw = _make_batch(trailer='BTS|999')
+
+        # The wrong count surfaces only at the end, so everything before it is still yielded ..
+        messages = iter_batch(raw.encode('utf-8'))
+
+        for _ in range(_Messages_Per_Batch):
+            _ = next(messages)
+
+        # .. and then the trailer is checked.
+        with self.assertRaises(ValueError) as ctx:
+            _ = next(messages)
+
+        self.assertIn('BTS declares 999 messages, found: 5', str(ctx.exception))
+
+    def test_missing_trailer(self) -> 'None':
+        raw = _make_batch(trailer='')
+
+        with self.assertRaises(ValueError) as ctx:
+            _ = list(iter_batch(raw.encode('utf-8')))
+
+        self.assertIn('no BTS trailer', str(ctx.exception))
+
+        # Without count checks, a batch cut short still yields all of its messages
+        out = list(iter_batch(raw.encode('utf-8'), check_counts=False))
+        self.assertEqual(len(out), _Messages_Per_Batch)
+
+    def test_validate_per_message(self) -> 'None':
+        raw = _make_batch()
+        seen = []
+
+        def should_validate(msg_raw:'str') -> 'bool':
+            seen.append(msg_raw)
+            return False
+
+        out = list(iter_batch(raw.encode('utf-8'), validate=should_validate))
+
+        self.assertEqual(len(out), _Messages_Per_Batch)
+        self.assertEqual(len(seen), _Messages_Per_Batch)
+        self.assertTrue(all(msg_raw.startswith('MSH|') for msg_raw in seen))
+
+    def test_file_input_rejected(self) -> 'None':
+        with self.assertRaises(ValueError) as ctx:
+            _ = list(iter_batch(_make_file(1).encode('utf-8')))
+
+        self.assertIn('use iter_file()', str(ctx.exception))
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class TestIterFile(unittest.TestCase):
+    """ Streaming a file yields the messages of all of its batches, with both trailers checked.
+    """
+
+    def setUp(self) -> 'None':
+        fd, self.path = tempfile.mkstemp(suffix='.hl7')
+        os.close(fd)
+
+    def tearDown(self) -> 'None':
+        os.remove(self.path)
+
+    def _write(self, raw:'str') -> 'None':
+        with open(self.path, 'wb') as f:
+            _ = f.write(raw.encode('utf-8'))
+
+    def test_path(self) -> 'None':
+        raw = _make_file(3)
+        self._write(raw)
+
+        expected = [message.serialize() for message in parse_file(raw).messages]
+        streamed = [message.serialize() for message in iter_file(self.path, chunk_size=_Small_Chunk_Size)]
+
+        self.assertEqual(streamed, expected)
+
+    def test_mmap(self) -> 'None':
+        self._write(_make_file(2))
+
+        with open(self.path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                out = list(iter_batch_or_file(buffer))
+
+        self.assertEqual(len(out), 2 * _Messages_Per_Batch)
+
+    def test_wrong_batch_count(self) -> 'None':
+        self._write(_make_file(2, trailer='FTS|3'))
+
+        with self.assertRaises(ValueError) as ctx:
+            _ = list(iter_file(self.path))
+
+        self.assertIn('FTS declares 3 batches, found: 2', str(ctx.exception))
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if __name__ == '__main__':
+    _ = unittest.main()
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# stdlib
+import os
+
+# SQLAlchemy
+from sqlalchemy import create_engine, inspect, text
+
+# Zato
+from zato.common.odb.model import Base, PubSubSubscription
+from zato.common.odb.schema import ensure_odb_columns
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if 0:
+    from zato.common.typing_ import any_
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+_table_name = PubSubSubscription.__tablename__
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def _get_column_names(engine:'any_') -> 'set[str]':
+    out = {column['name'] for column in inspect(engine).get_columns(_table_name)}
+    return out
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class TestODBSchema:
+
+    def test_an_odb_from_an_older_release_gains_the_new_column(self, tmp_path:'os.PathLike') -> 'None':
+
+        engine = create_engine('sqlite:///' + os.path.join(str(tmp_path), 'odb.db'))
+        Base.metadata.create_all(engine)
+
+        # This is what the table looked like before the column was declared ..
+        with engine.begin() as connection:
+            _ = connection.execute(text(f'ALTER TABLE {_table_name} DROP COLUMN rest_push_max_in_flight'))
+
+        assert 'rest_push_max_in_flight' not in _get_column_names(engine)
+
+        # .. and this is what a server starting against it does.
+        ensure_odb_columns(engine)
+
+        assert 'rest_push_max_in_flight' in _get_column_names(engine)
+
+        # Doing it again, e.g. by another server of the cluster, changes nothing
+        ensure_odb_columns(engine)
+
+        assert 'rest_push_max_in_flight' in _get_column_names(engine)
+
+# ################################################################################################################################
+
+    def test_no_engine_is_nothing_to_evolve(self) -> 'None':
+        ensure_odb_columns(None)
+
+# ################################################################################################################################
+# ################################################################################################################################
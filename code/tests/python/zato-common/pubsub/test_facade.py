@@ -257,6 +257,109 @@ class TestPubSubFacadePublishInputModel(unittest.TestCase):
 # ################################################################################################################################
 # ################################################################################################################################
 
+class TestPubSubFacadePublishMany(unittest.TestCase):
+
+    def setUp(self) -> 'None':
+
+        self.server = MagicMock()
+        self.server.config_manager._service_topic_cache = set()
+        self.server.config_manager._service_topic_lock = threading.RLock()
+        self.server.config_manager._push_subs = {}
+        self.server.config_manager.get_pubsub_topic_backend.return_value = None
+        self.server.service_store.name_to_impl_name = {
+            'my.api.customer.new': 'my_api_customer_new.MyApiCustomerNew',
+        }
+
+        self.server.pubsub_backend.publish_many.return_value = [PublishResult(), PublishResult()]
+
+        self.facade = PubSubFacade(self.server, 'test.service')
+
+# ################################################################################################################################
+
+    def test_publish_many_goes_to_backend_in_one_call(self) -> 'None':
+        """ All the items reach the backend at once, each with the calling service as its publisher.
+        """
+        items = [{'data': 'first'}, {'data': 'second', 'priority': 7}]
+
+        out = self.facade.publish_many('my.topic', items)
+
+        self.assertEqual(len(out), 2)
+        self.server.pubsub_backend.publish.assert_not_called()
+
+        call_args = self.server.pubsub_backend.publish_many.call_args
+        self.assertEqual(call_args[0][0], 'my.topic')
+
+        published = call_args[0][1]
+        self.assertEqual([item['data'] for item in published], ['first', 'second'])
+        self.assertEqual(published[1]['priority'], 7)
+
+        for item in published:
+            self.assertEqual(item['publisher'], 'test.service')
+
+# ################################################################################################################################
+
+    def test_publish_many_does_not_change_input_items(self) -> 'None':
+        """ The facade works on copies of the items, never on what the caller passed in.
+        """
+        items = [{'data': 'first'}]
+
+        _ = self.facade.publish_many('my.topic', items, cid='cid-many')
+
+        self.assertEqual(items, [{'data': 'first'}])
+
+# ################################################################################################################################
+
+    def test_publish_many_cid_becomes_correl_id(self) -> 'None':
+        """ The CID of the call, or that of an item, is each message's correlation ID unless the item has one.
+        """
+        items = [
+            {'data': 'first'},
+            {'data': 'second', 'cid': 'cid-item'},
+            {'data': 'third', 'correl_id': 'correl-explicit'},
+        ]
+
+        _ = self.facade.publish_many('my.topic', items, cid='cid-call')
+
+        published = self.server.pubsub_backend.publish_many.call_args[0][1]
+
+        self.assertEqual(published[0]['correl_id'], 'cid-call')
+        self.assertEqual(published[1]['correl_id'], 'cid-item')
+        self.assertEqual(published[2]['correl_id'], 'correl-explicit')
+
+        self.assertEqual(self.server.pubsub_backend.publish_many.call_args[1]['cid'], 'cid-call')
+
+# ################################################################################################################################
+
+    def test_publish_many_to_service_uses_computed_topic(self) -> 'None':
+        """ Publishing many messages to a service subscribes it once and uses its topic.
+        """
+        _ = self.facade.publish_many('my.api.customer.new', [{'data': 'first'}, {'data': 'second'}])
+
+        expected_topic = _service_topic_prefix + 'my.api.customer.new'
+        expected_sub_key = _service_sub_key_prefix + 'my.api.customer.new'
+
+        self.server.pubsub_backend.subscribe.assert_called_once_with(expected_sub_key, expected_topic)
+        self.assertEqual(self.server.pubsub_backend.publish_many.call_args[0][0], expected_topic)
+
+# ################################################################################################################################
+
+    def test_publish_many_to_amqp_topic_goes_to_broker(self) -> 'None':
+        """ Topics backed by AMQP get each message through their outgoing connection instead of the database.
+        """
+        backend_config = {'backend': 'amqp'}
+        self.server.config_manager.get_pubsub_topic_backend.return_value = backend_config
+
+        _ = self.facade.publish_many('my.amqp.topic', [{'data': 'first'}, {'data': 'second'}], cid='cid-amqp')
+
+        self.server.pubsub_backend.publish_many.assert_not_called()
+        self.assertEqual(self.server.config_manager.pubsub_publish_to_amqp.call_count, 2)
+
+        call_args = self.server.config_manager.pubsub_publish_to_amqp.call_args
+        self.assertEqual(call_args[0], (backend_config, 'second', 'my.amqp.topic', 'cid-amqp'))
+
+# ################################################################################################################################
+# ################################################################################################################################
+
 class TestServicePublishDelegatesToFacade(unittest.TestCase):
     """ Tests that Service.publish delegates to self.pubsub.publish.
     """
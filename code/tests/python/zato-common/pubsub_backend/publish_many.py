@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# gevent
+from gevent import joinall, spawn
+
+# Zato
+from common import delete_all_rows, get_delivery_rows, get_message_rows
+from zato.common.pubsub.sql.backend import SQLPubSubBackend
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if 0:
+    from zato.common.typing_ import anylist
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+# The topics and subscribers all the bulk-publish assertions share.
+_topic = 'pubsub.backend.test.publish-many'
+_other_topic = 'pubsub.backend.test.publish-many-other'
+_no_sub_topic = 'pubsub.backend.test.publish-many-no-sub'
+
+_sub_key_1 = 'zpsk.test.publish-many.1'
+_sub_key_2 = 'zpsk.test.publish-many.2'
+
+# How many messages one bulk publish carries - more than one msg_id lookup asks about, so chunking is exercised too.
+_message_count = 1_500
+
+# How many greenlets publish at the same time under group commit.
+_concurrent_publisher_count = 50
+
+# How long one group-commit window is, in milliseconds - long enough for all the greenlets to join one group.
+_group_commit_ms = 50
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def _run_publish_many_flow(backend:'SQLPubSubBackend') -> 'None':
+    """ Many messages go in with one call, each with its own options, and every subscriber gets all of them.
+    """
+    items:'anylist' = []
+
+    for idx in range(_message_count):
+        items.append({
+            'data': {'idx': idx},
+            'priority': 9 if idx == _message_count - 1 else 5,
+            'correl_id': f'correl-{idx}',
+        })
+
+    results = backend.publish_many(_topic, items, publisher='publish-many-test', cid='cid-publish-many')
+
+    # One result per item, in the order of the items ..
+    assert len(results) == _message_count
+
+    message_rows = get_message_rows(_topic)
+    assert len(message_rows) == _message_count
+
+    msg_id_to_row = {row.msg_id: row for row in message_rows}
+
+    for idx, result in enumerate(results):
+        row = msg_id_to_row[result.msg_id]
+        assert row.correl_id == f'correl-{idx}'
+        assert row.publisher == 'publish-many-test'
+        assert row.cid == 'cid-publish-many'
+
+    # .. each subscriber has one delivery row per message, pointing to the right one ..
+    row_id_to_msg_id = {row.id: row.msg_id for row in message_rows}
+
+    for sub_key in (_sub_key_1, _sub_key_2):
+        delivery_rows = get_delivery_rows(sub_key)
+        assert len(delivery_rows) == _message_count
+
+        delivered_msg_ids = {row_id_to_msg_id[row.message_id] for row in delivery_rows}
+        assert delivered_msg_ids == set(msg_id_to_row)
+
+    # .. the per-item priority was kept, so the last message is the first one delivered ..
+    messages = backend.fetch_messages(_sub_key_1, max_messages=1)
+    assert messages[0]['msg_id'] == results[-1].msg_id
+
+    # .. and an empty list publishes nothing.
+    assert backend.publish_many(_topic, []) == []
+
+# ################################################################################################################################
+
+def _run_no_subscriber_flow(backend:'SQLPubSubBackend') -> 'None':
+    """ Messages of a topic with no subscribers keep only their trace, as single publications do.
+    """
+    results = backend.publish_many(_no_sub_topic, [{'data': 'first'}, {'data': 'second'}])
+    assert len(results) == 2
+
+    message_rows = get_message_rows(_no_sub_topic)
+    assert len(message_rows) == 2
+
+    for row in message_rows:
+        assert row.payload is None
+
+# ################################################################################################################################
+
+def _run_group_commit_flow() -> 'None':
+    """ Publications from many greenlets at once are committed together, and each caller gets
+    its own msg_id only once its group is in the database.
+    """
+    backend = SQLPubSubBackend(group_commit_ms=_group_commit_ms)
+
+    committer = backend.group_committer
+    assert committer is not None
+
+    # Count how many transactions the groups take ..
+    group_sizes:'anylist' = []
+    write_group = committer.write_group
+
+    def _count_groups(messages:'anylist') -> 'None':
+        group_sizes.append(len(messages))
+        write_group(messages)
+
+    committer.write_group = _count_groups
+
+    # .. publish from many greenlets at the same time, to two topics ..
+    def _publish(idx:'int') -> 'str':
+        topic_name = _topic if idx % 2 else _other_topic
+        result = backend.publish(topic_name, f'group-{idx}')
+        return result.msg_id
+
+    greenlets = [spawn(_publish, idx) for idx in range(_concurrent_publisher_count)]
+    _ = joinall(greenlets, raise_error=True)
+
+    msg_ids = [greenlet.value for greenlet in greenlets]
+
+    # .. everyone got a msg_id of their own ..
+    assert len(set(msg_ids)) == _concurrent_publisher_count
+
+    # .. far fewer transactions ran than there were publications ..
+    assert sum(group_sizes) == _concurrent_publisher_count
+    assert len(group_sizes) < _concurrent_publisher_count, group_sizes
+
+    # .. and every message is in the database, with its delivery rows.
+    other_rows = get_message_rows(_other_topic)
+    assert len(other_rows) == _concurrent_publisher_count // 2
+
+    stored_msg_ids = {row.msg_id for row in get_message_rows(_topic)} | {row.msg_id for row in other_rows}
+    assert set(msg_ids) <= stored_msg_ids
+
+    assert len(get_delivery_rows(_sub_key_2)) == _message_count + _concurrent_publisher_count, len(get_delivery_rows(_sub_key_2))
+
+# ################################################################################################################################
+
+def _run_group_commit_failure_flow() -> 'None':
+    """ When a group cannot be committed, every caller in it gets the exception.
+    """
+    backend = SQLPubSubBackend(group_commit_ms=_group_commit_ms)
+
+    committer = backend.group_committer
+    assert committer is not None
+
+    def _fail(messages:'anylist') -> 'None':
+        raise Exception('Group commit test failure')
+
+    committer.write_group = _fail
+
+    def _publish(idx:'int') -> 'str':
+        try:
+            _ = backend.publish(_topic, f'failing-{idx}')
+        except Exception as e:
+            return str(e)
+        else:
+            return ''
+
+    greenlets = [spawn(_publish, idx) for idx in range(3)]
+    _ = joinall(greenlets, raise_error=True)
+
+    for greenlet in greenlets:
+        assert greenlet.value == 'Group commit test failure'
+
+# ################################################################################################################################
+
+def run_publish_many_scenario() -> 'None':
+    """ Bulk publications and group commit - many messages in one transaction, each caller
+    of a group-committed publish getting its own msg_id, and failures reaching everyone in a group.
+    """
+    delete_all_rows()
+
+    backend = SQLPubSubBackend()
+
+    backend.subscribe(_sub_key_1, _topic)
+    backend.subscribe(_sub_key_2, _topic)
+    backend.subscribe(_sub_key_2, _other_topic)
+
+    _run_publish_many_flow(backend)
+    _run_no_subscriber_flow(backend)
+    _run_group_commit_flow()
+    _run_group_commit_failure_flow()
+
+# ################################################################################################################################
+# ################################################################################################################################
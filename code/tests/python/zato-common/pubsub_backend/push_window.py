@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# gevent
+from gevent import sleep
+
+# Zato
+from common import delete_all_rows, get_delivery_rows
+from push_delivery import _StubServer, _wait_until
+from zato.common.api import PubSub
+from zato.common.pubsub.sql.backend import SQLPubSubBackend
+from zato.server.base.parallel.delivery import PushDelivery
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if 0:
+    from zato.common.typing_ import anydict, anylist
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+# The topic and subscriber all the in-flight window assertions share.
+_topic = 'pubsub.backend.test.push-window'
+_sub_key = 'zpsk.test.push-window.1'
+
+_rest_url = 'http://127.0.0.1:1/pubsub/test/push-window'
+_other_rest_url = 'http://127.0.0.1:1/pubsub/test/push-window-other'
+
+# How many messages may be in flight at once.
+_max_in_flight = 4
+
+# How many messages the windowed phase delivers - a few windows' worth.
+_message_count = 12
+
+# How long one simulated REST call takes, in seconds.
+_rest_call_seconds = 0.05
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class _RestRecorder:
+    """ Stands in for the REST endpoint - records what it receives and how many calls overlapped at most.
+    """
+    def __init__(self) -> 'None':
+        self.received:'anylist' = []
+        self.in_flight = 0
+        self.max_in_flight_seen = 0
+
+    def deliver(self, message:'anydict', sub_config:'anydict') -> 'None':
+
+        self.in_flight += 1
+        self.max_in_flight_seen = max(self.max_in_flight_seen, self.in_flight)
+
+        try:
+            sleep(_rest_call_seconds)
+            self.received.append(message['data'])
+        finally:
+            self.in_flight -= 1
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def _run_max_in_flight_flow(delivery:'PushDelivery') -> 'None':
+    """ The window comes from the REST subscription, defaults to one and never goes above the limit.
+    """
+    rest_config = {'push_type': PubSub.Push_Type.REST}
+    service_config = {'push_type': PubSub.Push_Type.Service}
+
+    assert delivery._get_max_in_flight([rest_config]) == 1
+    assert delivery._get_max_in_flight([service_config]) == 1
+
+    assert delivery._get_max_in_flight([{**rest_config, 'rest_push_max_in_flight': 7}]) == 7
+    assert delivery._get_max_in_flight([{**rest_config, 'rest_push_max_in_flight': 10_000}]) == \
+        PubSub.Delivery.Max_In_Flight_Limit
+
+# ################################################################################################################################
+
+def _run_session_flow(delivery:'PushDelivery') -> 'None':
+    """ Each REST endpoint has one session that all the pushes to it share, closed when delivery stops.
+    """
+    session = delivery._get_rest_session(_rest_url)
+
+    assert delivery._get_rest_session(_rest_url) is session
+    assert delivery._get_rest_session(_other_rest_url) is not session
+
+    adapter = session.get_adapter(_rest_url)
+    assert adapter._pool_maxsize >= PubSub.Delivery.Max_In_Flight_Limit # type: ignore
+
+# ################################################################################################################################
+
+def run_push_window_scenario() -> 'None':
+    """ REST push with an in-flight window - several messages of one subscriber go out at once,
+    yet all of them are acknowledged, and sessions to each endpoint are reused and closed on stop.
+    """
+    delete_all_rows()
+
+    backend = SQLPubSubBackend()
+    server = _StubServer()
+    delivery = PushDelivery(server, backend) # type: ignore[arg-type]
+
+    _run_max_in_flight_flow(delivery)
+    _run_session_flow(delivery)
+
+    recorder = _RestRecorder()
+    delivery._deliver_to_rest = recorder.deliver # type: ignore[method-assign]
+
+    sub_config = {
+        'topic_name': _topic,
+        'push_type': PubSub.Push_Type.REST,
+        'rest_push_url': _rest_url,
+        'rest_push_max_in_flight': _max_in_flight,
+    }
+
+    server.config_manager._push_subs[_sub_key] = [sub_config]
+    backend.subscribe(_sub_key, _topic)
+
+    # Publish everything up front so that the startup drain sees it all in one batch ..
+    for index in range(_message_count):
+        _ = backend.publish(_topic, f'push-window-{index}')
+
+    delivery.start_sub_key(_sub_key)
+
+    _wait_until(lambda: len(recorder.received) == _message_count, 'the windowed batch is delivered')
+    _wait_until(lambda: not get_delivery_rows(_sub_key), 'the windowed batch is acknowledged')
+
+    # .. more than one message was in flight at a time, but never more than the window allows ..
+    assert 1 < recorder.max_in_flight_seen <= _max_in_flight, recorder.max_in_flight_seen
+
+    # .. and each message arrived exactly once.
+    assert sorted(recorder.received) == sorted(f'push-window-{index}' for index in range(_message_count))
+
+    delivery.stop_sub_key(_sub_key)
+    delivery.stop()
+
+    assert not delivery._rest_sessions
+
+# ################################################################################################################################
+# ################################################################################################################################
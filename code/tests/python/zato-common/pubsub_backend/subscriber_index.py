@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# stdlib
+import os
+
+# gevent
+from gevent import sleep
+
+# Zato
+from common import delete_all_rows, get_delivery_rows, get_message_rows
+from zato.common.pubsub.sql.backend import SQLPubSubBackend
+from zato.common.pubsub.sql.config import get_pubsub_engine, ModuleCtx as PubSubDBCtx
+from zato.common.pubsub.sql.schema import topic_sub_table
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+# The topics and subscribers all the index assertions share.
+_topic = 'pubsub.backend.test.sub-index'
+_renamed_topic = 'pubsub.backend.test.sub-index-renamed'
+_deleted_topic = 'pubsub.backend.test.sub-index-deleted'
+_other_server_topic = 'pubsub.backend.test.sub-index-other-server'
+
+_sub_key_1 = 'zpsk.test.sub-index.1'
+_sub_key_2 = 'zpsk.test.sub-index.2'
+_sub_key_behind = 'zpsk.test.sub-index.behind'
+_sub_key_other_server = 'zpsk.test.sub-index.other-server'
+
+# How often the index is checked against the database in the refresh assertions, in seconds.
+_refresh_seconds = 1.0
+
+# A refresh interval no assertion ever reaches, in seconds.
+_no_refresh_seconds = 600.0
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def _insert_subscription_behind_back(sub_key:'str', topic_name:'str') -> 'None':
+    """ Adds a subscription straight to the database, bypassing every backend, so the subscription version stays as it was.
+    """
+    insert_statement = topic_sub_table.insert().values(sub_key=sub_key, topic_name=topic_name)
+
+    with get_pubsub_engine().begin() as connection:
+        _ = connection.execute(insert_statement)
+
+# ################################################################################################################################
+
+def _run_local_change_flow(backend:'SQLPubSubBackend') -> 'None':
+    """ Subscriptions made through the backend itself are seen by the very next publication.
+    """
+    sub_index = backend.sub_index
+    assert sub_index is not None
+
+    backend.subscribe(_sub_key_1, _topic)
+
+    # The first publication loads the index, which counts as a miss ..
+    _ = backend.publish(_topic, 'first')
+
+    assert sub_index.miss_count == 1
+    assert sub_index.hit_count == 0
+
+    # .. and everything after it is answered from memory.
+    backend.subscribe(_sub_key_2, _topic)
+    _ = backend.publish(_topic, 'second')
+
+    assert sub_index.miss_count == 1
+    assert sub_index.hit_count == 1
+
+    assert len(get_delivery_rows(_sub_key_1)) == 2
+    assert len(get_delivery_rows(_sub_key_2)) == 1
+
+    # An unsubscribed key gets nothing more ..
+    backend.unsubscribe(_sub_key_1, _topic)
+    _ = backend.publish(_topic, 'third')
+
+    assert len(get_delivery_rows(_sub_key_1)) == 0
+    assert len(get_delivery_rows(_sub_key_2)) == 2
+
+    # .. subscribers follow their topic when it is renamed ..
+    backend.rename_topic(_topic, _renamed_topic)
+    _ = backend.publish(_renamed_topic, 'fourth')
+
+    assert len(get_delivery_rows(_sub_key_2)) == 3
+
+    # .. and a deleted topic's subscribers are gone with it.
+    backend.subscribe(_sub_key_1, _deleted_topic)
+    backend.delete_topic(_deleted_topic)
+
+    _ = backend.publish(_deleted_topic, 'fifth')
+
+    message_rows = get_message_rows(_deleted_topic)
+    assert len(message_rows) == 1
+    assert message_rows[0].payload is None
+
+    assert sub_index.miss_count == 1
+
+# ################################################################################################################################
+
+def _run_other_server_flow(backend:'SQLPubSubBackend') -> 'None':
+    """ Subscriptions changed through another server sharing the database are seen by the very next publication here.
+    """
+    sub_index = backend.sub_index
+    assert sub_index is not None
+
+    # Each backend stands for a server of its own, with an index of its own
+    other_backend = SQLPubSubBackend()
+    assert other_backend.sub_index is not None
+    assert other_backend.sub_index is not sub_index
+
+    # Load the index first ..
+    _ = backend.publish(_other_server_topic, 'before')
+    miss_count = sub_index.miss_count
+
+    # .. now the other server subscribes ..
+    other_backend.subscribe(_sub_key_other_server, _other_server_topic)
+
+    # .. which the version tells this one about at once, at the cost of one load ..
+    _ = backend.publish(_other_server_topic, 'after-subscribe')
+
+    assert len(get_delivery_rows(_sub_key_other_server)) == 1
+    assert sub_index.miss_count == miss_count + 1
+
+    # .. after which the index answers again ..
+    _ = backend.publish(_other_server_topic, 'from-index')
+
+    assert len(get_delivery_rows(_sub_key_other_server)) == 2
+    assert sub_index.miss_count == miss_count + 1
+
+    # .. and the same goes for unsubscribing.
+    other_backend.unsubscribe(_sub_key_other_server, _other_server_topic)
+    _ = backend.publish(_other_server_topic, 'after-unsubscribe')
+
+    assert len(get_delivery_rows(_sub_key_other_server)) == 0
+    assert sub_index.miss_count == miss_count + 2
+
+# ################################################################################################################################
+
+def _run_behind_back_flow(backend:'SQLPubSubBackend') -> 'None':
+    """ A subscription added straight to the database, with no version bumped, is picked up by the next refresh of the index.
+    """
+    sub_index = backend.sub_index
+    assert sub_index is not None
+
+    # Load the index first ..
+    _ = backend.publish(_renamed_topic, 'before')
+
+    # .. now the other server subscribes ..
+    _insert_subscription_behind_back(_sub_key_behind, _renamed_topic)
+
+    # .. which this one does not know about yet ..
+    _ = backend.publish(_renamed_topic, 'unseen')
+    assert len(get_delivery_rows(_sub_key_behind)) == 0
+
+    # .. until the refresh interval passes.
+    sleep(_refresh_seconds)
+
+    _ = backend.publish(_renamed_topic, 'seen-after-refresh')
+    assert len(get_delivery_rows(_sub_key_behind)) == 1
+
+# ################################################################################################################################
+
+def _run_index_off_flow() -> 'None':
+    """ With the refresh interval set to zero, there is no index and each publication reads its subscribers.
+    """
+    os.environ[PubSubDBCtx.Env_Sub_Index_Refresh_Seconds] = '0'
+
+    try:
+        backend = SQLPubSubBackend()
+        assert backend.sub_index is None
+
+        _insert_subscription_behind_back(_sub_key_1, _topic)
+
+        _ = backend.publish(_topic, 'no-index')
+        assert len(get_delivery_rows(_sub_key_1)) == 1
+
+    finally:
+        _ = os.environ.pop(PubSubDBCtx.Env_Sub_Index_Refresh_Seconds, None)
+
+# ################################################################################################################################
+
+def run_subscriber_index_scenario() -> 'None':
+    """ The in-process index of topic subscribers - kept current by the backend's own subscription changes,
+    reloaded when another server changes them, refreshed from the database to catch rows changed there directly,
+    and possible to turn off.
+    """
+    delete_all_rows()
+
+    backend = SQLPubSubBackend()
+
+    sub_index = backend.sub_index
+    assert sub_index is not None
+
+    # Subscriptions changed locally are seen immediately, with no database reads in between ..
+    sub_index.refresh_seconds = _no_refresh_seconds
+    _run_local_change_flow(backend)
+
+    # .. so are those changed through another server ..
+    _run_other_server_flow(backend)
+
+    # .. while those changed in the database directly take up to one refresh interval ..
+    sub_index.refresh_seconds = _refresh_seconds
+    _run_behind_back_flow(backend)
+
+    # .. and the index can be turned off altogether.
+    _run_index_off_flow()
+
+# ################################################################################################################################
+# ################################################################################################################################
@@ -18,9 +18,12 @@ from common import assert_mysql_connection_encrypted, pubsub_backend_env
 from encryption import run_encryption_scenario
 from lifecycle import run_lifecycle_scenario
 from outgoing import run_outgoing_scenario
+from publish_many import run_publish_many_scenario
 from push_delivery import run_push_delivery_scenario
+from push_window import run_push_window_scenario
 from queues import run_queues_scenario
 from stats import run_stats_scenario
+from subscriber_index import run_subscriber_index_scenario
 from wakeup import run_wakeup_scenario
 from zato.common.pubsub.sql.backend import SQLPubSubBackend
 
@@ -43,9 +46,12 @@ def test_pubsub_backend_mysql_ssl(mysql_ssl_server:'DatabaseServer') -> 'None':
         run_queues_scenario()
         run_stats_scenario()
         run_wakeup_scenario()
+        run_publish_many_scenario()
+        run_subscriber_index_scenario()
         run_encryption_scenario()
         run_cleanup_scenario()
         run_push_delivery_scenario()
+        run_push_window_scenario()
         run_outgoing_scenario()
         assert_mysql_connection_encrypted()
 
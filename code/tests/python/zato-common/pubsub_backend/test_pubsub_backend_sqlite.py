@@ -15,9 +15,12 @@ from common import pubsub_backend_env
 from encryption import run_encryption_scenario
 from lifecycle import run_lifecycle_scenario
 from outgoing import run_outgoing_scenario
+from publish_many import run_publish_many_scenario
 from push_delivery import run_push_delivery_scenario
+from push_window import run_push_window_scenario
 from queues import run_queues_scenario
 from stats import run_stats_scenario
+from subscriber_index import run_subscriber_index_scenario
 from wakeup import run_wakeup_scenario
 from zato.common.pubsub.sql.config import ModuleCtx as PubSubDBCtx
 
@@ -39,9 +42,12 @@ def test_pubsub_backend_sqlite(tmp_path:'os.PathLike') -> 'None':
         run_queues_scenario()
         run_stats_scenario()
         run_wakeup_scenario()
+        run_publish_many_scenario()
+        run_subscriber_index_scenario()
         run_encryption_scenario()
         run_cleanup_scenario()
         run_push_delivery_scenario()
+        run_push_window_scenario()
         run_outgoing_scenario()
 
     # The database file was created under the path the environment pointed at.
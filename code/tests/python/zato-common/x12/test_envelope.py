@@ -8,11 +8,14 @@ Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
 
 # stdlib
 import unittest
+from io import BytesIO, StringIO
+from mmap import ACCESS_READ, mmap
+from tempfile import TemporaryFile
 
 # Zato
 from zato.common.typing_ import cast_
 from zato.x12.base import X12GenericMessage
-from zato.x12.envelope import X12EnvelopeError, X12Interchange, parse_x12
+from zato.x12.envelope import X12EnvelopeError, X12Interchange, iter_x12, parse_x12
 from zato.x12.retail import Invoice810, PurchaseOrder850, ShipNotice856
 
 # ################################################################################################################################
@@ -384,6 +387,101 @@ class TestBatchedConstruction(unittest.TestCase):
 # ################################################################################################################################
 # ################################################################################################################################
 
+class TestIterX12(unittest.TestCase):
+
+    maxDiff = None
+
+    def test_iter_matches_parse(self) -> 'None':
+
+        interchange = parse_x12(_interchange_multi_group)
+
+        expected = []
+        for group in interchange.groups:
+            for transaction_set in group.transaction_sets:
+                expected.append((group.gs.control_number, transaction_set.serialize()))
+
+        # Chunks this small split segments across reads
+        for source in (StringIO(_interchange_multi_group), BytesIO(_interchange_multi_group.encode('utf8'))):
+            result = []
+
+            for group, transaction_set in iter_x12(source, chunk_size=7):
+                self.assertEqual(group.transaction_sets, [])
+                result.append((group.gs.control_number, transaction_set.serialize()))
+
+            self.assertEqual(result, expected)
+
+# ################################################################################################################################
+
+    def test_iter_yields_before_the_end_is_read(self) -> 'None':
+
+        source = StringIO('\n' + _interchange_multi_set)
+        pairs = iter_x12(source, chunk_size=64)
+
+        group, transaction_set = next(pairs)
+
+        # The first invoice is out while the rest of the interchange is still unread ..
+        self.assertIsInstance(transaction_set, Invoice810)
+        self.assertEqual(transaction_set.big.invoice_number, 'INV-9981')
+        self.assertIsNone(group.ge)
+        self.assertLess(source.tell(), len(_interchange_multi_set))
+
+        # .. and the group's trailer is there once the group has been read to its end.
+        _, transaction_set = next(pairs)
+        self.assertEqual(transaction_set.big.invoice_number, 'INV-9982')
+
+        with self.assertRaises(StopIteration):
+            _ = next(pairs)
+
+        self.assertEqual(group.ge.transaction_set_count, '2')
+
+# ################################################################################################################################
+
+    def test_iter_mmap(self) -> 'None':
+
+        with TemporaryFile() as temp_file:
+            _ = temp_file.write(_interchange_multi_set.encode('utf8'))
+            temp_file.flush()
+
+            with mmap(temp_file.fileno(), 0, access=ACCESS_READ) as source:
+                pairs = list(iter_x12(source))
+
+        self.assertEqual(len(pairs), 2)
+        self.assertIs(pairs[0][0], pairs[1][0])
+
+# ################################################################################################################################
+
+    def test_iter_validates_each_trailer_as_it_arrives(self) -> 'None':
+
+        # A set whose SE count is wrong is never yielded ..
+        raw = _interchange_multi_set.replace('SE*4*0002~', 'SE*5*0002~')
+        result = []
+
+        with self.assertRaises(X12EnvelopeError) as ctx:
+            for _, transaction_set in iter_x12(StringIO(raw)):
+                result.append(transaction_set)
+
+        self.assertIn('SE01 `5` does not match', str(ctx.exception))
+        self.assertEqual(len(result), 1)
+
+        # .. while the GE and IEA can be checked only once their sets have been yielded.
+        for old, new, message in (
+            ('GE*2*905~', 'GE*3*905~', 'GE01 `3` does not match'),
+            ('IEA*1*000000905~', 'IEA*1*000000906~', 'does not match IEA02'),
+            ('IEA*1*000000905~', '', 'Interchange not closed with IEA'),
+        ):
+            raw = _interchange_multi_set.replace(old, new)
+            result = []
+
+            with self.assertRaises(X12EnvelopeError) as ctx:
+                for _, transaction_set in iter_x12(StringIO(raw)):
+                    result.append(transaction_set)
+
+            self.assertIn(message, str(ctx.exception))
+            self.assertEqual(len(result), 2)
+
+# ################################################################################################################################
+# ################################################################################################################################
+
 class TestLargeInterchange(unittest.TestCase):
 
     maxDiff = None
@@ -8,11 +8,12 @@ Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
 
 # stdlib
 import unittest
+from io import StringIO
 
 # Zato
 from zato.x12.envelope import parse_x12
 from zato.x12.validation import Element_Mandatory_Missing, Element_Too_Long, Element_Too_Short, Segment_Mandatory_Missing, \
-     Segment_Unrecognized, X12ValidationError, extract_business_key, parse_x12_strict, validate_snip_2, \
+     Segment_Unrecognized, X12ValidationError, extract_business_key, iter_x12_strict, parse_x12_strict, validate_snip_2, \
      validate_transaction_set
 
 # ################################################################################################################################
@@ -175,6 +176,31 @@ class TestStrictParsing(unittest.TestCase):
         self.assertEqual(issue.segment_position, 3)
         self.assertEqual(issue.segment_error_code, Segment_Unrecognized)
 
+# ################################################################################################################################
+
+    def test_streaming_rejects_the_set_with_issues(self) -> 'None':
+
+        # A clean invoice followed by one with an unrecognized segment
+        body = _invoice_clean + _invoice_unknown_segment.replace('*0001~', '*0002~')
+        wire = _in_group('IN', '004010', body, set_count=2)
+
+        result = []
+
+        with self.assertRaises(X12ValidationError) as ctx:
+            for _, transaction_set in iter_x12_strict(StringIO(wire)):
+                result.append(transaction_set)
+
+        # The clean set was yielded, the other one was not ..
+        self.assertEqual(len(result), 1)
+
+        # .. and the error reports it with its position in the interchange.
+        results = ctx.exception.results
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0].group_index, 0)
+        self.assertEqual(results[0].set_index, 1)
+        self.assertEqual(results[0].control_number, '0002')
+        self.assertEqual(results[0].issues[0].segment_tag, 'ZZZ')
+
 # ################################################################################################################################
 
     def test_missing_mandatory_element(self) -> 'None':
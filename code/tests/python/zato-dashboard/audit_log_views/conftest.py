@@ -14,9 +14,41 @@ import sys
 sys.path.insert(0, os.path.dirname(__file__))
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'zato-common', 'lib')))
 
+# pytest
+import pytest
+
 # Django
 from django.conf import settings
 
+# Zato
+from live_sql.containers import start_postgresql, stop_container
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if 0:
+    from collections.abc import Iterator
+    from live_sql.containers import DatabaseServer
+
+    servergen = Iterator[DatabaseServer]
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class ModuleCtx:
+
+    # The container the searches are run against where a test needs a live PostgreSQL, and its host port
+    PostgreSQL_Container = 'zato-audit-log-views-test-postgresql'
+    PostgreSQL_Port      = 25442
+
+    # Database credentials of the container
+    Username = 'zato_audit_log'
+    Password = 'test-audit-log-password'
+    DB_Name  = 'zato_audit_log'
+
+# ################################################################################################################################
+# ################################################################################################################################
+
 # The views build responses and read the request the way Django hands it over, so Django is
 # configured before anything imports them - with nothing behind it, no database and no
 # templates, because a view is called here directly rather than through a URL.
@@ -31,3 +63,22 @@ if not settings.configured:
 
 # ################################################################################################################################
 # ################################################################################################################################
+
+@pytest.fixture(scope='session')
+def postgresql_server() -> 'servergen':
+    """ A plain PostgreSQL server started on demand in a container.
+    """
+    server = start_postgresql(
+        container_name=ModuleCtx.PostgreSQL_Container,
+        port=ModuleCtx.PostgreSQL_Port,
+        username=ModuleCtx.Username,
+        password=ModuleCtx.Password,
+        db_name=ModuleCtx.DB_Name,
+        needs_ssl=False,
+    )
+    yield server
+
+    stop_container(server.container_name)
+
+# ################################################################################################################################
+# ################################################################################################################################
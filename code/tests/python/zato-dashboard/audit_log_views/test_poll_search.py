@@ -0,0 +1,334 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# The poll searches through the audit log's search index wherever the database holds one,
+# finding exactly what the LIKE conditions alone would - parts of words and events written
+# before the index existed included, in SQLite and PostgreSQL alike. A page read on from the cursor of the one before it is the same page
+# its offset would give, and a count stops at its limit rather than read the whole log.
+
+# stdlib
+import os
+from contextlib import contextmanager
+from json import dumps, loads
+
+# SQLAlchemy
+from sqlalchemy import func, select
+
+# Zato
+from zato.admin.web.views.audit_log import poll
+from zato.admin.web.views.audit_log import views as audit_log_views
+from zato.common.audit_log.api import event_table, get_audit_engine, AuditEvent, AuditLog, AuditOutcome, AuditSource, \
+    ModuleCtx as AuditLogCtx
+from zato.common.audit_log.search import has_search_index, Search_Table_Name
+from zato.common.ext.bunch import Bunch
+
+# Test support
+from live_sql.env import database_env
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if 0:
+    from collections.abc import Iterator
+    from live_sql.containers import DatabaseServer
+    from zato.common.typing_ import any_, anydict, anylist
+
+    envgen = Iterator[None]
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+# The server and channel the events of these tests are written under
+_server_name = 'test-poll-search-server'
+_channel_name = 'test.poll.search.channel'
+
+# The prefix all the audit log database environment variables share
+_env_prefix = 'Zato_Audit_Log_DB_'
+
+# What the matching events carry in their payloads, and the one attr value searched for
+_needle = 'PATIENT-7741'
+_mrn = 'MRN-55012'
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+@contextmanager
+def _audit_env(tmp_path:'any_') -> 'envgen':
+    """ Points the audit log at a throwaway SQLite database, schema and search index included.
+    """
+    db_path = os.path.join(str(tmp_path), 'audit.db')
+
+    details_config = {
+        'type': AuditLogCtx.Type_SQLite,
+        'name': db_path,
+    }
+
+    with database_env(_env_prefix, details_config):
+        yield
+
+# ################################################################################################################################
+
+def _insert_unindexed(event_time_iso:'str', data:'str') -> 'None':
+    """ Writes one event straight into the table, without its index row - the way
+    every event written before the index existed is stored.
+    """
+    insert = event_table.insert().values(
+        cid='cid-poll-search-unindexed',
+        source=AuditSource.MLLP_Channel,
+        event_type=AuditEvent.Message_Received,
+        object_name=_channel_name,
+        msg_id='',
+        correl_id='',
+        ext_client_id='',
+        pub_time_iso='',
+        event_time_iso=event_time_iso,
+        server_name=_server_name,
+        endpoint='',
+        sub_key='',
+        size=10,
+        priority=0,
+        outcome=AuditOutcome.OK,
+        data=data,
+    )
+
+    with get_audit_engine().begin() as connection:
+        _ = connection.execute(insert)
+
+# ################################################################################################################################
+
+def _insert_events(audit_log:'AuditLog', count:'int', data:'str') -> 'None':
+    """ Writes a number of events through the audit log, each of them indexed as it goes in.
+    """
+    for idx in range(count):
+        _ = audit_log.insert(AuditSource.MLLP_Channel, AuditEvent.Message_Received, _channel_name,
+            cid=f'cid-poll-search-{idx}', outcome=AuditOutcome.OK, data=f'{data} {idx}')
+
+# ################################################################################################################################
+
+def _poll(**overrides:'any_') -> 'anydict':
+    """ Calls the poll view with the standard filter keys, any of them overridden.
+    """
+    body = {
+        'sources': [],
+        'sources_excluded': [],
+        'object_names': [_channel_name],
+        'object_names_excluded': [],
+        'outcomes': [],
+        'query': '',
+        'status': '',
+        'time_from': '',
+        'time_to': '',
+        'event_types': [],
+        'page': 1,
+        'page_size': 50,
+    }
+
+    body.update(overrides)
+
+    request = Bunch()
+    request.method = 'POST'
+    request.body = dumps(body).encode('utf-8')
+
+    response = poll(request)
+
+    out = loads(response.content)
+    return out
+
+# ################################################################################################################################
+
+def _get_ids(response:'anydict') -> 'anylist':
+    out = [row['id'] for row in response['rows']]
+    return out
+
+# ################################################################################################################################
+
+def _check_parts_of_words_are_found() -> 'None':
+    """ A term found in the middle of a word, of an endpoint or of an attr value is found through the index
+    exactly as the LIKE conditions alone would find it, with LIKE wildcards in the term matching literally.
+    """
+    audit_log = AuditLog(_server_name)
+    assert has_search_index(get_audit_engine()) is True
+
+    _ = audit_log.insert(AuditSource.MLLP_Channel, AuditEvent.Message_Received, _channel_name,
+        cid='cid-poll-search-orders', outcome=AuditOutcome.OK, endpoint='crm.orders.api', data='MSH|PID|ORD-12345',
+        attrs={'mrn': _mrn})
+
+    _ = audit_log.insert(AuditSource.MLLP_Channel, AuditEvent.Message_Received, _channel_name,
+        cid='cid-poll-search-customers', outcome=AuditOutcome.OK, endpoint='crm.customers.api', data='MSH|PID|ORD-99999')
+
+    # A part of an endpoint's name ..
+    response = _poll(query='orders')
+
+    assert response['total'] == 1
+    assert response['rows'][0]['cid'] == 'cid-poll-search-orders'
+
+    # .. a part of an identifier in the payload ..
+    response = _poll(query='RD-12')
+
+    assert response['total'] == 1
+    assert response['rows'][0]['cid'] == 'cid-poll-search-orders'
+
+    assert _poll(query='ORD-')['total'] == 2
+
+    # .. and a part of an attr value are all found ..
+    response = _poll(sources=[AuditSource.MLLP_Channel], query=_mrn[2:])
+
+    assert response['total'] == 1
+    assert response['rows'][0]['cid'] == 'cid-poll-search-orders'
+
+    # .. while an underscore is only ever an underscore.
+    assert _poll(query='RD_12')['total'] == 0
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class TestSearch:
+
+    def test_events_written_through_the_log_are_indexed_and_found(self, tmp_path:'os.PathLike'):
+        with _audit_env(tmp_path):
+
+            audit_log = AuditLog(_server_name)
+
+            _insert_events(audit_log, 3, f'MSH|PID|{_needle}')
+            _insert_events(audit_log, 2, 'MSH|PID|SOMEONE-ELSE')
+
+            engine = get_audit_engine()
+            assert has_search_index(engine) is True
+
+            # Every event went into the index as it was written ..
+            with engine.connect() as connection:
+                event_count = connection.execute(select(func.count()).select_from(event_table)).scalar()
+                indexed_count = connection.exec_driver_sql(f'SELECT COUNT(*) FROM {Search_Table_Name}').scalar()
+
+            assert indexed_count == event_count == 5
+
+            # .. and a search finds the ones that match, a substring of a word included.
+            response = _poll(query=_needle[2:])
+
+            assert response['total'] == 3
+            assert len(response['rows']) == 3
+
+            for row in response['rows']:
+                assert _needle in row['data']
+
+# ################################################################################################################################
+
+    def test_events_written_before_the_index_are_still_found(self, tmp_path:'os.PathLike'):
+        with _audit_env(tmp_path):
+
+            audit_log = AuditLog(_server_name)
+
+            # The oldest event has no index row, the newer ones do
+            _insert_unindexed('2026-01-01T10:00:00+00:00', f'MSH|PID|{_needle}|old')
+            _insert_events(audit_log, 2, f'MSH|PID|{_needle}|new')
+
+            response = _poll(query=_needle)
+
+            assert response['total'] == 3
+
+            data = [row['data'] for row in response['rows']]
+            assert f'MSH|PID|{_needle}|old' in data
+
+# ################################################################################################################################
+
+    def test_a_term_too_short_for_the_index_is_searched_without_it(self, tmp_path:'os.PathLike'):
+        with _audit_env(tmp_path):
+
+            audit_log = AuditLog(_server_name)
+
+            _insert_events(audit_log, 2, 'MSH|PID|Q7')
+            _insert_events(audit_log, 1, 'MSH|PID|Z9')
+
+            response = _poll(query='Q7')
+            assert response['total'] == 2
+
+# ################################################################################################################################
+
+    def test_an_attr_value_is_found_through_the_index(self, tmp_path:'os.PathLike'):
+        with _audit_env(tmp_path):
+
+            audit_log = AuditLog(_server_name)
+
+            _ = audit_log.insert(AuditSource.MLLP_Channel, AuditEvent.Message_Received, _channel_name,
+                cid='cid-poll-search-mrn', outcome=AuditOutcome.OK, data='MSH|ADT', attrs={'mrn': _mrn})
+
+            _ = audit_log.insert(AuditSource.MLLP_Channel, AuditEvent.Message_Received, _channel_name,
+                cid='cid-poll-search-other', outcome=AuditOutcome.OK, data='MSH|ADT', attrs={'mrn': 'MRN-00001'})
+
+            response = _poll(sources=[AuditSource.MLLP_Channel], query=_mrn)
+
+            assert response['total'] == 1
+            assert response['rows'][0]['cid'] == 'cid-poll-search-mrn'
+
+# ################################################################################################################################
+
+    def test_parts_of_words_are_found(self, tmp_path:'os.PathLike'):
+        with _audit_env(tmp_path):
+            _check_parts_of_words_are_found()
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class TestSearchPostgreSQL:
+
+    def test_parts_of_words_are_found(self, postgresql_server:'DatabaseServer'):
+        with database_env(_env_prefix, postgresql_server.details):
+            _check_parts_of_words_are_found()
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class TestPaging:
+
+    def test_a_page_read_on_from_a_cursor_is_the_page_its_offset_gives(self, tmp_path:'os.PathLike'):
+        with _audit_env(tmp_path):
+
+            audit_log = AuditLog(_server_name)
+            _insert_events(audit_log, 5, 'MSH|PID')
+
+            first_page = _poll(page=1, page_size=2)
+            assert first_page['next_cursor'] is not None
+
+            by_cursor = _poll(page=2, page_size=2, cursor=first_page['next_cursor'])
+            by_offset = _poll(page=2, page_size=2)
+
+            assert _get_ids(by_cursor) == _get_ids(by_offset)
+            assert by_cursor['total'] == by_offset['total'] == 5
+
+            # The last page is not full, so there is nothing after it to read on from
+            last_page = _poll(page=3, page_size=2, cursor=by_cursor['next_cursor'])
+
+            assert len(last_page['rows']) == 1
+            assert last_page['next_cursor'] is None
+
+            all_ids = _get_ids(first_page) + _get_ids(by_cursor) + _get_ids(last_page)
+            assert all_ids == sorted(all_ids, reverse=True)
+
+# ################################################################################################################################
+
+    def test_a_count_stops_at_its_limit(self, tmp_path:'os.PathLike', monkeypatch:'any_'):
+        with _audit_env(tmp_path):
+
+            audit_log = AuditLog(_server_name)
+            _insert_events(audit_log, 5, 'MSH|PID')
+
+            monkeypatch.setattr(audit_log_views, '_max_counted_events', 3)
+
+            capped = _poll(page=1, page_size=2)
+
+            assert capped['total'] == 3
+            assert capped['is_total_capped'] is True
+
+            # Counted on from the second page's cursor, the whole log fits within the limit
+            second_page = _poll(page=2, page_size=2, cursor=capped['next_cursor'])
+
+            assert second_page['total'] == 5
+            assert second_page['is_total_capped'] is False
+
+# ################################################################################################################################
+# ################################################################################################################################
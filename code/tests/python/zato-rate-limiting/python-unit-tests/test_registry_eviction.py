@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# stdlib
+import datetime
+import os
+from unittest import main, TestCase
+
+# Zato
+from zato.common.rate_limiting.common import Env_Max_Keys, Microseconds_Per_Second, RateLimitError, Window_Unit_Minute
+from zato.common.rate_limiting.fixed_window import FixedWindowConfig, FixedWindowRegistry
+from zato.common.rate_limiting.token_bucket import TokenBucketConfig, TokenBucketRegistry
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+_utc = datetime.timezone.utc
+
+def _to_us(year:'int', month:'int', day:'int', hour:'int'=0, minute:'int'=0, second:'int'=0) -> 'int':
+    """ Converts a UTC date/time to microseconds since epoch.
+    """
+    now = datetime.datetime(year, month, day, hour, minute, second, tzinfo=_utc)
+    out = int(now.timestamp()) * Microseconds_Per_Second
+    return out
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class TokenBucketEvictionTestCase(TestCase):
+
+    def setUp(self) -> 'None':
+        self.now_us = _to_us(2026, 3, 1, 12, 0, 0)
+
+        # Two tokens a second with room for four, so an empty bucket is full again after two seconds
+        self.config = TokenBucketConfig.from_parts(2, 4)
+
+    def test_full_bucket_is_evicted(self) -> 'None':
+        """ Buckets that have refilled to capacity are dropped by later checks of other keys.
+        """
+        registry = TokenBucketRegistry()
+
+        for idx in range(4):
+            _ = registry.check_inner(f'idle_{idx}', self.config, self.now_us)
+
+        self.assertEqual(len(registry), 4)
+
+        # Each check drops a few of the keys that became idle, so a few checks are enough to drop them all
+        later = self.now_us + Microseconds_Per_Second
+        for _ in range(4):
+            _ = registry.check_inner('active', self.config, later)
+
+        self.assertEqual(len(registry), 1)
+        self.assertEqual(registry.idle_eviction_count, 4)
+
+# ################################################################################################################################
+
+    def test_draining_bucket_is_kept(self) -> 'None':
+        """ A bucket still refilling is not dropped, so its client cannot reset it by waiting a moment.
+        """
+        registry = TokenBucketRegistry()
+
+        for _ in range(4):
+            _ = registry.check_inner('drained', self.config, self.now_us)
+
+        # Half a second later only one token has come back ..
+        later = self.now_us + Microseconds_Per_Second // 2
+        for _ in range(4):
+            _ = registry.check_inner('other', self.config, later)
+
+        self.assertEqual(len(registry), 2)
+
+        # .. which is all the drained key can use.
+        result = registry.check_inner('drained', self.config, later)
+        self.assertTrue(result.is_allowed)
+        self.assertEqual(result.tokens_remaining, 0)
+
+        result = registry.check_inner('drained', self.config, later)
+        self.assertFalse(result.is_allowed)
+
+# ################################################################################################################################
+
+    def test_evicted_bucket_starts_full(self) -> 'None':
+        """ A key that was dropped gets the same tokens back it would have had anyway.
+        """
+        registry = TokenBucketRegistry()
+
+        for _ in range(4):
+            _ = registry.check_inner('key', self.config, self.now_us)
+
+        much_later = self.now_us + 10 * Microseconds_Per_Second
+        _ = registry.check_inner('other', self.config, much_later)
+
+        self.assertNotIn('key', registry._states)
+
+        result = registry.check_inner('key', self.config, much_later)
+        self.assertTrue(result.is_allowed)
+        self.assertEqual(result.tokens_remaining, 3)
+
+# ################################################################################################################################
+
+    def test_zero_rate_bucket_is_kept(self) -> 'None':
+        """ A bucket that never refills is never idle.
+        """
+        registry = TokenBucketRegistry()
+        config = TokenBucketConfig.from_parts(0, 1)
+
+        _ = registry.check_inner('key', config, self.now_us)
+        _ = registry.check_inner('other', config, self.now_us + 1_000 * Microseconds_Per_Second)
+
+        self.assertIn('key', registry._states)
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class FixedWindowEvictionTestCase(TestCase):
+
+    def setUp(self) -> 'None':
+        self.now_us = _to_us(2026, 3, 1, 12, 0, 10)
+        self.config = FixedWindowConfig.from_parts(3, Window_Unit_Minute)
+
+    def test_passed_window_is_evicted(self) -> 'None':
+        """ Windows that have passed are dropped, while the current ones are kept.
+        """
+        registry = FixedWindowRegistry()
+
+        _ = registry.check_inner('old', self.config, self.now_us)
+
+        next_minute = _to_us(2026, 3, 1, 12, 1, 5)
+        _ = registry.check_inner('new', self.config, next_minute)
+        _ = registry.check_inner('new', self.config, next_minute)
+
+        self.assertEqual(list(registry._states), ['new'])
+        self.assertEqual(registry.idle_eviction_count, 1)
+
+# ################################################################################################################################
+
+    def test_open_window_is_kept(self) -> 'None':
+        """ A window still open keeps its count, however many other keys are checked.
+        """
+        registry = FixedWindowRegistry()
+
+        for _ in range(3):
+            _ = registry.check_inner('limited', self.config, self.now_us)
+
+        for idx in range(10):
+            _ = registry.check_inner(f'other_{idx}', self.config, self.now_us + idx)
+
+        result = registry.check_inner('limited', self.config, self.now_us + 20)
+        self.assertFalse(result.is_allowed)
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class CapacityTestCase(TestCase):
+
+    def setUp(self) -> 'None':
+        self.now_us = _to_us(2026, 3, 1, 12, 0, 10)
+        self.config = FixedWindowConfig.from_parts(3, Window_Unit_Minute)
+
+    def test_least_recently_seen_key_is_evicted(self) -> 'None':
+        """ With all the state live, a new key at the cap replaces the key seen the longest time ago.
+        """
+        registry = FixedWindowRegistry(max_keys=3)
+
+        _ = registry.check_inner('a', self.config, self.now_us)
+        _ = registry.check_inner('b', self.config, self.now_us)
+        _ = registry.check_inner('c', self.config, self.now_us)
+        _ = registry.check_inner('a', self.config, self.now_us)
+        _ = registry.check_inner('d', self.config, self.now_us)
+
+        self.assertEqual(list(registry._states), ['c', 'a', 'd'])
+        self.assertEqual(registry.capacity_eviction_count, 1)
+
+# ################################################################################################################################
+
+    def test_idle_key_is_evicted_before_live_one(self) -> 'None':
+        """ A new key at the cap takes the place of idle state rather than of the least recently seen live state.
+        """
+        registry = TokenBucketRegistry(max_keys=2)
+        config = TokenBucketConfig.from_parts(1, 2)
+
+        # This bucket is drained ..
+        _ = registry.check_inner('live', config, self.now_us)
+        _ = registry.check_inner('live', config, self.now_us)
+
+        # .. and this one will be full by the time the new key arrives.
+        _ = registry.check_inner('idle', config, self.now_us + 1)
+        _ = registry.check_inner('new', config, self.now_us + Microseconds_Per_Second + 1)
+
+        self.assertEqual(set(registry._states), {'live', 'new'})
+        self.assertEqual(registry.capacity_eviction_count, 0)
+
+# ################################################################################################################################
+
+    def test_heap_is_bounded(self) -> 'None':
+        """ Entries of keys dropped at the cap do not pile up in the heap.
+        """
+        registry = FixedWindowRegistry(max_keys=10)
+
+        for idx in range(1_000):
+            _ = registry.check_inner(f'key_{idx}', self.config, self.now_us)
+
+        self.assertEqual(len(registry), 10)
+        self.assertLessEqual(len(registry._idle_heap), 2 * registry.max_keys + 1)
+
+# ################################################################################################################################
+
+    def test_max_keys_from_environment(self) -> 'None':
+        """ The cap can be set through an environment variable and must be positive.
+        """
+        os.environ[Env_Max_Keys] = '123'
+
+        try:
+            registry = TokenBucketRegistry()
+        finally:
+            del os.environ[Env_Max_Keys]
+
+        self.assertEqual(registry.max_keys, 123)
+
+        with self.assertRaises(RateLimitError):
+            _ = FixedWindowRegistry(max_keys=0)
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if __name__ == '__main__':
+    _ = main()
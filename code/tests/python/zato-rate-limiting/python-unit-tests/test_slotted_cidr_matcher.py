@@ -7,10 +7,12 @@ Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
 """
 
 # stdlib
+import ipaddress
+import random
 from unittest import main, TestCase
 
 # Zato
-from zato.common.rate_limiting.cidr import SlottedCIDRMatcher
+from zato.common.rate_limiting.cidr import parse_client_ip, SlottedCIDRMatcher
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -50,6 +52,16 @@ _rule_with_disabled_range = {
     ],
 }
 
+def _make_rule(cidr_list:'list[str]') -> 'dict':
+    out = {
+        'cidr_list': cidr_list,
+        'time_range': [
+            {'is_all_day': True, 'disabled': False, 'disallowed': False,
+             'rate': 10, 'burst': 20, 'limit': 100, 'limit_unit': 'minute'},
+        ],
+    }
+    return out
+
 # ################################################################################################################################
 # ################################################################################################################################
 
@@ -208,5 +220,98 @@ class SlottedCIDRMatcherToListTestCase(TestCase):
 # ################################################################################################################################
 # ################################################################################################################################
 
+class SlottedCIDRMatcherIndexTestCase(TestCase):
+
+    def test_broader_earlier_rule_wins(self) -> 'None':
+        """ Rules keep their top-to-bottom precedence, however specific a later rule's network is.
+        """
+        matcher = SlottedCIDRMatcher()
+        matcher.replace_all([_rule_10, _make_rule(['10.1.2.0/24'])])
+
+        match = matcher.resolve('10.1.2.3')
+
+        assert match is not None
+        self.assertEqual(match.key, '10.0.0.0/8')
+
+# ################################################################################################################################
+
+    def test_ipv6_and_empty_cidr_list(self) -> 'None':
+        """ IPv6 networks are matched, and a rule with no CIDRs at all matches any address of either version.
+        """
+        matcher = SlottedCIDRMatcher()
+        matcher.replace_all([_make_rule(['2001:db8::/32']), _make_rule([])])
+
+        match = matcher.resolve('2001:db8::1')
+        assert match is not None
+        self.assertEqual(match.key, '2001:db8::/32')
+
+        match = matcher.resolve('2001:db9::1')
+        assert match is not None
+        self.assertEqual(match.key, '::/0')
+
+        match = matcher.resolve('192.0.2.1')
+        assert match is not None
+        self.assertEqual(match.key, '0.0.0.0/0')
+
+# ################################################################################################################################
+
+    def test_cache_invalidated_by_replace_all(self) -> 'None':
+        """ What a client IP resolved to is remembered until the rules are replaced.
+        """
+        matcher = SlottedCIDRMatcher()
+        matcher.replace_all([_rule_10])
+
+        self.assertIs(matcher.resolve('10.0.0.1'), matcher.resolve('10.0.0.1'))
+        self.assertIsNone(matcher.resolve('192.168.0.1'))
+
+        matcher.replace_all([_rule_192])
+
+        self.assertIsNone(matcher.resolve('10.0.0.1'))
+        self.assertIsNotNone(matcher.resolve('192.168.0.1'))
+
+        matcher.clear()
+
+        self.assertIsNone(matcher.resolve('192.168.0.1'))
+
+# ################################################################################################################################
+
+    def test_same_as_first_match_walk(self) -> 'None':
+        """ For random rules and addresses, the index agrees with walking the rules in order.
+        """
+        randomizer = random.Random(42)
+
+        rule_dicts = []
+        for _ in range(50):
+            cidr_list = []
+            for _ in range(randomizer.randint(1, 5)):
+                address = ipaddress.IPv4Address(randomizer.getrandbits(32) & 0x0AFFFFFF)
+                cidr_list.append(f'{address}/{randomizer.randint(4, 32)}')
+            rule_dicts.append(_make_rule(cidr_list))
+
+        matcher = SlottedCIDRMatcher()
+        matcher.replace_all(rule_dicts)
+
+        for _ in range(2000):
+            client_ip = str(ipaddress.IPv4Address(randomizer.getrandbits(32) & 0x0AFFFFFF))
+            address = parse_client_ip(client_ip)
+
+            expected = None
+            for rule in matcher._rules:
+                if (entry := rule.match(address)) is not None:
+                    expected = (rule, entry)
+                    break
+
+            match = matcher.resolve(client_ip)
+
+            if expected is None:
+                self.assertIsNone(match)
+            else:
+                assert match is not None
+                self.assertIs(match.rule, expected[0])
+                self.assertIs(match.entry, expected[1])
+
+# ################################################################################################################################
+# ################################################################################################################################
+
 if __name__ == '__main__':
     _ = main()
@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# stdlib
+from unittest import main, TestCase
+
+# gevent
+from gevent import sleep
+from gevent.event import Event
+
+# Zato
+from zato.server.scheduler_.pool import JobPool, ModuleCtx
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if 0:
+    from zato.common.typing_ import anylist, strnone
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class _Runs:
+    """ Runs that block until they are released, recording the order they started in.
+    """
+    def __init__(self) -> 'None':
+        self.started:'anylist' = []
+        self.release = Event()
+
+    def run(self, name:'str') -> 'None':
+        self.started.append(name)
+        _ = self.release.wait()
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class _FakeSlots:
+    """ The slots of jobs as Redis keeps them, shared by every pool that is given the same instance.
+    """
+    def __init__(self, limits:'dict[int, int]') -> 'None':
+        self.limits = limits
+        self.lease_seconds = 60.0
+        self.held:'dict[int, set[str]]' = {}
+        self.is_broken = False
+        self._next_token = 0
+
+    def acquire(self, job_id:'int') -> 'strnone':
+
+        if self.is_broken:
+            raise Exception('Redis is not available')
+
+        if not (limit := self.limits.get(job_id)):
+            return ''
+
+        held = self.held.setdefault(job_id, set())
+
+        if len(held) >= limit:
+            return None
+
+        self._next_token += 1
+        token = f'token-{self._next_token}'
+        held.add(token)
+
+        return token
+
+    def renew(self, job_id:'int', token:'str') -> 'bool':
+        return token in self.held.get(job_id, set())
+
+    def release(self, job_id:'int', token:'str') -> 'None':
+        self.held[job_id].discard(token)
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class JobPoolTestCase(TestCase):
+
+    def setUp(self) -> 'None':
+        self._retry_interval = ModuleCtx.Slot_Retry_Interval
+        ModuleCtx.Slot_Retry_Interval = 0.01
+
+    def tearDown(self) -> 'None':
+        ModuleCtx.Slot_Retry_Interval = self._retry_interval
+
+# ################################################################################################################################
+
+    def test_running_runs_are_capped(self) -> 'None':
+        """ Runs above the cap are queued and start, in the order they arrived in, as the earlier ones complete.
+        """
+        runs = _Runs()
+        pool = JobPool(max_running=2, max_queued=10)
+
+        for idx in range(5):
+            pool.submit(idx, None, runs.run, f'run_{idx}')
+
+        sleep(0)
+
+        self.assertEqual(runs.started, ['run_0', 'run_1'])
+        self.assertEqual(pool.running_count, 2)
+        self.assertEqual(pool.queued_count, 3)
+
+        runs.release.set()
+        sleep(0.01)
+
+        self.assertEqual(runs.started, ['run_0', 'run_1', 'run_2', 'run_3', 'run_4'])
+        self.assertEqual(pool.running_count, 0)
+        self.assertEqual(pool.queued_count, 0)
+
+# ################################################################################################################################
+
+    def test_job_limit(self) -> 'None':
+        """ A job at its own limit waits for its runs to complete, without holding up the other jobs.
+        """
+        runs = _Runs()
+        slots = _FakeSlots({1: 1})
+        pool = JobPool(max_running=10, max_queued=10, slots=slots)
+
+        pool.submit(1, None, runs.run, 'job_1_a')
+        pool.submit(1, None, runs.run, 'job_1_b')
+        pool.submit(2, None, runs.run, 'job_2_a')
+        pool.submit(2, None, runs.run, 'job_2_b')
+
+        sleep(0)
+
+        self.assertEqual(runs.started, ['job_1_a', 'job_2_a', 'job_2_b'])
+
+        runs.release.set()
+        sleep(0.01)
+
+        self.assertEqual(runs.started, ['job_1_a', 'job_2_a', 'job_2_b', 'job_1_b'])
+        self.assertEqual(pool.queued_count, 0)
+        self.assertEqual(slots.held[1], set())
+
+# ################################################################################################################################
+
+    def test_job_limit_is_shared_by_servers(self) -> 'None':
+        """ Two servers sharing the job's slots never run it more times at once than its limit allows, and a run
+        waiting on one of them starts once the other one gives its slot back.
+        """
+        slots = _FakeSlots({1: 1})
+
+        runs_a = _Runs()
+        runs_b = _Runs()
+
+        pool_a = JobPool(max_running=10, max_queued=10, slots=slots)
+        pool_b = JobPool(max_running=10, max_queued=10, slots=slots)
+
+        pool_a.submit(1, None, runs_a.run, 'server_a')
+        pool_b.submit(1, None, runs_b.run, 'server_b')
+
+        sleep(0.05)
+
+        self.assertEqual(runs_a.started, ['server_a'])
+        self.assertEqual(runs_b.started, [])
+        self.assertEqual(pool_b.queued_count, 1)
+
+        # Nothing tells server B that the slot was given back - its periodic retry finds it
+        runs_a.release.set()
+        sleep(0.05)
+
+        self.assertEqual(runs_b.started, ['server_b'])
+        self.assertEqual(pool_b.queued_count, 0)
+
+        runs_b.release.set()
+        sleep(0.01)
+
+        self.assertEqual(slots.held[1], set())
+
+# ################################################################################################################################
+
+    def test_unreadable_slots_hold_runs_back(self) -> 'None':
+        """ A run of a limited job waits while its slots cannot be read, rather than risk overlapping with another run.
+        """
+        runs = _Runs()
+        runs.release.set()
+
+        slots = _FakeSlots({1: 1})
+        slots.is_broken = True
+
+        pool = JobPool(max_running=10, max_queued=10, slots=slots)
+        pool.submit(1, None, runs.run, 'job_1')
+
+        sleep(0.05)
+        self.assertEqual(runs.started, [])
+
+        slots.is_broken = False
+        sleep(0.05)
+
+        self.assertEqual(runs.started, ['job_1'])
+
+# ################################################################################################################################
+
+    def test_read_count_follows_capacity(self) -> 'None':
+        """ Reads ask for as many entries as the pool has room for, and the pool reports when it is full.
+        """
+        runs = _Runs()
+        pool = JobPool(max_running=100, max_queued=1000)
+
+        self.assertEqual(pool.get_read_count(), ModuleCtx.Max_Read_Count)
+
+        pool = JobPool(max_running=2, max_queued=2)
+
+        for idx in range(4):
+            pool.submit(idx, None, runs.run, f'run_{idx}')
+
+        self.assertEqual(pool.get_free_capacity(), 0)
+        self.assertEqual(pool.get_read_count(), ModuleCtx.Min_Read_Count)
+        self.assertFalse(pool.wait_for_room(0.01))
+
+        runs.release.set()
+
+        self.assertTrue(pool.wait_for_room(1))
+
+# ################################################################################################################################
+
+    def test_failing_run_frees_its_slot(self) -> 'None':
+        """ A run that raises an exception does not keep its slot.
+        """
+        started:'anylist' = []
+
+        def fail() -> 'None':
+            started.append('fail')
+            raise Exception('Test exception')
+
+        pool = JobPool(max_running=1, max_queued=10)
+        pool.submit(1, None, fail)
+        pool.submit(1, None, started.append, 'next')
+
+        sleep(0.01)
+
+        self.assertEqual(started, ['fail', 'next'])
+        self.assertEqual(pool.running_count, 0)
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if __name__ == '__main__':
+    _ = main()
+
+# ################################################################################################################################
+# ################################################################################################################################
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# stdlib
+import os
+from unittest import main, TestCase
+
+# Zato
+from zato.server.stream_reader import get_consumer_name, get_dead_letter_stream, ModuleCtx, StreamEntries, StreamReader
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if 0:
+    from zato.common.typing_ import any_, anydict, anylist
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class _FakeRedis:
+    """ Just enough of a consumer group to take entries over and to list and remove consumers.
+    """
+    def __init__(self) -> 'None':
+
+        # Entries pending with a consumer, as (msg_id, fields, consumer name, idle ms)
+        self.pending:'anylist' = []
+
+        # What XINFO CONSUMERS returns
+        self.consumers:'anylist' = []
+
+        # How many times each entry has been delivered
+        self.deliveries:'anydict' = {}
+
+        self.acked:'anylist' = []
+        self.added:'anylist' = []
+        self.claimed:'anylist' = []
+        self.deleted_consumers:'anylist' = []
+        self.read_count = 0
+
+    def xautoclaim(self, stream:'str', group:'str', consumer:'str', min_idle_time:'int', start_id:'str', count:'int') -> 'any_':
+        claimed = []
+
+        for idx, (msg_id, fields, _, idle) in enumerate(self.pending):
+            if idle >= min_idle_time and len(claimed) < count:
+                self.pending[idx] = (msg_id, fields, consumer, 0)
+                self.deliveries[msg_id] = self.deliveries.get(msg_id, 1) + 1
+                claimed.append((msg_id, fields))
+
+        return ['0-0', claimed, []]
+
+    def xpending_range(self, name:'str', groupname:'str', min:'str', max:'str', count:'int', consumername:'str') -> 'anylist':
+        out = []
+
+        for msg_id, _, consumer, _ in self.pending:
+            if consumer == consumername and min <= msg_id <= max:
+                out.append({'message_id': msg_id, 'consumer': consumer, 'times_delivered': self.deliveries[msg_id]})
+
+        return out[:count]
+
+    def xadd(self, name:'str', fields:'anydict', maxlen:'int', approximate:'bool') -> 'str':
+        self.added.append((name, fields))
+        return '1-0'
+
+    def xclaim(
+        self,
+        name:'str',
+        groupname:'str',
+        consumername:'str',
+        min_idle_time:'int',
+        message_ids:'anylist',
+        justid:'bool',
+        ) -> 'anylist':
+        self.claimed.append((consumername, min_idle_time, list(message_ids), justid))
+        return list(message_ids)
+
+    def xack(self, stream:'str', group:'str', *msg_ids:'str') -> 'int':
+        self.acked.extend(msg_ids)
+        return len(msg_ids)
+
+    def xinfo_consumers(self, stream:'str', group:'str') -> 'anylist':
+        return self.consumers
+
+    def xgroup_delconsumer(self, stream:'str', group:'str', consumer:'str') -> 'int':
+        self.deleted_consumers.append(consumer)
+        return 0
+
+    def xreadgroup(self, groupname:'str', consumername:'str', streams:'anydict', count:'int', block:'int') -> 'anylist':
+        self.read_count += 1
+        return []
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class StreamReaderTestCase(TestCase):
+
+    def setUp(self) -> 'None':
+        self.redis = _FakeRedis()
+        self.reader = StreamReader(self.redis, ['stream'], 'server-recv', 'server-recv-server1-100-0')
+
+    def test_consumer_names_are_unique_to_process(self) -> 'None':
+        name = get_consumer_name('server-recv', 'server1', 2)
+        self.assertEqual(name, f'server-recv-server1-{os.getpid()}-2')
+
+# ################################################################################################################################
+
+    def test_stale_entries_are_taken_over(self) -> 'None':
+        """ Entries pending for longer than the minimum idle time are returned before new ones are read,
+        and the ones still being processed elsewhere are left alone.
+        """
+        min_idle_ms = self.reader.claim_min_idle_ms
+
+        self.redis.pending.append(('1-0', {'service': 'stale'}, 'server-recv-server2-200-0', min_idle_ms + 1))
+        self.redis.pending.append(('2-0', {'service': 'busy'}, 'server-recv-server2-200-1', 10))
+
+        result = self.reader.read(10, 1000)
+
+        self.assertEqual(result, [['stream', [('1-0', {'service': 'stale'})]]])
+        self.assertEqual(self.redis.read_count, 0)
+
+        # The next claim is not due yet, so new entries are read this time
+        result = self.reader.read(10, 1000)
+
+        self.assertEqual(result, [])
+        self.assertEqual(self.redis.read_count, 1)
+
+# ################################################################################################################################
+
+    def test_deleted_entries_are_acknowledged(self) -> 'None':
+        """ Entries deleted from the stream while pending are acknowledged rather than returned.
+        """
+        self.redis.pending.append(('1-0', None, 'server-recv-server2-200-0', self.reader.claim_min_idle_ms + 1))
+
+        result = self.reader.read(10, 1000)
+
+        self.assertEqual(result, [])
+        self.assertEqual(self.redis.acked, ['1-0'])
+
+# ################################################################################################################################
+
+    def test_undeliverable_entries_are_dead_lettered(self) -> 'None':
+        """ Entries delivered more times than allowed are moved to the dead-letter stream and acknowledged,
+        while the others are taken over as usual.
+        """
+        min_idle_ms = self.reader.claim_min_idle_ms
+
+        self.redis.pending.append(('1-0', {'service': 'failing'}, 'server-recv-server2-200-0', min_idle_ms + 1))
+        self.redis.pending.append(('2-0', {'service': 'stale'}, 'server-recv-server2-200-0', min_idle_ms + 1))
+
+        # The first entry has been taken over as many times as it may be delivered
+        self.redis.deliveries['1-0'] = ModuleCtx.Default_Max_Deliveries
+
+        result = self.reader.read(10, 1000)
+
+        self.assertEqual(result, [['stream', [('2-0', {'service': 'stale'})]]])
+        self.assertEqual(self.redis.acked, ['1-0'])
+
+        self.assertEqual(self.redis.added, [(get_dead_letter_stream('stream'), {
+            'service': 'failing',
+            'original_stream': 'stream',
+            'original_msg_id': '1-0',
+            'delivery_count': ModuleCtx.Default_Max_Deliveries + 1,
+        })])
+
+# ################################################################################################################################
+
+    def test_held_entries_are_kept_without_counting_deliveries(self) -> 'None':
+        """ Entries still held are claimed again by their IDs alone, in chunks, which resets their idle time
+        without counting as delivering them.
+        """
+        entries = StreamEntries(self.redis, 'server-recv', 'server-recv-server1-100-0')
+        msg_ids = [f'{idx}-0' for idx in range(ModuleCtx.Keep_Count + 1)]
+
+        entries.keep('stream', msg_ids)
+
+        self.assertEqual(self.redis.claimed, [
+            ('server-recv-server1-100-0', 0, msg_ids[:ModuleCtx.Keep_Count], True),
+            ('server-recv-server1-100-0', 0, msg_ids[ModuleCtx.Keep_Count:], True),
+        ])
+
+# ################################################################################################################################
+
+    def test_dead_consumers_are_removed(self) -> 'None':
+        """ Only consumers with nothing pending that have been idle for long enough are removed.
+        """
+        dead_idle_ms = ModuleCtx.Dead_Consumer_Idle * 1000
+
+        self.redis.consumers = [
+            {'name': 'dead', 'pending': 0, 'idle': dead_idle_ms + 1},
+            {'name': 'busy', 'pending': 1, 'idle': dead_idle_ms + 1},
+            {'name': 'live', 'pending': 0, 'idle': 100},
+            {'name': self.reader.consumer_name, 'pending': 0, 'idle': dead_idle_ms + 1},
+        ]
+
+        _ = self.reader.read(10, 1000)
+
+        self.assertEqual(self.redis.deleted_consumers, ['dead'])
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if __name__ == '__main__':
+    _ = main()
+
+# ################################################################################################################################
+# ################################################################################################################################
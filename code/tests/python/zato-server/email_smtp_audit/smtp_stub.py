@@ -13,6 +13,7 @@ Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
 # stdlib
 import os
 from contextlib import contextmanager
+from smtplib import SMTPServerDisconnected
 
 # Zato
 from live_sql.env import database_env
@@ -41,6 +42,9 @@ Connection_Name = 'test.smtp.audit'
 # What the raising transport raises with
 Raised_Error = 'The SMTP server went away'
 
+# What a session the server dropped raises with
+Dropped_Error = 'Connection unexpectedly closed'
+
 # The prefix all the audit log database environment variables share
 _env_prefix = 'Zato_Audit_Log_DB_'
 
@@ -72,6 +76,11 @@ class TransportRecorder:
     # Every send that went through any instance, one (email, attachments, from_) triple each
     sends:'anylist' = []
 
+    # Every session that was connected, disconnected or reset, in the order it happened
+    connected:'anylist' = []
+    disconnected:'anylist' = []
+    reset_sessions:'anylist' = []
+
     def __init__(self, *ignored_args:'any_', **ignored_kwargs:'any_') -> 'None':
         pass
 
@@ -81,6 +90,18 @@ class TransportRecorder:
     def __exit__(self, *ignored:'any_') -> 'None':
         pass
 
+    def connect(self) -> 'None':
+        TransportRecorder.connected.append(self)
+
+    def disconnect(self) -> 'None':
+        TransportRecorder.disconnected.append(self)
+
+    def noop(self) -> 'None':
+        pass
+
+    def reset(self) -> 'None':
+        TransportRecorder.reset_sessions.append(self)
+
     def send(self, email:'any_', attachments:'any_', from_:'any_') -> 'None':
         TransportRecorder.sends.append((email, attachments, from_))
 
@@ -93,6 +114,32 @@ class RaisingTransport(TransportRecorder):
     def send(self, email:'any_', attachments:'any_', from_:'any_') -> 'None':
         raise Exception(Raised_Error)
 
+# ################################################################################################################################
+
+class DroppingTransport(TransportRecorder):
+    """ A transport whose sessions the server drops after their first message, without telling them.
+    """
+
+    def __init__(self, *ignored_args:'any_', **ignored_kwargs:'any_') -> 'None':
+        self.send_count = 0
+
+    def send(self, email:'any_', attachments:'any_', from_:'any_') -> 'None':
+        if self.send_count:
+            raise SMTPServerDisconnected(Dropped_Error)
+
+        self.send_count += 1
+        super().send(email, attachments, from_)
+
+# ################################################################################################################################
+
+def reset_transport_records() -> 'None':
+    """ Forgets everything the transports recorded so far, so that each test sees only its own sends and sessions.
+    """
+    TransportRecorder.sends.clear()
+    TransportRecorder.connected.clear()
+    TransportRecorder.disconnected.clear()
+    TransportRecorder.reset_sessions.clear()
+
 # ################################################################################################################################
 # ################################################################################################################################
 
@@ -100,6 +147,7 @@ def new_smtp_connection(
     *,
     is_audit_log_active:'bool' = True,
     transport_class:'any_' = TransportRecorder,
+    pool_size:'int' = 2,
     ) -> 'SMTPConnection':
     """ Builds the connection under test - real except for the transport, which never
     touches the network.
@@ -119,6 +167,7 @@ def new_smtp_connection(
     config.username = ''
     config.password = ''
     config.is_audit_log_active = is_audit_log_active
+    config.pool_size = pool_size
 
     audit_log = AuditLog(Server_Name)
 
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# Direct SMTP sends go out through a pool of sessions that are connected once and reused -
+# a dropped session is replaced without the message being lost, a failed send resets its session
+# before the next message uses it, and a batch goes out concurrently with one outcome per message.
+
+# SQLAlchemy
+from sqlalchemy import select
+
+# Zato
+from zato.common.api import SMTPMessage
+from zato.common.audit_log.api import event_table, get_audit_engine, AuditOutcome
+from zato.server.connection.email import SMTPAPI, SMTPConnStore
+
+# Test support
+from smtp_stub import new_smtp_connection, reset_transport_records, smtp_audit_env, DroppingTransport, RaisingTransport, \
+    Server_Name, TransportRecorder
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if 0:
+    import os
+    from zato.common.typing_ import anylist
+
+    os = os
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+# Where every message is sent to
+_to = 'recipient@example.com'
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def _new_message(idx:'int') -> 'SMTPMessage':
+    """ Builds one message of a batch, telling it apart from the others by its subject.
+    """
+    out = SMTPMessage(from_='sender@example.com', to=_to, subject=f'Notification {idx}', body='Body')
+    return out
+
+# ################################################################################################################################
+
+def _get_outcomes() -> 'anylist':
+    """ The outcome of every event the audit log holds, oldest first.
+    """
+    engine = get_audit_engine()
+
+    query = select(event_table.c.outcome)
+    query = query.order_by(event_table.c.id)
+
+    with engine.connect() as connection:
+        out = [row[0] for row in connection.execute(query)]
+
+    return out
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def test_sessions_are_reused_across_sends(tmp_path:'os.PathLike') -> 'None':
+    """ Sending one message after another connects once and keeps using that session.
+    """
+    with smtp_audit_env(tmp_path):
+
+        reset_transport_records()
+        conn = new_smtp_connection()
+
+        for idx in range(5):
+            assert conn.send(_new_message(idx)) is True
+
+        assert len(TransportRecorder.sends) == 5
+        assert len(TransportRecorder.connected) == 1
+        assert TransportRecorder.disconnected == []
+
+# ################################################################################################################################
+
+def test_a_session_the_server_dropped_is_replaced_and_the_message_still_goes_out(tmp_path:'os.PathLike') -> 'None':
+    """ A reused session that the server closed in the meantime is discarded, and the message is sent over a new one.
+    """
+    with smtp_audit_env(tmp_path):
+
+        reset_transport_records()
+        conn = new_smtp_connection(transport_class=DroppingTransport)
+
+        assert conn.send(_new_message(1)) is True
+        assert conn.send(_new_message(2)) is True
+
+        # Both messages went out, the second one over a second session ..
+        subjects = [item[0].subject for item in TransportRecorder.sends]
+
+        assert subjects == ['Notification 1', 'Notification 2']
+        assert len(TransportRecorder.connected) == 2
+
+        # .. the dropped one was closed ..
+        assert TransportRecorder.disconnected == [TransportRecorder.connected[0]]
+
+        # .. and each message left one event.
+        assert _get_outcomes() == [AuditOutcome.OK, AuditOutcome.OK]
+
+# ################################################################################################################################
+
+def test_a_failed_send_resets_its_session_for_the_next_message(tmp_path:'os.PathLike') -> 'None':
+    """ A message the server refused does not cost the session, which is reset and pooled again.
+    """
+    with smtp_audit_env(tmp_path):
+
+        reset_transport_records()
+        conn = new_smtp_connection(transport_class=RaisingTransport)
+
+        assert conn.send(_new_message(1)) is False
+        assert conn.send(_new_message(2)) is False
+
+        assert len(TransportRecorder.connected) == 1
+        assert TransportRecorder.reset_sessions == [TransportRecorder.connected[0]] * 2
+
+        assert _get_outcomes() == [AuditOutcome.Error, AuditOutcome.Error]
+
+# ################################################################################################################################
+
+def test_send_many_returns_one_outcome_per_message_and_stays_within_the_pool(tmp_path:'os.PathLike') -> 'None':
+    """ A batch goes out concurrently, but never over more sessions than the pool holds.
+    """
+    with smtp_audit_env(tmp_path):
+
+        reset_transport_records()
+        conn = new_smtp_connection(pool_size=3)
+
+        messages = [_new_message(idx) for idx in range(20)]
+        result = conn.send_many(messages)
+
+        assert result == [True] * 20
+
+        subjects = sorted(item[0].subject for item in TransportRecorder.sends)
+        expected = sorted(msg.subject for msg in messages)
+
+        assert subjects == expected
+        assert len(TransportRecorder.connected) <= 3
+
+        assert len(_get_outcomes()) == 20
+
+# ################################################################################################################################
+
+def test_send_many_through_the_api_and_deleting_the_connection_closes_its_sessions(tmp_path:'os.PathLike') -> 'None':
+    """ The API sends a batch through a connection by its name, and a deleted connection disconnects what it pooled.
+    """
+    with smtp_audit_env(tmp_path):
+
+        reset_transport_records()
+
+        conn = new_smtp_connection()
+        conn.config.is_active = True
+        name = conn.config.name
+
+        # The store gets the connection under test as if it had created it itself
+        store = SMTPConnStore(Server_Name)
+        store.create_impl = lambda config, config_no_sensitive: conn
+        store.create(name, conn.config)
+
+        api = SMTPAPI(store)
+        result = api.send_many(name, [_new_message(1), _new_message(2)])
+
+        assert result == [True, True]
+
+        store.delete(name)
+
+        assert sorted(map(id, TransportRecorder.disconnected)) == sorted(map(id, TransportRecorder.connected))
+
+# ################################################################################################################################
+# ################################################################################################################################
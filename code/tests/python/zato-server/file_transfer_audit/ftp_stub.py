@@ -62,6 +62,21 @@ class ClientRecorder:
     def write(self, remote_path:'any_', data:'any_') -> 'None':
         self.written.append((remote_path, data))
 
+# ################################################################################################################################
+
+    def write_iter(self, remote_path:'any_', chunks:'any_') -> 'None':
+
+        # Each chunk is remembered on its own, which is how a test sees that a write was streamed
+        chunk_list = list(chunks)
+        self.written.append((remote_path, chunk_list))
+
+# ################################################################################################################################
+
+    def read_iter(self, remote_path:'any_', chunk_size:'int') -> 'any_':
+
+        for idx in range(0, len(File_Content), chunk_size):
+            yield File_Content[idx:idx + chunk_size]
+
 # ################################################################################################################################
 
     def remove(self, remote_path:'any_') -> 'None':
@@ -86,6 +101,14 @@ class RaisingClient(ClientRecorder):
     def write(self, remote_path:'any_', data:'any_') -> 'None':
         raise Exception(Raised_Error)
 
+# ################################################################################################################################
+
+    def read_iter(self, remote_path:'any_', chunk_size:'int') -> 'any_':
+
+        # Part of the file arrives before the server goes away
+        yield File_Content[:chunk_size]
+        raise Exception(Raised_Error)
+
 # ################################################################################################################################
 
     def remove(self, remote_path:'any_') -> 'None':
@@ -119,6 +119,11 @@ class LocalDirectoryClient:
             out = file.read()
         return out
 
+    def read_iter(self, remote_path:'str', chunk_size:'int') -> 'any_':
+        with open(self._full_path(remote_path), 'rb') as file:
+            while chunk := file.read(chunk_size):
+                yield chunk
+
     def rename(self, from_path:'str', to_path:'str') -> 'None':
         os.rename(self._full_path(from_path), self._full_path(to_path))
 
@@ -170,6 +175,10 @@ class ServiceStub:
         self.invoked:'anylist' = []
 
     def invoke(self, service_name:'str', item:'any_') -> 'None':
+
+        # The downloaded file exists only while the target service runs, which is when a service reads it in
+        _ = item.data
+
         self.invoked.append((service_name, item))
 
 # ################################################################################################################################
@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# A file read or written in chunks leaves the same one event a whole-file operation does -
+# its size and checksum are computed as the chunks go by, a read that failed or was
+# abandoned midway is on record too, and an oversized file keeps its metadata only.
+
+# stdlib
+from hashlib import sha256
+from json import loads
+
+# SQLAlchemy
+from sqlalchemy import select
+
+# Zato
+from zato.common.audit_log.api import event_attr_table, event_table, get_audit_engine, AuditOutcome
+from zato.common.audit_log.attachment import get_attachment, list_attachments, Env_Max_Attachment_Size
+from zato.common.audit_log.file_transfer import Operation_Read, Operation_Store
+
+# Test support
+from audit_env import audit_db_env
+from ftp_stub import new_ftp_connection, ClientRecorder, File_Content, RaisingClient, Raised_Error, Remote_Path
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if 0:
+    import os
+    from zato.common.typing_ import any_, anylist
+
+    os = os
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+# Small enough for the test file to arrive in several chunks
+_chunk_size = 8
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def _get_events() -> 'anylist':
+    """ Everything the audit log holds, oldest first.
+    """
+    engine = get_audit_engine()
+
+    query = select(event_table)
+    query = query.order_by(event_table.c.id)
+
+    out:'anylist' = []
+
+    with engine.connect() as connection:
+        for row in connection.execute(query):
+            event = dict(row._mapping)
+            out.append(event)
+
+    return out
+
+# ################################################################################################################################
+
+def _get_checksum(event_id:'int') -> 'any_':
+    """ The checksum attribute of one event, if it has one.
+    """
+    engine = get_audit_engine()
+
+    query = select(event_attr_table.c.value)
+    query = query.where(event_attr_table.c.event_id == event_id)
+    query = query.where(event_attr_table.c.name == 'checksum')
+
+    with engine.connect() as connection:
+        out = connection.execute(query).scalar()
+
+    return out
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def test_a_streamed_read_writes_one_event_with_the_size_and_checksum(tmp_path:'os.PathLike') -> 'None':
+    """ Reading a file in chunks is one event, computed off every chunk that went by.
+    """
+    with audit_db_env(tmp_path):
+
+        conn = new_ftp_connection(ClientRecorder())
+
+        chunks = list(conn.read_iter(Remote_Path, _chunk_size))
+
+        # The file arrived in pieces, none bigger than asked for ..
+        assert len(chunks) > 1
+        assert max(len(chunk) for chunk in chunks) <= _chunk_size
+        assert b''.join(chunks) == File_Content
+
+        # .. and the read left exactly one trail entry describing the whole of it.
+        events = _get_events()
+        assert len(events) == 1
+
+        event = events[0]
+
+        assert event['outcome'] == AuditOutcome.OK
+        assert event['size'] == len(File_Content)
+
+        summary = loads(event['data'])
+        assert summary['operation'] == Operation_Read
+
+        expected_checksum = sha256(File_Content).hexdigest()
+        assert _get_checksum(event['id']) == expected_checksum
+
+# ################################################################################################################################
+
+def test_a_streamed_write_writes_one_event_with_the_size_and_checksum(tmp_path:'os.PathLike') -> 'None':
+    """ Writing a file out of chunks hands them to the client as they are and records the whole file.
+    """
+    with audit_db_env(tmp_path):
+
+        ftp_client = ClientRecorder()
+        conn = new_ftp_connection(ftp_client)
+
+        # Strings are encoded on the way, the same as in a whole-file write
+        chunks = [File_Content[:10], File_Content[10:].decode('utf8')]
+        conn.write_iter(chunks, Remote_Path)
+
+        assert ftp_client.written == [(Remote_Path, [File_Content[:10], File_Content[10:]])]
+
+        events = _get_events()
+        assert len(events) == 1
+
+        event = events[0]
+
+        assert event['outcome'] == AuditOutcome.OK
+        assert event['size'] == len(File_Content)
+
+        summary = loads(event['data'])
+        assert summary['operation'] == Operation_Store
+
+        expected_checksum = sha256(File_Content).hexdigest()
+        assert _get_checksum(event['id']) == expected_checksum
+
+# ################################################################################################################################
+
+def test_an_opened_file_is_read_and_written_in_chunks(tmp_path:'os.PathLike') -> 'None':
+    """ A remote file opened like a local one reads back what is there and writes out what it was given.
+    """
+    with audit_db_env(tmp_path):
+
+        ftp_client = ClientRecorder()
+        conn = new_ftp_connection(ftp_client)
+
+        with conn.open(Remote_Path, chunk_size=_chunk_size) as remote_file:
+            first = remote_file.read(5)
+            rest = remote_file.read()
+
+        assert first + rest == File_Content
+
+        with conn.open(Remote_Path, 'wb') as remote_file:
+            _ = remote_file.write(File_Content[:10])
+            _ = remote_file.write(File_Content[10:])
+
+        # What was written in two calls arrives at the server as one file
+        path, written_chunks = ftp_client.written[0]
+
+        assert path == Remote_Path
+        assert b''.join(written_chunks) == File_Content
+
+        # One event for the read and one for the write
+        events = _get_events()
+        outcomes = [event['outcome'] for event in events]
+
+        assert outcomes == [AuditOutcome.OK, AuditOutcome.OK]
+
+# ################################################################################################################################
+
+def test_a_read_stopped_midway_writes_the_error_outcome(tmp_path:'os.PathLike') -> 'None':
+    """ A caller that took only part of a file leaves an entry saying how far it got.
+    """
+    with audit_db_env(tmp_path):
+
+        conn = new_ftp_connection(ClientRecorder())
+
+        chunks = conn.read_iter(Remote_Path, _chunk_size)
+        _ = next(chunks)
+        chunks.close()
+
+        events = _get_events()
+        assert len(events) == 1
+
+        event = events[0]
+
+        assert event['outcome'] == AuditOutcome.Error
+        assert event['size'] == _chunk_size
+        assert f'after {_chunk_size} bytes' in event['data']
+
+# ################################################################################################################################
+
+def test_a_raising_streamed_read_writes_the_error_outcome(tmp_path:'os.PathLike') -> 'None':
+    """ A server that went away midway leaves an error entry with what had arrived by then.
+    """
+    with audit_db_env(tmp_path):
+
+        conn = new_ftp_connection(RaisingClient())
+
+        try:
+            for _ in conn.read_iter(Remote_Path, _chunk_size):
+                pass
+        except Exception:
+            pass
+        else:
+            raise Exception('A failed read was expected to propagate')
+
+        events = _get_events()
+        assert len(events) == 1
+
+        event = events[0]
+
+        assert event['outcome'] == AuditOutcome.Error
+        assert event['size'] == _chunk_size
+        assert Raised_Error in event['data']
+
+# ################################################################################################################################
+
+def test_a_streamed_read_stores_the_bytes_behind_the_flag(tmp_path:'os.PathLike') -> 'None':
+    """ A connection that asked for its files to be kept has streamed files kept too.
+    """
+    with audit_db_env(tmp_path):
+
+        conn = new_ftp_connection(ClientRecorder(), should_store_content=True)
+        _ = list(conn.read_iter(Remote_Path, _chunk_size))
+
+        events = _get_events()
+        event_id = events[0]['id']
+
+        engine = get_audit_engine()
+        items = list_attachments(engine, event_id)
+
+        assert len(items) == 1
+
+        item = items[0]
+        assert item['is_content_kept'] is True
+
+        stored = get_attachment(engine, item['id'])
+        assert stored['content'] == File_Content
+
+# ################################################################################################################################
+
+def test_an_oversized_streamed_file_keeps_its_metadata_only(tmp_path:'os.PathLike', monkeypatch:'any_') -> 'None':
+    """ A streamed file bigger than the cap is on record with its real size, without its bytes.
+    """
+    with audit_db_env(tmp_path):
+
+        # A cap smaller than the file about to be read, though bigger than one chunk
+        monkeypatch.setenv(Env_Max_Attachment_Size, '10')
+
+        conn = new_ftp_connection(ClientRecorder(), should_store_content=True)
+        _ = list(conn.read_iter(Remote_Path, _chunk_size))
+
+        events = _get_events()
+        event_id = events[0]['id']
+
+        engine = get_audit_engine()
+        items = list_attachments(engine, event_id)
+
+        assert len(items) == 1
+
+        item = items[0]
+
+        assert item['size'] == len(File_Content)
+        assert item['is_content_kept'] is False
+
+# ################################################################################################################################
+# ################################################################################################################################
@@ -37,6 +37,7 @@ def _make_channel_item(
     name:'str'='test.channel',
     method:'str'='POST',
     http_accept:'str'='',
+    match_slash:'bool'=True,
     ) -> 'anydict':
     """ Builds the parts of a channel item the dispatcher looks at, with its match target built
     the way the server builds one.
@@ -55,7 +56,7 @@ def _make_channel_item(
         'method': method,
         'http_accept': http_accept,
         'match_target': match_target,
-        'match_target_compiled': Matcher(match_target),
+        'match_target_compiled': Matcher(match_target, match_slash),
     }
 
     return out
@@ -593,6 +594,119 @@ class RemoveFromCacheTestCase(unittest.TestCase):
 # ################################################################################################################################
 # ################################################################################################################################
 
+class URLPathTreeTestCase(unittest.TestCase):
+    """ Tests for the tree that narrows a request's path down to the channels that can possibly match it.
+    """
+
+# ################################################################################################################################
+
+    def _candidate_names(self, url_data:'PyURLData', url_path:'str') -> 'list':
+        out = [item['name'] for item in url_data._get_candidates(url_path)]
+        return out
+
+# ################################################################################################################################
+
+    def test_only_channels_at_that_path_are_candidates(self) -> 'None':
+        url_data = _make_url_data([
+            _make_channel_item('/api/invoice', 'invoice.channel'),
+            _make_channel_item('/api/payment', 'payment.channel'),
+            _make_channel_item('/api/customer/{customer_id}', 'customer.channel'),
+        ])
+
+        self.assertEqual(self._candidate_names(url_data, '/api/invoice'), ['invoice.channel'])
+        self.assertEqual(self._candidate_names(url_data, '/api/customer/123'), ['customer.channel'])
+        self.assertEqual(self._candidate_names(url_data, '/api/nothing-here'), [])
+
+# ################################################################################################################################
+
+    def test_a_one_segment_parameter_takes_one_segment_only(self) -> 'None':
+        url_data = _make_url_data([_make_channel_item('/api/customer/{customer_id}', match_slash=False)])
+
+        self.assertEqual(_match(url_data, '/api/customer/123'), {'customer_id': '123'})
+        self.assertEqual(self._candidate_names(url_data, '/api/customer/123/order'), [])
+
+# ################################################################################################################################
+
+    def test_a_parameter_across_slashes_takes_the_rest_of_the_path(self) -> 'None':
+        url_data = _make_url_data([_make_channel_item('/api/file/{file_path}')])
+
+        self.assertEqual(_match(url_data, '/api/file/a/b/c.txt'), {'file_path': 'a/b/c.txt'})
+
+# ################################################################################################################################
+
+    def test_a_parameter_within_a_segment_still_matches(self) -> 'None':
+        url_data = _make_url_data([_make_channel_item('/api/invoice-{invoice_id}/lines', match_slash=False)])
+
+        self.assertEqual(_match(url_data, '/api/invoice-123/lines'), {'invoice_id': '123'})
+
+# ################################################################################################################################
+
+    def test_the_order_of_the_channel_data_decides_across_branches(self) -> 'None':
+
+        # The parameter channel comes first, so it is the one that answers even though the other
+        # channel spells the very same path out literally and sits in another branch of the tree.
+        url_data = _make_url_data([
+            _make_channel_item('/api/customer/{customer_id}', 'customer.param', match_slash=False),
+            _make_channel_item('/api/customer/me', 'customer.me'),
+        ])
+
+        _, channel_item = url_data.match('/api/customer/me', 'POST', _any_accept)
+        self.assertEqual(channel_item['name'], 'customer.param')
+
+        url_data.channel_data.reverse()
+        url_data.rebuild_match_target_index()
+        url_data.url_path_cache.clear()
+
+        _, channel_item = url_data.match('/api/customer/me', 'POST', _any_accept)
+        self.assertEqual(channel_item['name'], 'customer.me')
+
+# ################################################################################################################################
+
+    def test_a_channel_removed_leaves_no_nodes_behind(self) -> 'None':
+        invoice = _make_channel_item('/api/invoice/{invoice_id}/lines/{line_id}', match_slash=False)
+        channel_data = [invoice]
+        url_data = _make_url_data(channel_data)
+
+        self.assertEqual(len(url_data.url_path_tree), 1)
+
+        channel_data.remove(invoice)
+        url_data.rebuild_match_target_index()
+
+        self.assertEqual(len(url_data.url_path_tree), 0)
+        self.assertTrue(url_data.url_path_tree.root.is_empty())
+
+# ################################################################################################################################
+
+    def test_only_the_changed_channels_are_touched(self) -> 'None':
+        invoice = _make_channel_item('/api/invoice', 'invoice.channel')
+        payment = _make_channel_item('/api/payment', 'payment.channel')
+
+        channel_data = [invoice]
+        url_data = _make_url_data(channel_data)
+
+        invoice_key = url_data.url_path_tree.keys[id(invoice)]
+
+        channel_data.append(payment)
+        url_data.rebuild_match_target_index()
+
+        self.assertIs(url_data.url_path_tree.keys[id(invoice)], invoice_key)
+        self.assertIn(payment, url_data.url_path_tree)
+
+        _, channel_item = url_data.match('/api/payment', 'POST', _any_accept)
+        self.assertEqual(channel_item['name'], 'payment.channel')
+
+# ################################################################################################################################
+
+    def test_internal_channels_are_not_reached_by_user_paths(self) -> 'None':
+        url_data = _make_url_data([_make_channel_item('/zato/{name}', 'zato.internal')])
+
+        match, channel_item = url_data.match('/zato/ping', 'POST', _any_accept)
+        self.assertEqual(match, {'name': 'ping'})
+        self.assertEqual(channel_item['name'], 'zato.internal')
+
+# ################################################################################################################################
+# ################################################################################################################################
+
 if __name__ == '__main__':
     _ = unittest.main()
 
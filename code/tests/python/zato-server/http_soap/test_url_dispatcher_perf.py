@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# stdlib
+import time
+import unittest
+
+# pytest
+import pytest
+
+# Zato
+from zato.common.api import HTTP_SOAP
+from zato.common.util.url_dispatcher import build_methods_allowed_re, get_match_target, to_internal_accept
+from zato.server.connection.http_soap.url_dispatcher import Matcher, PyURLData
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if 0:
+    from zato.common.typing_ import anydict, anylist
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+_any_accept = to_internal_accept(HTTP_SOAP.ACCEPT.ANY)
+_methods_allowed_re = build_methods_allowed_re(['GET', 'POST', 'PUT', 'PATCH', 'DELETE'])
+
+# How many channels each round is run with
+_channel_counts = (100, 1_000, 5_000)
+
+# How many distinct paths each round matches, each one with an id of its own so that none is ever cached
+_request_count = 20_000
+
+# How much costlier a match may be with the most channels than with the fewest
+_max_cost_ratio = 3.0
+
+_microseconds_per_second = 1_000_000
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def _make_channel_data(channel_count:'int') -> 'anylist':
+    """ Builds channels of the shape a REST API with many resources has, each with a static
+    collection path and a path parameter under it.
+    """
+    out:'anylist' = []
+
+    for idx in range(channel_count):
+
+        if idx % 2:
+            url_path = f'/api/resource-{idx}/{{item_id}}'
+        else:
+            url_path = f'/api/resource-{idx}'
+
+        config = {'url_path': url_path, 'method': 'GET', 'http_accept': ''}
+        match_target = get_match_target(config, http_methods_allowed_re=_methods_allowed_re)
+
+        item:'anydict' = {
+            'name': f'resource.{idx}',
+            'url_path': url_path,
+            'method': 'GET',
+            'http_accept': '',
+            'match_target': match_target,
+            'match_target_compiled': Matcher(match_target),
+        }
+        out.append(item)
+
+    return out
+
+# ################################################################################################################################
+
+def _get_cost(channel_count:'int') -> 'float':
+    """ Returns how many microseconds one match of a path no cache knows takes with the given number of channels.
+    """
+    url_data = PyURLData(_make_channel_data(channel_count))
+
+    # The last channel with a path parameter, which a scan of every channel would reach last of all
+    last_param_idx = channel_count - 1 if (channel_count - 1) % 2 else channel_count - 2
+
+    start_time = time.perf_counter()
+
+    for idx in range(_request_count):
+        match, _ = url_data.match(f'/api/resource-{last_param_idx}/{idx}', 'GET', _any_accept)
+        assert match == {'item_id': str(idx)}
+
+    elapsed = time.perf_counter() - start_time
+
+    out = elapsed / _request_count * _microseconds_per_second
+    return out
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class URLDispatcherPerfTestCase(unittest.TestCase):
+    """ Measures what matching a path that no cache knows costs as the number of channels grows.
+    """
+
+# ################################################################################################################################
+
+    @pytest.mark.perftest
+    def test_match_cost_is_flat_in_the_number_of_channels(self) -> 'None':
+
+        costs = {}
+
+        for channel_count in _channel_counts:
+            costs[channel_count] = _get_cost(channel_count)
+            print(f'URL match; channels={channel_count}; cost={costs[channel_count]:.2f} us/match')
+
+        fewest = costs[_channel_counts[0]]
+        most = costs[_channel_counts[-1]]
+
+        self.assertLess(most / fewest, _max_cost_ratio)
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if __name__ == '__main__':
+    _ = unittest.main()
+
+# ################################################################################################################################
+# ################################################################################################################################
@@ -176,6 +176,9 @@ class _SMBClientRecorder:
     def write(self, remote_path:'any_', data:'any_') -> 'None':
         self.written.append((remote_path, data))
 
+    def write_iter(self, remote_path:'any_', chunks:'any_') -> 'None':
+        self.written.append((remote_path, b''.join(chunks)))
+
 # ################################################################################################################################
 
 class _SMBRaisingClient(_SMBClientRecorder):
@@ -185,6 +188,9 @@ class _SMBRaisingClient(_SMBClientRecorder):
     def write(self, remote_path:'any_', data:'any_') -> 'None':
         raise Exception(_raised_error)
 
+    def write_iter(self, remote_path:'any_', chunks:'any_') -> 'None':
+        raise Exception(_raised_error)
+
 # ################################################################################################################################
 
 class _SMBWrapper:
@@ -218,6 +224,11 @@ class _FTPClientRecorder:
     def write(self, remote_path:'any_', data:'any_') -> 'None':
         self.written.append((remote_path, data))
 
+# ################################################################################################################################
+
+    def write_iter(self, remote_path:'any_', chunks:'any_') -> 'None':
+        self.written.append((remote_path, b''.join(chunks)))
+
 # ################################################################################################################################
 
 class _FTPRaisingClient(_FTPClientRecorder):
@@ -227,6 +238,11 @@ class _FTPRaisingClient(_FTPClientRecorder):
     def write(self, remote_path:'any_', data:'any_') -> 'None':
         raise Exception(_raised_error)
 
+# ################################################################################################################################
+
+    def write_iter(self, remote_path:'any_', chunks:'any_') -> 'None':
+        raise Exception(_raised_error)
+
 # ################################################################################################################################
 
 class _FTPWrapper:
@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# stdlib
+from unittest import main, TestCase
+
+# gevent
+from gevent import sleep
+from gevent.event import Event
+
+# Zato
+from zato.server.queue_bridge.dispatcher import ModuleCtx, ProcessingMode, RecvDispatcher
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if 0:
+    from zato.common.typing_ import anydict, anylist, strlist
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class _Services:
+    """ Services that block until their messages are released, along with the stream their messages come from,
+    recording what started, what was acknowledged, kept, read again and dead-lettered.
+    """
+    def __init__(self) -> 'None':
+        self.started:'anylist' = []
+        self.acked:'anylist' = []
+        self.kept:'anylist' = []
+        self.fetched:'anylist' = []
+        self.dead_lettered:'anylist' = []
+        self.failing:'set[str]' = set()
+        self.release:'dict[str, Event]' = {}
+
+        # The fields of each entry of the stream, by its ID
+        self.stream:'anydict' = {}
+
+    def handle(self, fields:'anydict') -> 'None':
+        name = fields['name']
+        self.started.append(name)
+        _ = self.release.setdefault(name, Event()).wait()
+
+        if name in self.failing:
+            raise Exception(f'Test exception for {name}')
+
+    def ack(self, stream:'str', msg_ids:'strlist') -> 'None':
+        self.acked.extend(msg_ids)
+
+    def keep(self, stream:'str', msg_ids:'strlist') -> 'None':
+        self.kept.extend(msg_ids)
+
+    def fetch(self, stream:'str', msg_ids:'strlist') -> 'anydict':
+        self.fetched.extend(msg_ids)
+        out = {msg_id: self.stream[msg_id] for msg_id in msg_ids if msg_id in self.stream}
+        return out
+
+    def dead_letter(self, stream:'str', msg_id:'str', fields:'anydict', deliveries:'int') -> 'None':
+        self.dead_lettered.append((msg_id, deliveries))
+
+    def finish(self, name:'str') -> 'None':
+        self.release.setdefault(name, Event()).set()
+        sleep(0.01)
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class RecvDispatcherTestCase(TestCase):
+
+    def setUp(self) -> 'None':
+        self._retry_interval = ModuleCtx.Retry_Interval
+        ModuleCtx.Retry_Interval = 0.001
+
+    def tearDown(self) -> 'None':
+        ModuleCtx.Retry_Interval = self._retry_interval
+
+    def get_dispatcher(
+        self,
+        mode:'str',
+        window:'int'=10,
+        max_in_flight:'int'=100,
+        max_held_per_channel:'int'=100,
+        ) -> 'RecvDispatcher':
+        self.services = _Services()
+
+        config = {
+            ModuleCtx.Processing_Mode_Key: mode,
+            ModuleCtx.Window_Key: window,
+        }
+
+        out = RecvDispatcher(self.services.handle, self.services, lambda name: config, max_in_flight, max_held_per_channel)
+        return out
+
+    def submit(self, dispatcher:'RecvDispatcher', name:'str', ordering_key:'str'='', channel_name:'str'='channel1') -> 'None':
+        fields = {'name': name, 'channel_name': channel_name, 'ordering_key': ordering_key}
+        self.services.stream[name] = fields
+        dispatcher.submit('stream', name, fields)
+
+# ################################################################################################################################
+
+    def test_sequential(self) -> 'None':
+        """ One message of a channel runs at a time, without holding up the messages of other channels.
+        """
+        dispatcher = self.get_dispatcher(ProcessingMode.Sequential)
+
+        self.submit(dispatcher, 'a1')
+        self.submit(dispatcher, 'a2')
+        self.submit(dispatcher, 'b1', channel_name='channel2')
+        sleep(0)
+
+        self.assertEqual(self.services.started, ['a1', 'b1'])
+
+        self.services.finish('a1')
+
+        self.assertEqual(self.services.started, ['a1', 'b1', 'a2'])
+        self.assertEqual(self.services.acked, ['a1'])
+
+# ################################################################################################################################
+
+    def test_unordered_window(self) -> 'None':
+        """ Messages run in parallel up to the window, and acknowledgements advance only in the order they were read in.
+        """
+        dispatcher = self.get_dispatcher(ProcessingMode.Unordered, window=2)
+
+        for name in ('m1', 'm2', 'm3'):
+            self.submit(dispatcher, name)
+        sleep(0)
+
+        self.assertEqual(self.services.started, ['m1', 'm2'])
+
+        # The second message completes first, which does not acknowledge it yet ..
+        self.services.finish('m2')
+
+        self.assertEqual(self.services.started, ['m1', 'm2', 'm3'])
+        self.assertEqual(self.services.acked, [])
+
+        # .. until the first one has completed too.
+        self.services.finish('m1')
+        self.assertEqual(self.services.acked, ['m1', 'm2'])
+
+# ################################################################################################################################
+
+    def test_ordered_by_key(self) -> 'None':
+        """ Messages with the same ordering key run one after another, and the ones with different keys in parallel.
+        """
+        dispatcher = self.get_dispatcher(ProcessingMode.Ordered)
+
+        self.submit(dispatcher, 'k1_a', 'key1')
+        self.submit(dispatcher, 'k1_b', 'key1')
+        self.submit(dispatcher, 'k2_a', 'key2')
+        sleep(0)
+
+        self.assertEqual(self.services.started, ['k1_a', 'k2_a'])
+
+        self.services.finish('k1_a')
+
+        self.assertEqual(self.services.started, ['k1_a', 'k2_a', 'k1_b'])
+
+# ################################################################################################################################
+
+    def test_failed_message_is_not_acked(self) -> 'None':
+        """ A message whose service fails stays pending, while the acknowledgements move past it.
+        """
+        dispatcher = self.get_dispatcher(ProcessingMode.Unordered)
+        self.services.failing.add('m1')
+
+        self.submit(dispatcher, 'm1')
+        self.submit(dispatcher, 'm2')
+        sleep(0)
+
+        self.services.finish('m2')
+        self.services.finish('m1')
+
+        self.assertEqual(self.services.acked, ['m2'])
+        self.assertEqual(dispatcher.in_flight_count, 0)
+
+# ################################################################################################################################
+
+    def test_failed_message_holds_its_lane(self) -> 'None':
+        """ A failed message of an ordered channel runs again before the later messages of its key, and those of other keys
+        go on in the meantime.
+        """
+        dispatcher = self.get_dispatcher(ProcessingMode.Ordered)
+        self.services.failing.add('k1_a')
+
+        # However many times it is retried before it succeeds, it is never given up on here
+        dispatcher.max_attempts = 1000
+
+        self.submit(dispatcher, 'k1_a', 'key1')
+        self.submit(dispatcher, 'k1_b', 'key1')
+        self.submit(dispatcher, 'k2_a', 'key2')
+        sleep(0)
+
+        self.services.finish('k2_a')
+        self.services.finish('k1_a')
+
+        # The failed message is still the only one of its key that has run, as many times as it was retried ..
+        self.assertEqual(set(self.services.started), {'k1_a', 'k2_a'})
+        self.assertGreater(self.services.started.count('k1_a'), 1)
+        self.assertEqual(self.services.acked, [])
+
+        # .. until it succeeds, after which its key goes on and the acknowledgements advance.
+        self.services.failing.clear()
+        sleep(0.05)
+
+        self.services.finish('k1_b')
+
+        self.assertEqual(self.services.started.count('k1_b'), 1)
+        self.assertEqual(self.services.started[-1], 'k1_b')
+        self.assertEqual(self.services.acked, ['k1_a', 'k1_b', 'k2_a'])
+        self.assertEqual(self.services.dead_lettered, [])
+
+# ################################################################################################################################
+
+    def test_failed_message_is_dead_lettered_before_its_lane_goes_on(self) -> 'None':
+        """ A message of a sequential channel that keeps failing is dead-lettered once it has run as many times
+        as an entry may be delivered, and only then do the later messages of the channel run.
+        """
+        dispatcher = self.get_dispatcher(ProcessingMode.Sequential)
+        self.services.failing.add('m1')
+
+        self.submit(dispatcher, 'm1')
+        self.submit(dispatcher, 'm2')
+
+        self.services.finish('m1')
+        sleep(0.1)
+
+        max_attempts = dispatcher.max_attempts
+
+        self.assertEqual(self.services.started[:max_attempts], ['m1'] * max_attempts)
+        self.assertEqual(self.services.dead_lettered, [('m1', max_attempts)])
+        self.assertEqual(self.services.started[max_attempts:], ['m2'])
+
+        # The dead-lettered message was acknowledged when it was moved, so only the other one is acknowledged here
+        self.services.finish('m2')
+        self.assertEqual(self.services.acked, ['m2'])
+
+# ################################################################################################################################
+
+    def test_busy_channel_holds_only_its_share(self) -> 'None':
+        """ A channel keeps only its share of messages with their fields, so the others still have room,
+        and the rest of its messages are read again, in order, once it has room for them.
+        """
+        dispatcher = self.get_dispatcher(ProcessingMode.Sequential, max_in_flight=3, max_held_per_channel=2)
+
+        for name in ('a1', 'a2', 'a3', 'a4'):
+            self.submit(dispatcher, name)
+
+        self.submit(dispatcher, 'b1', channel_name='channel2')
+        sleep(0)
+
+        self.assertEqual(self.services.started, ['a1', 'b1'])
+        self.assertEqual(dispatcher.in_flight_count, 3)
+        self.assertEqual(dispatcher.deferred_count, 2)
+
+        # A message deleted from the stream before it could be read again is only acknowledged
+        del self.services.stream['a4']
+
+        for name in ('a1', 'a2', 'a3'):
+            self.services.finish(name)
+
+        self.assertEqual(self.services.started, ['a1', 'b1', 'a2', 'a3'])
+        self.assertEqual(self.services.fetched, ['a3', 'a4'])
+        self.assertEqual(self.services.acked, ['a1', 'a2', 'a3', 'a4'])
+        self.assertEqual(dispatcher.deferred_count, 0)
+
+# ################################################################################################################################
+
+    def test_held_messages_are_kept_alive(self) -> 'None':
+        """ All the messages not acknowledged yet are claimed again, running, waiting or held by their IDs alone.
+        """
+        dispatcher = self.get_dispatcher(ProcessingMode.Sequential, max_held_per_channel=1)
+
+        for name in ('m1', 'm2', 'm3'):
+            self.submit(dispatcher, name)
+        sleep(0)
+
+        dispatcher.keep_alive()
+        self.assertEqual(sorted(self.services.kept), ['m1', 'm2', 'm3'])
+
+        self.services.finish('m1')
+        self.services.kept.clear()
+
+        dispatcher.keep_alive()
+        self.assertEqual(sorted(self.services.kept), ['m2', 'm3'])
+
+# ################################################################################################################################
+
+    def test_capacity(self) -> 'None':
+        """ The dispatcher reports when it is full, and a message it holds already is not taken in twice.
+        """
+        dispatcher = self.get_dispatcher(ProcessingMode.Unordered, max_in_flight=2)
+
+        self.submit(dispatcher, 'm1')
+        self.submit(dispatcher, 'm1')
+        self.submit(dispatcher, 'm2')
+        sleep(0)
+
+        self.assertEqual(self.services.started, ['m1', 'm2'])
+        self.assertFalse(dispatcher.wait_for_room(0.01))
+
+        self.services.finish('m1')
+
+        self.assertTrue(dispatcher.wait_for_room(0.01))
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if __name__ == '__main__':
+    _ = main()
+
+# ################################################################################################################################
+# ################################################################################################################################
@@ -11,12 +11,15 @@ import os
 import sys
 from datetime import datetime, timedelta, timezone
 from unittest import main, TestCase
+from unittest.mock import patch
 
 # PyJWT
 from jwt import encode as jwt_encode
+from jwt.exceptions import ExpiredSignatureError
 
 # Zato
 from zato.common.bearer_token_verifier import JWKS_Cache_TTL, JWKS_Fetch_Interval
+from zato.common.typing_ import cast_
 
 # The directory with the shared bearer token test helpers
 _this_directory = os.path.dirname(__file__)
@@ -437,6 +440,107 @@ class JWKSFetchInterval(TestCase):
 # ################################################################################################################################
 # ################################################################################################################################
 
+class LocalCaches(TestCase):
+    """ Signing keys and verified tokens are kept in memory, so repeat tokens cost neither the cache nor crypto.
+    """
+
+    def test_signing_key_is_kept_in_memory(self) -> 'None':
+        config = make_config()
+        verifier = make_verifier()
+        verifier.max_verified_tokens = 0
+
+        _ = verifier.verify(_cid, _channel_name, make_token(Signing_Key), config)
+
+        # With the key built, the cache holding the document is not asked again
+        cast_('any_', verifier.cache).data.clear()
+
+        claims = verifier.verify(_cid, _channel_name, make_token(Signing_Key), config)
+
+        self.assertIsNotNone(claims)
+        self.assertEqual(verifier.fetch_count, 1)
+
+# ################################################################################################################################
+
+    def test_repeat_token_skips_signature_check(self) -> 'None':
+        config = make_config()
+        verifier = make_verifier()
+
+        token = make_token(Signing_Key)
+        _ = verifier.verify(_cid, _channel_name, token, config)
+
+        with patch('zato.common.bearer_token_verifier.jwt_decode') as jwt_decode:
+            claims = verifier.verify(_cid, _channel_name, token, config)
+
+        jwt_decode.assert_not_called()
+
+        assert claims is not None
+        self.assertEqual(claims['iss'], Issuer)
+
+# ################################################################################################################################
+
+    def test_repeat_token_still_matches_claims(self) -> 'None':
+        verifier = make_verifier()
+        token = make_token(Signing_Key, extra_claims={'role': 'reader'})
+
+        self.assertIsNotNone(verifier.verify(_cid, _channel_name, token, make_config(claims={'role': 'reader'})))
+        self.assertIsNone(verifier.verify(_cid, _channel_name, token, make_config(claims={'role': 'admin'})))
+
+        # A definition with another audience is not served from what was verified against the first one
+        self.assertIsNone(verifier.verify(_cid, _channel_name, token, make_config(audience='test-other-audience')))
+
+# ################################################################################################################################
+
+    def test_expired_token_is_not_served(self) -> 'None':
+        config = make_config()
+        verifier = make_verifier()
+
+        token = make_token(Signing_Key)
+        _ = verifier.verify(_cid, _channel_name, token, config)
+
+        for verified in verifier._verified_tokens.values():
+            verified.expires_at = 0
+
+        with patch('zato.common.bearer_token_verifier.jwt_decode', side_effect=ExpiredSignatureError):
+            claims = verifier.verify(_cid, _channel_name, token, config)
+
+        self.assertIsNone(claims)
+        self.assertEqual(len(verifier._verified_tokens), 0)
+
+# ################################################################################################################################
+
+    def test_withdrawn_key_invalidates_verified_tokens(self) -> 'None':
+        config = make_config()
+        verifier = make_verifier()
+
+        token = make_token(Signing_Key)
+        _ = verifier.verify(_cid, _channel_name, token, config)
+
+        # The issuer withdraws the key and, some time later, the document and the key expire ..
+        verifier.jwks_document = {'keys': [make_jwk(Rotated_Key, Rotated_Key_ID)]}
+        cast_('any_', verifier.cache).data.clear()
+
+        for signing_key in verifier._signing_keys.values():
+            signing_key.expires_at = 0
+
+        # .. after which a token verified with it is rejected.
+        self.assertIsNone(verifier.verify(_cid, _channel_name, token, config))
+
+# ################################################################################################################################
+
+    def test_verified_tokens_are_bounded(self) -> 'None':
+        config = make_config()
+        verifier = make_verifier()
+        verifier.max_verified_tokens = 3
+
+        for idx in range(10):
+            token = make_token(Signing_Key, extra_claims={'idx': idx})
+            self.assertIsNotNone(verifier.verify(_cid, _channel_name, token, config))
+
+        self.assertEqual(len(verifier._verified_tokens), 3)
+
+# ################################################################################################################################
+# ################################################################################################################################
+
 class JWKSURLMissing(TestCase):
     """ A definition with no JWKS URL and no issuer to derive one from.
     """
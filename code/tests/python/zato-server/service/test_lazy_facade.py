@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# stdlib
+import unittest
+from unittest.mock import MagicMock
+
+# Zato
+from zato.common.facade import PubSubFacade
+from zato.server.connection.facade import RESTFacade, SFTPFacade
+from zato.server.service import LazyFacade, Service
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+_test_cid = 'test-cid-0001'
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class TestLazyFacade(unittest.TestCase):
+    """ Facades are built on first access rather than on each invocation.
+    """
+
+    def _make_service(self) -> 'Service':
+        service = Service.__new__(Service)
+        service.name = 'test.service'
+        service.cid = _test_cid
+        service.server = MagicMock()
+        service._config_manager = MagicMock()
+        service._config_store = MagicMock()
+
+        return service
+
+# ################################################################################################################################
+
+    def test_nothing_is_built_before_access(self) -> 'None':
+        service = self._make_service()
+
+        self.assertNotIn('rest', service.__dict__)
+        self.assertNotIn('out', service.__dict__)
+        self.assertNotIn('pubsub', service.__dict__)
+
+# ################################################################################################################################
+
+    def test_facade_is_built_on_first_access(self) -> 'None':
+        service = self._make_service()
+
+        rest = service.rest
+
+        self.assertIsInstance(rest, RESTFacade)
+        self.assertIs(service.__dict__['rest'], rest)
+
+# ################################################################################################################################
+
+    def test_facade_is_built_once(self) -> 'None':
+        service = self._make_service()
+
+        self.assertIs(service.sftp, service.sftp)
+
+# ################################################################################################################################
+
+    def test_facade_is_bound_to_the_cid_of_its_service(self) -> 'None':
+        service = self._make_service()
+
+        self.assertIsInstance(service.sftp, SFTPFacade)
+        self.assertEqual(service.rest.cid, _test_cid)
+        self.assertEqual(service.sftp.cid, _test_cid)
+
+# ################################################################################################################################
+
+    def test_each_service_has_its_own_facade(self) -> 'None':
+        first = self._make_service()
+        second = self._make_service()
+
+        self.assertIsNot(first.rest, second.rest)
+
+# ################################################################################################################################
+
+    def test_outgoing_is_the_same_object_as_out(self) -> 'None':
+        service = self._make_service()
+
+        self.assertIs(service.outgoing, service.out)
+
+# ################################################################################################################################
+
+    def test_pubsub_uses_the_service_name(self) -> 'None':
+        service = self._make_service()
+
+        self.assertIsInstance(service.pubsub, PubSubFacade)
+        self.assertEqual(service.pubsub.service_name, 'test.service')
+
+# ################################################################################################################################
+
+    def test_an_assigned_facade_replaces_the_lazy_one(self) -> 'None':
+        service = self._make_service()
+
+        rest = MagicMock()
+        service.rest = rest
+
+        self.assertIs(service.rest, rest)
+
+# ################################################################################################################################
+
+    def test_the_descriptor_is_returned_through_the_class(self) -> 'None':
+        self.assertIsInstance(Service.__dict__['rest'], LazyFacade)
+        self.assertIsInstance(Service.rest, LazyFacade)
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if __name__ == '__main__':
+    _ = unittest.main()
+
+# ################################################################################################################################
+# ################################################################################################################################
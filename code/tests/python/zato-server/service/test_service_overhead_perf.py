@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# stdlib
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+# pytest
+import pytest
+
+# Zato
+from zato.common.api import CHANNEL, DATA_FORMAT
+from zato.common.util.api import new_cid
+from zato.server.service import Service
+from zato.server.service.store import ServiceStore
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+# How many invocations each round runs
+_invocation_count = 50_000
+
+# How many microseconds one invocation may take at most, all of the framework's own work included
+_max_cost = 50.0
+
+_microseconds_per_second = 1_000_000
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class _TrivialService(Service):
+    """ A service that only ever reads its input and writes it back.
+    """
+    name = 'test.perf.trivial'
+
+    def handle(self) -> 'None':
+        self.response.payload = self.request.input
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def _make_service_store() -> 'tuple':
+    """ Builds a service store with the trivial service deployed, and the server it belongs to,
+    with nothing but plain objects standing in for the server's own parts.
+    """
+    _ = _TrivialService.zato_set_module_name(__file__)
+    impl_name = _TrivialService.get_impl_name()
+    _ = _TrivialService.get_name()
+
+    _TrivialService.has_io = False
+    _TrivialService.component_enabled_email = False
+    _TrivialService._config_manager = SimpleNamespace(cache_api=SimpleNamespace(redis=None)) # type: ignore
+    _TrivialService._config_store = SimpleNamespace() # type: ignore
+
+    service_store = ServiceStore.__new__(ServiceStore)
+    service_store.services = {
+        impl_name: {
+            'service_class': _TrivialService,
+            'is_active': True,
+            'slow_threshold': 99999,
+        }
+    }
+
+    server = SimpleNamespace(
+        service_store=service_store,
+        user_config={},
+        static_config={},
+        time_util=None,
+        encrypt=None,
+    )
+    service_store.server = server
+
+    return service_store, server, impl_name
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class ServiceOverheadPerfTestCase(unittest.TestCase):
+    """ Measures what the framework itself costs per invocation, for a service that does nothing
+    but touch its input.
+    """
+
+# ################################################################################################################################
+
+    @pytest.mark.perftest
+    def test_new_instance_init_and_handle(self) -> 'None':
+
+        service_store, server, impl_name = _make_service_store()
+        config_dispatcher = MagicMock()
+        payload = {'customer': 'C-1001'}
+
+        start_time = time.perf_counter()
+
+        for _ in range(_invocation_count):
+
+            service, _ = service_store.new_instance(impl_name)
+
+            Service.update(service, CHANNEL.INVOKE, server, config_dispatcher, None, new_cid(), payload, payload, # type: ignore
+                data_format=DATA_FORMAT.DICT)
+
+            service.handle()
+
+        elapsed = time.perf_counter() - start_time
+
+        cost = elapsed / _invocation_count * _microseconds_per_second
+        print(f'Service overhead; invocations={_invocation_count}; cost={cost:.2f} us/invocation')
+
+        self.assertLess(cost, _max_cost)
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if __name__ == '__main__':
+    _ = unittest.main()
+
+# ################################################################################################################################
+# ################################################################################################################################
@@ -28,6 +28,7 @@ from sqlalchemy.pool import NullPool
 from live_sql.env import database_env
 from zato.common.audit_log.api import event_table, get_audit_engine, AuditEvent, AuditOutcome, AuditSource, \
     ModuleCtx as AuditLogCtx
+from zato.common.audit_log.sql import Batch_Params_Sample
 from zato.common.odb.api import PoolStore
 
 # ################################################################################################################################
@@ -71,6 +72,15 @@ _select_params = {'code': 'A2'}
 # A statement that no backend can run - the table it names does not exist
 _select_missing_table = f'select code from {_table_name}_missing'
 
+# The batch the bulk write checks insert
+_insert_row = f'insert into {_table_name} (code, label) values (:code, :label)'
+
+_insert_rows = [
+    {'code': 'B1', 'label': 'Third'},
+    {'code': 'B2', 'label': 'Fourth'},
+    {'code': 'B3', 'label': 'Fifth'},
+]
+
 # The prefix all the audit log database environment variables share
 _env_prefix = 'Zato_Audit_Log_DB_'
 
@@ -403,6 +413,32 @@ def _check_a_failed_statement_is_recorded(details:'stranydict', engine_name:'str
 
 # ################################################################################################################################
 
+def _check_a_stream_is_recorded_once(details:'stranydict', engine_name:'str', tmp_path:'any_') -> 'None':
+    """ A streamed query yields the same rows a plain one returns, fetched in batches,
+    and leaves one statement with how many rows were read.
+    """
+    with _audit_db_env(tmp_path, 'stream'):
+        with _new_connection(details, engine_name, 'full') as conn:
+
+            rows = [row._asdict() for row in conn.stream(_select_all, batch_size=1)]
+            assert rows == _seed_rows
+
+            events = _get_events()
+            assert len(events) == 2
+
+            statement_event, completion_event = events
+
+            assert statement_event['outcome'] == AuditOutcome.OK
+            assert completion_event['outcome'] == AuditOutcome.OK
+
+            # A streamed result is counted, never kept, even at the full level
+            summary = loads(statement_event['data'])
+
+            assert summary['row_count'] == len(_seed_rows)
+            assert 'rows' not in summary
+
+# ################################################################################################################################
+
 def _check_an_unknown_level_is_refused(details:'stranydict', engine_name:'str', tmp_path:'any_') -> 'None':
     """ A level nobody defined refuses to build a connection at all.
     """
@@ -503,6 +539,97 @@ def _check_sqlite_opt_in_pairs_statement_and_completion(tmp_path:'any_') -> 'Non
             summary = loads(statement_event['data'])
             assert summary['statement'] == _select_by_code
 
+# ################################################################################################################################
+
+def _check_sqlite_stream_stopped_early(tmp_path:'any_') -> 'None':
+    """ A caller that needs only the first rows of a stream stops reading, and the statement is still on record,
+    with the rows it read.
+    """
+    with _audit_db_env(tmp_path, 'sqlite-stream'):
+
+        db_path = os.path.join(str(tmp_path), 'sqlite-stream.db')
+        _seed_sqlite_table(db_path)
+
+        with _new_sqlite_connection(db_path, 'statement') as conn:
+
+            rows = conn.stream(_select_all, batch_size=1)
+            first = next(rows)
+
+            # Columns can be read by position and by name alike
+            assert first[0] == 'A1'
+            assert first.label == 'First'
+
+            rows.close()
+
+            events = _get_events()
+            assert len(events) == 2
+
+            statement_event, completion_event = events
+
+            assert completion_event['outcome'] == AuditOutcome.OK
+            assert loads(statement_event['data'])['row_count'] == 1
+
+# ################################################################################################################################
+
+def _check_sqlite_execute_many_commits_one_batch(tmp_path:'any_') -> 'None':
+    """ A batch of parameters runs as one executemany, is committed and is recorded as one statement.
+    """
+    with _audit_db_env(tmp_path, 'sqlite-execute-many'):
+
+        db_path = os.path.join(str(tmp_path), 'sqlite-execute-many.db')
+        _seed_sqlite_table(db_path)
+
+        with _new_sqlite_connection(db_path, 'statement') as conn:
+
+            row_count = conn.execute_many(_insert_row, _insert_rows)
+            assert row_count == len(_insert_rows)
+
+            # An empty batch runs nothing and records nothing
+            assert conn.execute_many(_insert_row, []) == 0
+
+            events = _get_events()
+            assert len(events) == 2
+
+            statement_event, completion_event = events
+
+            assert statement_event['event_type'] == AuditEvent.Request_Sent
+            assert completion_event['event_type'] == AuditEvent.Response_Received
+            assert completion_event['outcome'] == AuditOutcome.OK
+
+            summary = loads(statement_event['data'])
+
+            assert summary['statement'] == _insert_row
+            assert summary['row_count'] == len(_insert_rows)
+            assert summary['batch_size'] == len(_insert_rows)
+            assert 'params' not in summary
+
+            # The rows were committed, so a plain query sees them
+            rows = conn.execute(_select_all)
+            assert rows == _seed_rows + _insert_rows
+
+# ################################################################################################################################
+
+def _check_sqlite_execute_many_params_sample(tmp_path:'any_') -> 'None':
+    """ A batch recorded with its parameters carries only a sample of them, however large the batch is.
+    """
+    with _audit_db_env(tmp_path, 'sqlite-execute-many-params'):
+
+        db_path = os.path.join(str(tmp_path), 'sqlite-execute-many-params.db')
+        _seed_sqlite_table(db_path)
+
+        batch = [{'code': f'C{idx}', 'label': f'Batch {idx}'} for idx in range(Batch_Params_Sample * 3)]
+
+        with _new_sqlite_connection(db_path, 'statement-params') as conn:
+
+            _ = conn.execute_many(_insert_row, batch)
+
+            statement_event, _ = _get_events()
+            summary = loads(statement_event['data'])
+
+            assert summary['batch_size'] == len(batch)
+            assert summary['row_count'] == len(batch)
+            assert summary['params'] == batch[:Batch_Params_Sample]
+
 # ################################################################################################################################
 # ################################################################################################################################
 
@@ -513,6 +640,9 @@ def run_sqlite_completion_scenario(tmp_path:'any_') -> 'None':
     _check_sqlite_completion_of_an_ok_statement(tmp_path)
     _check_sqlite_completion_of_a_failed_statement(tmp_path)
     _check_sqlite_opt_in_pairs_statement_and_completion(tmp_path)
+    _check_sqlite_stream_stopped_early(tmp_path)
+    _check_sqlite_execute_many_commits_one_batch(tmp_path)
+    _check_sqlite_execute_many_params_sample(tmp_path)
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -536,6 +666,9 @@ def run_sql_audit_scenario(details:'stranydict', engine_name:'str', tmp_path:'an
     # A failed statement is recorded before the caller learns about it
     _check_a_failed_statement_is_recorded(details, engine_name, tmp_path)
 
+    # A streamed query reads through a server-side cursor and is recorded once
+    _check_a_stream_is_recorded_once(details, engine_name, tmp_path)
+
     # A level nobody defined refuses to build a connection at all
     _check_an_unknown_level_is_refused(details, engine_name, tmp_path)
 
@@ -368,6 +368,10 @@ class Create(ZatoCommand):
         publish_service = Service(None, 'pubsub.rest.publish', True, publish_impl, True, cluster)
         session.add(publish_service)
 
+        publish_many_impl = 'zato.server.service.internal.pubsub.rest.PublishMany'
+        publish_many_service = Service(None, 'pubsub.rest.publish-many', True, publish_many_impl, True, cluster)
+        session.add(publish_many_service)
+
         get_messages_impl = 'zato.server.service.internal.pubsub.rest.GetMessages'
         get_messages_service = Service(None, 'pubsub.rest.get-messages', True, get_messages_impl, True, cluster)
         session.add(get_messages_service)
@@ -387,6 +391,12 @@ class Create(ZatoCommand):
             service=publish_service, cluster=cluster)
         session.add(publish_channel)
 
+        publish_many_channel = HTTPSOAP(
+            None, 'pubsub.rest.publish-many', True, True, 'channel',
+            'plain_http', None, '/pubsub/publish-many/{topic_name}', None, '', None, DATA_FORMAT.JSON,
+            service=publish_many_service, cluster=cluster)
+        session.add(publish_many_channel)
+
         get_messages_channel = HTTPSOAP(
             None, 'pubsub.rest.get-messages', True, True, 'channel',
             'plain_http', None, '/pubsub/messages/get', None, '', None, DATA_FORMAT.JSON,
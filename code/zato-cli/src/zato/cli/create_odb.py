@@ -9,6 +9,7 @@ Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
 # Zato
 from zato.cli import common_odb_opts, ZatoCommand
 from zato.common.odb.model import Base
+from zato.common.odb.schema import ensure_odb_columns
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -36,6 +37,9 @@ class Create(ZatoCommand):
 
         Base.metadata.create_all(engine)
 
+        # An ODB that already existed may have been created by an older release
+        ensure_odb_columns(engine)
+
         if show_output:
             if self.verbose:
                 self.logger.debug('ODB created successfully')
@@ -51,6 +51,7 @@ class PubSubSubscriptionExporter:
             PubSubSubscription.push_type,
             PubSubSubscription.rest_push_endpoint_id,
             PubSubSubscription.push_service_name,
+            PubSubSubscription.rest_push_max_in_flight,
             PubSubTopic.name.label('topic_name'),
             SecurityBase.name.label('sec_name'),
             HTTPSOAP.name.label('rest_push_endpoint_name')
@@ -104,6 +105,8 @@ class PubSubSubscriptionExporter:
                         if not rest_push_endpoint_name:
                             raise ValueError(f'Push subscription missing rest_push_endpoint_name: subscription_id={subscription_id} security={security_name}')
                         subscription_data['push_rest_endpoint'] = rest_push_endpoint_name
+                        if item.rest_push_max_in_flight:
+                            subscription_data['push_rest_max_in_flight'] = item.rest_push_max_in_flight
                     elif push_type == 'service':
                         if not push_service_name:
                             raise ValueError(f'Push subscription missing push_service_name: subscription_id={subscription_id} security={security_name}')
@@ -61,6 +61,7 @@ class PubSubSubscriptionImporter:
                 'push_type': item.push_type,
                 'rest_push_endpoint_id': item.rest_push_endpoint_id,
                 'push_service_name': item.push_service_name,
+                'rest_push_max_in_flight': item.rest_push_max_in_flight,
                 'is_delivery_active': item.is_delivery_active,
                 'cluster_id': 1
             }
@@ -112,6 +113,7 @@ class PubSubSubscriptionImporter:
                 'push_type': subscription.push_type,
                 'rest_push_endpoint_id': subscription.rest_push_endpoint_id,
                 'push_service_name': subscription.push_service_name,
+                'rest_push_max_in_flight': subscription.rest_push_max_in_flight,
                 'is_delivery_active': subscription.is_delivery_active,
                 'cluster_id': subscription.cluster_id,
                 'topic_name_list': topic_names
@@ -141,6 +143,7 @@ class PubSubSubscriptionImporter:
         instance.push_type = definition.get('push_type')
         instance.rest_push_endpoint_id = definition.get('rest_push_endpoint_id')
         instance.push_service_name = definition.get('push_service_name')
+        instance.rest_push_max_in_flight = definition.get('rest_push_max_in_flight')
         instance.is_delivery_active = definition.get('is_delivery_active', True)
 
         logger.info('CREATE: sub_key=%s, sec_base_id=%s, cluster_id=%s', instance.sub_key, instance.sec_base_id, instance.cluster_id)
@@ -208,6 +211,7 @@ class PubSubSubscriptionImporter:
         instance.push_type = definition.get('push_type')
         instance.rest_push_endpoint_id = definition.get('rest_push_endpoint_id')
         instance.push_service_name = definition.get('push_service_name')
+        instance.rest_push_max_in_flight = definition.get('rest_push_max_in_flight')
         instance.is_delivery_active = definition.get('is_delivery_active', True)
 
         set_instance_opaque_attrs(instance, definition)
@@ -287,6 +291,14 @@ class PubSubSubscriptionImporter:
             logger.info('is_delivery_active differs: YAML=%s, DB=%s', yaml_is_active, db_is_active)
             return True
 
+        # Compare the in-flight window of REST push
+        yaml_max_in_flight = yaml_def.get('push_rest_max_in_flight')
+        db_max_in_flight = db_def.get('rest_push_max_in_flight')
+
+        if yaml_max_in_flight != db_max_in_flight:
+            logger.info('push_rest_max_in_flight differs: YAML=%s, DB=%s', yaml_max_in_flight, db_max_in_flight)
+            return True
+
         # Compare topic lists
         yaml_topic_list = sorted(yaml_def.get('topic_list', []))
         db_topic_list = sorted(db_def.get('topic_name_list', []))
@@ -372,13 +384,15 @@ class PubSubSubscriptionImporter:
                     rest_endpoint_id = self.get_rest_endpoint_id_by_name(yaml_def['push_rest_endpoint'], session)
                     subscription_def['rest_push_endpoint_id'] = rest_endpoint_id
                     subscription_def['push_type'] = PubSub.Push_Type.REST
+                    subscription_def['rest_push_max_in_flight'] = yaml_def.get('push_rest_max_in_flight')
                 elif 'push_service' in yaml_def:
                     subscription_def['push_service_name'] = yaml_def['push_service']
                     subscription_def['push_type'] = PubSub.Push_Type.Service
 
             # Add other opaque attributes
             for key, value in yaml_def.items():
-                if key not in ['security', 'topic_list', 'delivery_type', 'push_rest_endpoint', 'push_service', 'is_delivery_active']:
+                if key not in ['security', 'topic_list', 'delivery_type', 'push_rest_endpoint', 'push_rest_max_in_flight',
+                    'push_service', 'is_delivery_active']:
                     subscription_def[key] = value
 
             # Create a key for tracking
@@ -402,6 +416,7 @@ class PubSubSubscriptionImporter:
                     'push_type': instance.push_type,
                     'rest_push_endpoint_id': instance.rest_push_endpoint_id,
                     'push_service_name': instance.push_service_name,
+                    'rest_push_max_in_flight': instance.rest_push_max_in_flight,
                     'is_delivery_active': instance.is_delivery_active,
                     'cluster_id': instance.cluster_id
                 }
@@ -425,6 +440,7 @@ class PubSubSubscriptionImporter:
                         'push_type': instance.push_type,
                         'rest_push_endpoint_id': instance.rest_push_endpoint_id,
                         'push_service_name': instance.push_service_name,
+                        'rest_push_max_in_flight': instance.rest_push_max_in_flight,
                         'is_delivery_active': instance.is_delivery_active,
                         'cluster_id': instance.cluster_id
                     }
@@ -0,0 +1,356 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# The live aggregator - a per-process, in-memory view of the newest audit traffic that the rate
+# collectors read instead of grouping the audit database on every sweep. Each event the audit log
+# accepts is folded into one-second slots per (source, object) pair, holding its counts, errors,
+# authentication failures and durations, and into the failure streak of its (source, object,
+# event type) stream. The slots reach back one hour, which covers every window the collectors
+# measure by default - a longer window, and a window the aggregator has not been running for yet,
+# is still read from the database.
+#
+# A process sees only the events it wrote itself, so the aggregator runs by default only where
+# a single server writes to the audit database - with several of them, each one would measure
+# its own traffic alone while its alerts stood for all of it.
+
+from __future__ import annotations
+
+# stdlib
+import os
+from collections import deque
+from dataclasses import dataclass
+from threading import RLock
+
+# Zato
+from zato.common.audit_log.common import AuditEvent, AuditOutcome, AuditSource
+from zato.common.util.api import as_bool
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if 0:
+    from datetime import datetime
+    from zato.common.typing_ import floatnone
+    datetime = datetime
+    floatnone = floatnone
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+# Type aliases
+stream_key = tuple[str, str, str]
+stream_streak_dict = dict[stream_key, int]
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class ModuleCtx:
+
+    # The environment variable turning the aggregator on or off regardless of how many servers
+    # write to the audit database, e.g. on when each server of a cluster has an audit database of its own.
+    # An unset variable means the aggregator runs only when this server is the only one in its cluster.
+    Env_Enabled = 'Zato_Alerting_Live_Aggregator'
+
+    # How far back the slots reach, in seconds
+    Max_Window_Seconds = 3600
+
+# ################################################################################################################################
+
+# The sources always measured in the database - a scheduler job's start event has its outcome
+# written after the fact, once the job completes or times out, which no insert-time view can follow,
+# and configuration events are written by the dashboard too, whose events no server ever sees.
+sql_only_sources = frozenset({
+    AuditSource.Config,
+    AuditSource.Scheduler,
+})
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def is_live_aggregator_enabled(is_only_writer:'bool') -> 'bool':
+    """ Whether the collectors may be fed from memory, as set through the environment,
+    or otherwise, whether this process is the only one writing the traffic they measure.
+    """
+    if value := os.environ.get(ModuleCtx.Env_Enabled, ''):
+        out = as_bool(value)
+    else:
+        out = is_only_writer
+
+    return out
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+@dataclass(init=False)
+class WindowCounts:
+    """ What one (source, object) pair did within a window, summed over its slots.
+    """
+    source: 'str'
+    object_name: 'str'
+
+    # All the events, those that failed and those that were authentication failures
+    total: 'int' = 0
+    errors: 'int' = 0
+    auth_failures: 'int' = 0
+
+    # Only the events that carry a duration are summed, the same as the database average takes
+    duration_sum: 'int' = 0
+    duration_count: 'int' = 0
+
+# ################################################################################################################################
+
+class _Slot:
+    """ One second of one pair's traffic.
+    """
+    __slots__ = ('second', 'total', 'errors', 'auth_failures', 'duration_sum', 'duration_count')
+
+    def __init__(self, second:'int') -> 'None':
+        self.second = second
+        self.total = 0
+        self.errors = 0
+        self.auth_failures = 0
+        self.duration_sum = 0
+        self.duration_count = 0
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class LiveAggregator:
+    """ Folds accepted audit events into per-second slots and per-stream failure streaks.
+    Nothing is folded in until the aggregator is started, with the streaks read from the database
+    at that moment as its seed, and a window is answered from memory only once the aggregator
+    has been running for all of it.
+    """
+
+    def __init__(self, max_window_seconds:'int'=ModuleCtx.Max_Window_Seconds) -> 'None':
+
+        self.max_window_seconds = max_window_seconds
+
+        # Events are added by whichever greenlet or thread wrote them, while a sweep reads
+        self.lock = RLock()
+
+        # When the aggregator was started, as a timestamp, or None if it is not running
+        self.started_at:'floatnone' = None
+
+        # The newest slots of each (source, object) pair, oldest first
+        self.slots:'dict[tuple[str, str], deque[_Slot]]' = {}
+
+        # How many errors lead each (source, object, event type) stream, without a break
+        self.streaks:'stream_streak_dict' = {}
+
+# ################################################################################################################################
+
+    @property
+    def is_running(self) -> 'bool':
+        out = self.started_at is not None
+        return out
+
+# ################################################################################################################################
+
+    def start(self, stream_streaks:'stream_streak_dict', now:'datetime') -> 'None':
+        """ Starts folding events in, on top of the per-stream streaks the database holds as of now.
+        """
+        with self.lock:
+
+            self.slots = {}
+            self.streaks = {}
+
+            for key, streak in stream_streaks.items():
+                if key[0] not in sql_only_sources:
+                    self.streaks[key] = streak
+
+            self.started_at = now.timestamp()
+
+# ################################################################################################################################
+
+    def stop(self) -> 'None':
+        """ Stops folding events in and forgets everything folded so far.
+        """
+        with self.lock:
+            self.started_at = None
+            self.slots = {}
+            self.streaks = {}
+
+# ################################################################################################################################
+
+    def covers(self, now:'datetime', window_seconds:'int') -> 'bool':
+        """ Whether a window ending now can be answered from memory - the aggregator must have seen
+        every event of it, and the window must fit within the slots kept.
+        """
+        if self.started_at is None:
+            return False
+
+        if window_seconds > self.max_window_seconds:
+            return False
+
+        out = self.started_at <= now.timestamp() - window_seconds
+        return out
+
+# ################################################################################################################################
+
+    def add_event(
+        self,
+        source:'str',
+        event_type:'str',
+        object_name:'str',
+        outcome:'str',
+        duration_ms:'int',
+        event_time:'datetime',
+        ) -> 'None':
+        """ Folds one accepted event into its slot and its stream's streak.
+        """
+        if self.started_at is None:
+            return
+
+        if source in sql_only_sources:
+            return
+
+        second = int(event_time.timestamp())
+
+        with self.lock:
+
+            slots = self.slots.get((source, object_name))
+
+            if slots is None:
+                slots = self.slots[(source, object_name)] = deque()
+
+            # Events arrive in clock order, so a new second opens a new slot ..
+            if slots and slots[-1].second >= second:
+                slot = slots[-1]
+            else:
+                slot = _Slot(second)
+                slots.append(slot)
+
+            # .. the measures are the same the database queries take ..
+            slot.total += 1
+
+            if outcome == AuditOutcome.Error:
+                slot.errors += 1
+
+            if event_type == AuditEvent.Auth_Failed:
+                slot.auth_failures += 1
+
+            if duration_ms > 0:
+                slot.duration_sum += duration_ms
+                slot.duration_count += 1
+
+            # .. the slots that fell out of the longest window are dropped ..
+            self._prune(slots, second)
+
+            # .. and an event with an outcome extends or ends its stream's streak.
+            if outcome:
+                key = (source, object_name, event_type)
+
+                if outcome == AuditOutcome.Error:
+                    self.streaks[key] = self.streaks.get(key, 0) + 1
+                else:
+                    self.streaks[key] = 0
+
+# ################################################################################################################################
+
+    def _prune(self, slots:'deque[_Slot]', newest_second:'int') -> 'None':
+        """ Drops the slots older than the longest window, plus the one second a window may start into.
+        """
+        oldest_second = newest_second - self.max_window_seconds - 1
+
+        while slots and slots[0].second < oldest_second:
+            _ = slots.popleft()
+
+# ################################################################################################################################
+
+    def get_window_counts(
+        self,
+        now:'datetime',
+        window_seconds:'int',
+        *,
+        source:'str' = '',
+        object_name:'str' = '',
+        ) -> 'list[WindowCounts]':
+        """ Sums each (source, object) pair's slots within the window ending now. A pair without
+        any traffic in it is left out, the same as the database grouping leaves it out.
+        Slots are one second wide, so the window starts at the beginning of its first second.
+        """
+
+        # Our response to produce
+        out:'list[WindowCounts]' = []
+
+        now_second = int(now.timestamp())
+        window_start_second = int(now.timestamp() - window_seconds)
+
+        with self.lock:
+
+            for key, slots in list(self.slots.items()):
+
+                # Pairs that went quiet have their slots aged out here, since no new event does it for them
+                self._prune(slots, now_second)
+
+                if not slots:
+                    del self.slots[key]
+                    continue
+
+                slot_source, slot_object_name = key
+
+                # The optional criteria narrow the measures only when set
+                if source and slot_source != source:
+                    continue
+
+                if object_name and slot_object_name != object_name:
+                    continue
+
+                counts = WindowCounts()
+                counts.source = slot_source
+                counts.object_name = slot_object_name
+
+                for slot in slots:
+                    if slot.second >= window_start_second:
+                        counts.total += slot.total
+                        counts.errors += slot.errors
+                        counts.auth_failures += slot.auth_failures
+                        counts.duration_sum += slot.duration_sum
+                        counts.duration_count += slot.duration_count
+
+                if counts.total:
+                    out.append(counts)
+
+        return out
+
+# ################################################################################################################################
+
+    def get_stream_streaks(self, depth:'int', *, source:'str'='', object_name:'str'='') -> 'stream_streak_dict':
+        """ Returns how many errors lead each (source, object, event type) stream, capped at the depth
+        the database read looks back over.
+        """
+
+        # Our response to produce
+        out:'stream_streak_dict' = {}
+
+        with self.lock:
+
+            for key, streak in self.streaks.items():
+
+                stream_source, stream_object_name, _ = key
+
+                # The optional criteria narrow the measures only when set
+                if source and stream_source != source:
+                    continue
+
+                if object_name and stream_object_name != object_name:
+                    continue
+
+                out[key] = min(streak, depth)
+
+        return out
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+# The one aggregator of this process, fed by every audit log it writes through
+live_aggregator = LiveAggregator()
+
+# ################################################################################################################################
+# ################################################################################################################################
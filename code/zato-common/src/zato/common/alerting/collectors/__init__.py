@@ -22,7 +22,8 @@ from zato.common.alerting.collectors.probes import collect_certificate_facts as
     collect_health_facts as collect_health_facts, collect_test_transfer_facts as collect_test_transfer_facts
 from zato.common.alerting.collectors.rates import collect_auth_failure_facts as collect_auth_failure_facts, \
     collect_consecutive_failure_facts as collect_consecutive_failure_facts, \
-    collect_error_rate_facts as collect_error_rate_facts, collect_latency_facts as collect_latency_facts
+    collect_error_rate_facts as collect_error_rate_facts, collect_latency_facts as collect_latency_facts, \
+    start_live_aggregator as start_live_aggregator
 from zato.common.alerting.collectors.scheduler import collect_scheduler_facts as collect_scheduler_facts
 
 # ################################################################################################################################
@@ -7,8 +7,9 @@ Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
 """
 
 # The rate producers - error rates with their windows and counts, unbroken failure
-# streaks, average call durations and authentication failures, each one a pure
-# function over the audit database.
+# streaks, average call durations and authentication failures. Each one reads the live
+# aggregator once it has been running for the whole window, and the audit database otherwise,
+# with the sources whose outcomes are written after the fact always read from the database.
 
 from __future__ import annotations
 
@@ -19,6 +20,7 @@ from datetime import timedelta
 from sqlalchemy import and_, case, func, select
 
 # Zato
+from zato.common.alerting.aggregator import is_live_aggregator_enabled, live_aggregator, sql_only_sources
 from zato.common.alerting.collectors.common import apply_newest_error, collect_newest_error_events, new_fact, \
     Default_Consecutive_Depth
 from zato.common.audit_log.api import event_table, AuditEvent, AuditOutcome
@@ -29,34 +31,73 @@ from zato.common.audit_log.api import event_table, AuditEvent, AuditOutcome
 if 0:
     from datetime import datetime
     from sqlalchemy.engine import Engine
-    from zato.common.typing_ import dictlist
+    from zato.common.alerting.aggregator import stream_streak_dict, WindowCounts
+    from zato.common.typing_ import anylist, anytuple, callable_, dictlist, strlist
+    anylist = anylist
+    anytuple = anytuple
+    callable_ = callable_
     datetime = datetime
     dictlist = dictlist
     Engine = Engine
+    stream_streak_dict = stream_streak_dict
+    strlist = strlist
+    WindowCounts = WindowCounts
 
 # ################################################################################################################################
 # ################################################################################################################################
 
-def collect_error_rate_facts(
+def _get_sql_only_sources(source:'str') -> 'strlist':
+    """ The sources a read from memory leaves to the database, narrowed to the one asked for, if any.
+    """
+    if source:
+        out = [source] if source in sql_only_sources else []
+    else:
+        out = sorted(sql_only_sources)
+
+    return out
+
+# ################################################################################################################################
+
+def _get_window_rows(
     engine:'Engine',
     window_seconds:'int',
     now:'datetime',
-    *,
-    source:'str' = '',
-    object_name:'str' = '',
-    ) -> 'dictlist':
-    """ Measures the share of error outcomes within the window, one row of measures
-    per (source, object) pair that had any traffic at all. A pair whose window holds
-    failures also reports its newest failing event, so an alert about the failures
-    can point straight at the message that failed.
+    source:'str',
+    object_name:'str',
+    read_rows:'callable_',
+    get_memory_row:'callable_',
+    ) -> 'anylist':
+    """ Returns the rows of one windowed measure - from memory when the live aggregator has seen
+    the whole window, and from the database otherwise. The database reader takes the window start,
+    a source and an object, the memory one turns a pair's counts into the same row, or into None
+    when the pair has nothing to say about the measure.
     """
-
-    # Our response to produce
-    out:'dictlist' = []
-
     window_start = now - timedelta(seconds=window_seconds)
     window_start_iso = window_start.isoformat()
 
+    if live_aggregator.covers(now, window_seconds):
+
+        out:'anylist' = []
+
+        # The pairs the aggregator holds are summed off their slots ..
+        for counts in live_aggregator.get_window_counts(now, window_seconds, source=source, object_name=object_name):
+            if row := get_memory_row(counts):
+                out.append(row)
+
+        # .. while the sources it does not follow are still read from the database.
+        for sql_source in _get_sql_only_sources(source):
+            out.extend(read_rows(engine, window_start_iso, sql_source, object_name))
+
+    else:
+        out = read_rows(engine, window_start_iso, source, object_name)
+
+    return out
+
+# ################################################################################################################################
+
+def _read_error_rate_rows(engine:'Engine', window_start_iso:'str', source:'str', object_name:'str') -> 'anylist':
+    """ Reads errors and totals per source and object from the database, in one pass.
+    """
     conditions = [
         event_table.c.event_time_iso >= window_start_iso,
     ]
@@ -68,7 +109,6 @@ def collect_error_rate_facts(
     if object_name:
         conditions.append(event_table.c.object_name == object_name)
 
-    # Errors and totals per source and object, in one pass
     error_case = case((event_table.c.outcome == AuditOutcome.Error, 1), else_=0)
 
     statement = select(
@@ -79,17 +119,51 @@ def collect_error_rate_facts(
     ).where(and_(*conditions)).group_by(event_table.c.source, event_table.c.object_name)
 
     with engine.connect() as connection:
-        rows = connection.execute(statement).fetchall()
+        out = connection.execute(statement).fetchall()
 
-    # The newest failing event of each pair within the same window, read once
-    # for every pair rather than once per fact
-    newest_errors = collect_newest_error_events(
-        engine, window_start_iso=window_start_iso, source=source, object_name=object_name)
+    return out
+
+# ################################################################################################################################
+
+def _get_error_rate_memory_row(counts:'WindowCounts') -> 'anytuple':
+    out = (counts.source, counts.object_name, counts.total, counts.errors)
+    return out
+
+# ################################################################################################################################
+
+def collect_error_rate_facts(
+    engine:'Engine',
+    window_seconds:'int',
+    now:'datetime',
+    *,
+    source:'str' = '',
+    object_name:'str' = '',
+    ) -> 'dictlist':
+    """ Measures the share of error outcomes within the window, one row of measures
+    per (source, object) pair that had any traffic at all. A pair whose window holds
+    failures also reports its newest failing event, so an alert about the failures
+    can point straight at the message that failed.
+    """
+
+    # Our response to produce
+    out:'dictlist' = []
 
-    for row_source, row_object_name, total, errors in rows:
+    rows = _get_window_rows(
+        engine, window_seconds, now, source, object_name, _read_error_rate_rows, _get_error_rate_memory_row)
 
-        # Each backend returns its own numeric type for a sum, hence the conversion
-        error_count = int(errors)
+    # Each backend returns its own numeric type for a sum, hence the conversion
+    rows = [(row_source, row_object_name, total, int(errors)) for row_source, row_object_name, total, errors in rows]
+
+    # The newest failing event of each pair within the same window, read once
+    # for every pair rather than once per fact, and only when there is a failure to point at
+    if any(row[3] for row in rows):
+        window_start = now - timedelta(seconds=window_seconds)
+        newest_errors = collect_newest_error_events(
+            engine, window_start_iso=window_start.isoformat(), source=source, object_name=object_name)
+    else:
+        newest_errors = {}
+
+    for row_source, row_object_name, total, error_count in rows:
 
         fact = new_fact(row_source, row_object_name)
         fact['error_rate'] = error_count / total
@@ -107,26 +181,19 @@ def collect_error_rate_facts(
 
 # ################################################################################################################################
 
-def collect_consecutive_failure_facts(
+def _read_stream_streaks(
     engine:'Engine',
-    now:'datetime',
+    depth:'int',
     *,
-    depth:'int' = Default_Consecutive_Depth,
     source:'str' = '',
     object_name:'str' = '',
-    ) -> 'dictlist':
-    """ Measures how many of each object's newest outcomes are errors, without a break.
-    An object mid-streak also reports its newest failing event, so an alert about
-    the streak can point straight at the message that failed.
-
-    The count runs per event type and the object reports the highest one, because sources
-    write paired events - a request that always leaves with an OK outcome and a response
-    that carries the real one - and counting across types would let the OK halves of failed
-    calls hide an unbroken run of failures.
+    ) -> 'stream_streak_dict':
+    """ Reads how many errors lead each (source, object, event type) stream from the database,
+    looking back over its newest outcomes down to the given depth.
     """
 
     # Our response to produce
-    out:'dictlist' = []
+    out:'stream_streak_dict' = {}
 
     conditions = [
         event_table.c.outcome != '',
@@ -172,12 +239,8 @@ def collect_consecutive_failure_facts(
         key = (row_source, row_object_name, event_type)
         per_stream.setdefault(key, []).append(outcome)
 
-    # Each stream's streak is how many errors lead it - the first non-error ends the count.
-    # The object reports its highest stream, and an object whose every stream is clean
-    # still reports a zero, so a recovered connection resets the measure visibly.
-    streaks:'dict[tuple[str, str], int]' = {}
-
-    for (row_source, row_object_name, event_type), outcomes in per_stream.items():
+    # Each stream's streak is how many errors lead it - the first non-error ends the count
+    for key, outcomes in per_stream.items():
 
         streak = 0
 
@@ -187,6 +250,53 @@ def collect_consecutive_failure_facts(
             else:
                 break
 
+        out[key] = streak
+
+    return out
+
+# ################################################################################################################################
+
+def collect_consecutive_failure_facts(
+    engine:'Engine',
+    now:'datetime',
+    *,
+    depth:'int' = Default_Consecutive_Depth,
+    source:'str' = '',
+    object_name:'str' = '',
+    ) -> 'dictlist':
+    """ Measures how many of each object's newest outcomes are errors, without a break.
+    An object mid-streak also reports its newest failing event, so an alert about
+    the streak can point straight at the message that failed.
+
+    The count runs per event type and the object reports the highest one, because sources
+    write paired events - a request that always leaves with an OK outcome and a response
+    that carries the real one - and counting across types would let the OK halves of failed
+    calls hide an unbroken run of failures.
+    """
+
+    # Our response to produce
+    out:'dictlist' = []
+
+    # The live aggregator was seeded down to the default depth, so only a read that deep
+    # or shallower can be answered from memory ..
+    if live_aggregator.is_running and depth <= Default_Consecutive_Depth:
+
+        stream_streaks = live_aggregator.get_stream_streaks(depth, source=source, object_name=object_name)
+
+        # .. with the sources it does not follow still read from the database ..
+        for sql_source in _get_sql_only_sources(source):
+            stream_streaks.update(_read_stream_streaks(engine, depth, source=sql_source, object_name=object_name))
+
+    # .. and everything else is read from the database alone.
+    else:
+        stream_streaks = _read_stream_streaks(engine, depth, source=source, object_name=object_name)
+
+    # The object reports its highest stream, and an object whose every stream is clean
+    # still reports a zero, so a recovered connection resets the measure visibly.
+    streaks:'dict[tuple[str, str], int]' = {}
+
+    for (row_source, row_object_name, _), streak in stream_streaks.items():
+
         object_key = (row_source, row_object_name)
 
         if streak > streaks.get(object_key, 0):
@@ -195,8 +305,12 @@ def collect_consecutive_failure_facts(
             _ = streaks.setdefault(object_key, 0)
 
     # The newest failing event of each pair, all-time - a streak is about the newest
-    # outcomes whenever they happened, so no window narrows this read either
-    newest_errors = collect_newest_error_events(engine, source=source, object_name=object_name)
+    # outcomes whenever they happened, so no window narrows this read either,
+    # and it is not read at all when no object is mid-streak.
+    if any(streaks.values()):
+        newest_errors = collect_newest_error_events(engine, source=source, object_name=object_name)
+    else:
+        newest_errors = {}
 
     for (row_source, row_object_name), streak in streaks.items():
 
@@ -213,25 +327,9 @@ def collect_consecutive_failure_facts(
 
 # ################################################################################################################################
 
-def collect_latency_facts(
-    engine:'Engine',
-    window_seconds:'int',
-    now:'datetime',
-    *,
-    source:'str' = '',
-    object_name:'str' = '',
-    ) -> 'dictlist':
-    """ Measures the average duration of completed calls within the window, one row
-    of measures per (source, object) pair. Only events that carry a duration count -
-    a request-sent event has none and would drag the average down to nothing.
+def _read_latency_rows(engine:'Engine', window_start_iso:'str', source:'str', object_name:'str') -> 'anylist':
+    """ Reads the average duration per source and object from the database.
     """
-
-    # Our response to produce
-    out:'dictlist' = []
-
-    window_start = now - timedelta(seconds=window_seconds)
-    window_start_iso = window_start.isoformat()
-
     conditions = [
         event_table.c.event_time_iso >= window_start_iso,
         event_table.c.duration_ms > 0,
@@ -251,21 +349,24 @@ def collect_latency_facts(
     ).where(and_(*conditions)).group_by(event_table.c.source, event_table.c.object_name)
 
     with engine.connect() as connection:
-        rows = connection.execute(statement).fetchall()
+        out = connection.execute(statement).fetchall()
 
-    for row_source, row_object_name, avg_duration in rows:
+    return out
 
-        fact = new_fact(row_source, row_object_name)
-        fact['avg_duration_ms'] = round(avg_duration)
-        fact['window_seconds'] = window_seconds
+# ################################################################################################################################
 
-        out.append(fact)
+def _get_latency_memory_row(counts:'WindowCounts') -> 'anytuple':
+
+    # A pair whose window holds no event with a duration has no average to report
+    if not counts.duration_count:
+        return ()
 
+    out = (counts.source, counts.object_name, counts.duration_sum / counts.duration_count)
     return out
 
 # ################################################################################################################################
 
-def collect_auth_failure_facts(
+def collect_latency_facts(
     engine:'Engine',
     window_seconds:'int',
     now:'datetime',
@@ -273,17 +374,31 @@ def collect_auth_failure_facts(
     source:'str' = '',
     object_name:'str' = '',
     ) -> 'dictlist':
-    """ Measures how many authentication failures the window holds, one row of measures
-    per (source, object) pair. Authentication failing is its own event type because
-    its remedy is credentials, not networking, so it gets its own measure too.
+    """ Measures the average duration of completed calls within the window, one row
+    of measures per (source, object) pair. Only events that carry a duration count -
+    a request-sent event has none and would drag the average down to nothing.
     """
 
     # Our response to produce
     out:'dictlist' = []
 
-    window_start = now - timedelta(seconds=window_seconds)
-    window_start_iso = window_start.isoformat()
+    rows = _get_window_rows(engine, window_seconds, now, source, object_name, _read_latency_rows, _get_latency_memory_row)
+
+    for row_source, row_object_name, avg_duration in rows:
+
+        fact = new_fact(row_source, row_object_name)
+        fact['avg_duration_ms'] = round(avg_duration)
+        fact['window_seconds'] = window_seconds
+
+        out.append(fact)
+
+    return out
+
+# ################################################################################################################################
 
+def _read_auth_failure_rows(engine:'Engine', window_start_iso:'str', source:'str', object_name:'str') -> 'anylist':
+    """ Reads how many authentication failures each source and object had from the database.
+    """
     conditions = [
         event_table.c.event_time_iso >= window_start_iso,
         event_table.c.event_type == AuditEvent.Auth_Failed,
@@ -303,7 +418,41 @@ def collect_auth_failure_facts(
     ).where(and_(*conditions)).group_by(event_table.c.source, event_table.c.object_name)
 
     with engine.connect() as connection:
-        rows = connection.execute(statement).fetchall()
+        out = connection.execute(statement).fetchall()
+
+    return out
+
+# ################################################################################################################################
+
+def _get_auth_failure_memory_row(counts:'WindowCounts') -> 'anytuple':
+
+    # A pair without a failed authentication has nothing to report
+    if not counts.auth_failures:
+        return ()
+
+    out = (counts.source, counts.object_name, counts.auth_failures)
+    return out
+
+# ################################################################################################################################
+
+def collect_auth_failure_facts(
+    engine:'Engine',
+    window_seconds:'int',
+    now:'datetime',
+    *,
+    source:'str' = '',
+    object_name:'str' = '',
+    ) -> 'dictlist':
+    """ Measures how many authentication failures the window holds, one row of measures
+    per (source, object) pair. Authentication failing is its own event type because
+    its remedy is credentials, not networking, so it gets its own measure too.
+    """
+
+    # Our response to produce
+    out:'dictlist' = []
+
+    rows = _get_window_rows(
+        engine, window_seconds, now, source, object_name, _read_auth_failure_rows, _get_auth_failure_memory_row)
 
     for row_source, row_object_name, failure_count in rows:
 
@@ -317,3 +466,20 @@ def collect_auth_failure_facts(
 
 # ################################################################################################################################
 # ################################################################################################################################
+
+def start_live_aggregator(engine:'Engine', now:'datetime', *, is_only_writer:'bool') -> 'bool':
+    """ Starts the live aggregator of this process, seeding it with the failure streaks the audit database
+    holds as of now - if the environment turned it on, or if it did not say and this process is the only writer
+    of the traffic the collectors measure. Returns whether it was started.
+    An event written while the seed is being read may be left out of its stream's streak.
+    """
+    if not is_live_aggregator_enabled(is_only_writer):
+        return False
+
+    stream_streaks = _read_stream_streaks(engine, Default_Consecutive_Depth)
+    live_aggregator.start(stream_streaks, now)
+
+    return True
+
+# ################################################################################################################################
+# ################################################################################################################################
@@ -8,26 +8,34 @@ Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
 
 # Traffic analytics - the durable aggregate store behind the analytics screens.
 # A standalone rollup process reads new audit log events and lands them here
-# as hourly rows keyed by channel, caller and status class, each row carrying
-# request counts, error counts by source, size and duration sums and latency
-# histogram bucket counts. Because the aggregates are extracted before the audit
-# rows expire, audit retention does not bound the trends - hourly rows are kept
-# indefinitely at negligible size.
+# as per-minute, hourly and daily rows keyed by channel, caller and status class,
+# each row carrying request counts, error counts by source, size and duration sums
+# and latency histogram bucket counts. Because the aggregates are extracted before
+# the audit rows expire, audit retention does not bound the trends - hourly and daily
+# rows are kept indefinitely at negligible size, while per-minute rows only cover
+# the most recent hours.
+
+# stdlib
+from hashlib import sha256
+from struct import Struct
 
 # SQLAlchemy
-from sqlalchemy import BigInteger, Column, Index, Integer, MetaData, String, Table, Text
+from sqlalchemy import BigInteger, Column, Index, Integer, LargeBinary, MetaData, String, Table, Text
 
 # Zato
 from zato.common.db_env import EnvDBConfig, get_env_engine
+from zato.common.json_internal import dumps
 
 # ################################################################################################################################
 # ################################################################################################################################
 
 if 0:
     from sqlalchemy.engine import Engine
+    from zato.common.typing_ import intlist
 
     # Dummy assignments to satisfy type checkers
     Engine = Engine
+    intlist = intlist
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -65,6 +73,9 @@ Latency_Buckets_Ms = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 300
 # One count per boundary plus the overflow bucket for anything above the last boundary
 Latency_Bucket_Count = len(Latency_Buckets_Ms) + 1
 
+# How a histogram is stored - one little-endian 64-bit count per bucket, packed together
+_latency_histogram_struct = Struct(f'<{Latency_Bucket_Count}q')
+
 # ################################################################################################################################
 
 # Where an error came from, derived from the HTTP status code of the response
@@ -83,9 +94,44 @@ Error_Sources = (ErrorSource.Auth, ErrorSource.Rate_Limit, ErrorSource.Upstream,
 # What a caller that authenticated with no security definition is reported as
 Caller_Anonymous = 'Anonymous'
 
-# An ISO timestamp cut to this many characters is an hourly period, e.g. 2026-07-16T14
+# An ISO timestamp cut to this many characters is an hourly period, e.g. 2026-07-16T14 ..
 Period_Len = 13
 
+# .. to this many, a per-minute one, e.g. 2026-07-16T14:05 ..
+Period_Len_Minute = 16
+
+# .. and to this many, a daily one, e.g. 2026-07-16.
+Period_Len_Day = 10
+
+# ################################################################################################################################
+
+# The resolutions the usage rows are kept in, each in its own tier
+class Resolution:
+    Minute = 'minute'
+    Hour   = 'hour'
+    Day    = 'day'
+
+# The resolutions from the finest to the coarsest
+Resolutions = (Resolution.Minute, Resolution.Hour, Resolution.Day)
+
+# How long the periods of each resolution are, in characters of an ISO timestamp ..
+Resolution_Period_Len = {
+    Resolution.Minute: Period_Len_Minute,
+    Resolution.Hour:   Period_Len,
+    Resolution.Day:    Period_Len_Day,
+}
+
+# .. and in minutes.
+Resolution_Minutes = {
+    Resolution.Minute: 1,
+    Resolution.Hour:   60,
+    Resolution.Day:    24 * 60,
+}
+
+# Which version of the tiers the store has been brought up to - stores written by earlier
+# releases have hourly rows only, with their histograms as JSON and without key hashes.
+Tier_Version = 1
+
 # ################################################################################################################################
 # ################################################################################################################################
 
@@ -98,31 +144,71 @@ _short_column_len = 255
 # The analytics store schema, portable across SQLite, MySQL, PostgreSQL and Oracle DB.
 metadata = MetaData()
 
-# One row per hour, channel, caller and status class
-usage_table = Table('usage', metadata,
-    Column('id', Integer, primary_key=True, autoincrement=True),
-    Column('period', String(_short_column_len)),
-    Column('source', String(_short_column_len)),
-    Column('channel', String(_short_column_len)),
-    Column('caller', String(_short_column_len)),
-    Column('status_class', String(_short_column_len)),
-    Column('request_count', BigInteger),
-    Column('error_count_auth', BigInteger),
-    Column('error_count_rate_limit', BigInteger),
-    Column('error_count_upstream', BigInteger),
-    Column('error_count_gateway', BigInteger),
-    Column('size_sum', BigInteger),
-    Column('duration_sum_ms', BigInteger),
-    Column('latency_buckets', Text),
-    Index('idx_usage_period', 'period'),
-    Index('idx_usage_channel', 'channel', 'period'),
-    Index('idx_usage_caller', 'caller', 'period'),
-)
+# How long a key hash is - a hex-encoded SHA-256 digest
+_key_hash_column_len = 64
+
+# ################################################################################################################################
+
+def _get_usage_table(name:'str', *extra_columns:'Column') -> 'Table':
+    """ Declares one tier of usage rows, with one row per period, channel, caller and status class -
+    all the tiers have the same columns and differ only in how long their periods are.
+    """
+    out = Table(name, metadata,
+        Column('id', Integer, primary_key=True, autoincrement=True),
+        Column('period', String(_short_column_len)),
+        Column('source', String(_short_column_len)),
+        Column('channel', String(_short_column_len)),
+        Column('caller', String(_short_column_len)),
+        Column('status_class', String(_short_column_len)),
+        Column('request_count', BigInteger),
+        Column('error_count_auth', BigInteger),
+        Column('error_count_rate_limit', BigInteger),
+        Column('error_count_upstream', BigInteger),
+        Column('error_count_gateway', BigInteger),
+        Column('size_sum', BigInteger),
+        Column('duration_sum_ms', BigInteger),
+        *extra_columns,
+
+        # The packed latency histogram of the row
+        Column('latency_histogram', LargeBinary),
+
+        # The newest hourly period the row has seen traffic in
+        Column('last_seen', String(_short_column_len)),
+
+        # What identifies the row - its five key columns together are too long for a unique index on MySQL
+        Column('key_hash', String(_key_hash_column_len)),
+
+        Index(f'idx_{name}_period', 'period'),
+        Index(f'idx_{name}_channel', 'channel', 'period'),
+        Index(f'idx_{name}_caller', 'caller', 'period'),
+        Index(f'idx_{name}_key_hash', 'key_hash', unique=True),
+    )
+
+    return out
+
+# ################################################################################################################################
+
+# The hourly tier, which is also where earlier releases kept their histograms, as JSON ..
+usage_table = _get_usage_table('usage', Column('latency_buckets', Text))
+
+# .. the per-minute one ..
+usage_minute_table = _get_usage_table('usage_minute')
+
+# .. and the daily one.
+usage_day_table = _get_usage_table('usage_day')
+
+# Each tier by its resolution
+usage_tables = {
+    Resolution.Minute: usage_minute_table,
+    Resolution.Hour:   usage_table,
+    Resolution.Day:    usage_day_table,
+}
 
 # The one row remembering the last audit event the rollup has already aggregated
 watermark_table = Table('watermark', metadata,
     Column('id', Integer, primary_key=True, autoincrement=True),
     Column('last_event_id', BigInteger),
+    Column('tier_version', Integer),
 )
 
 # ################################################################################################################################
@@ -222,3 +308,31 @@ def get_latency_bucket_index(duration_ms:'int') -> 'int':
 
 # ################################################################################################################################
 # ################################################################################################################################
+
+def get_usage_key_hash(period:'str', source:'str', channel:'str', caller:'str', status_class:'str') -> 'str':
+    """ Returns the hash identifying the usage row of one period, channel, caller and status class.
+    """
+    key = dumps([period, source, channel, caller, status_class])
+    key = key.encode('utf8')
+
+    out = sha256(key).hexdigest()
+    return out
+
+# ################################################################################################################################
+
+def pack_latency_buckets(latency_buckets:'intlist') -> 'bytes':
+    """ Packs histogram bucket counts into the form they are stored in.
+    """
+    out = _latency_histogram_struct.pack(*latency_buckets)
+    return out
+
+# ################################################################################################################################
+
+def unpack_latency_buckets(latency_histogram:'bytes') -> 'intlist':
+    """ Unpacks histogram bucket counts out of the form they are stored in.
+    """
+    out = list(_latency_histogram_struct.unpack(latency_histogram))
+    return out
+
+# ################################################################################################################################
+# ################################################################################################################################
@@ -7,8 +7,11 @@ Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
 """
 
 # The read side of the analytics store - everything the analytics screens show
-# comes from these queries. They read the hourly aggregate rows only, never
-# the live tables, so a year-long trend costs hundreds of rows, not millions.
+# comes from these queries. They read the aggregate rows only, never the live tables,
+# and each window is read from the coarsest tier that still gives its trend lines
+# enough points, so a quarter costs daily rows, not hourly ones. The timeline stays
+# hourly because the anomaly baseline is built per hour of the week, and the database
+# sums it up per period, so it costs one row per hour whatever the traffic.
 
 # stdlib
 from datetime import datetime, timedelta, timezone
@@ -16,21 +19,22 @@ from logging import getLogger
 from time import perf_counter
 
 # SQLAlchemy
-from sqlalchemy import select
+from sqlalchemy import func, select
 
 # Zato
-from zato.common.analytics.api import get_analytics_engine, usage_table, Caller_Anonymous, Latency_Bucket_Count, \
-    Latency_Buckets_Ms, Period_Len
+from zato.common.analytics.api import get_analytics_engine, unpack_latency_buckets, usage_tables, Caller_Anonymous, \
+    Latency_Bucket_Count, Latency_Buckets_Ms, Period_Len, Resolution, Resolution_Minutes, Resolution_Period_Len, Resolutions
 from zato.common.analytics.baseline import get_anomaly_periods, period_set, Baseline_Weeks, Hours_Per_Week
-from zato.common.json_internal import loads
 
 # ################################################################################################################################
 # ################################################################################################################################
 
 if 0:
+    from sqlalchemy import Table
     from zato.common.typing_ import anylist, anytuple, intlist, stranydict, strlist, strnone
 
     # Dummy assignments to satisfy type checkers
+    Table = Table
     anylist = anylist
     anytuple = anytuple
     intlist = intlist
@@ -54,6 +58,7 @@ logger = getLogger(__name__)
 # ################################################################################################################################
 
 # The selectable time windows
+Range_Hour    = 'hour'
 Range_Day     = 'day'
 Range_Week    = 'week'
 Range_Month   = 'month'
@@ -61,6 +66,7 @@ Range_Quarter = 'quarter'
 
 # How far back each window reaches
 Range_Hours = {
+    Range_Hour:    1,
     Range_Day:     24,
     Range_Week:    7 * 24,
     Range_Month:   30 * 24,
@@ -69,6 +75,7 @@ Range_Hours = {
 
 # What each window is called on the screens
 Range_Label = {
+    Range_Hour:    'Last hour',
     Range_Day:     'Last 24 hours',
     Range_Week:    'Last 7 days',
     Range_Month:   'Last 30 days',
@@ -81,9 +88,12 @@ Default_Range = Range_Week
 # How many channels and consumers the overview ranks
 Top_Count = 10
 
-# How many points a table sparkline has at most
+# How many points a table sparkline has at most ..
 _spark_max_points = 48
 
+# .. and how many a window needs to have in a tier for its entities to be read from that tier.
+_min_trend_points = 24
+
 # The percentiles the screens show
 _p50_quantile = 0.50
 _p95_quantile = 0.95
@@ -130,16 +140,18 @@ class _EntityState:
 
 # ################################################################################################################################
 
-    def add_row(self, period:'str', request_count:'int', error_count:'int', size_sum:'int', duration_sum_ms:'int',
-        latency_buckets:'intlist') -> 'None':
+    def add_row(self, period:'str', last_seen:'str', request_count:'int', error_count:'int', size_sum:'int',
+        duration_sum_ms:'int', latency_buckets:'intlist | None') -> 'None':
 
         self.request_count += request_count
         self.error_count += error_count
         self.size_sum += size_sum
         self.duration_sum_ms += duration_sum_ms
 
-        for index in range(Latency_Bucket_Count):
-            self.latency_buckets[index] += latency_buckets[index]
+        # Rows of earlier releases have no histogram until the rollup converts them
+        if latency_buckets:
+            for index in range(Latency_Bucket_Count):
+                self.latency_buckets[index] += latency_buckets[index]
 
         if period in self.period_counts:
             self.period_counts[period] += request_count
@@ -148,28 +160,28 @@ class _EntityState:
             self.period_counts[period] = request_count
             self.period_errors[period] = error_count
 
-        if period > self.last_seen:
-            self.last_seen = period
+        if last_seen > self.last_seen:
+            self.last_seen = last_seen
 
 # ################################################################################################################################
 # ################################################################################################################################
 
-def get_range_cutoff(now:'datetime', time_range:'str') -> 'str':
-    """ Returns the hourly period the given window reaches back to.
+def get_range_cutoff(now:'datetime', time_range:'str', period_len:'int'=Period_Len) -> 'str':
+    """ Returns the period the given window reaches back to, hourly unless period_len says otherwise.
     """
     range_hours = Range_Hours[time_range]
     cutoff = now - timedelta(hours=range_hours)
 
     cutoff_iso = cutoff.isoformat()
 
-    out = cutoff_iso[:Period_Len]
+    out = cutoff_iso[:period_len]
     return out
 
 # ################################################################################################################################
 
 def period_to_ms(period:'str') -> 'int':
-    """ Converts an hourly period like 2026-07-16T14 to its Unix timestamp in milliseconds.
-    All periods are UTC.
+    """ Converts a period like 2026-07-16T14 to its Unix timestamp in milliseconds,
+    which works the same for per-minute and daily periods. All periods are UTC.
     """
     when = datetime.fromisoformat(period)
     when = when.replace(tzinfo=timezone.utc)
@@ -224,48 +236,165 @@ def get_percentile(latency_buckets:'intlist', quantile:'float') -> 'int':
 
 # ################################################################################################################################
 
-def _load_rows(cutoff_period:'str', channel:'str'='', caller:'strnone'=None) -> 'anylist':
-    """ Reads the hourly rows of the window, optionally scoped down to one channel
-    or one consumer - the anonymous consumer is stored as an empty caller,
-    so the caller filter distinguishes "no filter" from "anonymous only".
+def get_resolution(time_range:'str') -> 'str':
+    """ Returns the resolution the entities of a window are read in - the coarsest one
+    in which the window still has enough periods for their trend lines.
+    """
+    range_minutes = Range_Hours[time_range] * 60
+
+    for resolution in reversed(Resolutions):
+        if range_minutes // Resolution_Minutes[resolution] >= _min_trend_points:
+            out = resolution
+            break
+
+    # A window shorter than any tier can show is read in the finest one
+    else:
+        out = Resolution.Minute
+
+    return out
+
+# ################################################################################################################################
+
+def _get_series_resolution(resolution:'str') -> 'str':
+    """ Returns the resolution the timeline of a window is read in - hourly, because that is what
+    the anomaly baseline is built of, unless the window's entities are read in a finer one.
     """
-    conditions = [usage_table.c.period >= cutoff_period]
+    if Resolution_Minutes[resolution] > Resolution_Minutes[Resolution.Hour]:
+        out = Resolution.Hour
+    else:
+        out = resolution
+
+    return out
+
+# ################################################################################################################################
+
+def _get_filters(table:'Table', channel:'str', caller:'strnone') -> 'anylist':
+    """ Returns the conditions scoping a tier's rows down to one channel or one consumer -
+    the anonymous consumer is stored as an empty caller, so the caller filter
+    distinguishes "no filter" from "anonymous only".
+    """
+
+    # Our response to produce
+    out:'anylist' = []
 
     if channel:
-        conditions.append(usage_table.c.channel == channel)
+        out.append(table.c.channel == channel)
 
     if caller is not None:
-        conditions.append(usage_table.c.caller == caller)
+        out.append(table.c.caller == caller)
+
+    return out
+
+# ################################################################################################################################
+
+def _get_cover(cutoff_period:'str', resolution:'str') -> 'anylist':
+    """ Returns which rows of which tiers add up to the window exactly, as (table, conditions) pairs.
+    The cutoff is a period of the series resolution, so when the entities are read in a coarser one,
+    the first coarse period is only partly in the window and its part comes from the finer tier.
+    """
+    table = usage_tables[resolution]
+    series_resolution = _get_series_resolution(resolution)
+
+    # The window starts on a period of the tier itself ..
+    if resolution == series_resolution:
+        out = [(table, [table.c.period >= cutoff_period])]
+
+    # .. or in the middle of one.
+    else:
+        period_len = Resolution_Period_Len[resolution]
+        first_period = cutoff_period[:period_len]
+
+        next_period = datetime.fromisoformat(first_period) + timedelta(minutes=Resolution_Minutes[resolution])
+        next_period = next_period.isoformat()[:period_len]
+
+        series_table = usage_tables[series_resolution]
+
+        out = [
+            (series_table, [series_table.c.period >= cutoff_period, series_table.c.period < next_period]),
+            (table, [table.c.period >= next_period]),
+        ]
+
+    return out
+
+# ################################################################################################################################
+
+def _load_series(series_resolution:'str', cutoff_period:'str', channel:'str', caller:'strnone') -> 'anytuple':
+    """ Returns the request and error counts per period from the cutoff on, summed up by the database.
+    """
+    table = usage_tables[series_resolution]
+
+    error_count = table.c.error_count_auth + table.c.error_count_rate_limit + \
+        table.c.error_count_upstream + table.c.error_count_gateway
 
     statement = select(
-        usage_table.c.period,
-        usage_table.c.source,
-        usage_table.c.channel,
-        usage_table.c.caller,
-        usage_table.c.request_count,
-        usage_table.c.error_count_auth,
-        usage_table.c.error_count_rate_limit,
-        usage_table.c.error_count_upstream,
-        usage_table.c.error_count_gateway,
-        usage_table.c.size_sum,
-        usage_table.c.duration_sum_ms,
-        usage_table.c.latency_buckets,
+        table.c.period,
+        func.sum(table.c.request_count),
+        func.sum(error_count),
     )
-    statement = statement.where(*conditions)
-    statement = statement.order_by(usage_table.c.period)
+    statement = statement.where(table.c.period >= cutoff_period, *_get_filters(table, channel, caller))
+    statement = statement.group_by(table.c.period)
+
+    engine = get_analytics_engine()
+
+    with engine.connect() as connection:
+        result = connection.execute(statement)
+        rows = result.fetchall()
+
+    period_counts:'period_count_dict' = {}
+    period_errors:'period_count_dict' = {}
+
+    # Sums of big integers come back as decimals from some of the databases
+    for period, request_count, error_count in rows:
+        period_counts[period] = int(request_count)
+        period_errors[period] = int(error_count)
+
+    out = period_counts, period_errors
+    return out
+
+# ################################################################################################################################
+
+def _load_rows(cutoff_period:'str', resolution:'str', channel:'str'='', caller:'strnone'=None) -> 'anylist':
+    """ Reads the rows covering the window in the given resolution, optionally scoped down
+    to one channel or one consumer.
+    """
+
+    # Our response to produce
+    out:'anylist' = []
 
     diag_start = perf_counter()
     engine = get_analytics_engine()
     diag_engine = perf_counter()
 
     with engine.connect() as connection:
-        result = connection.execute(statement)
-        out = result.fetchall()
+
+        for table, conditions in _get_cover(cutoff_period, resolution):
+
+            statement = select(
+                table.c.period,
+                table.c.source,
+                table.c.channel,
+                table.c.caller,
+                table.c.request_count,
+                table.c.error_count_auth,
+                table.c.error_count_rate_limit,
+                table.c.error_count_upstream,
+                table.c.error_count_gateway,
+                table.c.size_sum,
+                table.c.duration_sum_ms,
+                table.c.latency_histogram,
+                table.c.last_seen,
+            )
+            statement = statement.where(*conditions, *_get_filters(table, channel, caller))
+
+            result = connection.execute(statement)
+            out.extend(result.fetchall())
 
     diag_done = perf_counter()
 
-    logger.info('Analytics-Diag: _load_rows cutoff=%s channel=%r caller=%r -> rows=%d engine=%.1fms query=%.1fms',
-        cutoff_period, channel, caller, len(out), (diag_engine - diag_start) * 1000, (diag_done - diag_engine) * 1000)
+    logger.info('Analytics-Diag: _load_rows cutoff=%s resolution=%s channel=%r caller=%r -> rows=%d ' \
+        'engine=%.1fms query=%.1fms',
+        cutoff_period, resolution, channel, caller, len(out), (diag_engine - diag_start) * 1000,
+        (diag_done - diag_engine) * 1000)
 
     return out
 
@@ -315,10 +444,14 @@ def _build_timeline(period_counts:'period_count_dict', period_errors:'period_cou
 
 # ################################################################################################################################
 
-def get_window_periods(now:'datetime', cutoff_period:'str') -> 'strlist':
-    """ Returns every hourly period of the window, from the cutoff up to now, inclusive.
+def get_window_periods(now:'datetime', cutoff_period:'str', resolution:'str'=Resolution.Hour) -> 'strlist':
+    """ Returns every period of the window, from the cutoff up to now, inclusive,
+    hourly unless the resolution says otherwise.
     """
-    now_period = now.isoformat()[:Period_Len]
+    period_len = Resolution_Period_Len[resolution]
+    step = timedelta(minutes=Resolution_Minutes[resolution])
+
+    now_period = now.isoformat()[:period_len]
     when = datetime.fromisoformat(cutoff_period)
 
     # Our response to produce
@@ -326,13 +459,13 @@ def get_window_periods(now:'datetime', cutoff_period:'str') -> 'strlist':
 
     while True:
 
-        period = when.isoformat()[:Period_Len]
+        period = when.isoformat()[:period_len]
 
         if period > now_period:
             break
 
         out.append(period)
-        when = when + timedelta(hours=1)
+        when = when + step
 
     return out
 
@@ -340,14 +473,14 @@ def get_window_periods(now:'datetime', cutoff_period:'str') -> 'strlist':
 
 def _build_spark(period_counts:'period_count_dict', window_periods:'strlist') -> 'intlist':
     """ Turns per-period counts into a short list of sparkline points, at most
-    _spark_max_points long, by summing hourly chunks of the window. Every hour
-    of the window contributes a point - hours without traffic count as zero -
-    so each entity's trend spans the whole window rather than only the hours
+    _spark_max_points long, by summing chunks of the window's periods. Every period
+    of the window contributes a point - periods without traffic count as zero -
+    so each entity's trend spans the whole window rather than only the periods
     it happened to be seen in.
     """
     period_len = len(window_periods)
 
-    # How many hourly points one sparkline point covers
+    # How many periods one sparkline point covers
     chunk_size = 1
 
     if period_len > _spark_max_points:
@@ -369,43 +502,34 @@ def _build_spark(period_counts:'period_count_dict', window_periods:'strlist') ->
 
 # ################################################################################################################################
 
-def _fold_rows(rows:'anylist', cutoff_period:'str', group_by_channel:'bool') -> 'anytuple':
-    """ Folds hourly rows into totals, a per-period series and per-entity states.
-    The extended rows reaching back before the cutoff only feed the anomaly baseline.
+def _fold_rows(rows:'anylist', period_len:'int', group_by_channel:'bool') -> 'anytuple':
+    """ Folds the window's rows into totals and per-entity states, with the per-period counts
+    of each entity in periods period_len characters long.
     """
     totals = _EntityState()
 
-    # The whole window's per-period totals also cover the baseline weeks before it
-    extended_counts:'period_count_dict' = {}
-
     entities:'entity_state_dict' = {}
 
     diag_start = perf_counter()
-    diag_loads_time = 0.0
-    diag_loads_count = 0
-    diag_skipped_count = 0
 
     for period, source, channel, caller, request_count, error_count_auth, error_count_rate_limit, \
-        error_count_upstream, error_count_gateway, size_sum, duration_sum_ms, latency_buckets_json in rows:
+        error_count_upstream, error_count_gateway, size_sum, duration_sum_ms, latency_histogram, last_seen in rows:
 
         error_count = error_count_auth + error_count_rate_limit + error_count_upstream + error_count_gateway
 
-        if period in extended_counts:
-            extended_counts[period] += request_count
-        else:
-            extended_counts[period] = request_count
+        # Rows of earlier releases do not know when they were last seen, which is their own hourly period
+        if not last_seen:
+            last_seen = period[:Period_Len]
 
-        # Rows before the cutoff only feed the baseline
-        if period < cutoff_period:
-            diag_skipped_count += 1
-            continue
+        # Rows of the finer tier that the cover starts with count towards their coarser period
+        period = period[:period_len]
 
-        diag_loads_start = perf_counter()
-        latency_buckets = loads(latency_buckets_json)
-        diag_loads_time += perf_counter() - diag_loads_start
-        diag_loads_count += 1
+        if latency_histogram:
+            latency_buckets = unpack_latency_buckets(latency_histogram)
+        else:
+            latency_buckets = None
 
-        totals.add_row(period, request_count, error_count, size_sum, duration_sum_ms, latency_buckets)
+        totals.add_row(period, last_seen, request_count, error_count, size_sum, duration_sum_ms, latency_buckets)
 
         if group_by_channel:
             entity_name = channel
@@ -420,18 +544,16 @@ def _fold_rows(rows:'anylist', cutoff_period:'str', group_by_channel:'bool') ->
             entity = _EntityState()
             entities[entity_name] = entity
 
-        entity.add_row(period, request_count, error_count, size_sum, duration_sum_ms, latency_buckets)
+        entity.add_row(period, last_seen, request_count, error_count, size_sum, duration_sum_ms, latency_buckets)
         entity.source = source
         entity.related.add(related_name)
 
         totals.related.add(related_name)
 
-    logger.info('Analytics-Diag: _fold_rows rows=%d skipped_before_cutoff=%d entities=%d ' \
-        'json_loads_calls=%d json_loads=%.1fms total=%.1fms',
-        len(rows), diag_skipped_count, len(entities), diag_loads_count, diag_loads_time * 1000,
-        (perf_counter() - diag_start) * 1000)
+    logger.info('Analytics-Diag: _fold_rows rows=%d entities=%d total=%.1fms',
+        len(rows), len(entities), (perf_counter() - diag_start) * 1000)
 
-    out = totals, extended_counts, entities
+    out = totals, entities
     return out
 
 # ################################################################################################################################
@@ -471,7 +593,8 @@ def _build_totals(totals:'_EntityState') -> 'stranydict':
 
 def _get_anomalies(extended_counts:'period_count_dict', cutoff_period:'str') -> 'period_set':
     """ Returns which of the window's periods are anomalies against their
-    hour-of-week baseline built out of the extended series.
+    hour-of-week baseline built out of the extended series, which reaches
+    back before the cutoff.
     """
     series:'dict[str, float]' = {}
     displayed:'strlist' = []
@@ -535,42 +658,54 @@ def _build_entity_rows(entities:'entity_state_dict', window_periods:'strlist', t
 
 def _get_screen_data(now:'datetime', time_range:'str', channel:'str', caller:'strnone',
     group_by_channel:'bool', top_count:'int') -> 'stranydict':
-    """ The one query behind every screen - loads the window plus the baseline weeks,
-    folds the rows and shapes the result the way the screens and their CSVs expect.
+    """ The one query behind every screen - sums up the timeline over the window plus the baseline weeks,
+    folds the window's rows in the coarsest tier that fits it and shapes the result the way
+    the screens and their CSVs expect.
     """
-    cutoff_period = get_range_cutoff(now, time_range)
-    window_periods = get_window_periods(now, cutoff_period)
+    resolution = get_resolution(time_range)
+    series_resolution = _get_series_resolution(resolution)
+    series_period_len = Resolution_Period_Len[series_resolution]
+
+    cutoff_period = get_range_cutoff(now, time_range, series_period_len)
+
+    # The sparklines have one point per period of the tier the entities are read from
+    period_len = Resolution_Period_Len[resolution]
+    window_periods = get_window_periods(now, cutoff_period[:period_len], resolution)
 
     # The baseline of the anomaly marker needs earlier weeks too
     baseline_weeks_hours = Baseline_Weeks * Hours_Per_Week
     baseline_hours = Range_Hours[time_range] + baseline_weeks_hours
     baseline_cutoff = now - timedelta(hours=baseline_hours)
-    baseline_cutoff_period = baseline_cutoff.isoformat()[:Period_Len]
+    baseline_cutoff_period = baseline_cutoff.isoformat()[:series_period_len]
 
     diag_start = perf_counter()
 
-    rows = _load_rows(baseline_cutoff_period, channel, caller)
+    extended_counts, extended_errors = _load_series(series_resolution, baseline_cutoff_period, channel, caller)
+    diag_series = perf_counter()
+
+    rows = _load_rows(cutoff_period, resolution, channel, caller)
     diag_loaded = perf_counter()
 
-    totals, extended_counts, entities = _fold_rows(rows, cutoff_period, group_by_channel)
+    totals, entities = _fold_rows(rows, period_len, group_by_channel)
     diag_folded = perf_counter()
 
     anomalies = _get_anomalies(extended_counts, cutoff_period)
     diag_anomalies = perf_counter()
 
-    timeline = _build_timeline(totals.period_counts, totals.period_errors, anomalies, cutoff_period)
+    timeline = _build_timeline(extended_counts, extended_errors, anomalies, cutoff_period)
     diag_timeline = perf_counter()
 
     entity_rows = _build_entity_rows(entities, window_periods, top_count)
     diag_entity_rows = perf_counter()
 
     logger.info(
-        'Analytics-Diag: _get_screen_data range=%s channel=%r caller=%r group_by_channel=%s top_count=%d | ' \
-        'rows=%d entities=%d timeline=%d window_periods=%d entity_rows=%d | ' \
-        'load=%.1fms fold=%.1fms anomalies=%.1fms timeline=%.1fms entity_rows=%.1fms total=%.1fms',
-        time_range, channel, caller, group_by_channel, top_count,
-        len(rows), len(entities), len(timeline), len(window_periods), len(entity_rows),
-        (diag_loaded - diag_start) * 1000,
+        'Analytics-Diag: _get_screen_data range=%s resolution=%s channel=%r caller=%r group_by_channel=%s ' \
+        'top_count=%d | series=%d rows=%d entities=%d timeline=%d window_periods=%d entity_rows=%d | ' \
+        'series=%.1fms load=%.1fms fold=%.1fms anomalies=%.1fms timeline=%.1fms entity_rows=%.1fms total=%.1fms',
+        time_range, resolution, channel, caller, group_by_channel, top_count,
+        len(extended_counts), len(rows), len(entities), len(timeline), len(window_periods), len(entity_rows),
+        (diag_series - diag_start) * 1000,
+        (diag_loaded - diag_series) * 1000,
         (diag_folded - diag_loaded) * 1000,
         (diag_anomalies - diag_folded) * 1000,
         (diag_timeline - diag_anomalies) * 1000,
@@ -649,38 +784,38 @@ def get_error_sources(now:'datetime', time_range:'str', channel:'str'='', caller
     consumer is stored as an empty caller, so the caller filter distinguishes "no filter"
     from "anonymous only", the same way _load_rows does.
     """
-    cutoff_period = get_range_cutoff(now, time_range)
+    resolution = get_resolution(time_range)
+    series_resolution = _get_series_resolution(resolution)
 
-    statement = select(
-        usage_table.c.error_count_auth,
-        usage_table.c.error_count_rate_limit,
-        usage_table.c.error_count_upstream,
-        usage_table.c.error_count_gateway,
-    )
-    statement = statement.where(usage_table.c.period >= cutoff_period)
+    cutoff_period = get_range_cutoff(now, time_range, Resolution_Period_Len[series_resolution])
 
-    if channel:
-        statement = statement.where(usage_table.c.channel == channel)
-
-    if caller is not None:
-        statement = statement.where(usage_table.c.caller == caller)
+    auth = 0
+    rate_limit = 0
+    upstream = 0
+    gateway = 0
 
     engine = get_analytics_engine()
 
     with engine.connect() as connection:
-        result = connection.execute(statement)
-        rows = result.fetchall()
 
-    auth = 0
-    rate_limit = 0
-    upstream = 0
-    gateway = 0
+        for table, conditions in _get_cover(cutoff_period, resolution):
+
+            statement = select(
+                func.sum(table.c.error_count_auth),
+                func.sum(table.c.error_count_rate_limit),
+                func.sum(table.c.error_count_upstream),
+                func.sum(table.c.error_count_gateway),
+            )
+            statement = statement.where(*conditions, *_get_filters(table, channel, caller))
+
+            result = connection.execute(statement)
+            count_auth, count_rate_limit, count_upstream, count_gateway = result.fetchone()
 
-    for count_auth, count_rate_limit, count_upstream, count_gateway in rows:
-        auth += count_auth
-        rate_limit += count_rate_limit
-        upstream += count_upstream
-        gateway += count_gateway
+            # Sums over no rows at all are NULLs
+            auth += int(count_auth or 0)
+            rate_limit += int(count_rate_limit or 0)
+            upstream += int(count_upstream or 0)
+            gateway += int(count_gateway or 0)
 
     out = {
         'auth': auth,
@@ -7,35 +7,46 @@ Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
 """
 
 # The rollup - reads audit log events the analytics store has not seen yet,
-# aggregates them into hourly rows and advances a watermark, all in one
-# analytics-side transaction. It is watermark-based and idempotent - rerunning
+# aggregates them into per-minute, hourly and daily rows and advances a watermark,
+# all in one analytics-side transaction. It is watermark-based and idempotent - rerunning
 # from the same watermark produces the same aggregates, so overlapping cron runs
 # and mid-run crashes are harmless. It runs in its own OS process, never inside
 # the server - see the analytics CLI command and the make target that invoke it.
 
 # stdlib
+from datetime import datetime, timedelta, timezone
 from logging import getLogger
 
 # SQLAlchemy
-from sqlalchemy import and_, select, update
+from sqlalchemy import and_, bindparam, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 # Zato
 from zato.common.analytics.api import get_analytics_engine, get_error_source, get_latency_bucket_index, get_status_class, \
-    ErrorSource, Latency_Bucket_Count, Period_Len, usage_table, watermark_table
+    get_usage_key_hash, pack_latency_buckets, unpack_latency_buckets, ErrorSource, Latency_Bucket_Count, Period_Len, \
+    Period_Len_Day, Period_Len_Minute, Tier_Version, usage_day_table, usage_minute_table, usage_table, watermark_table
 from zato.common.audit_log.api import event_table, get_audit_engine, AuditEvent, AuditSource
-from zato.common.json_internal import dumps, loads
+from zato.common.db_env import Type_MySQL, Type_PostgreSQL, Type_SQLite
+from zato.common.json_internal import loads
 
 # ################################################################################################################################
 # ################################################################################################################################
 
 if 0:
+    from sqlalchemy import Table
     from sqlalchemy.engine import Connection
-    from zato.common.typing_ import anytuple, intlist
+    from zato.common.typing_ import anylist, anytuple, intlist, stranydict, strlist
 
     # Dummy assignments to satisfy type checkers
     Connection = Connection
+    Table = Table
+    anylist = anylist
     anytuple = anytuple
     intlist = intlist
+    stranydict = stranydict
+    strlist = strlist
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -47,6 +58,7 @@ logger = getLogger(__name__)
 
 #  Type aliases
 group_dict = dict['anytuple', '_UsageState']
+stored_dict = dict[str, 'anytuple']
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -54,9 +66,28 @@ group_dict = dict['anytuple', '_UsageState']
 # How many audit rows one run reads at most - the next run picks up from the new watermark
 Batch_Size = 100_000
 
+# How many hours back the per-minute tier reaches - older per-minute rows are deleted
+Minute_Retention_Hours = 48
+
 # The channel sources the rollup aggregates
 _channel_sources = (AuditSource.REST_Channel, AuditSource.SOAP_Channel)
 
+# How many rows one query looks up by their key hashes
+_key_hash_chunk_size = 500
+
+# The columns of a usage row that the rollup adds to, in the order it reads them in
+_value_columns = (
+    'request_count',
+    'error_count_auth',
+    'error_count_rate_limit',
+    'error_count_upstream',
+    'error_count_gateway',
+    'size_sum',
+    'duration_sum_ms',
+    'latency_histogram',
+    'last_seen',
+)
+
 # ################################################################################################################################
 # ################################################################################################################################
 
@@ -72,7 +103,7 @@ class RollupResult:
 # ################################################################################################################################
 
 class _UsageState:
-    """ The aggregation state of one hourly row in the making.
+    """ The aggregation state of one usage row in the making.
     """
 
     def __init__(self) -> 'None':
@@ -92,6 +123,80 @@ class _UsageState:
         # One count per latency histogram bucket
         self.latency_buckets:'intlist' = [0] * Latency_Bucket_Count
 
+        # The newest hourly period of the events behind this state
+        self.last_seen:'str' = ''
+
+# ################################################################################################################################
+
+    def add_state(self, other:'_UsageState') -> 'None':
+        """ Adds another state to this one, e.g. a per-minute state to its hourly one.
+        """
+        self.request_count += other.request_count
+        self.size_sum += other.size_sum
+        self.duration_sum_ms += other.duration_sum_ms
+
+        for error_source, error_count in other.error_counts.items():
+            self.error_counts[error_source] += error_count
+
+        for index in range(Latency_Bucket_Count):
+            self.latency_buckets[index] += other.latency_buckets[index]
+
+        if other.last_seen > self.last_seen:
+            self.last_seen = other.last_seen
+
+# ################################################################################################################################
+
+    def add_stored(self, values:'anytuple') -> 'None':
+        """ Adds what a usage row already holds to this state, given the row's _value_columns.
+        """
+        request_count, count_auth, count_rate_limit, count_upstream, count_gateway, size_sum, duration_sum_ms, \
+            latency_histogram, last_seen = values
+
+        self.request_count += request_count
+        self.size_sum += size_sum
+        self.duration_sum_ms += duration_sum_ms
+
+        self.error_counts[ErrorSource.Auth] += count_auth
+        self.error_counts[ErrorSource.Rate_Limit] += count_rate_limit
+        self.error_counts[ErrorSource.Upstream] += count_upstream
+        self.error_counts[ErrorSource.Gateway] += count_gateway
+
+        if latency_histogram:
+            stored_buckets = unpack_latency_buckets(latency_histogram)
+
+            for index in range(Latency_Bucket_Count):
+                self.latency_buckets[index] += stored_buckets[index]
+
+        if last_seen and last_seen > self.last_seen:
+            self.last_seen = last_seen
+
+# ################################################################################################################################
+
+    def get_values(self, key:'anytuple', key_hash:'str') -> 'stranydict':
+        """ Returns the complete usage row this state stands for, given its key.
+        """
+        period, source, channel, caller, status_class = key
+
+        out = {
+            'period': period,
+            'source': source,
+            'channel': channel,
+            'caller': caller,
+            'status_class': status_class,
+            'request_count': self.request_count,
+            'error_count_auth': self.error_counts[ErrorSource.Auth],
+            'error_count_rate_limit': self.error_counts[ErrorSource.Rate_Limit],
+            'error_count_upstream': self.error_counts[ErrorSource.Upstream],
+            'error_count_gateway': self.error_counts[ErrorSource.Gateway],
+            'size_sum': self.size_sum,
+            'duration_sum_ms': self.duration_sum_ms,
+            'latency_histogram': pack_latency_buckets(self.latency_buckets),
+            'last_seen': self.last_seen,
+            'key_hash': key_hash,
+        }
+
+        return out
+
 # ################################################################################################################################
 # ################################################################################################################################
 
@@ -135,7 +240,8 @@ def _load_new_events(last_event_id:'int') -> 'list':
 # ################################################################################################################################
 
 def _aggregate_events(events:'list') -> 'group_dict':
-    """ Folds the new events into per-hour aggregation states.
+    """ Folds the new events into per-minute aggregation states, the finest resolution
+    there is - the coarser ones are folded out of these.
     """
 
     # Our response to produce
@@ -150,8 +256,8 @@ def _aggregate_events(events:'list') -> 'group_dict':
         if duration_ms is None:
             duration_ms = 0
 
-        # The hourly period this event belongs to
-        period = event_time_iso[:Period_Len]
+        # The per-minute period this event belongs to
+        period = event_time_iso[:Period_Len_Minute]
 
         status_class = get_status_class(status)
 
@@ -161,6 +267,7 @@ def _aggregate_events(events:'list') -> 'group_dict':
             pass
         else:
             group = _UsageState()
+            group.last_seen = event_time_iso[:Period_Len]
             out[key] = group
 
         # Every response is one request handled ..
@@ -182,104 +289,292 @@ def _aggregate_events(events:'list') -> 'group_dict':
 
 # ################################################################################################################################
 
-def _upsert_group(connection:'Connection', key:'anytuple', group:'_UsageState') -> 'None':
-    """ Folds one aggregation state into its hourly row, creating the row if this hour,
-    channel, caller and status class have not been seen before.
+def _fold_groups(groups:'group_dict', period_len:'int') -> 'group_dict':
+    """ Folds aggregation states into the coarser ones of a resolution whose periods are period_len characters long.
     """
-    period, source, channel, caller, status_class = key
-
-    row_matches = and_(
-        usage_table.c.period == period,
-        usage_table.c.source == source,
-        usage_table.c.channel == channel,
-        usage_table.c.caller == caller,
-        usage_table.c.status_class == status_class,
-    )
 
+    # Our response to produce
+    out:'group_dict' = {}
+
+    for key, group in groups.items():
+
+        period, source, channel, caller, status_class = key
+        coarse_key = (period[:period_len], source, channel, caller, status_class)
+
+        if coarse_group := out.get(coarse_key):
+            pass
+        else:
+            coarse_group = _UsageState()
+            out[coarse_key] = coarse_group
+
+        coarse_group.add_state(group)
+
+    return out
+
+# ################################################################################################################################
+
+def _load_stored_rows(connection:'Connection', table:'Table', key_hashes:'strlist') -> 'stored_dict':
+    """ Reads what the rows with the given key hashes already hold, keyed by their hashes.
+    Rows that do not exist yet are not in the result.
+    """
+    columns = [table.c[name] for name in _value_columns]
+
+    # Our response to produce
+    out:'stored_dict' = {}
+
+    # The hashes are looked up in chunks to keep each query's parameter count well within every database's limit
+    for idx in range(0, len(key_hashes), _key_hash_chunk_size):
+
+        chunk = key_hashes[idx:idx + _key_hash_chunk_size]
+
+        statement = select(table.c.key_hash, *columns)
+        statement = statement.where(table.c.key_hash.in_(chunk))
+
+        result = connection.execute(statement)
+
+        for row in result:
+            out[row[0]] = tuple(row[1:])
+
+    return out
+
+# ################################################################################################################################
+
+def _write_rows(connection:'Connection', table:'Table', rows:'anylist', stored:'stored_dict') -> 'None':
+    """ Writes complete usage rows in bulk, creating the ones that do not exist yet
+    and replacing the values of the ones that do.
+    """
+    dialect_name = connection.dialect.name
+
+    # SQLite and PostgreSQL insert all the rows in one statement, updating the ones whose key hash exists ..
+    if dialect_name in (Type_SQLite, Type_PostgreSQL):
+
+        if dialect_name == Type_SQLite:
+            statement = sqlite_insert(table)
+        else:
+            statement = postgresql_insert(table)
+
+        set_ = {name: statement.excluded[name] for name in _value_columns}
+        statement = statement.on_conflict_do_update(index_elements=[table.c.key_hash], set_=set_)
+
+        _ = connection.execute(statement, rows)
+
+    # .. MySQL does the same through its unique key on the hash ..
+    elif dialect_name == Type_MySQL:
+
+        statement = mysql_insert(table)
+        statement = statement.on_duplicate_key_update({name: statement.inserted[name] for name in _value_columns})
+
+        _ = connection.execute(statement, rows)
+
+    # .. while Oracle DB has no such statement, so new rows are inserted and existing ones updated,
+    # .. each in one bulk statement, which is safe because the watermark lock serializes the runs.
+    else:
+        new_rows:'anylist' = []
+        existing_rows:'anylist' = []
+
+        for row in rows:
+
+            if row['key_hash'] in stored:
+                existing_row = {name: row[name] for name in _value_columns}
+                existing_row['b_key_hash'] = row['key_hash']
+                existing_rows.append(existing_row)
+            else:
+                new_rows.append(row)
+
+        if new_rows:
+            _ = connection.execute(table.insert(), new_rows)
+
+        if existing_rows:
+            update_statement = update(table)
+            update_statement = update_statement.where(table.c.key_hash == bindparam('b_key_hash'))
+            update_statement = update_statement.values({name: bindparam(name) for name in _value_columns})
+
+            _ = connection.execute(update_statement, existing_rows)
+
+# ################################################################################################################################
+
+def _upsert_groups(connection:'Connection', table:'Table', groups:'group_dict') -> 'None':
+    """ Folds aggregation states into the rows of one tier, creating the rows of the periods,
+    channels, callers and status classes that have not been seen before.
+    """
+    if not groups:
+        return
+
+    key_hashes:'dict[anytuple, str]' = {}
+
+    for key in groups:
+        key_hashes[key] = get_usage_key_hash(*key)
+
+    # Histograms are packed, so what the rows already hold is added to the new counts here rather than in SQL ..
+    stored = _load_stored_rows(connection, table, list(key_hashes.values()))
+
+    rows:'anylist' = []
+
+    for key in sorted(groups):
+
+        group = groups[key]
+        key_hash = key_hashes[key]
+
+        if values := stored.get(key_hash):
+            group.add_stored(values)
+
+        row = group.get_values(key, key_hash)
+        rows.append(row)
+
+    # .. and everything is written back in bulk.
+    _write_rows(connection, table, rows, stored)
+
+# ################################################################################################################################
+
+def _get_minute_cutoff() -> 'str':
+    """ Returns the oldest per-minute period the per-minute tier keeps.
+    """
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(hours=Minute_Retention_Hours)
+
+    out = cutoff.isoformat()[:Period_Len_Minute]
+    return out
+
+# ################################################################################################################################
+
+def _prune_minute_tier(connection:'Connection', minute_cutoff:'str') -> 'None':
+    """ Deletes the per-minute rows that have fallen out of the per-minute tier's retention.
+    """
+    delete_statement = usage_minute_table.delete()
+    delete_statement = delete_statement.where(usage_minute_table.c.period < minute_cutoff)
+
+    _ = connection.execute(delete_statement)
+
+# ################################################################################################################################
+
+def _migrate_hourly_rows(connection:'Connection') -> 'None':
+    """ Converts the hourly rows of earlier releases, which have their histograms as JSON
+    and neither a key hash nor the last period they were seen in.
+    """
     select_statement = select(
         usage_table.c.id,
-        usage_table.c.request_count,
-        usage_table.c.error_count_auth,
-        usage_table.c.error_count_rate_limit,
-        usage_table.c.error_count_upstream,
-        usage_table.c.error_count_gateway,
-        usage_table.c.size_sum,
-        usage_table.c.duration_sum_ms,
+        usage_table.c.period,
+        usage_table.c.source,
+        usage_table.c.channel,
+        usage_table.c.caller,
+        usage_table.c.status_class,
         usage_table.c.latency_buckets,
     )
-    select_statement = select_statement.where(row_matches)
+    select_statement = select_statement.where(usage_table.c.key_hash.is_(None))
 
     result = connection.execute(select_statement)
-    existing = result.fetchone()
 
-    # This hour has been seen before, so the new counts add to the stored ones ..
-    if existing:
+    rows:'anylist' = []
 
-        row_id, request_count, count_auth, count_rate_limit, count_upstream, count_gateway, \
-            size_sum, duration_sum_ms, latency_buckets_json = existing
+    for row_id, period, source, channel, caller, status_class, latency_buckets_json in result:
 
-        latency_buckets = loads(latency_buckets_json)
+        if latency_buckets_json:
+            latency_buckets = loads(latency_buckets_json)
+        else:
+            latency_buckets = [0] * Latency_Bucket_Count
+
+        rows.append({
+            'b_id': row_id,
+            'latency_histogram': pack_latency_buckets(latency_buckets),
+            'latency_buckets': None,
+            'last_seen': period,
+            'key_hash': get_usage_key_hash(period, source, channel, caller, status_class),
+        })
+
+    if not rows:
+        return
+
+    update_statement = update(usage_table)
+    update_statement = update_statement.where(usage_table.c.id == bindparam('b_id'))
+    update_statement = update_statement.values(
+        latency_histogram=bindparam('latency_histogram'),
+        latency_buckets=bindparam('latency_buckets'),
+        last_seen=bindparam('last_seen'),
+        key_hash=bindparam('key_hash'),
+    )
 
-        for index in range(Latency_Bucket_Count):
-            latency_buckets[index] += group.latency_buckets[index]
-
-        update_statement = update(usage_table)
-        update_statement = update_statement.where(usage_table.c.id == row_id)
-        update_statement = update_statement.values(
-            request_count=request_count + group.request_count,
-            error_count_auth=count_auth + group.error_counts[ErrorSource.Auth],
-            error_count_rate_limit=count_rate_limit + group.error_counts[ErrorSource.Rate_Limit],
-            error_count_upstream=count_upstream + group.error_counts[ErrorSource.Upstream],
-            error_count_gateway=count_gateway + group.error_counts[ErrorSource.Gateway],
-            size_sum=size_sum + group.size_sum,
-            duration_sum_ms=duration_sum_ms + group.duration_sum_ms,
-            latency_buckets=dumps(latency_buckets),
-        )
-
-        _ = connection.execute(update_statement)
-
-    # .. otherwise, a fresh row is born.
-    else:
-        insert_statement = usage_table.insert()
-        insert_statement = insert_statement.values(
-            period=period,
-            source=source,
-            channel=channel,
-            caller=caller,
-            status_class=status_class,
-            request_count=group.request_count,
-            error_count_auth=group.error_counts[ErrorSource.Auth],
-            error_count_rate_limit=group.error_counts[ErrorSource.Rate_Limit],
-            error_count_upstream=group.error_counts[ErrorSource.Upstream],
-            error_count_gateway=group.error_counts[ErrorSource.Gateway],
-            size_sum=group.size_sum,
-            duration_sum_ms=group.duration_sum_ms,
-            latency_buckets=dumps(group.latency_buckets),
-        )
+    _ = connection.execute(update_statement, rows)
 
-        _ = connection.execute(insert_statement)
+    logger.info('Analytics rollup converted %d hourly rows of an earlier release', len(rows))
 
 # ################################################################################################################################
 
-def _get_watermark(connection:'Connection') -> 'int':
-    """ Returns the id of the last audit event already aggregated, creating and locking
-    the watermark row on the way so overlapping runs serialize on it.
+def _backfill_day_tier(connection:'Connection') -> 'None':
+    """ Folds all the hourly rows into the daily tier, which is how a store written by an earlier
+    release learns about its daily rows. The per-minute tier has nothing to backfill -
+    it only reaches back a few hours and the hourly rows are not fine enough for it anyway.
     """
-    select_statement = select(watermark_table.c.id, watermark_table.c.last_event_id)
+    columns = [usage_table.c[name] for name in _value_columns]
+
+    select_statement = select(
+        usage_table.c.period,
+        usage_table.c.source,
+        usage_table.c.channel,
+        usage_table.c.caller,
+        usage_table.c.status_class,
+        *columns,
+    )
+
+    result = connection.execute(select_statement)
+
+    groups:'group_dict' = {}
+
+    for row in result:
+
+        period, source, channel, caller, status_class = row[:5]
+        key = (period[:Period_Len_Day], source, channel, caller, status_class)
+
+        if group := groups.get(key):
+            pass
+        else:
+            group = _UsageState()
+            groups[key] = group
+
+        group.add_stored(tuple(row[5:]))
+
+    _upsert_groups(connection, usage_day_table, groups)
+
+# ################################################################################################################################
+
+def _upgrade_tiers(connection:'Connection', tier_version:'int') -> 'None':
+    """ Brings a store written by an earlier release up to the current tiers, once.
+    """
+    if tier_version == Tier_Version:
+        return
+
+    # The hourly rows need converting first ..
+    _migrate_hourly_rows(connection)
+
+    # .. because the daily ones are built out of them ..
+    _backfill_day_tier(connection)
+
+    # .. and none of this needs to happen again.
+    update_statement = update(watermark_table)
+    update_statement = update_statement.values(tier_version=Tier_Version)
+
+    _ = connection.execute(update_statement)
+
+# ################################################################################################################################
+
+def _get_watermark(connection:'Connection') -> 'anytuple':
+    """ Returns the id of the last audit event already aggregated and the version of the tiers
+    the store has, creating and locking the watermark row on the way so overlapping runs serialize on it.
+    """
+    select_statement = select(watermark_table.c.id, watermark_table.c.last_event_id, watermark_table.c.tier_version)
 
     result = connection.execute(select_statement)
     row = result.fetchone()
 
-    # The very first run creates the watermark row ..
+    # The very first run creates the watermark row, in a store that has nothing to upgrade ..
     if not row:
         insert_statement = watermark_table.insert()
-        insert_statement = insert_statement.values(last_event_id=0)
+        insert_statement = insert_statement.values(last_event_id=0, tier_version=Tier_Version)
         _ = connection.execute(insert_statement)
 
-        out = 0
+        out = 0, Tier_Version
         return out
 
-    row_id, last_event_id = row
+    row_id, last_event_id, tier_version = row
 
     # .. later runs write it back unchanged first - the no-op update takes a write lock
     # on every database engine, so a second rollup started by an overlapping cron run
@@ -289,7 +584,7 @@ def _get_watermark(connection:'Connection') -> 'int':
     update_statement = update_statement.values(last_event_id=last_event_id)
     _ = connection.execute(update_statement)
 
-    out = last_event_id
+    out = last_event_id, tier_version
     return out
 
 # ################################################################################################################################
@@ -306,9 +601,9 @@ def _advance_watermark(connection:'Connection', last_event_id:'int') -> 'None':
 
 def run_rollup() -> 'RollupResult':
     """ One rollup run - read the audit events newer than the watermark, aggregate them
-    into hourly rows, advance the watermark and exit. The aggregates and the watermark
-    move in one transaction, so a crash mid-run changes nothing and the next run
-    simply starts from the same place.
+    into per-minute, hourly and daily rows, advance the watermark and exit. The aggregates
+    and the watermark move in one transaction, so a crash mid-run changes nothing
+    and the next run simply starts from the same place.
     """
 
     # Our response to produce
@@ -319,22 +614,36 @@ def run_rollup() -> 'RollupResult':
     with analytics_engine.begin() as connection:
 
         # Find out where the previous run finished ..
-        last_event_id = _get_watermark(connection)
+        last_event_id, tier_version = _get_watermark(connection)
+
+        # .. a store written by an earlier release gets its tiers first ..
+        _upgrade_tiers(connection, tier_version)
 
-        # .. read what has been recorded since then ..
+        # .. the per-minute tier drops what it no longer keeps ..
+        minute_cutoff = _get_minute_cutoff()
+        _prune_minute_tier(connection, minute_cutoff)
+
+        # .. read what has been recorded since the previous run ..
         events = _load_new_events(last_event_id)
 
         if not events:
             out.last_event_id = last_event_id
             return out
 
-        # .. fold the new events into per-hour aggregation states ..
-        groups = _aggregate_events(events)
+        # .. fold the new events into per-minute aggregation states, and these into hourly and daily ones ..
+        minute_groups = _aggregate_events(events)
+        hour_groups = _fold_groups(minute_groups, Period_Len)
+        day_groups = _fold_groups(hour_groups, Period_Len_Day)
+
+        # .. the per-minute tier does not keep what would be deleted on the next run anyway ..
+        for key in list(minute_groups):
+            if key[0] < minute_cutoff:
+                del minute_groups[key]
 
-        # .. land each state in its hourly row ..
-        for key in sorted(groups):
-            group = groups[key]
-            _upsert_group(connection, key, group)
+        # .. land each state in its row of its tier ..
+        _upsert_groups(connection, usage_minute_table, minute_groups)
+        _upsert_groups(connection, usage_table, hour_groups)
+        _upsert_groups(connection, usage_day_table, day_groups)
 
         # .. and remember how far we have come.
         newest_event = events[-1]
@@ -850,9 +850,17 @@ class HTTP_SOAP:
         # The name of the key in the channel's opaque attributes
         Opaque_Key = 'response_cache'
 
-        # Cached entries live under this per-channel prefix, which makes purging a channel a prefix delete
+        # Cached entries live under this per-channel prefix
         Key_Prefix = 'cache:channel:{}:'
 
+        # Purging a whole channel increments its generation, which makes all the entries stored before stale at once ..
+        Generation_Key = 'cache:channel-generation:{}'
+
+        # .. while each channel's index of its entries, scored by when they expire, lets a pattern purge
+        # find the entries to delete without reading any of them.
+        Index_Key = 'cache:channel-index:{}'
+        Index_Separator = '|'
+
         class TTLUnit:
             Seconds = 'seconds'
             Minutes = 'minutes'
@@ -869,6 +877,7 @@ class HTTP_SOAP:
         Default_Cache_On_Second_Request = True
         Default_Needs_ETag = False
         Default_Coalesce_Timeout = 15
+        Default_Is_Local_Cache_Enabled = False
 
         @staticmethod
         def get_default_config() -> 'stranydict':
@@ -886,6 +895,7 @@ class HTTP_SOAP:
                 'cache_on_second_request': HTTP_SOAP.ResponseCache.Default_Cache_On_Second_Request,
                 'needs_etag': HTTP_SOAP.ResponseCache.Default_Needs_ETag,
                 'coalesce_timeout': HTTP_SOAP.ResponseCache.Default_Coalesce_Timeout,
+                'is_local_cache_enabled': HTTP_SOAP.ResponseCache.Default_Is_Local_Cache_Enabled,
             }
             return out
 
@@ -2343,6 +2353,12 @@ class PubSub:
         # Random jitter added to each interval, as a percentage of the current interval
         Retry_Jitter_Percent = 10
 
+        # How many messages a REST push subscriber may have outstanding at once unless its subscription says otherwise
+        Max_In_Flight_Default = 1
+
+        # The most messages any REST push subscriber may have outstanding at once
+        Max_In_Flight_Limit = 100
+
     class Repeats:
         Max = 500
 
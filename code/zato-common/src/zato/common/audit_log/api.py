@@ -10,6 +10,7 @@ Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
 import os
 import stat
 from collections import OrderedDict
+from functools import lru_cache
 from logging import getLogger
 from time import monotonic
 
@@ -17,6 +18,7 @@ from time import monotonic
 from sqlalchemy.exc import OperationalError
 
 # Zato
+from zato.common.alerting.aggregator import live_aggregator
 from zato.common.audit_log.attachment import build_attachment_rows
 from zato.common.audit_log.buffer import Env_Flush_Max_Size, Env_Flush_Max_Wait_Ms, EventBuffer, get_flush_max_size, \
     get_flush_max_wait_ms, PendingEvent
@@ -26,6 +28,8 @@ from zato.common.audit_log.common import Attr_Value_Max_Len, Audit_DB_File_Name,
     get_source_env_suffix, metadata
 from zato.common.audit_log.retention import Env_Archive_Dir, Env_Content_Retention_Days, \
     Env_Content_Retention_Days_Prefix, get_content_retention_days, register_prunability, run_retention
+from zato.common.audit_log.search import build_search_row, has_search_index, insert_search_rows
+from zato.common.audit_log.spool import Env_Spool_Dir, EventSpool, get_spool_dir
 from zato.common.config_db import Default_Enabled, Env_Audit_Log_Enabled
 from zato.common.db_env import Default_SSL, Default_SSL_Verify, Default_Type, dispose_env_engine, EnvDBConfig, \
     get_env_engine, get_env_values, Type_MySQL, Type_Oracle, Type_PostgreSQL, Type_SQLite
@@ -36,14 +40,16 @@ from zato.common.util.api import as_bool, utcnow
 
 if 0:
     from datetime import datetime
-    from sqlalchemy.engine import Engine
+    from sqlalchemy.engine import Connection, Dialect, Engine
     from zato.common.audit_log.buffer import pending_event_list
     from zato.common.typing_ import anylist, anylistnone, intlist, intlistnone, intnone, stranydict, strdictnone
 
     # Dummy assignments to satisfy type checkers
     anylist = anylist
     anylistnone = anylistnone
+    Connection = Connection
     datetime = datetime
+    Dialect = Dialect
     Engine = Engine
     intlist = intlist
     intlistnone = intlistnone
@@ -98,6 +104,7 @@ class ModuleCtx:
     # The environment variables configuring the buffered writer
     Env_Flush_Max_Size    = Env_Flush_Max_Size
     Env_Flush_Max_Wait_Ms = Env_Flush_Max_Wait_Ms
+    Env_Spool_Dir         = Env_Spool_Dir
 
     # Recognized database types
     Type_SQLite     = Type_SQLite
@@ -126,6 +133,23 @@ _retention_check_interval = 1000
 # The files SQLite keeps next to a WAL-mode database
 _sqlite_companion_suffixes = ('-wal', '-shm')
 
+# How many event rows one multi-row INSERT carries at most - with two dozen columns per row,
+# this keeps each statement well within the bound-parameter limits of SQLite and PostgreSQL
+_insert_chunk_size = 500
+
+# The first SQLite version that understands INSERT .. RETURNING
+_sqlite_min_returning_version = (3, 35, 0)
+
+# The columns of the event table that a multi-row INSERT lists, in order - all of them but the generated id
+_event_insert_columns = [column.name for column in event_table.columns if column.name != 'id']
+
+# How each positional driver marks a bound parameter - drivers of other styles use one statement per event
+_placeholder_by_paramstyle = {
+    'qmark': '?',
+    'format': '%s',
+    'pyformat': '%s',
+}
+
 logger = getLogger(__name__)
 
 # Per-write trace diagnostics - opt-in through the environment
@@ -139,6 +163,9 @@ def _trace(message:'str', *args:'object') -> 'None':
 # How many distinct cids have their sequence counters kept in memory at a time
 _max_tracked_cids = 100_000
 
+# How many multi-row INSERT statements are kept, one per dialect and row count
+_multi_row_insert_cache_size = 64
+
 # What the process was configured with at startup - display code uses this constant
 Retention_Days = get_retention_days()
 
@@ -244,12 +271,60 @@ def is_audit_log_enabled() -> 'bool':
 # ################################################################################################################################
 # ################################################################################################################################
 
+def _supports_returning(dialect:'Dialect') -> 'bool':
+    """ Returns True if the database behind the dialect can return the ids of the rows a multi-row INSERT generated.
+    """
+    if dialect.paramstyle not in _placeholder_by_paramstyle:
+        out = False
+
+    elif dialect.name == 'postgresql':
+        out = True
+
+    # SQLite understands RETURNING as of 3.35, even though this version of SQLAlchemy does not know it yet
+    elif dialect.name == 'sqlite':
+        out = dialect.dbapi.sqlite_version_info >= _sqlite_min_returning_version
+
+    # Elsewhere, the ids of a multi-row insert are not guaranteed to be consecutive
+    else:
+        out = False
+
+    return out
+
+# ################################################################################################################################
+
+@lru_cache(maxsize=_multi_row_insert_cache_size)
+def _get_multi_row_insert(dialect:'Dialect', row_count:'int') -> 'str':
+    """ Returns the text of an INSERT .. RETURNING that writes this many event rows with positional parameters.
+    The text is built by hand because compiling a statement of hundreds of rows through SQLAlchemy
+    would cost more than running it.
+    """
+    preparer = dialect.identifier_preparer
+    placeholder = _placeholder_by_paramstyle[dialect.paramstyle]
+
+    table_name = preparer.format_table(event_table)
+    column_names = ', '.join(preparer.quote(name) for name in _event_insert_columns)
+
+    row_placeholders = ', '.join([placeholder] * len(_event_insert_columns))
+    row_placeholders = f'({row_placeholders})'
+
+    values = ', '.join([row_placeholders] * row_count)
+    id_column = preparer.quote('id')
+
+    out = f'INSERT INTO {table_name} ({column_names}) VALUES {values} RETURNING {id_column}'
+    return out
+
+# ################################################################################################################################
+# ################################################################################################################################
+
 class AuditLog:
     """ A source-agnostic audit log writing structured events into one shared database.
     The database is SQLite by default and can be MySQL, PostgreSQL or Oracle DB,
     as configured through the Zato_Audit_Log_DB_* environment variables.
     Events are written synchronously by default - high-volume producers turn on batching
-    through the flush parameters or the Zato_Audit_Log_Flush_* environment variables.
+    through the flush parameters or the Zato_Audit_Log_Flush_* environment variables,
+    and writers that never read an event's id back are buffered by default.
+    Buffered events are spooled to local disk until they are written, so a process
+    killed before a flush loses none of them.
     The whole log can be turned off through Zato_Audit_Log_Enabled, in which case every
     insert becomes a silent no-op.
     """
@@ -260,6 +335,7 @@ class AuditLog:
         *,
         flush_max_size:'intnone' = None,
         flush_max_wait_ms:'intnone' = None,
+        is_buffered_by_default:'bool' = False,
         ) -> 'None':
 
         self.server_name = server_name
@@ -272,18 +348,26 @@ class AuditLog:
 
         # The flush configuration comes from the environment unless given explicitly ..
         if flush_max_size is None:
-            flush_max_size = get_flush_max_size()
+            flush_max_size = get_flush_max_size(is_buffered_by_default)
 
         if flush_max_wait_ms is None:
             flush_max_wait_ms = get_flush_max_wait_ms()
 
         self.flush_max_size = flush_max_size
 
+        # .. buffered events are kept on disk too, until they are in the database ..
+        if flush_max_size > 1:
+            spool_dir = get_spool_dir()
+            spool = EventSpool(spool_dir)
+        else:
+            spool = None
+
         # .. and the buffer holds events between flushes.
         self._buffer = EventBuffer(
             max_size=flush_max_size,
             max_wait_ms=flush_max_wait_ms,
             write_batch=self._write_batch,
+            spool=spool,
         )
 
 # ################################################################################################################################
@@ -397,6 +481,9 @@ class AuditLog:
             'data': data,
         }
 
+        # .. let the alerting collectors see it without having to read it back ..
+        live_aggregator.add_event(source, event_type, object_name, outcome, duration_ms, now)
+
         # .. write it now if batching is off ..
         if self.flush_max_size <= 1:
             out = self._write_batch([pending])
@@ -544,6 +631,7 @@ class AuditLog:
 
     def _insert_batch(self, batch:'pending_event_list') -> 'intnone':
         """ Inserts one batch of events in a single transaction and returns the id of the last event written.
+        The event rows go in through multi-row statements and each companion table gets one executemany.
         """
 
         # Our response to produce
@@ -551,67 +639,118 @@ class AuditLog:
 
         with self.engine.begin() as connection:
 
-            for pending in batch:
+            # The event rows come first, so everything else can reference their ids ..
+            event_ids = self._insert_event_rows(connection, batch)
 
-                # The event row itself comes first, so everything else can reference its id ..
-                insert_statement = event_table.insert()
-                insert_statement = insert_statement.values(**pending.values)
+            attr_rows:'anylist' = []
+            body_rows:'anylist' = []
+            link_rows:'anylist' = []
+            search_rows:'anylist' = []
 
-                result = connection.execute(insert_statement)
+            # A database without the search index is searched without it, so nothing is built for it
+            is_searchable = has_search_index(connection.engine)
 
-                primary_key = result.inserted_primary_key
-                event_id = primary_key[0]
-                out = event_id
+            for event_id, pending in zip(event_ids, batch):
+
+                event_time_iso = pending.values['event_time_iso']
+
+                # .. what the free-text search finds the event by ..
+                if is_searchable:
+                    search_rows.append(build_search_row(connection, event_id, pending.values, pending.attrs))
 
                 # .. searchable attributes ..
                 if pending.attrs:
-                    attr_rows = self._build_attr_rows(event_id, pending.attrs)
-                    attr_insert = event_attr_table.insert()
-
-                    _ = connection.execute(attr_insert, attr_rows)
+                    attr_rows.extend(self._build_attr_rows(event_id, pending.attrs))
 
                 # .. message bodies, stamped with the event's own time so pruning never needs a join ..
-                if pending.bodies:
+                for kind, body_data in pending.bodies.items():
+                    body_rows.append({
+                        'event_id': event_id,
+                        'kind': kind,
+                        'event_time_iso': event_time_iso,
+                        'data': body_data,
+                    })
 
-                    body_rows:'anylist' = []
+                # .. attachments, one body row each, stamped the same way ..
+                if pending.attachments:
+                    body_rows.extend(build_attachment_rows(event_id, event_time_iso, pending.attachments))
 
-                    for kind, body_data in pending.bodies.items():
-                        body_rows.append({
-                            'event_id': event_id,
-                            'kind': kind,
-                            'event_time_iso': pending.values['event_time_iso'],
-                            'data': body_data,
-                        })
+                # .. and lineage links to parent events ..
+                for parent_event_id in pending.parents:
+                    link_rows.append({
+                        'child_event_id': event_id,
+                        'parent_event_id': parent_event_id,
+                        'link_type': pending.parent_link_type,
+                    })
 
-                    body_insert = event_body_table.insert()
+            # .. now, each companion table gets the rows of the whole batch in one go.
+            if attr_rows:
+                _ = connection.execute(event_attr_table.insert(), attr_rows)
 
-                    _ = connection.execute(body_insert, body_rows)
+            if body_rows:
+                _ = connection.execute(event_body_table.insert(), body_rows)
 
-                # .. attachments, one body row each, stamped the same way ..
-                if pending.attachments:
+            if link_rows:
+                _ = connection.execute(event_link_table.insert(), link_rows)
+
+            insert_search_rows(connection, search_rows)
+
+            if event_ids:
+                out = event_ids[-1]
+
+        return out
+
+# ################################################################################################################################
+
+    def _insert_event_rows(self, connection:'Connection', batch:'pending_event_list') -> 'intlist':
+        """ Inserts the event rows of a batch and returns their ids, in the order of the batch.
+        Databases that can return what they generated get multi-row statements, the rest one statement per event.
+        """
 
-                    attachment_rows = build_attachment_rows(
-                        event_id, pending.values['event_time_iso'], pending.attachments)
-                    attachment_insert = event_body_table.insert()
+        # Our response to produce
+        out:'intlist' = []
+
+        # Insert as many rows at a time as possible if the database can tell us their ids ..
+        if _supports_returning(connection.dialect):
+
+            batch_size = len(batch)
+
+            for idx in range(0, batch_size, _insert_chunk_size):
+                chunk = batch[idx:idx + _insert_chunk_size]
+                out.extend(self._insert_event_rows_returning(connection, chunk))
+
+        # .. otherwise, each event needs to be inserted on its own to learn its id.
+        else:
+            for pending in batch:
+                insert_statement = event_table.insert()
+                insert_statement = insert_statement.values(**pending.values)
+
+                result = connection.execute(insert_statement)
+
+                primary_key = result.inserted_primary_key
+                out.append(primary_key[0])
 
-                    _ = connection.execute(attachment_insert, attachment_rows)
+        return out
 
-                # .. and lineage links to parent events.
-                if pending.parents:
+# ################################################################################################################################
 
-                    link_rows:'anylist' = []
+    def _insert_event_rows_returning(self, connection:'Connection', chunk:'pending_event_list') -> 'intlist':
+        """ Inserts event rows with one statement and returns their ids through a RETURNING clause.
+        """
+        row_count = len(chunk)
+        query = _get_multi_row_insert(connection.dialect, row_count)
 
-                    for parent_event_id in pending.parents:
-                        link_rows.append({
-                            'child_event_id': event_id,
-                            'parent_event_id': parent_event_id,
-                            'link_type': pending.parent_link_type,
-                        })
+        # Event columns are text and integers, which go to the driver as they are, without any bind processing
+        params:'anylist' = []
 
-                    link_insert = event_link_table.insert()
+        for pending in chunk:
+            values = pending.values
+            params.extend(values[name] for name in _event_insert_columns)
 
-                    _ = connection.execute(link_insert, link_rows)
+        result = connection.exec_driver_sql(query, tuple(params))
 
+        # Ids are generated in the order the rows were given in, but the database may return them in any order
+        out = sorted(row[0] for row in result)
         return out
 
 # ################################################################################################################################
@@ -22,11 +22,12 @@ from zato.common.audit_log.common import event_body_table, AuditBody
 
 if 0:
     from sqlalchemy.engine import Engine
-    from zato.common.typing_ import anydictnone, anylist, stranydict
+    from zato.common.typing_ import anydictnone, anylist, intnone, stranydict
 
     # Dummy assignments to satisfy type checkers
     anydictnone = anydictnone
     anylist = anylist
+    intnone = intnone
     Engine = Engine
     stranydict = stranydict
 
@@ -53,12 +54,14 @@ def get_max_attachment_size() -> 'int':
 
 # ################################################################################################################################
 
-def build_attachment(filename:'str', content_type:'str', content:'bytes') -> 'stranydict':
+def build_attachment(filename:'str', content_type:'str', content:'bytes', size:'intnone'=None) -> 'stranydict':
     """ Builds one attachment envelope out of a file's name, type and bytes.
     An attachment bigger than the cap keeps its metadata and loses its bytes,
-    saying so through the is_content_kept flag.
+    saying so through the is_content_kept flag. The size is given explicitly
+    when the bytes were streamed and dropped once they went past the cap.
     """
-    size = len(content)
+    if size is None:
+        size = len(content)
     max_size = get_max_attachment_size()
 
     out:'stranydict' = {
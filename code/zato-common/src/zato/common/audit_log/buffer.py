@@ -21,11 +21,13 @@ from gevent.monkey import is_module_patched
 # ################################################################################################################################
 
 if 0:
+    from zato.common.audit_log.spool import EventSpool
     from zato.common.typing_ import anylist, callable_, stranydict
 
     # Dummy assignments to satisfy type checkers
     anylist = anylist
     callable_ = callable_
+    EventSpool = EventSpool
     stranydict = stranydict
 
 # ################################################################################################################################
@@ -49,6 +51,10 @@ Env_Flush_Max_Wait_Ms = 'Zato_Audit_Log_Flush_Max_Wait_Ms'
 # One event per flush means the writer is synchronous - the default, high-volume producers opt into batching
 _default_flush_max_size = 1
 
+# What writers that never read an event's id back buffer up to by default - one multi-row write
+# then replaces this many transactions
+_default_buffered_flush_max_size = 200
+
 # How long a buffered event may wait before it is flushed regardless of the batch size
 _default_flush_max_wait_ms = 500
 
@@ -68,11 +74,13 @@ def _trace(message:'str', *args:'object') -> 'None':
 
 # ################################################################################################################################
 
-def get_flush_max_size() -> 'int':
+def get_flush_max_size(is_buffered_by_default:'bool'=False) -> 'int':
     """ Returns how many events are buffered before a flush. One means every event is written synchronously.
     """
     if value := os.environ.get(Env_Flush_Max_Size, ''):
         out = int(value)
+    elif is_buffered_by_default:
+        out = _default_buffered_flush_max_size
     else:
         out = _default_flush_max_size
 
@@ -121,13 +129,23 @@ class EventBuffer:
     """ Buffers audit events and writes them out in batches - a flush runs when the buffer
     reaches its maximum size or when its oldest event has waited long enough.
     With a maximum size of one, every event is written synchronously and no flusher thread ever starts.
+    With a spool, each buffered event is also kept on disk until its batch is written,
+    and the flusher starts at once to replay what an earlier process left behind.
     """
 
-    def __init__(self, *, max_size:'int', max_wait_ms:'int', write_batch:'callable_') -> 'None':
+    def __init__(
+        self,
+        *,
+        max_size:'int',
+        max_wait_ms:'int',
+        write_batch:'callable_',
+        spool:'EventSpool | None' = None,
+        ) -> 'None':
 
         self.max_size = max_size
         self.max_wait_ms = max_wait_ms
         self.write_batch = write_batch
+        self.spool = spool
 
         # Guards the pending list and the first-added timestamp
         self._lock = Lock()
@@ -138,8 +156,13 @@ class EventBuffer:
         # When the oldest pending event was added, per the monotonic clock
         self._first_added_at = 0.0
 
-        # The background flusher starts lazily, with the first buffered event
-        self._flusher_started = False
+        # The background flusher starts lazily, with the first buffered event,
+        # unless there is a spool that may need to be replayed first.
+        if spool:
+            self._flusher_started = True
+            self._start_flusher()
+        else:
+            self._flusher_started = False
 
 # ################################################################################################################################
 
@@ -152,6 +175,10 @@ class EventBuffer:
 
             self._pending.append(event)
 
+            # .. keep a copy on disk until the event is in the database ..
+            if self.spool:
+                self.spool.append(event)
+
             pending_count = len(self._pending)
 
             if pending_count == 1:
@@ -160,8 +187,10 @@ class EventBuffer:
             if pending_count >= self.max_size:
                 batch = self._pending
                 self._pending = []
+                segment_path = self._rotate_spool()
             else:
                 batch = None
+                segment_path = ''
 
             # .. make sure the time-based flusher is running ..
             if not self._flusher_started:
@@ -178,12 +207,35 @@ class EventBuffer:
             flush_start = monotonic()
 
             self._write_batch_off_loop(batch)
+            self._remove_spool_segment(segment_path)
 
             flush_elapsed = monotonic() - flush_start
             flush_elapsed_ms = flush_elapsed * 1000
 
             _trace('inline flush of %d events done %.1fms', batch_size, flush_elapsed_ms)
 
+# ################################################################################################################################
+
+    def _rotate_spool(self) -> 'str':
+        """ Closes the spool segment holding the batch just taken out, if there is a spool,
+        and returns its path. Must be called with the lock held.
+        """
+        if self.spool:
+            out = self.spool.rotate()
+        else:
+            out = ''
+
+        return out
+
+# ################################################################################################################################
+
+    def _remove_spool_segment(self, segment_path:'str') -> 'None':
+        """ Deletes a spool segment once its batch is in the database. A segment whose batch
+        could not be written stays where it is and is replayed by the next process to start.
+        """
+        if self.spool:
+            self.spool.remove(segment_path)
+
 # ################################################################################################################################
 
     def _write_batch_off_loop(self, batch:'pending_event_list') -> 'None':
@@ -207,10 +259,13 @@ class EventBuffer:
         with self._lock:
             batch = self._pending
             self._pending = []
+            segment_path = self._rotate_spool()
 
         if batch:
             self.write_batch(batch)
 
+        self._remove_spool_segment(segment_path)
+
 # ################################################################################################################################
 
     def _start_flusher(self) -> 'None':
@@ -238,6 +293,13 @@ class EventBuffer:
 
         max_wait_seconds = self.max_wait_ms / 1000.0
 
+        # Whatever an earlier process buffered and never wrote out goes first
+        if self.spool:
+            try:
+                self.replay_spool()
+            except Exception:
+                logger.warning('Audit log spool replay failed', exc_info=True)
+
         while True:
 
             sleep(interval)
@@ -250,6 +312,7 @@ class EventBuffer:
                     if waited >= max_wait_seconds:
                         batch = self._pending
                         self._pending = []
+                        segment_path = self._rotate_spool()
                     else:
                         batch = None
                 else:
@@ -268,11 +331,45 @@ class EventBuffer:
                     self._write_batch_off_loop(batch)
                 except Exception:
                     logger.warning('Audit log flush failed', exc_info=True)
+                else:
+                    self._remove_spool_segment(segment_path)
 
                 flush_elapsed = monotonic() - flush_start
                 flush_elapsed_ms = flush_elapsed * 1000
 
                 _trace('timed flush of %d events done %.1fms', batch_size, flush_elapsed_ms)
 
+# ################################################################################################################################
+
+    def replay_spool(self) -> 'int':
+        """ Writes out the events that processes no longer running left in the spool,
+        one batch of the maximum size at a time, and returns how many there were.
+        """
+
+        # Our response to produce
+        out = 0
+
+        if not self.spool:
+            return out
+
+        for segment_path in self.spool.claim_orphans():
+
+            events = self.spool.read_segment(segment_path)
+            event_count = len(events)
+
+            # The same batch size as in regular flushes keeps each statement within the same limits
+            for idx in range(0, event_count, self.max_size):
+                batch = events[idx:idx + self.max_size]
+                self._write_batch_off_loop(batch)
+
+            # Only now that everything is in the database can the segment go away
+            self.spool.remove(segment_path)
+
+            logger.info('Replayed %d audit log event(s) from spool segment `%s`', event_count, segment_path)
+
+            out += event_count
+
+        return out
+
 # ################################################################################################################################
 # ################################################################################################################################
@@ -338,6 +338,10 @@ _event_columns = [
     # this the whole of an object's history would be sorted to answer for a single page.
     Index('idx_event_source_object_time', 'source', 'object_name', 'event_time_iso'),
 
+    # The all-events page reads the same order across every source, one page after another,
+    # each page starting right after the (time, id) pair the previous one ended on.
+    Index('idx_event_time_id', 'event_time_iso', 'id'),
+
     Index('idx_event_cid', 'cid', 'id'),
     Index('idx_event_msg_id', 'msg_id', 'id'),
 
@@ -113,10 +113,12 @@ def record_file_transfer(
     }
 
     # The file's bytes travel as an attachment when the connection asked for them to be kept -
-    # the envelope caps oversized files on its own, keeping their metadata.
+    # the envelope caps oversized files on its own, keeping their metadata. A streamed file
+    # past the cap arrives with its bytes already dropped, which is why its size is given too.
     if content is not None:
         filename = remote_path.rstrip('/').split('/')[-1]
-        insert_options['attachments'] = [build_attachment(filename, _default_content_type, content)]
+        attachment_size = max(size, len(content))
+        insert_options['attachments'] = [build_attachment(filename, _default_content_type, content, attachment_size)]
 
     # Our response to produce
     out = audit_log.insert(AuditSource.File_Outgoing, AuditEvent.Request_Sent, conn_name, **insert_options)
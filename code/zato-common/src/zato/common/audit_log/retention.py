@@ -18,6 +18,7 @@ from sqlalchemy import or_, select, update
 # Zato
 from zato.common.audit_log.common import AuditOutcome, event_attr_table, event_body_table, event_link_table, \
     event_table, get_retention_days, get_source_env_suffix
+from zato.common.audit_log.search import delete_search_rows, reindex_events
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -226,7 +227,7 @@ def _archive_events(engine:'Engine', archiver:'_Archiver', ids:'intlist') -> 'No
 # ################################################################################################################################
 
 def _delete_events(engine:'Engine', ids:'intlist') -> 'None':
-    """ Deletes one chunk of events along with their attributes, bodies and lineage links.
+    """ Deletes one chunk of events along with their attributes, bodies, lineage links and search index rows.
     """
     is_child_event = event_link_table.c.child_event_id.in_(ids)
     is_parent_event = event_link_table.c.parent_event_id.in_(ids)
@@ -254,6 +255,8 @@ def _delete_events(engine:'Engine', ids:'intlist') -> 'None':
         _ = connection.execute(delete_links)
         _ = connection.execute(delete_events)
 
+        delete_search_rows(connection, ids)
+
 # ################################################################################################################################
 
 def _run_row_retention(engine:'Engine', archiver:'_Archiver', source:'str', cutoff_iso:'str') -> 'int':
@@ -354,6 +357,7 @@ def _archive_content(engine:'Engine', archiver:'_Archiver', ids:'intlist') -> 'N
 def _prune_content(engine:'Engine', ids:'intlist') -> 'None':
     """ Prunes the content of one chunk of events - the data column is emptied
     and their body rows are deleted, while the event rows themselves stay.
+    Their search index rows are rebuilt, so pruned content cannot be found any longer.
     """
     is_wanted_event = event_table.c.id.in_(ids)
     is_body_of_event = event_body_table.c.event_id.in_(ids)
@@ -369,6 +373,8 @@ def _prune_content(engine:'Engine', ids:'intlist') -> 'None':
         _ = connection.execute(prune_statement)
         _ = connection.execute(delete_bodies)
 
+        reindex_events(connection, ids)
+
 # ################################################################################################################################
 
 def _run_content_retention(engine:'Engine', archiver:'_Archiver', source:'str', cutoff_iso:'str') -> 'int':
@@ -23,6 +23,7 @@ from sqlalchemy import select
 from zato.common.api import SCHEDULER
 from zato.common.audit_log.api import AuditEvent, AuditSource, get_audit_engine
 from zato.common.audit_log.common import event_attr_table, event_body_table, event_table
+from zato.common.audit_log.search import reindex_events
 from zato.common.util.api import utcnow
 
 # ################################################################################################################################
@@ -153,8 +154,10 @@ def record_job_complete(event_id:'int', *, outcome:'str', duration_ms:'int', err
     update_statement = update_statement.where(event_table.c.id == event_id)
     update_statement = update_statement.values(outcome=outcome, duration_ms=duration_ms, data=error)
 
+    # The error is searchable text, so the run is indexed anew along with the update
     with engine.begin() as connection:
         _ = connection.execute(update_statement)
+        reindex_events(connection, [event_id])
 
     # The run closes with its own system entry, mirroring the one it opened with.
     duration_human = format_duration_ms(duration_ms)
@@ -198,6 +201,7 @@ def record_job_timeout(job_id:'int', current_run:'int', *, elapsed_ms:'int', err
             outcome=SCHEDULER.OUTCOME.TIMEOUT, duration_ms=elapsed_ms, data=error)
 
         _ = connection.execute(update_statement)
+        reindex_events(connection, [event_id])
 
     elapsed_human = format_duration_ms(elapsed_ms)
     now = utcnow()
@@ -0,0 +1,356 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# The full-text index behind the audit log's free-text search - one row per event holding
+# the text of its searchable columns and, apart from them, the values of its attributes.
+# SQLite keeps it in an FTS5 table whose trigram tokenizer matches any substring of three
+# characters or more, the same way the LIKE it narrows down does. PostgreSQL keeps it in
+# a plain table with pg_trgm GIN indexes over its texts, which serve the same LIKE '%term%'
+# the search runs, so a part of a word is found there too. The other databases have no index
+# and their searches read every row, as they always did.
+#
+# The index only ever narrows a search down - the LIKE conditions still run over what it found,
+# so a match is exactly what it was without the index. Events written before the index existed
+# have no rows in it and are searched the way they always were, until retention removes them.
+
+# stdlib
+import re
+from logging import getLogger
+from weakref import WeakKeyDictionary
+
+# SQLAlchemy
+from sqlalchemy import column, event as sa_event, func, or_, select, table, text as sa_text
+from sqlalchemy.exc import DBAPIError
+
+# Zato
+from zato.common.audit_log.common import event_attr_table, event_table, metadata
+from zato.common.db_env import Type_PostgreSQL, Type_SQLite
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if 0:
+    from sqlalchemy.engine import Connection, Engine
+    from sqlalchemy.sql.elements import ColumnElement
+    from zato.common.typing_ import any_, anylist, intlist, stranydict, strdictnone
+
+    # Dummy assignments to satisfy type checkers
+    any_ = any_
+    anylist = anylist
+    ColumnElement = ColumnElement
+    Connection = Connection
+    Engine = Engine
+    intlist = intlist
+    stranydict = stranydict
+    strdictnone = strdictnone
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+logger = getLogger(__name__)
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+# The event columns the free-text search covers
+Search_Columns = ('data', 'event_type', 'msg_id', 'correl_id', 'endpoint', 'ext_client_id',
+    'status', 'classification', 'sub_key')
+
+# The two texts each event is indexed under - its columns and its attribute values
+Search_Field_Columns = 'fields_text'
+Search_Field_Attrs   = 'attrs_text'
+
+# The name of the table the index lives in, whichever database holds it
+Search_Table_Name = 'event_search'
+
+# How many characters of each text are indexed - a document bigger than this is found by what its beginning says,
+# which keeps the index from growing with the biggest payloads.
+_max_indexed_length = 256 * 1024
+
+# Both indexes take three characters at a time, so shorter terms are never in them
+_min_term_length = 3
+
+# PostgreSQL builds its trigrams out of word characters only, so a term without any has none to look up
+_has_word_character = re.compile(r'\w')
+
+# An id no event ever reaches - what the first indexed id is when nothing is indexed yet,
+# which leaves every existing event to the searches without the index.
+_no_indexed_id = 2 ** 62
+
+# The statements building the index, per database, each of them a no-op when it exists already
+_create_statements = {
+    Type_SQLite: [
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {Search_Table_Name}
+        USING fts5({Search_Field_Columns}, {Search_Field_Attrs}, tokenize='trigram')
+        """,
+    ],
+    Type_PostgreSQL: [
+        f"""
+        CREATE TABLE IF NOT EXISTS {Search_Table_Name} (
+            event_id BIGINT PRIMARY KEY,
+            {Search_Field_Columns} TEXT NOT NULL,
+            {Search_Field_Attrs} TEXT NOT NULL
+        )
+        """,
+        'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+
+        # The word indexes the table was first built with cannot serve a LIKE, so they give way to trigram ones
+        f'DROP INDEX IF EXISTS idx_{Search_Table_Name}_columns',
+        f'DROP INDEX IF EXISTS idx_{Search_Table_Name}_attrs',
+
+        f"""
+        CREATE INDEX IF NOT EXISTS idx_{Search_Table_Name}_columns_trgm ON {Search_Table_Name}
+        USING GIN ({Search_Field_Columns} gin_trgm_ops)
+        """,
+        f"""
+        CREATE INDEX IF NOT EXISTS idx_{Search_Table_Name}_attrs_trgm ON {Search_Table_Name}
+        USING GIN ({Search_Field_Attrs} gin_trgm_ops)
+        """,
+    ],
+}
+
+# How the index table is addressed, per database - an FTS5 table keys its rows by their rowid,
+# which is the event id, while PostgreSQL has a column of its own for it.
+_search_tables = {
+    Type_SQLite: table(Search_Table_Name, column('rowid'), column(Search_Field_Columns), column(Search_Field_Attrs)),
+    Type_PostgreSQL: table(Search_Table_Name, column('event_id'), column(Search_Field_Columns), column(Search_Field_Attrs)),
+}
+
+# The engines whose database was found to hold the index, as told when their schema was created
+_engines_with_index:'WeakKeyDictionary[Engine, bool]' = WeakKeyDictionary()
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def _on_schema_created(target:'any_', connection:'Connection', **kwargs:'any_') -> 'None':
+    """ Builds the index along with the rest of the audit schema, wherever the database supports one.
+    A database that cannot build it, e.g. an SQLite compiled without FTS5 or a PostgreSQL whose user
+    may not create the pg_trgm extension, is searched without it.
+    """
+    engine = connection.engine
+    dialect_name = connection.dialect.name
+
+    if not (statements := _create_statements.get(dialect_name)):
+        _engines_with_index[engine] = False
+        return
+
+    # The index goes in on the connection the schema was created on - a second connection would wait
+    # for the first one's transaction to end, which on SQLite happens only after this hook returns.
+    # A failed statement leaves a PostgreSQL transaction unusable, so there, the index goes in under a savepoint
+    # that a failure is rolled back to.
+    savepoint = connection.begin_nested() if dialect_name == Type_PostgreSQL else None
+
+    try:
+        for statement in statements:
+            _ = connection.execute(sa_text(statement))
+
+    except DBAPIError:
+        if savepoint:
+            savepoint.rollback()
+
+        logger.warning('Audit log search index could not be created in `%s`, searches will read every event', dialect_name)
+        _engines_with_index[engine] = False
+
+    else:
+        if savepoint:
+            savepoint.commit()
+
+        _engines_with_index[engine] = True
+
+# The index is created each time the schema is, which is once per engine
+sa_event.listen(metadata, 'after_create', _on_schema_created)
+
+# ################################################################################################################################
+
+def has_search_index(engine:'Engine') -> 'bool':
+    """ Whether the database behind the engine holds the search index.
+    """
+    out = _engines_with_index.get(engine, False)
+    return out
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def build_search_row(connection:'Connection', event_id:'int', values:'stranydict', attrs:'strdictnone') -> 'stranydict':
+    """ Builds the index row of one event out of its column values and its attributes.
+    """
+    key_name = _get_key_name(connection.dialect.name)
+
+    column_texts:'anylist' = []
+
+    for column_name in Search_Columns:
+        if value := values.get(column_name):
+            column_texts.append(str(value))
+
+    attr_texts:'anylist' = []
+
+    if attrs:
+        for value in attrs.values():
+            if value is not None:
+                attr_texts.append(str(value))
+
+    # One value per line keeps the values of different columns apart
+    columns_text = '\n'.join(column_texts)
+    attrs_text = '\n'.join(attr_texts)
+
+    out = {
+        key_name: event_id,
+        Search_Field_Columns: columns_text[:_max_indexed_length],
+        Search_Field_Attrs: attrs_text[:_max_indexed_length],
+    }
+
+    return out
+
+# ################################################################################################################################
+
+def insert_search_rows(connection:'Connection', rows:'anylist') -> 'None':
+    """ Adds the index rows of newly written events, on the connection that wrote them.
+    """
+    if not rows:
+        return
+
+    if not has_search_index(connection.engine):
+        return
+
+    search_table = _search_tables[connection.dialect.name]
+    _ = connection.execute(search_table.insert(), rows)
+
+# ################################################################################################################################
+
+def delete_search_rows(connection:'Connection', event_ids:'any_') -> 'None':
+    """ Removes the index rows of events about to be deleted - the ids are a list or a select of them.
+    """
+    if not has_search_index(connection.engine):
+        return
+
+    search_table = _search_tables[connection.dialect.name]
+    key_column = search_table.c[_get_key_name(connection.dialect.name)]
+
+    delete_statement = search_table.delete()
+    delete_statement = delete_statement.where(key_column.in_(event_ids))
+
+    _ = connection.execute(delete_statement)
+
+# ################################################################################################################################
+
+def reindex_events(connection:'Connection', event_ids:'intlist') -> 'None':
+    """ Rebuilds the index rows of events whose searchable columns were changed in place,
+    e.g. a scheduler run given its outcome or a payload emptied by content retention.
+    Only events that had index rows get new ones, so what was written before the index
+    existed stays where it was searched from.
+    """
+    if not event_ids:
+        return
+
+    if not has_search_index(connection.engine):
+        return
+
+    search_table = _search_tables[connection.dialect.name]
+    key_column = search_table.c[_get_key_name(connection.dialect.name)]
+
+    # The events that are in the index ..
+    indexed_query = select(key_column).where(key_column.in_(event_ids))
+    indexed_ids = [row[0] for row in connection.execute(indexed_query)]
+
+    if not indexed_ids:
+        return
+
+    # .. their columns as they are now ..
+    search_columns = [event_table.c[column_name] for column_name in Search_Columns]
+
+    event_query = select(event_table.c.id, *search_columns)
+    event_query = event_query.where(event_table.c.id.in_(indexed_ids))
+
+    values_by_id:'stranydict' = {}
+
+    for row in connection.execute(event_query):
+        values_by_id[row[0]] = dict(zip(Search_Columns, row[1:]))
+
+    # .. with their attributes ..
+    attr_query = select(event_attr_table.c.event_id, event_attr_table.c.name, event_attr_table.c.value)
+    attr_query = attr_query.where(event_attr_table.c.event_id.in_(indexed_ids))
+
+    attrs_by_id:'stranydict' = {}
+
+    for event_id, name, value in connection.execute(attr_query):
+        attrs_by_id.setdefault(event_id, {})[name] = value
+
+    # .. replace what the index held for them.
+    rows:'anylist' = []
+
+    for event_id, values in values_by_id.items():
+        row = build_search_row(connection, event_id, values, attrs_by_id.get(event_id))
+        rows.append(row)
+
+    delete_search_rows(connection, indexed_ids)
+    insert_search_rows(connection, rows)
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def get_search_condition(engine:'Engine', id_column:'any_', query:'str', field_name:'str') -> 'ColumnElement | None':
+    """ Returns the condition narrowing a free-text search down to the events whose field of the index
+    matches the query, along with every event written before the index existed. None means the index
+    cannot answer this query, e.g. there is no index or the term is too short for it, and the search
+    reads every row without it.
+    """
+    if not has_search_index(engine):
+        return None
+
+    dialect_name = engine.dialect.name
+    search_table = _search_tables[dialect_name]
+
+    key_column = search_table.c[_get_key_name(dialect_name)]
+    text_column = search_table.c[field_name]
+
+    if len(query) < _min_term_length:
+        return None
+
+    # SQLite matches the query as one phrase, which for trigrams means as one substring ..
+    if dialect_name == Type_SQLite:
+
+        phrase = '"' + query.replace('"', '""') + '"'
+        is_match = text_column.match(phrase)
+
+    # .. while PostgreSQL runs the very LIKE the search does, with the trigram index finding its candidates.
+    else:
+
+        if not _has_word_character.search(query):
+            return None
+
+        pattern = '%' + escape_like(query) + '%'
+        is_match = text_column.like(pattern, escape='\\')
+
+    matching_ids = select(key_column).where(is_match)
+
+    # Everything older than the oldest indexed event was written before the index existed
+    first_indexed_id = select(key_column).order_by(key_column).limit(1).scalar_subquery()
+    first_indexed_id = func.coalesce(first_indexed_id, _no_indexed_id)
+
+    out = or_(id_column.in_(matching_ids), id_column < first_indexed_id)
+    return out
+
+# ################################################################################################################################
+
+def escape_like(query:'str') -> 'str':
+    """ Escapes LIKE wildcards in a user query so they match literally, with a backslash as the escape character.
+    """
+    out = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return out
+
+# ################################################################################################################################
+
+def _get_key_name(dialect_name:'str') -> 'str':
+    """ The name the index table keys its rows by in a given database.
+    """
+    out = 'rowid' if dialect_name == Type_SQLite else 'event_id'
+    return out
+
+# ################################################################################################################################
+# ################################################################################################################################
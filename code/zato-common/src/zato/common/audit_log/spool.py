@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# stdlib
+import os
+from itertools import count
+from json import dumps, loads
+from logging import getLogger
+from threading import Lock
+
+# Zato
+from zato.common.audit_log.buffer import PendingEvent
+from zato.common.defaults import default_env_base_dir
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if 0:
+    from zato.common.audit_log.buffer import pending_event_list
+    from zato.common.typing_ import strlist
+
+    # Dummy assignments to satisfy type checkers
+    pending_event_list = pending_event_list
+    strlist = strlist
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+logger = getLogger(__name__)
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+# The environment variable pointing to the directory buffered events are spooled to
+Env_Spool_Dir = 'Zato_Audit_Log_Spool_Dir'
+
+# Where the spool is kept when the environment does not say otherwise
+_default_spool_dir = os.path.join(default_env_base_dir, 'audit-log-spool')
+
+# Every segment file ends with this
+_segment_suffix = '.spool'
+
+# What separates the parts of a segment's file name - the pid of its owner always comes first
+_name_separator = '-'
+
+# Each spool in a process has a number of its own, so that several buffered writers never share a segment
+_spool_counter = count(1)
+
+# The names of the segments in use by this process right now - a segment under this process's own pid
+# that is not here was left behind by an earlier process that had the same pid, which is common in containers
+_live_segment_names:'set[str]' = set()
+
+# Serializes claiming orphaned segments, so that no two spools of one process ever claim the same one
+_claim_lock = Lock()
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def get_spool_dir() -> 'str':
+    """ Returns the directory buffered events are spooled to before they reach the database.
+    """
+    if value := os.environ.get(Env_Spool_Dir, ''):
+        out = value
+    else:
+        out = _default_spool_dir
+
+    return out
+
+# ################################################################################################################################
+
+def _is_pid_alive(pid:'int') -> 'bool':
+    """ Returns True if a process of the given pid exists, no matter who it belongs to.
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    else:
+        return True
+
+# ################################################################################################################################
+
+def _get_owner_pid(file_name:'str') -> 'int':
+    """ Returns the pid of the process that wrote a segment, or zero if the name is not one of ours.
+    """
+    pid, _, _ = file_name.partition(_name_separator)
+
+    if pid.isdigit():
+        out = int(pid)
+    else:
+        out = 0
+
+    return out
+
+# ################################################################################################################################
+
+def event_to_line(event:'PendingEvent') -> 'bytes':
+    """ Serializes one buffered event to a single line of a segment file.
+    """
+    data = {
+        'values': event.values,
+        'attrs': event.attrs,
+        'bodies': event.bodies,
+        'attachments': event.attachments,
+        'parents': event.parents,
+        'parent_link_type': event.parent_link_type,
+    }
+
+    # Attribute values may be of any type - whatever JSON has no type for is kept as text,
+    # which is what the writer would turn it into anyway
+    line = dumps(data, default=str)
+    line = line + '\n'
+
+    out = line.encode('utf8')
+    return out
+
+# ################################################################################################################################
+
+def line_to_event(line:'bytes') -> 'PendingEvent | None':
+    """ Deserializes one line of a segment file, or returns None if the line was cut short,
+    which is what a process killed in the middle of a write leaves behind.
+    """
+    try:
+        data = loads(line)
+    except ValueError:
+        return None
+
+    out = PendingEvent()
+
+    out.values = data['values']
+    out.attrs = data['attrs']
+    out.bodies = data['bodies']
+    out.attachments = data['attachments']
+    out.parents = data['parents']
+    out.parent_link_type = data['parent_link_type']
+
+    return out
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class EventSpool:
+    """ Keeps a copy of each buffered event in a local segment file until the batch it belongs to
+    is in the database, so that events buffered by a process killed with no chance to flush them
+    are written out by the next process to start. Each batch taken out of the buffer closes the current
+    segment, and the segment is deleted once the batch is written. The spool survives a process crash,
+    not a crash of the operating system - lines are not fsync-ed, which would cost what batching saves.
+    """
+
+    def __init__(self, spool_dir:'str') -> 'None':
+
+        self.spool_dir = spool_dir
+
+        # Whose segments these are and which spool of that process writes them
+        self.pid = os.getpid()
+        self.spool_id = next(_spool_counter)
+
+        # How many segments this spool has opened so far
+        self._segment_number = 0
+
+        # The segment events are appended to right now, if any is open
+        self._fd = -1
+        self._segment_path = ''
+
+# ################################################################################################################################
+
+    def _open_segment(self) -> 'None':
+        """ Opens a new segment that the next events will be appended to.
+        """
+
+        self._segment_number += 1
+
+        # Build the name of the segment ..
+        file_name = f'{self.pid}{_name_separator}{self.spool_id}{_name_separator}{self._segment_number}{_segment_suffix}'
+
+        # .. make sure its directory exists ..
+        os.makedirs(self.spool_dir, exist_ok=True)
+
+        # .. and open it for appending.
+        self._segment_path = os.path.join(self.spool_dir, file_name)
+        self._fd = os.open(self._segment_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+
+        _live_segment_names.add(file_name)
+
+# ################################################################################################################################
+
+    def append(self, event:'PendingEvent') -> 'None':
+        """ Appends one event to the current segment, opening a new one if there is none.
+        """
+
+        # A process forked off after this spool was created must not keep writing to its parent's segment ..
+        pid = os.getpid()
+
+        if pid != self.pid:
+            if self._fd >= 0:
+                os.close(self._fd)
+            self.pid = pid
+            self._segment_number = 0
+            self._fd = -1
+
+        # .. which is why it gets a segment of its own ..
+        if self._fd < 0:
+            self._open_segment()
+
+        # .. and the event goes there as a single line, written with one call.
+        line = event_to_line(event)
+        _ = os.write(self._fd, line)
+
+# ################################################################################################################################
+
+    def rotate(self) -> 'str':
+        """ Closes the current segment and returns its path, or an empty string if none was open.
+        The next event appended goes to a new segment.
+        """
+        if self._fd < 0:
+            return ''
+
+        os.close(self._fd)
+
+        out = self._segment_path
+
+        self._fd = -1
+        self._segment_path = ''
+
+        return out
+
+# ################################################################################################################################
+
+    def remove(self, segment_path:'str') -> 'None':
+        """ Deletes a segment whose events are all in the database.
+        """
+        if not segment_path:
+            return
+
+        try:
+            os.remove(segment_path)
+        except FileNotFoundError:
+            pass
+
+        file_name = os.path.basename(segment_path)
+        _live_segment_names.discard(file_name)
+
+# ################################################################################################################################
+
+    def claim_orphans(self) -> 'strlist':
+        """ Takes over the segments of processes that no longer exist and returns their new paths,
+        oldest first. A segment is claimed by renaming it, which is atomic, so no two processes
+        starting at the same time ever replay the same one.
+        """
+
+        # Our response to produce
+        out:'strlist' = []
+
+        try:
+            file_names = os.listdir(self.spool_dir)
+        except FileNotFoundError:
+            return out
+
+        # The oldest segments go first so their events reach the database in the order they were recorded
+        candidates:'strlist' = []
+
+        for file_name in file_names:
+
+            if not file_name.endswith(_segment_suffix):
+                continue
+
+            if file_name in _live_segment_names:
+                continue
+
+            pid = _get_owner_pid(file_name)
+
+            if not pid:
+                continue
+
+            # A segment of another process that is still running is still in use ..
+            if pid != self.pid and _is_pid_alive(pid):
+                continue
+
+            # .. while one under our own pid and not in use by us was left by an earlier process with the same pid.
+            candidates.append(file_name)
+
+        candidates.sort(key=self._get_segment_mtime)
+
+        with _claim_lock:
+
+            for file_name in candidates:
+
+                # The original name is kept inside the new one so that a claimed segment can be traced back to its source
+                self._segment_number += 1
+                claimed_name = f'{self.pid}{_name_separator}{self.spool_id}{_name_separator}{self._segment_number}' + \
+                    f'{_name_separator}{file_name}'
+
+                source_path = os.path.join(self.spool_dir, file_name)
+                claimed_path = os.path.join(self.spool_dir, claimed_name)
+
+                # Someone else may have claimed it a moment ago
+                try:
+                    os.rename(source_path, claimed_path)
+                except FileNotFoundError:
+                    continue
+
+                _live_segment_names.add(claimed_name)
+                out.append(claimed_path)
+
+        return out
+
+# ################################################################################################################################
+
+    def _get_segment_mtime(self, file_name:'str') -> 'float':
+        """ Returns when a segment was last written to, or zero if it is already gone.
+        """
+        try:
+            out = os.path.getmtime(os.path.join(self.spool_dir, file_name))
+        except FileNotFoundError:
+            out = 0.0
+
+        return out
+
+# ################################################################################################################################
+
+    def read_segment(self, segment_path:'str') -> 'pending_event_list':
+        """ Returns all the complete events of a segment, in the order they were appended.
+        """
+
+        # Our response to produce
+        out:'pending_event_list' = []
+
+        with open(segment_path, 'rb') as segment_file:
+            for line in segment_file:
+
+                # Only the very last line can be incomplete and there is nothing to save from it
+                if event := line_to_event(line):
+                    out.append(event)
+                else:
+                    logger.info('Skipping an incomplete line in audit log spool segment `%s`', segment_path)
+
+        return out
+
+# ################################################################################################################################
+# ################################################################################################################################
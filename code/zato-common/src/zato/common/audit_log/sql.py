@@ -27,11 +27,11 @@ from zato.common.audit_log.api import AuditEvent, AuditSource
 
 if 0:
     from zato.common.audit_log.api import AuditLog
-    from zato.common.typing_ import anylistnone, intnone, strdictnone
+    from zato.common.typing_ import any_, anylistnone, intnone
     AuditLog = AuditLog
+    any_ = any_
     anylistnone = anylistnone
     intnone = intnone
-    strdictnone = strdictnone
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -54,6 +54,10 @@ all_levels = {Level_Off, Level_Statement, Level_Statement_Params, Level_Full}
 # The levels that carry the statement's parameters with the event
 _levels_with_params = {Level_Statement_Params, Level_Full}
 
+# How many sets of parameters of a batch travel with its event - enough to tell what the batch was about,
+# whereas all of them could make a single event as large as the batch itself.
+Batch_Params_Sample = 10
+
 # ################################################################################################################################
 # ################################################################################################################################
 
@@ -66,14 +70,20 @@ def record_sql_execution(
     cid:'str',
     endpoint:'str',
     outcome:'str',
-    params:'strdictnone' = None,
+    params:'any_' = None,
     rows:'anylistnone' = None,
+    row_count:'intnone' = None,
+    batch_size:'intnone' = None,
     duration_ms:'int' = 0,
     error:'str' = '',
     ) -> 'intnone':
     """ Writes one audit event describing one executed SQL statement. The level says
     how much travels with the event - the statement alone, the statement with its
-    parameters, or everything including the rows that came back. Returns the event id.
+    parameters, or everything including the rows that came back. A streamed result
+    is counted instead, via row_count, because its rows are never held in memory
+    all at once. A batch, whose params are a list of parameter sets, travels with
+    its batch_size and only the first Batch_Params_Sample of these sets, while its
+    row_count is how many rows it affected. Returns the event id.
     """
 
     # The statement itself is on record at every level
@@ -81,16 +91,29 @@ def record_sql_execution(
         'statement': statement,
     }
 
-    # The parameters travel only when the connection asked for them
+    # The parameters travel only when the connection asked for them ..
     if level in _levels_with_params:
+
+        # .. and of a batch, only a sample of them does.
+        if batch_size is not None:
+            params = params[:Batch_Params_Sample]
+
         summary['params'] = params
 
+    # How many sets of parameters a batch had is no one's data either way
+    if batch_size is not None:
+        summary['batch_size'] = batch_size
+
     # The rows travel only at the full level, and only when there are any -
     # a failed statement has none to speak of.
     if level == Level_Full and rows is not None:
         summary['rows'] = rows
         summary['row_count'] = len(rows)
 
+    # A count alone is no one's data, so it travels at every level
+    if row_count is not None:
+        summary['row_count'] = row_count
+
     # A failed statement says what went wrong right in its data
     if error:
         summary['error'] = error
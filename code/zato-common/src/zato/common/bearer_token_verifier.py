@@ -7,7 +7,12 @@ Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
 """
 
 # stdlib
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from hashlib import sha256
 from logging import getLogger
+from time import time
 from urllib.parse import urlsplit
 
 # PyJWT
@@ -27,7 +32,7 @@ from zato.common.util.api import parse_extra_into_dict
 # ################################################################################################################################
 
 if 0:
-    from zato.common.typing_ import any_, anydictnone, stranydict
+    from zato.common.typing_ import any_, anydictnone, anytuple, stranydict
     from zato.server.connection.cache import CacheAPI
 
 # ################################################################################################################################
@@ -50,6 +55,16 @@ JWKS_Cache_TTL = 3600
 # this many seconds, which is why it is far shorter than JWKS_Cache_TTL.
 JWKS_Fetch_Interval = 60
 
+# How long a signing key built out of a JWKS document is used before the document is read again, in seconds.
+# This is the same as the fetch interval, so a key the issuer has withdrawn stops being used
+# within this many seconds of the cached document being refreshed.
+Signing_Key_TTL = JWKS_Fetch_Interval
+
+# How many verified tokens are kept, so that a token seen again skips the signature check until it expires.
+# Set the environment variable to 0 to verify each token in full every time.
+Env_Max_Verified_Tokens = 'Zato_Bearer_Token_Max_Verified_Tokens'
+Default_Max_Verified_Tokens = 10_000
+
 # The case-insensitive prefix inbound Authorization headers carry
 Bearer_Prefix = 'bearer '
 
@@ -71,6 +86,41 @@ _decode_options:'any_' = {'require': ['exp', 'iss', 'aud']}
 # ################################################################################################################################
 # ################################################################################################################################
 
+@dataclass(init=False)
+class _SigningKey:
+    """ A signing key built out of a JWKS document, along with when it needs to be looked up in the document again.
+    """
+    key_data: 'stranydict'
+    key: 'any_'
+    expires_at: 'float'
+
+# ################################################################################################################################
+
+@dataclass(init=False)
+class _VerifiedToken:
+    """ The claims of a token whose signature, expiry, issuer and audience have been verified.
+    """
+    claims: 'stranydict'
+    signing_key_id: 'anytuple'
+    signing_key: '_SigningKey'
+    expires_at: 'float'
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def get_max_verified_tokens() -> 'int':
+    """ Returns how many verified tokens a verifier may keep, 0 meaning none.
+    """
+    if value := os.environ.get(Env_Max_Verified_Tokens, ''):
+        out = int(value)
+    else:
+        out = Default_Max_Verified_Tokens
+
+    return out
+
+# ################################################################################################################################
+# ################################################################################################################################
+
 def extract_bearer_token(auth_header:'str') -> 'str':
     """ Returns the token from an Authorization header carrying a case-insensitive Bearer prefix,
     or an empty string if the header does not carry one.
@@ -174,9 +224,18 @@ class BearerTokenVerifier:
     and JWT ones locally against the issuer's JWKS keys, with no per-request calls to the IdP.
     """
 
-    def __init__(self, cache:'CacheAPI') -> 'None':
+    def __init__(self, cache:'CacheAPI', max_verified_tokens:'int | None'=None) -> 'None':
         self.cache = cache
 
+        # Signing keys already built, by their JWKS URL and key ID, so a request needs neither
+        # a round trip to the cache nor a key to be built out of the document ..
+        self._signing_keys:'dict[anytuple, _SigningKey]' = {}
+
+        # .. and tokens already verified, by their digest and what they were verified against,
+        # the least recently used one first.
+        self.max_verified_tokens = get_max_verified_tokens() if max_verified_tokens is None else max_verified_tokens
+        self._verified_tokens:'OrderedDict[anytuple, _VerifiedToken]' = OrderedDict()
+
 # ################################################################################################################################
 
     def verify(self, cid:'str', channel_name:'str', token:'str', config:'BearerTokenVerifyConfig') -> 'anydictnone':
@@ -216,6 +275,17 @@ class BearerTokenVerifier:
     def _verify_jwt(self, cid:'str', channel_name:'str', token:'str', config:'BearerTokenVerifyConfig') -> 'anydictnone':
         """ Verifies a JWT locally - signature via JWKS, expiry, issuer and audience, then the configured claims.
         """
+        # A token verified against the same definition details before needs no signature check,
+        # though the claims are still matched, since they may differ between definitions ..
+        if self.max_verified_tokens:
+            token_key = (sha256(token.encode('utf8')).digest(), config.jwks_url, config.issuer, config.audience)
+
+            if claims := self._get_verified_token(token_key):
+                out = self._match_claims(cid, channel_name, claims, config)
+                return out
+        else:
+            token_key = None
+
         # The header can be read without verification - it names the key and the algorithm ..
         try:
             header = get_unverified_header(token)
@@ -248,9 +318,9 @@ class BearerTokenVerifier:
             return None
 
         # .. find the signing key, refetching the JWKS document if the key is unknown ..
-        key = self._get_signing_key(config.jwks_url, key_id)
+        signing_key = self._get_signing_key(config.jwks_url, key_id)
 
-        if key is None:
+        if signing_key is None:
             logger.info('No JWKS key matches key ID `%s` from `%s`; sec_def=%s; channel=%s; cid=%s',
                 key_id, config.jwks_url, config.sec_def_name, channel_name, cid)
             return None
@@ -259,7 +329,7 @@ class BearerTokenVerifier:
         try:
             claims = jwt_decode(
                 token,
-                key=key,
+                key=signing_key.key,
                 algorithms=[JWT_Algorithm],
                 audience=config.audience,
                 issuer=config.issuer,
@@ -286,10 +356,61 @@ class BearerTokenVerifier:
                 e, config.sec_def_name, channel_name, cid)
             return None
 
-        # .. the signature checks out, so the configured claims are matched last ..
+        # .. the signature checks out, so the token can be remembered until it expires ..
+        if token_key:
+            self._set_verified_token(token_key, claims, (config.jwks_url, key_id), signing_key)
+
+        # .. and the configured claims are matched last.
         out = self._match_claims(cid, channel_name, claims, config)
         return out
 
+# ################################################################################################################################
+
+    def _get_verified_token(self, token_key:'anytuple') -> 'anydictnone':
+        """ Returns the claims of a token verified before, or None if it has not been, or if its claims
+        may not be relied on any longer, because it has expired or its signing key is not the current one.
+        """
+        if not (verified := self._verified_tokens.get(token_key)):
+            return None
+
+        # A token is good only until it expires ..
+        is_valid = verified.expires_at > time()
+
+        # .. and only as long as the key it was verified with is still the one its JWKS document has.
+        if is_valid:
+            signing_key = self._signing_keys.get(verified.signing_key_id)
+            is_valid = signing_key is verified.signing_key and signing_key.expires_at > time()
+
+        if not is_valid:
+            del self._verified_tokens[token_key]
+            return None
+
+        self._verified_tokens.move_to_end(token_key)
+
+        return verified.claims
+
+# ################################################################################################################################
+
+    def _set_verified_token(
+        self,
+        token_key:'anytuple',
+        claims:'stranydict',
+        signing_key_id:'anytuple',
+        signing_key:'_SigningKey',
+        ) -> 'None':
+        """ Remembers the claims of a verified token, evicting the least recently used token if there is no room for it.
+        """
+        if len(self._verified_tokens) >= self.max_verified_tokens:
+            _ = self._verified_tokens.popitem(last=False)
+
+        verified = _VerifiedToken()
+        verified.claims = claims
+        verified.signing_key_id = signing_key_id
+        verified.signing_key = signing_key
+        verified.expires_at = claims['exp']
+
+        self._verified_tokens[token_key] = verified
+
 # ################################################################################################################################
 
     def _match_claims(
@@ -331,31 +452,55 @@ class BearerTokenVerifier:
 
 # ################################################################################################################################
 
-    def _get_signing_key(self, jwks_url:'str', key_id:'str') -> 'any_':
+    def _get_signing_key(self, jwks_url:'str', key_id:'str') -> '_SigningKey | None':
         """ Returns the signing key for the given key ID, refetching the JWKS document
         once if the key is unknown - this is how IdP key rotation is handled without restarts.
         """
-        # Try the cached document first ..
+        signing_key_id = (jwks_url, key_id)
+
+        # A key built recently is used as it is ..
+        if signing_key := self._signing_keys.get(signing_key_id):
+            if signing_key.expires_at > time():
+                return signing_key
+
+        # .. otherwise, try the cached document ..
         document = self._get_jwks_document(jwks_url, force_refetch=False)
-        key = self._find_key(document, key_id)
+        key_data = self._find_key_data(document, key_id)
 
         # .. a key ID the document does not carry may mean the issuer has rotated its keys, so the
         # .. document is fetched again - within the limit that _get_jwks_document keeps.
-        if key is None:
+        if key_data is None:
             document = self._get_jwks_document(jwks_url, force_refetch=True)
-            key = self._find_key(document, key_id)
+            key_data = self._find_key_data(document, key_id)
 
-        return key
+        # A key that is gone from the document is not used any longer ..
+        if key_data is None:
+            _ = self._signing_keys.pop(signing_key_id, None)
+            return None
+
+        # .. while one that is still there is kept for the next requests. If the key has not changed,
+        # .. the same object is reused, which saves building it anew and keeps the tokens verified with it valid.
+        if signing_key and signing_key.key_data == key_data:
+            signing_key.expires_at = time() + Signing_Key_TTL
+            return signing_key
+
+        out = _SigningKey()
+        out.key_data = key_data
+        out.key = PyJWK.from_dict(key_data, algorithm=JWT_Algorithm).key
+        out.expires_at = time() + Signing_Key_TTL
+
+        self._signing_keys[signing_key_id] = out
+
+        return out
 
 # ################################################################################################################################
 
-    def _find_key(self, document:'stranydict', key_id:'str') -> 'any_':
-        """ Returns the key matching the given key ID from a JWKS document, or None if there is no match.
+    def _find_key_data(self, document:'stranydict', key_id:'str') -> 'anydictnone':
+        """ Returns the entry of a JWKS document matching the given key ID, or None if there is no match.
         """
         for key_data in document['keys']:
             if key_data.get('kid') == key_id:
-                jwk = PyJWK.from_dict(key_data, algorithm=JWT_Algorithm)
-                out = jwk.key
+                out = key_data
                 break
         else:
             out = None
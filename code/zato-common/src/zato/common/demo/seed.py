@@ -36,6 +36,7 @@ from zato.common.audit_log.api import event_attr_table, event_body_table, event_
 from zato.common.audit_log.common import alert_table, event_dedup_table
 from zato.common.audit_log.config_audit import record_config_change, record_view_event
 from zato.common.audit_log.dedup import build_dedup_key
+from zato.common.audit_log.search import build_search_row, delete_search_rows, insert_search_rows
 from zato.common.hl7.audit import audit_ack_received, audit_ack_sent, audit_batch_received, audit_message_received, \
     audit_message_sent, get_audit_attrs, ACKStatus
 from zato.common.hl7.feed import generate_feed_items, rewrite_msh_field, FeedConfig, MSH3_Index, MSH4_Index, MSH10_Index
@@ -384,6 +385,7 @@ class _BulkAuditLog(AuditLog):
         attr_rows:'anylist' = []
         body_rows:'anylist' = []
         link_rows:'anylist' = []
+        search_rows:'anylist' = []
 
         for index, pending in enumerate(to_write, start=self.written_count):
 
@@ -392,6 +394,8 @@ class _BulkAuditLog(AuditLog):
             if pending.attrs:
                 attr_rows.extend(self._build_attr_rows(event_id, pending.attrs))
 
+            search_rows.append(build_search_row(connection, event_id, pending.values, pending.attrs))
+
             for kind, body_data in pending.bodies.items():
                 body_rows.append({
                     'event_id': event_id,
@@ -417,6 +421,8 @@ class _BulkAuditLog(AuditLog):
         if link_rows:
             _ = connection.execute(event_link_table.insert(), link_rows)
 
+        insert_search_rows(connection, search_rows)
+
         self.written_count = len(self.pending_events)
 
         return out
@@ -480,6 +486,7 @@ def _delete_demo_rows(connection:'Connection') -> 'None':
     _ = connection.execute(delete(event_body_table).where(event_body_table.c.event_id.in_(demo_event_ids)))
     _ = connection.execute(delete(event_attr_table).where(event_attr_table.c.event_id.in_(demo_event_ids)))
     _ = connection.execute(delete(event_link_table).where(event_link_table.c.child_event_id.in_(demo_event_ids)))
+    delete_search_rows(connection, demo_event_ids)
     _ = connection.execute(delete(event_table).where(event_table.c.cid.like(Cid_Prefix + '%')))
 
     # .. the demo alerts are filed under demo rule names ..
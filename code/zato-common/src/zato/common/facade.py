@@ -17,7 +17,7 @@ from zato.common.api import PubSub
 
 if 0:
     from zato.common.pubsub.sql.backend import PublishResult
-    from zato.common.typing_ import any_, anydict, anydictnone, anylist
+    from zato.common.typing_ import any_, anydict, anydictnone, anylist, strnone
     from zato.server.base.parallel import ParallelServer
 
 # ################################################################################################################################
@@ -121,6 +121,61 @@ class PubSubFacade:
 
         return out
 
+# ################################################################################################################################
+
+    def publish_many(
+        self,
+        topic_name:'str',
+        items:'anylist',
+        *,
+        cid:'strnone'=None,
+    ) -> 'anylist':
+        """ Publishes many messages to a topic at once, all of them in one transaction of the pub/sub database.
+        Each item is a dict with the message's data under 'data' and, optionally, any of the keyword
+        arguments publish accepts. Returns one result per item, in the order of the items.
+        """
+        is_service = topic_name in self.server.service_store.name_to_impl_name
+
+        # Check if the topic_name is actually a known service name ..
+        if is_service:
+            topic_name = self._ensure_service_topic(topic_name)
+
+        # .. service auto-topics always use the built-in backend so the backend registry
+        # .. is consulted only for regular topics ..
+        if not topic_name.startswith(_service_topic_prefix):
+            backend_config = self.server.config_manager.get_pubsub_topic_backend(topic_name)
+
+            # .. AMQP-backed topics go to the broker through their outgoing connection, one message at a time.
+            if backend_config:
+
+                out:'anylist' = []
+
+                for item in items:
+                    item_cid = item.get('cid') or cid or ''
+                    result = self.server.config_manager.pubsub_publish_to_amqp(backend_config, item['data'], topic_name, item_cid)
+                    out.append(result)
+
+                return out
+
+        # .. each message's CID serves as its correlation ID unless the item gives one explicitly,
+        # .. and the publisher is always the calling service ..
+        publish_items:'anylist' = []
+
+        for item in items:
+
+            item = dict(item)
+
+            if item_cid := item.get('cid') or cid:
+                _ = item.setdefault('correl_id', item_cid)
+
+            item['publisher'] = self.service_name
+            publish_items.append(item)
+
+        # .. now, publish all the messages to the topic.
+        out = self.server.pubsub_backend.publish_many(topic_name, publish_items, cid=cid)
+
+        return out
+
 # ################################################################################################################################
 
     def _ensure_service_topic(self, service_name:'str') -> 'str':
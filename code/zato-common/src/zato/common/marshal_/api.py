@@ -7,10 +7,12 @@ Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
 """
 
 # stdlib
-from dataclasses import asdict, _FIELDS, make_dataclass, MISSING, _PARAMS # type: ignore
+from copy import deepcopy
+from dataclasses import dataclass, _FIELDS, fields as dataclass_fields, make_dataclass, MISSING, _PARAMS # type: ignore
 from http.client import BAD_REQUEST
-from inspect import isclass
+from inspect import getattr_static, isclass
 from traceback import extract_stack
+from types import BuiltinFunctionType, CodeType, FunctionType
 from typing import Any
 
 try:
@@ -46,7 +48,8 @@ from zato.common.typing_ import cast_, date_, datetime_, datetimez, extract_from
 
 if 0:
     from dataclasses import Field
-    from zato.common.typing_ import any_, anydict, anylist, boolnone, dictnone, intnone, optional, tuplist
+    from zato.common.typing_ import any_, anydict, anylist, boolnone, callable_, dictnone, intnone, optional, strtuple, \
+        tuplist
     from zato.server.base.parallel import ParallelServer
     from zato.server.service import Service
     boolnone = boolnone
@@ -63,6 +66,21 @@ _None_Type = type(None)
 # ################################################################################################################################
 # ################################################################################################################################
 
+class ModuleCtx:
+
+    # Under what names each model class keeps its compiled deserializer and the names of its fields for serialization
+    From_Dict_Plan_Attr = '_zato_from_dict_plan'
+    To_Dict_Names_Attr = '_zato_to_dict_names'
+
+    # Values that serialization returns as they are, because copying them would return the same objects anyway
+    Atomic_Types = frozenset({
+        _None_Type, bool, int, float, complex, str, bytes, type(Ellipsis), type(NotImplemented),
+        range, property, type, CodeType, FunctionType, BuiltinFunctionType,
+    })
+
+# ################################################################################################################################
+# ################################################################################################################################
+
 def is_list(field_type:'Field', is_class:'bool') -> 'bool':
 
     # Using str is the only reliable method
@@ -182,7 +200,7 @@ class Model(BaseModel):
 
     def to_dict(self):
         try:
-            return asdict(self)
+            return model_to_dict(self)
         except TypeError as e:
             if 'asdict() should be called on dataclass instances' in str(e):
                 stack = extract_stack()
@@ -505,6 +523,531 @@ class FieldCtx:
 # ################################################################################################################################
 # ################################################################################################################################
 
+def _get_elem_path(name:'str', parent:'any_') -> 'str':
+    """ Returns the path to an element for a validation error, in the same format that MarshalAPI.get_validation_error uses.
+    """
+
+    # This will always exist
+    elem_path = [name]
+
+    # Each parent is a tuple of the parent field's name, the state of the dict the field is in, and that field's own parent
+    while parent:
+        parent_name, parent_state, parent = parent
+
+        if parent_state.list_idx is not None:
+            parent_name = '{}[{}]'.format(parent_name, parent_state.list_idx)
+
+        elem_path.append(parent_name)
+
+    # We need to reverse it now to present a top-down view
+    out = '/' + '/'.join(reversed(elem_path))
+    return out
+
+# ################################################################################################################################
+
+def _convert_int(value:'any_') -> 'any_':
+    if not isinstance(value, int):
+        value = int(value)
+    return value
+
+def _convert_date(value:'any_') -> 'any_':
+    if not isinstance(value, date_):
+        value = dt_parse(value).date() # type: ignore
+    return value
+
+def _convert_datetime(value:'any_') -> 'any_':
+    if not isinstance(value, (date_, datetime_, datetimez)):
+        value = dt_parse(value) # type: ignore
+    return value
+
+def _convert_datetimez(value:'any_') -> 'any_':
+    if not isinstance(value, (date_, datetime_, datetimez)):
+        value = dt_parse(value) # type: ignore
+        value = datetimez(
+            year=value.year,
+            month=value.month,
+            day=value.day,
+            hour=value.hour,
+            minute=value.minute,
+            second=value.second,
+            microsecond=value.microsecond,
+            tzinfo=value.tzinfo,
+            fold=value.fold,
+        )
+    return value
+
+def _convert_isotimestamp(value:'any_') -> 'any_':
+    if isinstance(value, str):
+        value = dt_parse(value) # type: ignore
+        value = value.isoformat()
+    return value
+
+# ################################################################################################################################
+
+def _get_converter(field_type:'any_') -> 'callable_ | None':
+    """ Returns what turns input values into the field's type, or None if they are assigned as they are.
+    """
+    if field_type is int:
+        out = _convert_int
+    elif field_type is date_:
+        out = _convert_date
+    elif field_type is datetime_:
+        out = _convert_datetime
+    elif field_type is datetimez:
+        out = _convert_datetimez
+    elif field_type is isotimestamp:
+        out = _convert_isotimestamp
+    else:
+        out = None
+
+    return out
+
+# ################################################################################################################################
+
+def _return_none() -> 'None':
+    return None
+
+def _return_empty_string() -> 'str':
+    return ''
+
+def _get_empty_value_factory(field_type:'any_') -> 'callable_':
+    """ Returns what creates the value of an optional field that has none on input, each call creating a new one.
+    """
+    # This is the most reliable way
+    if 'typing.List' in str(field_type):
+        out = list
+    elif field_type is Any:
+        out = _return_none
+    elif issubclass(field_type, str):
+        out = _return_empty_string
+    elif issubclass(field_type, int):
+        out = int
+    elif issubclass(field_type, list):
+        out = list
+    elif issubclass(field_type, dict):
+        out = dict
+    elif issubclass(field_type, float):
+        out = float
+    else:
+        out = _return_none
+
+    return out
+
+def _get_deferred_empty_value_factory(field_type:'any_') -> 'callable_':
+    """ Returns a factory for a type that the checks in _get_empty_value_factory cannot be run against,
+    which runs them when the value is needed so that they fail exactly when the interpreter's would.
+    """
+    def factory() -> 'any_':
+        return _get_empty_value_factory(field_type)()
+    return factory
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class _FieldKind:
+    Scalar = 0
+    Model = 1
+    List = 2
+
+# ################################################################################################################################
+
+class _DictState:
+    """ The one piece of state of a dict being deserialized that validation errors need -
+    which element of a list it is, or which element of its own list field it is visiting.
+    """
+    __slots__ = ('list_idx',)
+
+    def __init__(self, list_idx:'intnone') -> 'None':
+        self.list_idx = list_idx
+
+# ################################################################################################################################
+
+@dataclass(init=False)
+class _FieldPlan:
+    """ Everything about one field of a model that does not depend on the input, worked out once.
+    """
+    name: 'str'
+    is_required: 'bool'
+    kind: 'int'
+
+    # Turns an input value into the field's type, if the type needs it
+    convert: 'callable_ | None'
+
+    # Whether a list field declares what its elements are, whether or not they are models
+    has_model_class: 'bool'
+
+    # The plan of the model that the field is, or that its list's elements are
+    model_plan: '_ModelPlan | None'
+
+    default: 'any_'
+    default_factory: 'any_'
+
+    # Creates the value of an optional field with none on input
+    get_empty_value: 'callable_'
+
+# ################################################################################################################################
+
+class _ModelPlan:
+    """ A deserializer compiled for one model class. It does exactly what MarshalAPI.from_dict_interpreted does,
+    raising the same validation errors, but everything that depends only on the class, such as which fields
+    are required, lists or nested models, and what their values are converted with, is worked out only once,
+    when the plan is compiled, leaving only what depends on the input to do for each request.
+    """
+
+    def __init__(self, DataClass:'any_') -> 'None':
+        self.DataClass = DataClass
+        self.fields:'list[_FieldPlan]' = []
+
+        # Whether the dataclass defines the __init__method
+        dataclass_params = getattr(DataClass, _PARAMS, None)
+        self.has_init = dataclass_params.init if dataclass_params else False
+
+        # Whether values can go straight to the instances' __dict__, which is what Model.__setattr__ ends up doing
+        # unless a subclass overrides it, the instances have no __dict__ or a field is a descriptor.
+        self.can_update_dict = False
+
+# ################################################################################################################################
+
+    def from_dict(
+        self,
+        service:      'Service',
+        current_dict: 'any_',
+        extra:        'dictnone',
+        list_idx:     'intnone',
+        parent:       'any_',
+        ) -> 'any_':
+
+        state = _DictState(list_idx)
+        attrs = {}
+
+        # Extra data overwrites top-level elements only
+        has_extra = extra and (not parent)
+
+        is_dict = isinstance(current_dict, dict)
+        is_model = (not is_dict) and isinstance(current_dict, Model)
+
+        for field in self.fields:
+
+            name = field.name
+            value = ZatoNotGiven
+
+            # If we have extra data, that will take priority over our regular dict ..
+            if has_extra:
+                value = extra.get(name, ZatoNotGiven) # type: ignore
+
+            # .. otherwise, we look the value up in the current dict or model.
+            if value == ZatoNotGiven:
+                if is_dict:
+                    value = current_dict.get(name, ZatoNotGiven)
+                elif is_model:
+                    value = getattr(current_dict, name, ZatoNotGiven)
+
+            # If this field has a value, we can try to parse it into a specific type, unless it is a table
+            if field.convert:
+                if (not isinstance(value, Table)) and value and (value != ZatoNotGiven):
+                    try:
+                        value = field.convert(value)
+                    except Exception as e:
+                        msg = f'Value `{repr(value)}` of field {name} could not be parsed -> {e} -> {current_dict}'
+                        raise Exception(msg)
+
+            kind = field.kind
+
+            # A nested model needs a dict or a model to extract its fields from ..
+            if kind == _FieldKind.Model:
+                if not isinstance(value, (dict, BaseModel)):
+                    raise ElementMissing(_get_elem_path(name, parent))
+
+                value = field.model_plan.from_dict(service, value, None, state.list_idx, (name, state, parent)) # type: ignore
+
+            # .. while a list is checked and, if its elements are models, each of them is visited.
+            elif kind == _FieldKind.List:
+
+                # Lists that do not declare what their elements are have their values assigned as they are
+                if field.has_model_class:
+
+                    if value and value != ZatoNotGiven:
+
+                        if field.is_required:
+                            if not isinstance(value, list):
+                                raise ElementIsNotAList(_get_elem_path(name, parent))
+
+                        if model_plan := field.model_plan:
+                            field_parent = (name, state, parent)
+                            elems = []
+
+                            for idx, elem in enumerate(value):
+                                state.list_idx = idx
+                                elems.append(model_plan.from_dict(service, elem, None, idx, field_parent))
+
+                            value = elems
+
+                    # An empty value, which may also be one returned by a default factory, is taken from
+                    # the current dict as it is, but only if the dict has this name in the first place.
+                    elif name in current_dict:
+
+                        list_value = current_dict[name]
+
+                        if field.is_required:
+                            if not isinstance(list_value, list):
+                                raise ElementIsNotAList(_get_elem_path(name, parent))
+
+                        value = list_value
+
+            # If we do not have a value yet, perhaps we will find a default one ..
+            if value == ZatoNotGiven:
+
+                if field.default is not MISSING:
+                    value = field.default
+
+                elif field.default_factory and field.default_factory is not MISSING:
+                    value = field.default_factory()
+
+            # .. and if not, the field is either missing or it gets an empty value.
+            if value == ZatoNotGiven:
+                if field.is_required:
+                    raise ElementMissing(_get_elem_path(name, parent))
+                else:
+                    value = field.get_empty_value()
+
+            attrs[name] = value
+
+        DataClass = self.DataClass
+
+        # Create a new instance, potentially with attributes ..
+        if self.has_init:
+            instance = DataClass(**attrs) # type: Model
+
+        # .. or add them to one in case __init__ was not defined ..
+        else:
+            instance = DataClass()
+
+            if self.can_update_dict:
+                instance.__dict__.update(attrs)
+            else:
+                for name, value in attrs.items():
+                    setattr(instance, name, value)
+
+        # .. run the post-creation hook ..
+        if instance.after_created:
+
+            ctx = ModelCtx()
+            ctx.service = service
+            ctx.data = current_dict
+            ctx.DataClass = DataClass
+
+            instance.after_created(ctx)
+
+        # .. and return the new dataclass to our caller.
+        return instance
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def _set_class_attr(class_:'any_', name:'str', value:'any_') -> 'None':
+    try:
+        setattr(class_, name, value)
+    except (AttributeError, TypeError):
+        pass # Built-in types cannot be given attributes
+
+# ################################################################################################################################
+
+def _can_update_dict(DataClass:'any_', names:'strtuple') -> 'bool':
+
+    if not issubclass(DataClass, Model):
+        return False
+
+    if DataClass.__setattr__ is not Model.__setattr__:
+        return False
+
+    for class_ in DataClass.__mro__:
+        if '__slots__' in vars(class_) and class_ is not object:
+            return False
+
+    for name in names:
+        class_attr = getattr_static(DataClass, name, None)
+        if hasattr(type(class_attr), '__set__') or hasattr(type(class_attr), '__delete__'):
+            return False
+
+    return True
+
+# ################################################################################################################################
+
+def _compile_model_plan(DataClass:'any_', in_progress:'dict[any_, _ModelPlan]') -> '_ModelPlan':
+    """ Compiles a plan for a model class and, recursively, for all the models it contains.
+    Raises an exception if any of them cannot be compiled.
+    """
+
+    # A model that contains itself, directly or not, is already being compiled ..
+    if plan := in_progress.get(DataClass):
+        return plan
+
+    # .. while other models may have been compiled before ..
+    if (plan := vars(DataClass).get(ModuleCtx.From_Dict_Plan_Attr)) is not None:
+        if plan is False:
+            raise Exception(f'Model `{DataClass}` cannot be compiled')
+        return plan
+
+    # .. and if not, this one is compiled now.
+    plan = _ModelPlan(DataClass)
+    in_progress[DataClass] = plan
+
+    field_items = sorted(getattr(DataClass, _FIELDS).items())
+
+    for _ignored_name, _field in field_items:
+
+        # Assume we are required ..
+        is_required = True
+
+        # Use this by default ..
+        field_type = _field.type
+
+        # .. unless it is a union with None = this field is really optional[type_]
+        if is_union(_field.type):
+            _, field_type, union_with = extract_from_union(_field.type)
+            is_required = union_with is not _None_Type
+
+        # These are the same checks that FieldCtx.init runs for each field of each input dict
+        is_class = isclass(_field.type)
+        is_model = is_class and issubclass(_field.type, Model)
+        _is_list = is_list(_field.type, is_class) # type: ignore
+
+        model_class = None
+        contains_model = False
+
+        if _is_list:
+            model_class = extract_model_class(_field.type)
+            contains_model = bool(model_class and hasattr(model_class, _FIELDS))
+
+        field = _FieldPlan()
+        field.name = _field.name
+        field.is_required = is_required
+        field.convert = _get_converter(field_type)
+        field.has_model_class = bool(model_class)
+        field.model_plan = None
+        field.default = _field.default
+        field.default_factory = _field.default_factory
+
+        if is_model:
+            field.kind = _FieldKind.Model
+            field.model_plan = _compile_model_plan(_field.type, in_progress)
+
+        elif _is_list:
+            field.kind = _FieldKind.List
+            if contains_model:
+                field.model_plan = _compile_model_plan(model_class, in_progress)
+
+        else:
+            field.kind = _FieldKind.Scalar
+
+        try:
+            field.get_empty_value = _get_empty_value_factory(field_type)
+        except Exception:
+            field.get_empty_value = _get_deferred_empty_value_factory(field_type)
+
+        plan.fields.append(field)
+
+    plan.can_update_dict = _can_update_dict(DataClass, tuple(field.name for field in plan.fields))
+
+    return plan
+
+# ################################################################################################################################
+
+def get_model_plan(DataClass:'any_') -> '_ModelPlan | None':
+    """ Returns the deserializer compiled for a model class, compiling it the first time it is needed,
+    or None if the class cannot be compiled, in which case the interpreter deserializes it.
+    """
+    if not isclass(DataClass):
+        return None
+
+    # Only a plan of the class itself counts, not one that it inherited from its base class
+    plan = vars(DataClass).get(ModuleCtx.From_Dict_Plan_Attr)
+
+    if plan is None:
+
+        in_progress:'dict[any_, _ModelPlan]' = {}
+
+        try:
+            plan = _compile_model_plan(DataClass, in_progress)
+        except Exception:
+            plan = False
+            _set_class_attr(DataClass, ModuleCtx.From_Dict_Plan_Attr, plan)
+        else:
+            for class_, class_plan in in_progress.items():
+                _set_class_attr(class_, ModuleCtx.From_Dict_Plan_Attr, class_plan)
+
+    return plan or None
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def _get_field_names(class_:'any_') -> 'strtuple | None':
+    """ Returns the names of the fields that serialization covers, or None if the class is not a dataclass.
+    """
+    if (out := vars(class_).get(ModuleCtx.To_Dict_Names_Attr)) is None:
+
+        if not hasattr(class_, _FIELDS):
+            return None
+
+        out = tuple(field.name for field in dataclass_fields(class_))
+        _set_class_attr(class_, ModuleCtx.To_Dict_Names_Attr, out)
+
+    return out
+
+# ################################################################################################################################
+
+def _to_dict_value(value:'any_') -> 'any_':
+    """ Serializes a value the way dataclasses.asdict does, looking up the names of each class's fields only once.
+    """
+    value_type = type(value)
+
+    if value_type in ModuleCtx.Atomic_Types:
+        return value
+
+    # Plain lists and dicts are the most common containers and they cannot be dataclasses at the same time
+    if value_type is list:
+        return [_to_dict_value(elem) for elem in value]
+
+    if value_type is dict:
+        return {_to_dict_value(key): _to_dict_value(elem) for key, elem in value.items()}
+
+    if (names := _get_field_names(value_type)) is not None:
+        return {name: _to_dict_value(getattr(value, name)) for name in names}
+
+    # Named tuples are created from positional arguments ..
+    if isinstance(value, tuple) and hasattr(value, '_fields'):
+        return value_type(*[_to_dict_value(elem) for elem in value])
+
+    # .. while other lists and tuples are created from iterables ..
+    if isinstance(value, (list, tuple)):
+        return value_type(_to_dict_value(elem) for elem in value)
+
+    # .. and dicts from their items, except for defaultdict instances, which need their factories too.
+    if isinstance(value, dict):
+        if hasattr(value_type, 'default_factory'):
+            out = value_type(value.default_factory)
+            for key, elem in value.items():
+                out[_to_dict_value(key)] = _to_dict_value(elem)
+            return out
+
+        return value_type((_to_dict_value(key), _to_dict_value(elem)) for key, elem in value.items())
+
+    return deepcopy(value)
+
+# ################################################################################################################################
+
+def model_to_dict(instance:'any_') -> 'anydict':
+    """ Returns a dataclass instance as a dict, the same one that dataclasses.asdict returns.
+    """
+    if (names := _get_field_names(type(instance))) is None:
+        raise TypeError('asdict() should be called on dataclass instances')
+
+    out = {name: _to_dict_value(getattr(instance, name)) for name in names}
+    return out
+
+# ################################################################################################################################
+# ################################################################################################################################
+
 class MarshalAPI:
 
     def __init__(self):
@@ -590,6 +1133,28 @@ class MarshalAPI:
         parent:       'optional[FieldCtx]' = None
         ) -> 'any_':
 
+        # A model is deserialized by the plan compiled for its class, which also deserializes all the models
+        # it contains, so a parent field on input means that the call comes from the interpreter itself ..
+        if parent is None:
+            if plan := get_model_plan(DataClass):
+                return plan.from_dict(service, current_dict, extra, list_idx, None)
+
+        # .. which is also what deserializes classes that could not be compiled.
+        return self.from_dict_interpreted(service, current_dict, DataClass, extra, list_idx, parent)
+
+# ################################################################################################################################
+
+    def from_dict_interpreted(
+        self,
+        service:      'Service',
+        current_dict: 'anydict | BaseModel',
+        DataClass:    'any_',
+        extra:        'dictnone' = None,
+        list_idx:     'intnone'  = None,
+        parent:       'optional[FieldCtx]' = None
+        ) -> 'any_':
+        """ Deserializes a dict into a model field by field, inspecting the definition of each field as it goes.
+        """
         dict_ctx = DictCtx(service, current_dict, DataClass, extra, list_idx, parent)
         dict_ctx.init()
 
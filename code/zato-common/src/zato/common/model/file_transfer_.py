@@ -6,6 +6,12 @@ Copyright (C) 2026, Zato Source s.r.o. https://zato.io
 Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
 """
 
+# stdlib
+from io import BytesIO
+
+# gevent
+from gevent.fileobject import FileObjectThread
+
 # Zato
 from zato.common.typing_ import dataclass
 
@@ -13,7 +19,7 @@ from zato.common.typing_ import dataclass
 # ################################################################################################################################
 
 if 0:
-    from zato.common.typing_ import stranydict
+    from zato.common.typing_ import any_, bytesnone, stranydict
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -101,7 +107,8 @@ class FileTransferSchedule:
 
 class FileTransferItem:
     """ A single file received by a file transfer schedule, handed over to the service the schedule invokes -
-    one instance per file.
+    one instance per file. A file that the schedule spooled to the local disk is read in from there only
+    if the service asks for its data - a service that streams it through self.open never holds it in memory.
     """
 
     def __init__(
@@ -114,7 +121,8 @@ class FileTransferItem:
         full_path:'str',
         size:'int',
         last_modified:'str',
-        data:'bytes',
+        data:'bytesnone' = None,
+        local_path:'str' = '',
         ) -> 'None':
 
         # Where the file came from
@@ -128,7 +136,37 @@ class FileTransferItem:
         self.full_path = full_path
         self.size = size
         self.last_modified = last_modified
-        self.data = data
+
+        # The file's bytes, unless they are only in the local spool file, which exists until the service returns
+        self._data = data
+        self.local_path = local_path
+
+# ################################################################################################################################
+
+    @property
+    def data(self) -> 'bytes':
+
+        # A spooled file is read in on first use, in a separate thread so as not to block the event loop
+        if self._data is None:
+            thread_file = FileObjectThread(self.local_path, 'rb')
+            self._data = thread_file.read()
+            thread_file.close()
+
+        return self._data
+
+# ################################################################################################################################
+
+    def open(self) -> 'any_':
+        """ Returns the file as a binary file object, to be read in chunks and closed by the caller.
+        """
+        if self._data is None:
+            out = FileObjectThread(self.local_path, 'rb')
+        else:
+            out = BytesIO(self._data)
+
+        return out
+
+# ################################################################################################################################
 
     def __repr__(self) -> 'str':
         class_name = self.__class__.__name__
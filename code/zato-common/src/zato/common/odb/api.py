@@ -58,7 +58,7 @@ if 0:
     from sqlalchemy.orm import Session as SASession
     from zato.common.crypto.api import CryptoManager
     from zato.common.odb.model import Cluster as ClusterModel, Server as ServerModel
-    from zato.common.typing_ import any_, anylistnone, anyset, callable_, commondict, strdict, strdictnone
+    from zato.common.typing_ import any_, anylist, anylistnone, anyset, callable_, commondict, intnone, strdict, strdictnone
     from zato.server.base.parallel import ParallelServer
 
 # ################################################################################################################################
@@ -75,6 +75,11 @@ unittest_fs_sql_config = {
 
 # ################################################################################################################################
 
+# How many rows a streamed query fetches from the database at a time when its caller does not say otherwise
+Default_Stream_Batch_Size = 1000
+
+# ################################################################################################################################
+
 ServiceTable = Service.__table__
 ServiceTableInsert = ServiceTable.insert
 
@@ -188,6 +193,40 @@ class SessionWrapper:
         self.is_sqlite = self.pool.engine and self.pool.engine.name == 'sqlite'
         self.is_oracle_db = self.pool.engine and self.pool.engine.name.startswith('oracle')
 
+    def _record_statement(
+        self,
+        query:'str',
+        cid:'str',
+        start:'float',
+        *,
+        is_ok:'bool',
+        params:'any_' = None,
+        rows:'anylistnone' = None,
+        row_count:'intnone' = None,
+        batch_size:'intnone' = None,
+        error:'str' = '',
+        ) -> 'None':
+        """ Puts one statement on record - its own content only where the connection opted in,
+        its completion with the outcome and duration always.
+        """
+        duration_ms = int((monotonic() - start) * 1000)
+
+        if is_ok:
+            outcome = AuditOutcome.OK
+        else:
+            outcome = AuditOutcome.Error
+
+        # The statement's own content is on record only where the connection opted in ..
+        if self.sql_audit_level != SQL_Audit_Off:
+            _ = record_sql_execution(self.audit_log, self.config['name'], self.sql_audit_level, query,
+                cid=cid, endpoint=self.sql_audit_endpoint, outcome=outcome,
+                params=params, rows=rows, row_count=row_count, batch_size=batch_size, duration_ms=duration_ms, error=error)
+
+        # .. while the completing event with the outcome and duration is always written -
+        # it is what the alerting collectors measure.
+        record_remote_call(self.audit_log, AuditSource.SQL_Outgoing, self.config['name'],
+            cid=cid, is_ok=is_ok, duration_ms=duration_ms, endpoint=self.sql_audit_endpoint)
+
     def execute(self, query:'str', params:'strdictnone'=None) -> 'any_':
 
         # A wrapper with no writer attached - the ODB's own - runs statements as it always did
@@ -204,32 +243,10 @@ class SessionWrapper:
         try:
             out = self._execute(query, params)
         except Exception:
-            duration_ms = int((monotonic() - start) * 1000)
-
-            # The statement's own content is on record only where the connection opted in ..
-            if self.sql_audit_level != SQL_Audit_Off:
-                _ = record_sql_execution(self.audit_log, self.config['name'], self.sql_audit_level, query,
-                    cid=cid, endpoint=self.sql_audit_endpoint, outcome=AuditOutcome.Error,
-                    params=params, duration_ms=duration_ms, error=format_exc())
-
-            # .. while the completing event with the outcome and duration is always written -
-            # it is what the alerting collectors measure.
-            record_remote_call(self.audit_log, AuditSource.SQL_Outgoing, self.config['name'],
-                cid=cid, is_ok=False, duration_ms=duration_ms, endpoint=self.sql_audit_endpoint)
+            self._record_statement(query, cid, start, is_ok=False, params=params, error=format_exc())
             raise
 
-        duration_ms = int((monotonic() - start) * 1000)
-
-        # The statement's own content is on record only where the connection opted in ..
-        if self.sql_audit_level != SQL_Audit_Off:
-            _ = record_sql_execution(self.audit_log, self.config['name'], self.sql_audit_level, query,
-                cid=cid, endpoint=self.sql_audit_endpoint, outcome=AuditOutcome.OK,
-                params=params, rows=out, duration_ms=duration_ms)
-
-        # .. while the completing event with the outcome and duration is always written -
-        # it is what the alerting collectors measure.
-        record_remote_call(self.audit_log, AuditSource.SQL_Outgoing, self.config['name'],
-            cid=cid, is_ok=True, duration_ms=duration_ms, endpoint=self.sql_audit_endpoint)
+        self._record_statement(query, cid, start, is_ok=True, params=params, rows=out)
 
         return out
 
@@ -241,6 +258,83 @@ class SessionWrapper:
             result = [dict(zip(column_names, row)) for row in result] # type: ignore
             return result
 
+    def stream(self, query:'str', params:'strdictnone'=None, batch_size:'int'=Default_Stream_Batch_Size) -> 'any_':
+        """ Runs a query through a server-side cursor, where the driver has one, and yields its rows one by one
+        while fetching them from the database batch_size at a time - e.g. for row in self.out.sql['My DB'].stream(query): ...
+        Each row is a tuple whose columns can also be read by name, so no list of dicts for the whole result
+        is ever built. The statement is recorded once the caller is done with it, with how many rows it read.
+        """
+
+        # The statement event and the completion event of one statement pair up on this id
+        cid = new_cid_server()
+
+        start = monotonic()
+        row_count = 0
+
+        with closing(self.session()) as session:
+
+            # A failed statement is recorded too, before the caller learns about it ..
+            try:
+                result = session.execute(query, params, execution_options={'stream_results': True})
+
+                for batch in result.partitions(batch_size):
+                    row_count += len(batch)
+                    yield from batch
+
+            except GeneratorExit:
+
+                # .. whereas a caller that stopped reading early simply did not need the rest of the rows.
+                if self.audit_log:
+                    self._record_statement(query, cid, start, is_ok=True, params=params, row_count=row_count)
+                raise
+
+            except Exception:
+                if self.audit_log:
+                    self._record_statement(query, cid, start, is_ok=False, params=params, row_count=row_count,
+                        error=format_exc())
+                raise
+
+        if self.audit_log:
+            self._record_statement(query, cid, start, is_ok=True, params=params, row_count=row_count)
+
+    def execute_many(self, query:'str', param_list:'anylist') -> 'int':
+        """ Runs one statement for each set of parameters in a single round of the driver's executemany,
+        which is what lets drivers with a bulk path, e.g. multi-row VALUES, use it. The whole batch
+        is committed as one transaction and recorded as one statement, with the size of the batch,
+        a sample of its parameters and the number of rows it affected. Returns the number of rows
+        the driver says were affected, which is -1 for drivers that do not report it.
+        """
+
+        # An empty batch has nothing to run - and an empty list would make the statement run once without parameters
+        if not param_list:
+            return 0
+
+        # The statement event and the completion event of one batch pair up on this id
+        cid = new_cid_server()
+
+        start = monotonic()
+        batch_size = len(param_list)
+
+        # A failed batch is recorded too, before the caller learns about it, and nothing of it is committed
+        try:
+            with closing(self.session()) as session:
+                result = session.execute(query, param_list)
+                session.commit()
+                out = result.rowcount
+        except Exception:
+            if self.audit_log:
+                self._record_statement(query, cid, start, is_ok=False, params=param_list, batch_size=batch_size,
+                    error=format_exc())
+            raise
+
+        # A driver that does not report how many rows were affected leaves the count out of the record
+        if self.audit_log:
+            row_count = out if out >= 0 else None
+            self._record_statement(query, cid, start, is_ok=True, params=param_list, row_count=row_count,
+                batch_size=batch_size)
+
+        return out
+
     def ping(self, fs_sql_config:'any_') -> 'any_':
         """ Pings the database the pool's own way, putting the ping on record like
         any other statement when this connection is audited.
@@ -268,32 +362,10 @@ class SessionWrapper:
         try:
             out = self.pool.ping(fs_sql_config)
         except Exception:
-            duration_ms = int((monotonic() - start) * 1000)
-
-            # The ping's own statement is on record only where the connection opted in ..
-            if self.sql_audit_level != SQL_Audit_Off:
-                _ = record_sql_execution(self.audit_log, self.config['name'], self.sql_audit_level, query,
-                    cid=cid, endpoint=self.sql_audit_endpoint, outcome=AuditOutcome.Error,
-                    duration_ms=duration_ms, error=format_exc())
-
-            # .. while the completing event with the outcome and duration is always written -
-            # it is what the alerting collectors measure.
-            record_remote_call(self.audit_log, AuditSource.SQL_Outgoing, self.config['name'],
-                cid=cid, is_ok=False, duration_ms=duration_ms, endpoint=self.sql_audit_endpoint)
+            self._record_statement(query, cid, start, is_ok=False, error=format_exc())
             raise
 
-        duration_ms = int((monotonic() - start) * 1000)
-
-        # The ping's own statement is on record only where the connection opted in ..
-        if self.sql_audit_level != SQL_Audit_Off:
-            _ = record_sql_execution(self.audit_log, self.config['name'], self.sql_audit_level, query,
-                cid=cid, endpoint=self.sql_audit_endpoint, outcome=AuditOutcome.OK,
-                duration_ms=duration_ms)
-
-        # .. while the completing event with the outcome and duration is always written -
-        # it is what the alerting collectors measure.
-        record_remote_call(self.audit_log, AuditSource.SQL_Outgoing, self.config['name'],
-            cid=cid, is_ok=True, duration_ms=duration_ms, endpoint=self.sql_audit_endpoint)
+        self._record_statement(query, cid, start, is_ok=True)
 
         return out
 
@@ -1322,6 +1322,9 @@ class PubSubSubscription(Base):
     # This is equivalent to service.name but cannot be turned into a foreing key
     push_service_name = Column(String(400), nullable=True)
 
+    # How many messages a REST push subscriber may have outstanding at once - None means one at a time
+    rest_push_max_in_flight = Column(Integer, nullable=True)
+
     # Not used by the DB
     topic_name_list = None
     topic_link_list = None
@@ -954,6 +954,7 @@ def _pubsub_subscription(session, cluster_id):
         PubSubSubscription.delivery_type,
         PubSubSubscription.push_type,
         PubSubSubscription.rest_push_endpoint_id,
+        PubSubSubscription.rest_push_max_in_flight,
         PubSubSubscription.push_service_name,
         PubSubTopic.name.label('topic_name'),
         PubSubSubscriptionTopic.is_pub_enabled,
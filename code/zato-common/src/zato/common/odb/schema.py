@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# Schema evolution for the ODB - an ODB is built once, by create_all when its cluster is created,
+# so tables whose declarations gained columns since then learn about them here, each time a server starts.
+
+# stdlib
+from logging import getLogger
+
+# Zato
+from zato.common.db_env.schema import ensure_columns
+from zato.common.odb.model import PubSubSubscription
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if 0:
+    from sqlalchemy.engine import Engine
+
+    # Dummy assignments to satisfy type checkers
+    Engine = Engine
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+logger = getLogger(__name__)
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+# The ODB tables that have gained columns since they were first released
+_evolved_tables = [
+    PubSubSubscription.__table__,
+]
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def ensure_odb_columns(engine:'Engine | None') -> 'None':
+    """ Adds to the tables of an existing ODB any columns their declarations have gained since it was created.
+    """
+
+    # There is nothing to evolve without an engine, e.g. when the ODB's driver is not available
+    if not engine:
+        return
+
+    for table in _evolved_tables:
+
+        # Servers of one cluster start together and another one may have just added the same column ..
+        try:
+            ensure_columns(engine, table)
+        except Exception as e:
+            logger.info('Could not evolve ODB table `%s`, checking again -> %s', table.name, e)
+
+            # .. in which case there is nothing left to add by now, and if there still is, the error is a real one.
+            ensure_columns(engine, table)
+
+# ################################################################################################################################
+# ################################################################################################################################
@@ -17,6 +17,7 @@ from zato.common.api import PubSub
 from zato.common.pubsub.sql.browse import SQLBrowseAPI
 from zato.common.pubsub.sql.config import get_batch_size
 from zato.common.pubsub.sql.schema import delivery_table, message_table, topic_sub_table
+from zato.common.pubsub.sql.sub_index import bump_sub_version
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -506,6 +507,14 @@ class SQLAdminAPI(SQLBrowseAPI):
         with self.engine.begin() as connection:
             result = connection.execute(update_statement)
 
+            # Every process keeping a copy of the subscriptions needs to learn of the ones that moved
+            if result.rowcount:
+                version = bump_sub_version(connection)
+
+        if result.rowcount:
+            if sub_index := self.sub_index:
+                sub_index.rename_topic(old_topic_name, new_topic_name, version)
+
         logger.info('rename_topic -> old:%s, new:%s, subscribers_updated:%d',
             old_topic_name, new_topic_name, result.rowcount)
 
@@ -564,6 +573,14 @@ class SQLAdminAPI(SQLBrowseAPI):
         with self.engine.begin() as connection:
             result = connection.execute(delete_statement)
 
+            # Every process keeping a copy of the subscriptions needs to learn of the ones that are gone
+            if result.rowcount:
+                version = bump_sub_version(connection)
+
+        if result.rowcount:
+            if sub_index := self.sub_index:
+                sub_index.delete_topic(topic_name, version)
+
         logger.info('delete_topic -> topic_name:%s, subscribers_removed:%d', topic_name, result.rowcount)
 
 # ################################################################################################################################
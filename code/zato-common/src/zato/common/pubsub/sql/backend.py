@@ -22,6 +22,7 @@ from zato.common.marshal_.api import Model
 from zato.common.pubsub.sql.admin import SQLAdminAPI
 from zato.common.pubsub.sql.config import get_batch_size
 from zato.common.pubsub.sql.schema import delivery_table, message_table, topic_sub_table
+from zato.common.pubsub.sql.sub_index import bump_sub_version
 from zato.common.util.api import new_msg_id, utcnow
 from zato.common.util.time_ import datetime_to_ms
 from zato.server.metrics import zato_pubsub_messages_delivered_total, zato_pubsub_messages_published_total
@@ -30,7 +31,11 @@ from zato.server.metrics import zato_pubsub_messages_delivered_total, zato_pubsu
 # ################################################################################################################################
 
 if 0:
-    from zato.common.typing_ import any_, anydict, anylist, intlist, strnone
+    from sqlalchemy.engine import Connection
+    from zato.common.typing_ import any_, anydict, anylist, intlist, strintdict, strlist, strlistdict, strnone, strset
+
+    # Dummy assignments to satisfy type checkers
+    Connection = Connection
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -49,6 +54,9 @@ _data_preview_len     = PubSub.Message.Data_Preview_Len
 # One second expressed in milliseconds.
 _milliseconds_per_second = 1000
 
+# How many msg_ids one lookup asks about at most - Oracle DB accepts no longer IN lists.
+_max_lookup_size = 1000
+
 # ################################################################################################################################
 # ################################################################################################################################
 
@@ -86,6 +94,11 @@ _fetch_query = _fetch_query.where(and_(
 _fetch_query = _fetch_query.order_by(delivery_table.c.priority.desc(), delivery_table.c.message_id.asc())
 _fetch_query = _fetch_query.limit(bindparam('fetch_max_messages'))
 
+# Messages published together learn their primary keys from their public identifiers.
+_message_row_id_query = select(message_table.c.id, message_table.c.msg_id)
+_message_row_id_query = _message_row_id_query.where(
+    message_table.c.msg_id.in_(bindparam('lookup_msg_ids', expanding=True)))
+
 # ################################################################################################################################
 # ################################################################################################################################
 
@@ -93,6 +106,21 @@ _fetch_query = _fetch_query.limit(bindparam('fetch_max_messages'))
 class PublishResult:
     msg_id: 'str'
 
+# ################################################################################################################################
+
+@dataclass(init=False)
+class PreparedMessage:
+    """ One message ready to be written - its row and the payload as it was before any encryption at rest.
+    """
+    values: 'anydict'
+    serialized_data: 'str'
+
+# ################################################################################################################################
+
+# Type aliases
+prepared_message_list = list[PreparedMessage]
+publish_result_list = list[PublishResult]
+
 # ################################################################################################################################
 # ################################################################################################################################
 
@@ -118,7 +146,92 @@ class SQLPubSubBackend(SQLAdminAPI):
         pub_time:'strnone'=None,
         cid:'strnone'=None,
     ) -> 'PublishResult':
-        """ Publish a message to a topic.
+        """ Publish a message to a topic. With group commit on, the message is committed
+        along with whatever other greenlets publish at the same time, and the call returns
+        once that shared transaction is committed.
+        """
+        message = self._prepare_message(
+            topic_name,
+            data,
+            priority=priority,
+            expiration=expiration,
+            correl_id=correl_id,
+            in_reply_to=in_reply_to,
+            ext_client_id=ext_client_id,
+            publisher=publisher,
+            pub_time=pub_time,
+            cid=cid,
+        )
+
+        if self.group_committer:
+            self.group_committer.submit(message)
+        else:
+            self._publish_prepared([message])
+
+        out = PublishResult()
+        out.msg_id = message.values['msg_id']
+
+        return out
+
+# ################################################################################################################################
+
+    def publish_many(
+        self,
+        topic_name:'str',
+        items:'anylist',
+        *,
+        publisher:'strnone'=None,
+        cid:'strnone'=None,
+    ) -> 'publish_result_list':
+        """ Publish many messages to a topic in one transaction. Each item is a dict with the message's data
+        under 'data' and, optionally, any of the keyword arguments publish accepts, which take precedence
+        over the publisher and cid given here. Returns one result per item, in the order of the items.
+        """
+        messages:'prepared_message_list' = []
+
+        for item in items:
+
+            options = dict(item)
+            data = options.pop('data')
+
+            if publisher is not None:
+                _ = options.setdefault('publisher', publisher)
+
+            if cid is not None:
+                _ = options.setdefault('cid', cid)
+
+            message = self._prepare_message(topic_name, data, **options)
+            messages.append(message)
+
+        if messages:
+            self._publish_prepared(messages)
+
+        out:'publish_result_list' = []
+
+        for message in messages:
+            result = PublishResult()
+            result.msg_id = message.values['msg_id']
+            out.append(result)
+
+        return out
+
+# ################################################################################################################################
+
+    def _prepare_message(
+        self,
+        topic_name:'str',
+        data:'any_',
+        *,
+        priority:'int'=_default_priority,
+        expiration:'int'=_default_expiration,
+        correl_id:'strnone'=None,
+        in_reply_to:'strnone'=None,
+        ext_client_id:'strnone'=None,
+        publisher:'strnone'=None,
+        pub_time:'strnone'=None,
+        cid:'strnone'=None,
+    ) -> 'PreparedMessage':
+        """ Builds the row of one message about to be published, everything but its subscribers included.
         """
 
         # Normalize topic name to lowercase for case-insensitivity ..
@@ -171,8 +284,11 @@ class SQLPubSubBackend(SQLAdminAPI):
             payload = serialized_data
             payload_encrypted = False
 
-        # .. build the message row, with optional values stored as NULLs ..
-        message_values:'anydict' = {
+        # .. and build the message row, with optional values stored as NULLs.
+        out = PreparedMessage()
+        out.serialized_data = serialized_data
+
+        out.values = {
             'msg_id': message_id,
             'topic_name': topic_name,
             'payload': payload,
@@ -194,87 +310,162 @@ class SQLPubSubBackend(SQLAdminAPI):
             'ext_client_id': ext_client_id,
         }
 
-        # .. one transaction inserts the message and its delivery rows ..
+        return out
+
+# ################################################################################################################################
+
+    def _publish_prepared(self, messages:'prepared_message_list') -> 'None':
+        """ Writes prepared messages, possibly of many topics, in one transaction along with
+        their delivery rows, and then does everything that follows a commit.
+        """
+
+        # One transaction inserts the messages and their delivery rows ..
         with self.engine.begin() as connection:
+            subscriber_keys = self._insert_messages(connection, messages)
+
+        # .. wake up the subscribers now that the transaction is committed ..
+        if subscriber_keys:
+            self.notify_sub_keys(subscriber_keys)
+
+        # .. give the subscribers just woken up a chance to run ..
+        self._yield_after_write()
+
+        # .. and record each message in the logs, the audit log and the metrics.
+        message_count = len(messages)
+
+        if message_count == 1:
+            message_values = messages[0].values
+            logger.info('Published message -> msg_id:%s, topic_name:%s, subscriber_count:%d',
+                message_values['msg_id'], message_values['topic_name'], len(subscriber_keys))
+        else:
+            logger.info('Published messages -> message_count:%d, subscriber_count:%d', message_count, len(subscriber_keys))
 
-            # .. the subscribers as of this very publication ..
-            subscriber_keys = self._get_subscriber_keys(connection, topic_name)
+        for message in messages:
+            self._after_publish(message)
+
+# ################################################################################################################################
+
+    def _insert_messages(self, connection:'Connection', messages:'prepared_message_list') -> 'strlist':
+        """ Inserts message rows and one delivery row per message and subscriber, within the caller's transaction.
+        Returns the keys of all the subscribers that received anything.
+        """
+
+        # Each topic's subscribers are read once, no matter how many of its messages there are ..
+        subscriber_keys_by_topic:'strlistdict' = {}
+
+        for message in messages:
+            topic_name = message.values['topic_name']
+            if topic_name not in subscriber_keys_by_topic:
+                subscriber_keys_by_topic[topic_name] = self._get_subscriber_keys(connection, topic_name)
+
+        # .. with no subscribers, a payload is dropped immediately ..
+        for message in messages:
+            topic_name = message.values['topic_name']
+            if not subscriber_keys_by_topic[topic_name]:
+                message.values['payload'] = None
+                message.values['payload_encrypted'] = False
+
+        # .. a single message learns its id from the insert itself ..
+        if len(messages) == 1:
 
-            # .. with no subscribers the payload is dropped immediately ..
-            if not subscriber_keys:
-                message_values['payload'] = None
-                message_values['payload_encrypted'] = False
+            message_values = messages[0].values
 
             insert_statement = message_table.insert().values(**message_values)
             result = connection.execute(insert_statement)
 
             primary_key = result.inserted_primary_key
-            message_row_id = primary_key[0]
+            message_row_ids = {message_values['msg_id']: primary_key[0]}
 
-            # .. one delivery row per subscriber ..
-            if subscriber_keys:
+        # .. while many go in with one executemany and learn their ids through their unique msg_id.
+        else:
+            message_rows = [message.values for message in messages]
+            _ = connection.execute(message_table.insert(), message_rows)
 
-                delivery_rows:'anylist' = []
+            message_row_ids = self._get_message_row_ids(connection, messages)
 
-                for sub_key in subscriber_keys:
-                    delivery_rows.append({
-                        'message_id': message_row_id,
-                        'sub_key': sub_key,
-                        'topic_name': topic_name,
-                        'priority': priority,
-                        'expiration_ms': expiration_ms,
-                    })
+        # One delivery row per message and subscriber ..
+        delivery_rows:'anylist' = []
 
-                _ = connection.execute(delivery_table.insert(), delivery_rows)
+        for message in messages:
 
-        # .. wake up the subscribers now that the transaction is committed ..
-        if subscriber_keys:
-            self.notify_sub_keys(subscriber_keys)
+            message_values = message.values
+            topic_name = message_values['topic_name']
 
-        # .. give the subscribers just woken up a chance to run ..
-        self._yield_after_write()
+            for sub_key in subscriber_keys_by_topic[topic_name]:
+                delivery_rows.append({
+                    'message_id': message_row_ids[message_values['msg_id']],
+                    'sub_key': sub_key,
+                    'topic_name': topic_name,
+                    'priority': message_values['priority'],
+                    'expiration_ms': message_values['expiration_ms'],
+                })
+
+        if delivery_rows:
+            _ = connection.execute(delivery_table.insert(), delivery_rows)
+
+        # .. and everyone with anything new to read is returned, each subscriber once.
+        out:'strlist' = []
+        seen:'strset' = set()
+
+        for subscriber_keys in subscriber_keys_by_topic.values():
+            for sub_key in subscriber_keys:
+                if sub_key not in seen:
+                    seen.add(sub_key)
+                    out.append(sub_key)
 
-        subscriber_count = len(subscriber_keys)
+        return out
+
+# ################################################################################################################################
 
-        logger.info('Published message -> msg_id:%s, topic_name:%s, subscriber_count:%d',
-            message_id, topic_name, subscriber_count)
+    def _get_message_row_ids(self, connection:'Connection', messages:'prepared_message_list') -> 'strintdict':
+        """ Maps the public identifiers of just inserted messages to their primary keys, read within the caller's transaction.
+        """
+        out:'strintdict' = {}
+
+        msg_ids = [message.values['msg_id'] for message in messages]
+        msg_id_count = len(msg_ids)
+
+        for idx in range(0, msg_id_count, _max_lookup_size):
+            chunk = msg_ids[idx:idx + _max_lookup_size]
+            for row in connection.execute(_message_row_id_query, {'lookup_msg_ids': chunk}):
+                out[row.msg_id] = row.id
+
+        return out
+
+# ################################################################################################################################
+
+    def _after_publish(self, message:'PreparedMessage') -> 'None':
+        """ Records one committed publication in the audit log, unless the topic's audit log is off,
+        and in the publish counter.
+        """
+        message_values = message.values
+        topic_name = message_values['topic_name']
 
-        # .. record the publish in the audit log, unless the topic's audit log is off ..
         if self.audit_log:
             if topic_name not in self.audit_disabled_topics:
 
                 # These are all optional on input so they are normalized to strings here.
-                if cid is None:
-                    cid = ''
-                if correl_id is None:
-                    correl_id = ''
-                if ext_client_id is None:
-                    ext_client_id = ''
-                if publisher is None:
-                    publisher = ''
+                cid = message_values['cid'] or ''
+                correl_id = message_values['correl_id'] or ''
+                ext_client_id = message_values['ext_client_id'] or ''
+                publisher = message_values['publisher'] or ''
 
                 self.audit_log.insert(AuditSource.PubSub, AuditEvent.Published, topic_name,
                     cid=cid,
-                    msg_id=message_id,
+                    msg_id=message_values['msg_id'],
                     correl_id=correl_id,
                     ext_client_id=ext_client_id,
-                    pub_time_iso=pub_time_iso,
+                    pub_time_iso=message_values['pub_time_iso'],
                     endpoint=publisher,
-                    size=data_size,
-                    priority=priority,
+                    size=message_values['data_size'],
+                    priority=message_values['priority'],
                     outcome=AuditOutcome.OK,
-                    data=serialized_data,
+                    data=message.serialized_data,
                 )
 
-        # .. update the publish counter and return the result.
         counter = zato_pubsub_messages_published_total.labels(topic_name=topic_name)
         _ = counter.inc()
 
-        out = PublishResult()
-        out.msg_id = message_id
-
-        return out
-
 # ################################################################################################################################
 
     def subscribe(self, sub_key:'str', topic_name:'str') -> 'None':
@@ -298,10 +489,17 @@ class SQLPubSubBackend(SQLAdminAPI):
             if row:
                 return
 
-            # .. record the subscription.
+            # .. otherwise, record the subscription, which every process keeping a copy of the subscriptions
+            # .. learns of through the version bumped along with it ..
             insert_statement = topic_sub_table.insert().values(sub_key=sub_key, topic_name=topic_name)
             _ = connection.execute(insert_statement)
 
+            version = bump_sub_version(connection)
+
+        # .. while this one can apply it to its own copy straight away.
+        if sub_index := self.sub_index:
+            sub_index.add(sub_key, topic_name, version)
+
         logger.info('Subscribed -> sub_key:%s, topic_name:%s', sub_key, topic_name)
 
 # ################################################################################################################################
@@ -321,7 +519,15 @@ class SQLPubSubBackend(SQLAdminAPI):
         ))
 
         with self.engine.begin() as connection:
-            _ = connection.execute(delete_statement)
+            result = connection.execute(delete_statement)
+
+            # .. bumping the version for every process keeping a copy of the subscriptions ..
+            if result.rowcount:
+                version = bump_sub_version(connection)
+
+        if result.rowcount:
+            if sub_index := self.sub_index:
+                sub_index.remove(sub_key, topic_name, version)
 
         # .. then clean up the pending deliveries in bounded batches.
         batch_size = get_batch_size()
@@ -51,6 +51,14 @@ class ModuleCtx:
     # The environment variable overriding how many rows one bulk statement may touch.
     Env_Batch_Size = 'Zato_PubSub_DB_Batch_Size'
 
+    # The environment variable turning group commit of concurrent publications on,
+    # by saying how many milliseconds one group waits for more publications to join it.
+    Env_Group_Commit_Ms = 'Zato_PubSub_Group_Commit_Ms'
+
+    # The environment variable overriding how often, in seconds, the in-process index of topic subscribers
+    # is checked against the database. Zero turns the index off and each publication reads the subscribers itself.
+    Env_Sub_Index_Refresh_Seconds = 'Zato_PubSub_Sub_Index_Refresh_Seconds'
+
     # Recognized database types.
     Type_SQLite     = Type_SQLite
     Type_MySQL      = Type_MySQL
@@ -78,6 +86,14 @@ _default_delivered_max_days = 7
 # How many rows one bulk delete or update statement may touch.
 _default_batch_size = 5_000
 
+# Every publication commits on its own unless group commit is turned on explicitly.
+_default_group_commit_ms = 0
+
+# How often the index of topic subscribers is checked against the database, in seconds - changes made through
+# any server are seen at once through the subscription version, so this is how long a row changed
+# in the database directly may take to be seen here.
+_default_sub_index_refresh_seconds = 5.0
+
 # ################################################################################################################################
 # ################################################################################################################################
 
@@ -152,5 +168,31 @@ def get_batch_size() -> 'int':
 
     return out
 
+# ################################################################################################################################
+
+def get_group_commit_ms() -> 'int':
+    """ Returns how many milliseconds concurrent publications wait for one another to be committed together.
+    Zero means every publication commits on its own.
+    """
+    if value := os.environ.get(ModuleCtx.Env_Group_Commit_Ms, ''):
+        out = int(value)
+    else:
+        out = _default_group_commit_ms
+
+    return out
+
+# ################################################################################################################################
+
+def get_sub_index_refresh_seconds() -> 'float':
+    """ Returns how often the in-process index of topic subscribers is checked against the database, in seconds.
+    Zero means there is no index and each publication reads the subscribers from the database.
+    """
+    if value := os.environ.get(ModuleCtx.Env_Sub_Index_Refresh_Seconds, ''):
+        out = float(value)
+    else:
+        out = _default_sub_index_refresh_seconds
+
+    return out
+
 # ################################################################################################################################
 # ################################################################################################################################
@@ -21,8 +21,10 @@ from sqlalchemy.exc import DBAPIError
 
 # Zato
 from zato.common.db_env import Type_SQLite
-from zato.common.pubsub.sql.config import get_pubsub_engine
+from zato.common.pubsub.sql.config import get_group_commit_ms, get_pubsub_engine, get_sub_index_refresh_seconds
+from zato.common.pubsub.sql.group_commit import GroupCommitter
 from zato.common.pubsub.sql.schema import delivery_table, message_table, topic_sub_table
+from zato.common.pubsub.sql.sub_index import SubscriberIndex
 from zato.common.typing_ import cast_
 from zato.common.util.time_ import datetime_to_ms, utcnow
 
@@ -33,7 +35,7 @@ if 0:
     from sqlalchemy.engine import Connection, Engine
     from zato.common.audit_log.api import AuditLog
     from zato.common.crypto.api import CryptoManager
-    from zato.common.typing_ import any_, anydict, intlist, intlistnone, strlist, strset
+    from zato.common.typing_ import any_, anydict, anylist, intlist, intlistnone, intnone, strlist, strset
 
     # Dummy assignments to satisfy type checkers
     AuditLog = AuditLog
@@ -60,6 +62,9 @@ _deadlock_retry_sleep = 0.05
 # yields it, in seconds - see _yield_after_write.
 _yield_interval_seconds = 0.005
 
+# How many publications one group commit may hold - a group this big is written without waiting for its window to close.
+_group_commit_max_size = 1000
+
 # The statements below run on every publish or delivery, so they are built once here,
 # not per call - the bind parameters take their values at execution time.
 _subscriber_keys_query = select(topic_sub_table.c.sub_key)
@@ -114,6 +119,7 @@ class SQLBackendCore:
         audit_log:'AuditLog | None' = None,
         crypto_manager:'CryptoManager | None' = None,
         encrypt_at_rest:'bool' = False,
+        group_commit_ms:'intnone' = None,
         ) -> 'None':
 
         # The audit log is injected by the server and is None in backend-only tests.
@@ -138,6 +144,25 @@ class SQLBackendCore:
         self._yield_engine:'Engine | None' = None
         self._needs_write_yield = False
 
+        # The in-process index of each topic's subscribers and which engine it was built for -
+        # a repointed engine means another database, whose subscriptions the index knows nothing about.
+        self._sub_index_engine:'Engine | None' = None
+        self._sub_index:'SubscriberIndex | None' = None
+
+        # Concurrent publications share one transaction if a group-commit window is configured,
+        # which comes from the environment unless given explicitly.
+        if group_commit_ms is None:
+            group_commit_ms = get_group_commit_ms()
+
+        if group_commit_ms > 0:
+            self.group_committer = GroupCommitter(
+                window_ms=group_commit_ms,
+                max_size=_group_commit_max_size,
+                write_group=self._publish_prepared,
+            )
+        else:
+            self.group_committer = None
+
 # ################################################################################################################################
 
     @property
@@ -147,6 +172,34 @@ class SQLBackendCore:
         out = get_pubsub_engine()
         return out
 
+# ################################################################################################################################
+
+    @property
+    def sub_index(self) -> 'SubscriberIndex | None':
+        """ The in-process index of each topic's subscribers, or None if it is turned off.
+        """
+        engine = self.engine
+
+        if engine is not self._sub_index_engine:
+
+            refresh_seconds = get_sub_index_refresh_seconds()
+
+            if refresh_seconds > 0:
+                self._sub_index = SubscriberIndex(refresh_seconds)
+            else:
+                self._sub_index = None
+
+            self._sub_index_engine = engine
+
+        return self._sub_index
+
+# ################################################################################################################################
+
+    def _publish_prepared(self, messages:'anylist') -> 'None':
+        """ Writes prepared messages in one transaction - implemented by the backend that publishes them.
+        """
+        raise NotImplementedError('Must be implemented by subclasses')
+
 # ################################################################################################################################
 
     def close(self) -> 'None':
@@ -302,8 +355,13 @@ class SQLBackendCore:
 # ################################################################################################################################
 
     def _get_subscriber_keys(self, connection:'Connection', topic_name:'str') -> 'strlist':
-        """ Returns all the subscriber keys of one topic, read within the caller's transaction.
+        """ Returns all the subscriber keys of one topic, from the in-process index if it can answer,
+        or read within the caller's transaction otherwise.
         """
+        if sub_index := self.sub_index:
+            if (sub_keys := sub_index.get_sub_keys(connection, topic_name)) is not None:
+                return sub_keys
+
         out:'strlist' = []
 
         for row in connection.execute(_subscriber_keys_query, {'pub_topic_name': topic_name}):
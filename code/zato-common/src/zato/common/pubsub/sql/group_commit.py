@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# stdlib
+from logging import getLogger
+
+# gevent
+from gevent import spawn_later
+from gevent.event import AsyncResult
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if 0:
+    from zato.common.typing_ import any_, anylist, callable_
+
+    # Dummy assignments to satisfy type checkers
+    any_ = any_
+    anylist = anylist
+    callable_ = callable_
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+logger = getLogger(__name__)
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+# One millisecond expressed in seconds.
+_seconds_per_millisecond = 0.001
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class GroupCommitter:
+    """ Coalesces publications arriving from many greenlets into one transaction. The first publication
+    of a group opens a window of a few milliseconds, everything submitted within it is written
+    with the first one, and each caller is released only once the whole group is committed -
+    or with the group's exception if it is not. A group that reaches its maximum size
+    is written at once, without waiting for the window to close.
+    """
+
+    def __init__(self, *, window_ms:'int', max_size:'int', write_group:'callable_') -> 'None':
+
+        self.window_seconds = window_ms * _seconds_per_millisecond
+        self.max_size = max_size
+
+        # Writes a list of items in one transaction - this is what the backend gives us
+        self.write_group = write_group
+
+        # Items of the group that is currently open, each with the result its caller waits on.
+        # Greenlets switch only on I/O, so appending to and swapping these lists needs no lock.
+        self._items:'anylist' = []
+        self._results:'anylist' = []
+
+# ################################################################################################################################
+
+    def submit(self, item:'any_') -> 'None':
+        """ Adds an item to the currently open group and blocks until the group is committed.
+        """
+        result = AsyncResult()
+
+        self._items.append(item)
+        self._results.append(result)
+
+        item_count = len(self._items)
+
+        # The first item of a group is the one to open its window ..
+        if item_count == 1:
+            _ = spawn_later(self.window_seconds, self._write_open_group)
+
+        # .. while a group that is already full is written by whoever filled it up.
+        elif item_count >= self.max_size:
+            self._write_open_group()
+
+        # Either way, we return only when our own group is in the database.
+        _ = result.get()
+
+# ################################################################################################################################
+
+    def _write_open_group(self) -> 'None':
+        """ Takes the currently open group out, writes it and releases everyone waiting on it.
+        The window of a group written early because it was full may still fire afterwards,
+        in which case it writes whatever group has been opened since then.
+        """
+        items = self._items
+        results = self._results
+
+        if not items:
+            return
+
+        self._items = []
+        self._results = []
+
+        try:
+            self.write_group(items)
+        except Exception as e:
+            logger.info('Group commit of %d item(s) failed -> %s', len(items), e)
+            for result in results:
+                result.set_exception(e)
+        else:
+            for result in results:
+                result.set(None)
+
+# ################################################################################################################################
+# ################################################################################################################################
@@ -8,6 +8,7 @@ Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
 
 # SQLAlchemy
 from sqlalchemy import BigInteger, Boolean, Column, Index, Integer, MetaData, String, Table, Text
+from sqlalchemy import event as sa_event
 from sqlalchemy.dialects.mysql import LONGTEXT
 
 # Zato
@@ -16,6 +17,16 @@ from zato.common.api import PubSub
 # ################################################################################################################################
 # ################################################################################################################################
 
+if 0:
+    from sqlalchemy.engine import Connection
+    from zato.common.typing_ import any_
+
+    # Dummy assignments to satisfy type checkers
+    Connection = Connection
+
+# ################################################################################################################################
+# ################################################################################################################################
+
 # The name of the SQLite file holding all pub/sub messages and queue state.
 pubsub_db_file_name = 'pubsub.db'
 
@@ -134,5 +145,24 @@ topic_sub_table = Table('pubsub_topic_sub', metadata,
     Index('idx_pubsub_topic_sub_topic', 'topic_name'),
 )
 
+# ################################################################################################################################
+
+# The ID of the one row of the subscription version table.
+sub_version_row_id = 1
+
+# A single row counting the changes to pubsub_topic_sub. Each subscribe, unsubscribe, topic rename and topic delete
+# bumps it in its own transaction, which lets every process that keeps a copy of the subscriptions tell
+# whether its copy is still current, no matter which server the change was made through.
+sub_version_table = Table('pubsub_sub_version', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=False),
+    Column('version', BigInteger, nullable=False),
+)
+
+def _insert_sub_version_row(target:'Table', connection:'Connection', **kwargs:'any_') -> 'None':
+    _ = connection.execute(target.insert().values(id=sub_version_row_id, version=0))
+
+# The row is there as soon as the table is
+sa_event.listen(sub_version_table, 'after_create', _insert_sub_version_row)
+
 # ################################################################################################################################
 # ################################################################################################################################
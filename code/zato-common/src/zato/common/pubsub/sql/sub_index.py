@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# stdlib
+from logging import getLogger
+from time import monotonic
+
+# SQLAlchemy
+from sqlalchemy import select, update
+
+# Zato
+from zato.common.pubsub.sql.schema import sub_version_row_id, sub_version_table, topic_sub_table
+from zato.server.metrics import zato_pubsub_subscriber_index_lookups_total
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if 0:
+    from sqlalchemy.engine import Connection
+    from zato.common.typing_ import intnone, strlistnone, strset
+
+    # Dummy assignments to satisfy type checkers
+    Connection = Connection
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+logger = getLogger(__name__)
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+# Each topic's subscribers keyed by their sub_keys - a dict keeps them in the order they subscribed
+# while still letting a single one go without a scan.
+topic_sub_dict = dict[str, dict[str, None]]
+
+# What the lookups counter reports for each kind of lookup.
+_index_hits = zato_pubsub_subscriber_index_lookups_total.labels(result='hit')
+_index_misses = zato_pubsub_subscriber_index_lookups_total.labels(result='miss')
+
+# All the subscriptions in the database, read in one go.
+_all_subscriptions_query = select(topic_sub_table.c.topic_name, topic_sub_table.c.sub_key)
+
+# How many times the subscriptions have changed so far ..
+_sub_version_query = select(sub_version_table.c.version)
+_sub_version_query = _sub_version_query.where(sub_version_table.c.id == sub_version_row_id)
+
+# .. and how it is bumped on each change.
+_bump_sub_version_statement = update(sub_version_table)
+_bump_sub_version_statement = _bump_sub_version_statement.where(sub_version_table.c.id == sub_version_row_id)
+_bump_sub_version_statement = _bump_sub_version_statement.values(version=sub_version_table.c.version + 1)
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def bump_sub_version(connection:'Connection') -> 'intnone':
+    """ Records a change to the subscriptions within the caller's transaction and returns the version it makes them,
+    or None if the version row is missing. The row stays locked until the transaction ends,
+    so no other change can get in between the bump and the read.
+    """
+    _ = connection.execute(_bump_sub_version_statement)
+
+    out = connection.execute(_sub_version_query).scalar()
+    return out
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class SubscriberIndex:
+    """ An in-process copy of which subscribers each topic has, so that publications need not ask the database
+    for them. Each publication reads only the version of the subscriptions, within its own transaction,
+    and the index answers only if it was built at that very version - a subscription changed through any server
+    bumps the version, which makes the next publication everywhere read the index anew.
+
+    The backend applies its own process's changes to the index as they are committed, so they do not cost a reload,
+    and every refresh interval the index is read anew anyway, to catch rows changed in the database directly.
+    """
+
+    def __init__(self, refresh_seconds:'float') -> 'None':
+
+        # How often the whole index is checked against the database.
+        self.refresh_seconds = refresh_seconds
+
+        # The topics and their subscribers, empty until the first load.
+        self._topics:'topic_sub_dict' = {}
+
+        # When the index was last loaded, or None if it never was.
+        self._loaded_at:'float | None' = None
+
+        # The version of the subscriptions the index holds, or None if it does not match any.
+        self._version:'intnone' = None
+
+        # Bumped on each change, so that a load that overlapped a change does not overwrite it
+        # with what the database said before the change was committed.
+        self._generation = 0
+
+        # How many lookups were answered from the index and how many had to go to the database.
+        self.hit_count = 0
+        self.miss_count = 0
+
+# ################################################################################################################################
+
+    def _needs_load(self, version:'int') -> 'bool':
+        """ Tells whether the index must be read from the database before it can answer anything.
+        """
+        if self._loaded_at is None:
+            return True
+
+        # Someone changed the subscriptions since the index was built ..
+        if version != self._version:
+            return True
+
+        # .. or it is simply time to check it against the database.
+        out = monotonic() - self._loaded_at >= self.refresh_seconds
+        return out
+
+# ################################################################################################################################
+
+    def _load(self, connection:'Connection', version:'int') -> 'bool':
+        """ Reads all the subscriptions from the database and installs them as of the version read just before,
+        reporting any differences with what the index held. Returns False if a subscription changed in this process
+        while the rows were being read, in which case nothing is installed and the next lookup tries again.
+        """
+        generation = self._generation
+
+        topics:'topic_sub_dict' = {}
+
+        for row in connection.execute(_all_subscriptions_query):
+            sub_keys = topics.setdefault(row.topic_name, {})
+            sub_keys[row.sub_key] = None
+
+        if generation != self._generation:
+            return False
+
+        # Only a refresh of an index that was current can tell a difference, other loads expect one ..
+        if self._loaded_at is not None and version == self._version:
+            if topics != self._topics:
+
+                db_pairs = _get_pairs(topics)
+                index_pairs = _get_pairs(self._topics)
+
+                logger.info('Pub/sub subscriber index was out of sync with the database -> missing:%s, stale:%s',
+                    sorted(db_pairs - index_pairs), sorted(index_pairs - db_pairs))
+
+        # .. either way, the database is what the index holds from now on.
+        self._topics = topics
+        self._loaded_at = monotonic()
+
+        # A change committed after the version was read may already be among the rows, which only means
+        # that the next lookup sees a newer version and loads the index again.
+        self._version = version
+
+        return True
+
+# ################################################################################################################################
+
+    def get_sub_keys(self, connection:'Connection', topic_name:'str') -> 'strlistnone':
+        """ Returns all the subscriber keys of a topic, loading the index within the caller's transaction if it is due,
+        or None if the index cannot answer now and the caller must ask the database itself.
+        """
+        # The version is read before any subscriptions are, so that the index never claims to be newer than it is
+        version = connection.execute(_sub_version_query).scalar()
+
+        # Without a version, there is no telling whether the index is current
+        if version is None:
+            self.miss_count += 1
+            _index_misses.inc()
+            return None
+
+        # A lookup that has to load the index first goes to the database anyway, so it counts as a miss ..
+        if self._needs_load(version):
+            self.miss_count += 1
+            _index_misses.inc()
+            if not self._load(connection, version):
+                return None
+
+        # .. unlike one the index can answer as it is.
+        else:
+            self.hit_count += 1
+            _index_hits.inc()
+
+        if sub_keys := self._topics.get(topic_name):
+            out = list(sub_keys)
+        else:
+            out = []
+
+        return out
+
+# ################################################################################################################################
+
+    def _set_version(self, version:'intnone') -> 'None':
+        """ Moves the index to the version that a change made in this process was committed as - if the index
+        was at the version right before it, it is current again, otherwise it missed other changes and needs a load.
+        """
+        if version is not None and self._version is not None and version == self._version + 1:
+            self._version = version
+        else:
+            self._version = None
+
+# ################################################################################################################################
+
+    def add(self, sub_key:'str', topic_name:'str', version:'intnone') -> 'None':
+        """ Records a subscription that was just committed as the given version.
+        """
+        self._generation += 1
+
+        sub_keys = self._topics.setdefault(topic_name, {})
+        sub_keys[sub_key] = None
+
+        self._set_version(version)
+
+# ################################################################################################################################
+
+    def remove(self, sub_key:'str', topic_name:'str', version:'intnone') -> 'None':
+        """ Forgets a subscription whose deletion was just committed as the given version.
+        """
+        self._generation += 1
+
+        if sub_keys := self._topics.get(topic_name):
+            _ = sub_keys.pop(sub_key, None)
+            if not sub_keys:
+                del self._topics[topic_name]
+
+        self._set_version(version)
+
+# ################################################################################################################################
+
+    def rename_topic(self, old_topic_name:'str', new_topic_name:'str', version:'intnone') -> 'None':
+        """ Moves all the subscribers of a topic whose renaming was just committed as the given version to its new name.
+        """
+        self._generation += 1
+
+        if sub_keys := self._topics.pop(old_topic_name, None):
+            new_sub_keys = self._topics.setdefault(new_topic_name, {})
+            new_sub_keys.update(sub_keys)
+
+        self._set_version(version)
+
+# ################################################################################################################################
+
+    def delete_topic(self, topic_name:'str', version:'intnone') -> 'None':
+        """ Forgets all the subscribers of a topic whose deletion was just committed as the given version.
+        """
+        self._generation += 1
+        _ = self._topics.pop(topic_name, None)
+
+        self._set_version(version)
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def _get_pairs(topics:'topic_sub_dict') -> 'strset':
+    """ Returns subscriptions as topic_name:sub_key pairs, the way the out-of-sync message reports them.
+    """
+    out:'strset' = set()
+
+    for topic_name, sub_keys in topics.items():
+        for sub_key in sub_keys:
+            out.add(f'{topic_name}:{sub_key}')
+
+    return out
+
+# ################################################################################################################################
+# ################################################################################################################################
@@ -22,7 +22,7 @@ from zato.common.rate_limiting.token_bucket import CheckResult, TokenBucketConfi
 logger = logging.getLogger('zato_rate_limiting')
 
 if 0:
-    from zato.common.typing_ import stranydict, strdictlist, strlist
+    from zato.common.typing_ import any_, anydict, anylist, stranydict, strdictlist, strlist
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -53,6 +53,12 @@ cidr_entry_list   = list[CIDREntry]
 time_range_list   = list[TimeRange]
 slotted_rule_list = list['SlottedCIDRRule']
 
+# How many client IPs each matcher remembers the resolved rule of.
+Resolve_Cache_Size = 4096
+
+# How many bits an address of each IP version has.
+_address_bits = {4: 32, 6: 128}
+
 # ################################################################################################################################
 # ################################################################################################################################
 
@@ -289,12 +295,85 @@ class CIDRCheckResult:
 # ################################################################################################################################
 # ################################################################################################################################
 
+class CIDRIndex:
+    """ Rules compiled into hash tables of network prefixes, one table per prefix length and IP version.
+
+    Resolving an address takes one lookup per distinct prefix length in use rather than a walk over all the rules
+    and their entries. Of all the entries whose networks contain the address, the one that comes first
+    in the rules, top to bottom, is the one returned, which is what a first-match walk would return too.
+    """
+
+    def __init__(self, rules:'anylist', is_empty_match_all:'bool') -> 'None':
+
+        # Prefix tables by IP version, each a list of (shift, table) pairs, where shift turns
+        # an address into its prefix and table maps prefixes to (position, rule, entry) tuples.
+        self._tables:'dict[int, list[tuple[int, dict[int, tuple[tuple[int, int], any_, CIDREntry]]]]]' = {4: [], 6: []}
+
+        tables_by_length:'dict[tuple[int, int], dict[int, tuple[tuple[int, int], any_, CIDREntry]]]' = {}
+
+        for rule_index, rule in enumerate(rules):
+
+            # Slotted rules with no CIDR entries match any address ..
+            if not rule.entries and is_empty_match_all:
+                entries = [_match_all_v4, _match_all_v6]
+
+            # .. while others match only what their entries list.
+            else:
+                entries = rule.entries
+
+            for entry_index, entry in enumerate(entries):
+                network = entry.network
+                version = network.version
+                shift = _address_bits[version] - network.prefixlen
+
+                table = tables_by_length.setdefault((version, shift), {})
+                prefix = int(network.network_address) >> shift
+
+                # If the same network is listed more than once, the first one is what matches.
+                if prefix not in table:
+                    table[prefix] = ((rule_index, entry_index), rule, entry)
+
+        for (version, shift), table in sorted(tables_by_length.items()):
+            self._tables[version].append((shift, table))
+
+# ################################################################################################################################
+
+    def resolve(self, address:'ipaddress.IPv4Address | ipaddress.IPv6Address') -> 'tuple[any_, CIDREntry] | None':
+        """ Returns the first rule, and its entry, whose network contains the address, or None.
+        """
+        best = None
+        address_int = int(address)
+
+        for shift, table in self._tables[address.version]:
+            if (candidate := table.get(address_int >> shift)) is not None:
+                if best is None or candidate[0] < best[0]:
+                    best = candidate
+
+        if best is None:
+            return None
+
+        _, rule, entry = best
+        return rule, entry
+
+# ################################################################################################################################
+# ################################################################################################################################
+
 class CIDRMatcher:
     """ Holds an ordered list of CIDR rules and resolves client IPs to the first matching rule.
     """
 
     def __init__(self) -> 'None':
         self._rules:'list[CIDRRule]' = []
+        self._index = CIDRIndex(self._rules, is_empty_match_all=False)
+        self._resolve_cache:'dict[str, CIDRMatch | None]' = {}
+
+# ################################################################################################################################
+
+    def _rebuild_index(self) -> 'None':
+        """ Compiles the current rules and forgets what was resolved from the previous ones.
+        """
+        self._index = CIDRIndex(self._rules, is_empty_match_all=False)
+        self._resolve_cache = {}
 
 # ################################################################################################################################
 
@@ -313,28 +392,32 @@ class CIDRMatcher:
         """
         rule = CIDRRule.from_parts(cidr_list, token_bucket_config, fixed_window_config)
         self._rules.append(rule)
+        self._rebuild_index()
 
 # ################################################################################################################################
 
     def resolve(self, client_ip:'str') -> 'CIDRMatch | None':
-        """ Parses the client IP and iterates rules top-to-bottom, returning the first match.
+        """ Returns the first rule, top-to-bottom, that matches the client IP.
         """
 
-        # Parse the raw IP string ..
+        # Clients tend to come back, so look at what they resolved to previously first ..
+        if client_ip in self._resolve_cache:
+            return self._resolve_cache[client_ip]
+
+        # .. otherwise, parse the raw IP string ..
         address = parse_client_ip(client_ip)
 
-        # .. walk rules in insertion order ..
-        for rule in self._rules:
-            entry = rule.match(address)
+        # .. look it up among the compiled rules ..
+        if found := self._index.resolve(address):
+            out = CIDRMatch()
+            out.rule, out.entry = found
+        else:
+            out = None
 
-            # .. if a rule matches, wrap it in a CIDRMatch and return immediately.
-            if entry is not None:
-                out = CIDRMatch()
-                out.rule  = rule
-                out.entry = entry
-                return out
+        # .. and remember the outcome for next time.
+        _store_resolved(self._resolve_cache, client_ip, out)
 
-        return None
+        return out
 
 # ################################################################################################################################
 
@@ -376,6 +459,7 @@ class CIDRMatcher:
         """ Removes the rule at the given index.
         """
         del self._rules[index]
+        self._rebuild_index()
 
 # ################################################################################################################################
 
@@ -390,6 +474,7 @@ class CIDRMatcher:
         """ Removes all rules.
         """
         self._rules.clear()
+        self._rebuild_index()
 
 # ################################################################################################################################
 
@@ -404,8 +489,12 @@ class CIDRMatcher:
             rule = CIDRRule.from_parts(cidr_list, token_bucket_config, fixed_window_config)
             new_rules.append(rule)
 
+        new_index = CIDRIndex(new_rules, is_empty_match_all=False)
+
         # .. then swap in one shot.
         self._rules = new_rules
+        self._index = new_index
+        self._resolve_cache = {}
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -451,6 +540,16 @@ class SlottedCIDRMatcher:
 
     def __init__(self) -> 'None':
         self._rules:'slotted_rule_list' = []
+        self._index = CIDRIndex(self._rules, is_empty_match_all=True)
+        self._resolve_cache:'dict[str, SlottedCIDRMatch | None]' = {}
+
+# ################################################################################################################################
+
+    def _rebuild_index(self) -> 'None':
+        """ Compiles the current rules and forgets what was resolved from the previous ones.
+        """
+        self._index = CIDRIndex(self._rules, is_empty_match_all=True)
+        self._resolve_cache = {}
 
 # ################################################################################################################################
 
@@ -460,23 +559,27 @@ class SlottedCIDRMatcher:
 # ################################################################################################################################
 
     def resolve(self, client_ip:'str') -> 'SlottedCIDRMatch | None':
-        """ Parses the client IP and iterates rules top-to-bottom, returning the first match.
+        """ Returns the first rule, top-to-bottom, that matches the client IP.
         """
 
-        # Parse the raw IP string ..
+        # Clients tend to come back, so look at what they resolved to previously first ..
+        if client_ip in self._resolve_cache:
+            return self._resolve_cache[client_ip]
+
+        # .. otherwise, parse the raw IP string ..
         address = parse_client_ip(client_ip)
 
-        # .. walk rules in insertion order ..
-        for rule in self._rules:
-            entry = rule.match(address)
+        # .. look it up among the compiled rules ..
+        if found := self._index.resolve(address):
+            out = SlottedCIDRMatch()
+            out.rule, out.entry = found
+        else:
+            out = None
 
-            if entry is not None:
-                out = SlottedCIDRMatch()
-                out.rule  = rule
-                out.entry = entry
-                return out
+        # .. and remember the outcome for next time.
+        _store_resolved(self._resolve_cache, client_ip, out)
 
-        return None
+        return out
 
 # ################################################################################################################################
 
@@ -491,8 +594,12 @@ class SlottedCIDRMatcher:
             rule = SlottedCIDRRule.from_dict(rule_dict)
             new_rules.append(rule)
 
-        # .. then swap in one shot.
+        new_index = CIDRIndex(new_rules, is_empty_match_all=True)
+
+        # .. then swap in one shot, forgetting what was resolved from the previous rules.
         self._rules = new_rules
+        self._index = new_index
+        self._resolve_cache = {}
 
 # ################################################################################################################################
 
@@ -520,6 +627,7 @@ class SlottedCIDRMatcher:
         """ Removes all rules.
         """
         self._rules.clear()
+        self._rebuild_index()
 
 # ################################################################################################################################
 
@@ -631,6 +739,16 @@ def parse_client_ip(value:'str') -> 'ipaddress.IPv4Address | ipaddress.IPv6Addre
 
 # ################################################################################################################################
 
+def _store_resolved(cache:'anydict', client_ip:'str', match:'any_') -> 'None':
+    """ Remembers what a client IP resolved to, making room by forgetting the oldest client IP if the cache is full.
+    """
+    if len(cache) >= Resolve_Cache_Size:
+        del cache[next(iter(cache))]
+
+    cache[client_ip] = match
+
+# ################################################################################################################################
+
 # Synthetic match-all entries for rules with an empty CIDR list,
 # defined after parse_cidr is available.
 _match_all_v4 = CIDREntry.from_string('0.0.0.0/0')
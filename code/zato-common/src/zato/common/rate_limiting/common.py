@@ -8,6 +8,7 @@ Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
 
 # stdlib
 import datetime
+import os
 import time
 from dataclasses import dataclass
 
@@ -38,6 +39,13 @@ Window_Unit_Month  = 'month'
 
 client_address_headers = ['HTTP_X_ZATO_FORWARDED_FOR', 'HTTP_X_FORWARDED_FOR', 'REMOTE_ADDR']
 
+# How many client keys each registry may keep state for, unless the environment says otherwise ..
+Env_Max_Keys     = 'Zato_Rate_Limiting_Max_Keys'
+Default_Max_Keys = 500_000
+
+# .. and how many keys whose state has become idle each check may drop at most.
+Eviction_Keys_Per_Check = 4
+
 _all_window_units = {
     Window_Unit_Second,
     Window_Unit_Minute,
@@ -66,6 +74,18 @@ def current_time_us() -> 'int':
 
 # ################################################################################################################################
 
+def get_max_keys() -> 'int':
+    """ Returns how many client keys each registry may keep state for.
+    """
+    if value := os.environ.get(Env_Max_Keys, ''):
+        out = int(value)
+    else:
+        out = Default_Max_Keys
+
+    return out
+
+# ################################################################################################################################
+
 def validate_window_unit(value:'str') -> 'str':
     """ Returns the value unchanged if it is a known window unit, raises RateLimitError otherwise.
     """
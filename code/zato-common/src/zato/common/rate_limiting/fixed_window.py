@@ -14,6 +14,7 @@ from dataclasses import dataclass
 from zato.common.rate_limiting.common import December, January, Microseconds_Per_Second, RateLimitError, \
     Seconds_Per_Day, Seconds_Per_Hour, Seconds_Per_Minute, validate_window_unit, Window_Unit_Day, \
     Window_Unit_Hour, Window_Unit_Minute, Window_Unit_Month, Window_Unit_Second
+from zato.common.rate_limiting.registry import KeyRegistry
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -162,17 +163,18 @@ def _check_state(
 # ################################################################################################################################
 # ################################################################################################################################
 
-class FixedWindowRegistry:
+class FixedWindowRegistry(KeyRegistry):
     """ Top-level registry holding fixed-window counters for all keys.
     """
 
-    def __init__(self) -> 'None':
-        self._windows:'dict[str, _WindowState]' = {}
+    registry_name = 'fixed_window'
 
 # ################################################################################################################################
 
-    def __len__(self) -> 'int':
-        return len(self._windows)
+    def _get_idle_at_us(self, state:'_WindowState') -> 'int':
+        """ A window that has passed would be started afresh by the next check anyway.
+        """
+        return state.window_end_us
 
 # ################################################################################################################################
 
@@ -181,48 +183,18 @@ class FixedWindowRegistry:
         """
 
         #  Look up or create the per-key window state ..
-        state = self._windows.get(key)
+        state = self._get_state(key, now_us)
 
         if state is None:
             state = _WindowState()
             state.count         = 0
             state.window_end_us = compute_window_end_us(config.unit(), now_us)
-            self._windows[key] = state
+            self._add_state(key, state)
 
         # .. and decide whether the request is allowed.
         out = _check_state(state, config, now_us)
 
         return out
 
-# ################################################################################################################################
-
-    def remove(self, key:'str') -> 'None':
-        """ Removes the window state for the given key, if any.
-        """
-        _ = self._windows.pop(key, None)
-
-# ################################################################################################################################
-
-    def is_empty(self) -> 'bool':
-        """ Returns True if no windows are registered.
-        """
-        return not self._windows
-
-# ################################################################################################################################
-
-    def remove_by_prefix(self, prefix:'str') -> 'None':
-        """ Removes all window states whose key starts with the given prefix.
-        """
-        keys_to_remove = [key for key in self._windows if key.startswith(prefix)]
-        for key in keys_to_remove:
-            del self._windows[key]
-
-# ################################################################################################################################
-
-    def clear(self) -> 'None':
-        """ Removes all window states.
-        """
-        self._windows.clear()
-
 # ################################################################################################################################
 # ################################################################################################################################
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# stdlib
+from collections import OrderedDict
+from heapq import heapify, heappop, heappush
+from itertools import count
+
+# Zato
+from zato.common.rate_limiting.common import Eviction_Keys_Per_Check, get_max_keys, RateLimitError
+from zato.server.metrics import zato_rate_limiting_evictions_total, zato_rate_limiting_keys
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if 0:
+    from zato.common.typing_ import any_
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+# Why a key's state was dropped.
+Eviction_Reason_Idle     = 'idle'
+Eviction_Reason_Capacity = 'capacity'
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class KeyRegistry:
+    """ Per-key state of a rate limiter, kept in the order the keys were last seen in.
+
+    State that carries no information any more, because a bucket has refilled or a window has passed,
+    is dropped a few keys at a time by each check, in the order the keys become idle in, so there is never
+    a sweep over all of them. Each key has one entry in a heap ordered by when its state will be idle -
+    an entry whose key was seen again in the meantime is put back with the key's new idle time.
+
+    The number of keys is capped. A new key arriving when the cap is reached is always let in,
+    taking the place of the least recently seen key, whose next request starts from a full bucket or a new window.
+    """
+
+    # What the metrics call this registry, set by subclasses.
+    registry_name = ''
+
+    def __init__(self, max_keys:'int | None'=None) -> 'None':
+
+        max_keys = get_max_keys() if max_keys is None else max_keys
+
+        if max_keys < 1:
+            raise RateLimitError(f'max_keys must be at least 1, got: {max_keys}')
+
+        # How many keys may be kept at most.
+        self.max_keys = max_keys
+
+        # State by key, the least recently seen key first.
+        self._states:'OrderedDict[str, any_]' = OrderedDict()
+
+        # When each key's state may become idle, the earliest first, as (idle_at_us, sequence, key, state) tuples.
+        # The sequence keeps tuples of the same time from ever comparing their keys and states.
+        self._idle_heap:'list[tuple[int, int, str, any_]]' = []
+        self._sequence = count()
+
+        # What was evicted, for each reason.
+        self.idle_eviction_count = 0
+        self.capacity_eviction_count = 0
+
+        self._key_gauge = zato_rate_limiting_keys.labels(registry=self.registry_name)
+        self._idle_counter = zato_rate_limiting_evictions_total.labels(registry=self.registry_name, reason=Eviction_Reason_Idle)
+        self._capacity_counter = zato_rate_limiting_evictions_total.labels(
+            registry=self.registry_name, reason=Eviction_Reason_Capacity)
+
+# ################################################################################################################################
+
+    def __len__(self) -> 'int':
+        return len(self._states)
+
+# ################################################################################################################################
+
+    def _get_idle_at_us(self, state:'any_') -> 'int':
+        """ Returns the time from which dropping the state would not change the outcome of any later check.
+        """
+        raise NotImplementedError('Must be implemented by subclasses')
+
+# ################################################################################################################################
+
+    def _update_key_gauge(self) -> 'None':
+        self._key_gauge.set(len(self._states))
+
+# ################################################################################################################################
+
+    def _push_idle_entry(self, key:'str', state:'any_') -> 'None':
+        heappush(self._idle_heap, (self._get_idle_at_us(state), next(self._sequence), key, state))
+
+# ################################################################################################################################
+
+    def _rebuild_idle_heap(self) -> 'None':
+        """ Builds the heap anew out of the keys that still exist, leaving out the entries of keys that do not.
+        """
+        self._idle_heap = [
+            (self._get_idle_at_us(state), next(self._sequence), key, state) for key, state in self._states.items()]
+        heapify(self._idle_heap)
+
+# ################################################################################################################################
+
+    def _evict_idle(self, now_us:'int') -> 'int':
+        """ Drops up to a few keys whose state is idle, returning how many were dropped.
+        """
+        out = 0
+        heap = self._idle_heap
+
+        for _ in range(Eviction_Keys_Per_Check):
+
+            # Stop if no entry is due yet ..
+            if not heap or heap[0][0] > now_us:
+                break
+
+            _, _, key, state = heappop(heap)
+
+            # .. skip entries whose keys were removed, or removed and added again, in the meantime ..
+            if self._states.get(key) is not state:
+                continue
+
+            idle_at_us = self._get_idle_at_us(state)
+
+            # .. drop the state if it is still idle ..
+            if idle_at_us <= now_us:
+                del self._states[key]
+                out += 1
+
+            # .. or, if the key was seen again since its entry was pushed, push it back for later.
+            else:
+                heappush(heap, (idle_at_us, next(self._sequence), key, state))
+
+        if out:
+            self.idle_eviction_count += out
+            self._idle_counter.inc(out)
+
+        return out
+
+# ################################################################################################################################
+
+    def _get_state(self, key:'str', now_us:'int') -> 'any_':
+        """ Returns the state of a key, or None if it has none, marking the key as the most recently seen one.
+        Also drops a few idle keys as it goes.
+        """
+        evicted = self._evict_idle(now_us)
+
+        if (out := self._states.get(key)) is not None:
+            self._states.move_to_end(key)
+
+        if evicted:
+            self._update_key_gauge()
+
+        return out
+
+# ################################################################################################################################
+
+    def _add_state(self, key:'str', state:'any_') -> 'None':
+        """ Stores the state of a new key, first making room for it if the cap is reached.
+        """
+        if len(self._states) >= self.max_keys:
+            _ = self._states.popitem(last=False)
+            self.capacity_eviction_count += 1
+            self._capacity_counter.inc()
+
+            # Entries of keys dropped this way stay in the heap until they are due,
+            # so they are cleaned out in one go if they ever outnumber the live ones.
+            if len(self._idle_heap) > 2 * self.max_keys:
+                self._rebuild_idle_heap()
+
+        self._states[key] = state
+        self._push_idle_entry(key, state)
+        self._update_key_gauge()
+
+# ################################################################################################################################
+
+    def remove(self, key:'str') -> 'None':
+        """ Removes the state of the given key, if any.
+        """
+        if self._states.pop(key, None) is not None:
+            self._update_key_gauge()
+
+# ################################################################################################################################
+
+    def is_empty(self) -> 'bool':
+        """ Returns True if no state is kept for any key.
+        """
+        return not self._states
+
+# ################################################################################################################################
+
+    def remove_by_prefix(self, prefix:'str') -> 'None':
+        """ Removes the state of all the keys that start with the given prefix.
+        """
+        keys_to_remove = [key for key in self._states if key.startswith(prefix)]
+        for key in keys_to_remove:
+            del self._states[key]
+
+        self._rebuild_idle_heap()
+        self._update_key_gauge()
+
+# ################################################################################################################################
+
+    def clear(self) -> 'None':
+        """ Removes the state of all the keys.
+        """
+        self._states.clear()
+        self._idle_heap.clear()
+        self._update_key_gauge()
+
+# ################################################################################################################################
+# ################################################################################################################################
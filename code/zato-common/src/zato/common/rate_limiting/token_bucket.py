@@ -7,10 +7,12 @@ Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
 """
 
 # stdlib
+import sys
 from dataclasses import dataclass
 
 # Zato
 from zato.common.rate_limiting.common import Microseconds_Per_Second, Microtokens_Per_Token, RateLimitError
+from zato.common.rate_limiting.registry import KeyRegistry
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -54,6 +56,7 @@ class _BucketState:
     """
     tokens_remaining_micro: 'int'
     last_refill_us:         'int'
+    full_at_us:             'int'
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -108,22 +111,38 @@ def _consume_or_deny(
         out.tokens_remaining = 0
         out.retry_after_us   = retry_us
 
+    # Either way, note when the bucket will be full again, after which it is no different from a new one ..
+    missing_micro = burst_micro - bucket.tokens_remaining_micro
+
+    # .. which is now if nothing is missing ..
+    if missing_micro <= 0:
+        bucket.full_at_us = now_us
+
+    # .. once enough time has passed to refill what is missing ..
+    elif config.refill_rate_micro_per_us > 0:
+        bucket.full_at_us = now_us - (-missing_micro // config.refill_rate_micro_per_us)
+
+    # .. or never, if nothing refills it.
+    else:
+        bucket.full_at_us = sys.maxsize
+
     return out
 
 # ################################################################################################################################
 # ################################################################################################################################
 
-class TokenBucketRegistry:
+class TokenBucketRegistry(KeyRegistry):
     """ Top-level rate limiter registry holding all buckets across all keys.
     """
 
-    def __init__(self) -> 'None':
-        self._buckets:'dict[str, _BucketState]' = {}
+    registry_name = 'token_bucket'
 
 # ################################################################################################################################
 
-    def __len__(self) -> 'int':
-        return len(self._buckets)
+    def _get_idle_at_us(self, state:'_BucketState') -> 'int':
+        """ A bucket that has refilled to its burst capacity is the same as the one a new key would get.
+        """
+        return state.full_at_us
 
 # ################################################################################################################################
 
@@ -140,48 +159,19 @@ class TokenBucketRegistry:
             )
 
         # .. look up or create the per-key bucket ..
-        bucket = self._buckets.get(key)
+        bucket = self._get_state(key, now_us)
 
         if bucket is None:
             bucket = _BucketState()
             bucket.tokens_remaining_micro = burst_micro
             bucket.last_refill_us         = now_us
-            self._buckets[key] = bucket
+            bucket.full_at_us             = now_us
+            self._add_state(key, bucket)
 
         # .. and decide whether the request is allowed.
         out = _consume_or_deny(bucket, config, burst_micro, now_us)
 
         return out
 
-# ################################################################################################################################
-
-    def remove(self, key:'str') -> 'None':
-        """ Removes the bucket for the given key, if any.
-        """
-        _ = self._buckets.pop(key, None)
-
-# ################################################################################################################################
-
-    def is_empty(self) -> 'bool':
-        """ Returns True if no buckets are registered.
-        """
-        return not self._buckets
-
-# ################################################################################################################################
-
-    def remove_by_prefix(self, prefix:'str') -> 'None':
-        """ Removes all buckets whose key starts with the given prefix.
-        """
-        keys_to_remove = [key for key in self._buckets if key.startswith(prefix)]
-        for key in keys_to_remove:
-            del self._buckets[key]
-
-# ################################################################################################################################
-
-    def clear(self) -> 'None':
-        """ Removes all buckets.
-        """
-        self._buckets.clear()
-
 # ################################################################################################################################
 # ################################################################################################################################
@@ -9,6 +9,7 @@ Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
 # Zato - import all components and re-export them
 from zato.common.rule_engine.models import Ruleset, MatchResult, Rule, rule_from_document
 from zato.common.rule_engine.cache import CachedRule
+from zato.common.rule_engine.decision_index import DecisionIndex
 from zato.common.rule_engine.evaluation import first_matching_rule
 
 # ################################################################################################################################
@@ -204,6 +205,9 @@ class RulesManager:
             # .. append it for later use ..
             out.append(rule.full_name)
 
+        # .. compile the index that picks out the rules each input can fire ..
+        ruleset.decision_index = DecisionIndex(ruleset.get_cached_rules())
+
         # .. finally, we can return a list of what we loaded.
         return out
 
@@ -0,0 +1,425 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# The decision index of a ruleset - compiled once when the ruleset is loaded, it tells which of its rules
+# an input can possibly fire, so that only those are evaluated rather than every rule there is.
+#
+# A rule's when expression is a chain of conditions joined with and, evaluated left to right until one
+# of them is false. The leading conditions that compare one input value with literals - equality,
+# membership in a list and the four range comparisons - are what the index is built out of. The rules
+# form a tree, one level per such condition, and the rules sharing a condition share its branch - which
+# is what the filter of a decision table, repeated in every column, turns into. Each level keeps its
+# conditions per input value - a hash of the literals an equality or a membership test accepts, and the
+# sorted bounds of the range tests - so an input walks only down the branches its values satisfy.
+#
+# A rule is left out only when one of its leading conditions is false and everything before it held,
+# which means evaluating it would have stopped right there without firing and without raising. A value
+# the index cannot vouch for, e.g. a missing one or one of a type a range test rejects, makes every rule
+# below it a candidate, so such a rule is evaluated and raises exactly as it would have without the index.
+# The candidates are evaluated in rule order, which keeps what fires and how the then actions merge the same.
+
+# stdlib
+from bisect import bisect_left, bisect_right
+from decimal import Decimal
+
+# rule-engine
+from rule_engine.ast import ArithmeticComparisonExpression, ArrayExpression, BooleanExpression, ComparisonExpression, \
+    ContainsExpression, GetAttributeExpression, LiteralExpressionBase, LogicExpression, SymbolExpression
+
+# Zato
+from zato.common.rule_engine.cache import build_expression_key
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if 0:
+    from zato.common.rule_engine.cache import CachedRule
+    from zato.common.typing_ import any_, anydict, anylist, intlist
+
+    # Dummy assignments to satisfy type checkers
+    any_ = any_
+    anydict = anydict
+    anylist = anylist
+    CachedRule = CachedRule
+    intlist = intlist
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+# The literal types an equality or a membership test is indexed for - each of them hashes
+# consistently with how it compares, which is what looking one up in a dict relies on.
+_hashed_types = (Decimal, str, bool, type(None))
+
+# The literal types a range test is indexed for - each of them is totally ordered within itself.
+_ordered_types = (Decimal, str)
+
+# The range comparisons, as the engine names them
+_range_operators = ('lt', 'le', 'gt', 'ge')
+
+# What a value the index cannot vouch for is remembered as
+_unsafe = object()
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def _is_subject(expression:'any_') -> 'bool':
+    """ Whether an expression reads one value out of the input - a name or a dotted path starting with one.
+    """
+    if isinstance(expression, SymbolExpression):
+        out = expression.scope is None
+
+    elif isinstance(expression, GetAttributeExpression):
+        out = _is_subject(expression.object)
+
+    else:
+        out = False
+
+    return out
+
+# ################################################################################################################################
+
+def _is_indexed_literal(value:'any_', types:'tuple') -> 'bool':
+    """ Whether a literal value is one of the given types, with numbers limited to finite ones.
+    """
+    if type(value) not in types:
+        return False
+
+    if isinstance(value, Decimal):
+        out = value.is_finite()
+    else:
+        out = True
+
+    return out
+
+# ################################################################################################################################
+
+def _flatten_and(expression:'any_', out:'anylist') -> 'None':
+    """ Appends the conditions of an and-chain in the order they are evaluated in.
+    """
+    if isinstance(expression, LogicExpression) and expression.type == 'and':
+        _flatten_and(expression.left, out)
+        _flatten_and(expression.right, out)
+    else:
+        out.append(expression)
+
+# ################################################################################################################################
+
+def _is_always_true(condition:'any_') -> 'bool':
+    """ Whether a condition is the constant the engine reduced an always-true one to, e.g. column 0's `true == true`.
+    """
+    out = isinstance(condition, BooleanExpression) and condition.value is True
+    return out
+
+# ################################################################################################################################
+
+def _get_subject(condition:'any_') -> 'any_':
+    """ Returns the input value a condition tests, if it is a test the index is built out of, or None if it is not.
+    """
+
+    # An equality test of one value against one literal ..
+    if type(condition) is ComparisonExpression and condition.type == 'eq':
+        if _is_subject(condition.left):
+            if isinstance(condition.right, LiteralExpressionBase):
+                if _is_indexed_literal(condition.right.value, _hashed_types):
+                    return condition.left
+
+    # .. a range test of one value against one bound ..
+    elif type(condition) is ArithmeticComparisonExpression and condition.type in _range_operators:
+        if _is_subject(condition.left):
+            if isinstance(condition.right, LiteralExpressionBase):
+                if _is_indexed_literal(condition.right.value, _ordered_types):
+                    return condition.left
+
+    # .. or a membership test of one value against a list of literals.
+    elif type(condition) is ContainsExpression:
+        if _is_subject(condition.member):
+            if isinstance(condition.container, ArrayExpression):
+                for item in condition.container.value:
+                    if not isinstance(item, LiteralExpressionBase):
+                        return None
+                    if not _is_indexed_literal(item.value, _hashed_types):
+                        return None
+                return condition.member
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class _Node:
+    """ One level of the tree - the rules whose indexed conditions all held by the time an input got here.
+    """
+    __slots__ = ('positions', 'subjects', 'all_positions')
+
+    def __init__(self) -> 'None':
+
+        # The rules that have no further indexed conditions, by their position in the ruleset
+        self.positions:'intlist' = []
+
+        # The next conditions of the other rules, per the input value they test
+        self.subjects:'dict[str, _SubjectIndex]' = {}
+
+        # Every rule at this level or below it
+        self.all_positions:'intlist' = []
+
+# ################################################################################################################################
+
+class _RangeIndex:
+    """ The range tests of one input value against bounds of one type, each kind of them sorted by its bound.
+    """
+    __slots__ = ('entries', 'bounds', 'nodes', 'all_nodes')
+
+    def __init__(self) -> 'None':
+        self.entries:'dict[str, list]' = {}
+        self.bounds:'dict[str, anylist]' = {}
+        self.nodes:'dict[str, list[_Node]]' = {}
+        self.all_nodes:'list[_Node]' = []
+
+    def add(self, operator:'str', bound:'any_', node:'_Node') -> 'None':
+        self.entries.setdefault(operator, []).append((bound, node))
+        self.all_nodes.append(node)
+
+    def finalize(self) -> 'None':
+        """ Sorts each kind of test by its bound, which is what the lookup bisects.
+        """
+        for operator, entries in self.entries.items():
+            entries.sort(key=lambda entry: entry[0])
+            self.bounds[operator] = [entry[0] for entry in entries]
+            self.nodes[operator] = [entry[1] for entry in entries]
+
+    def get_matching(self, value:'any_', out:'list[_Node]') -> 'None':
+        """ Appends the tests a value satisfies - those with a bound above it for less-than tests,
+        and those with a bound below it for greater-than ones.
+        """
+        for operator, bounds in self.bounds.items():
+            nodes = self.nodes[operator]
+
+            if operator == 'lt':
+                out.extend(nodes[bisect_right(bounds, value):])
+
+            elif operator == 'le':
+                out.extend(nodes[bisect_left(bounds, value):])
+
+            elif operator == 'gt':
+                out.extend(nodes[:bisect_left(bounds, value)])
+
+            else:
+                out.extend(nodes[:bisect_right(bounds, value)])
+
+# ################################################################################################################################
+
+class _SubjectIndex:
+    """ Every condition one level of the tree has on one input value, each leading to the rules it gates.
+    """
+    __slots__ = ('expression', 'children', 'equal', 'members', 'ranges')
+
+    def __init__(self, expression:'any_') -> 'None':
+
+        # What reads the value out of an input
+        self.expression = expression
+
+        # One node per distinct condition, shared by every rule having it at this level
+        self.children:'dict[str, _Node]' = {}
+
+        # The nodes of equality and membership tests, per each literal they accept
+        self.equal:'dict[any_, list[_Node]]' = {}
+        self.members:'dict[any_, list[_Node]]' = {}
+
+        # The nodes of range tests, per the type of their bounds
+        self.ranges:'dict[type, _RangeIndex]' = {}
+
+    def get_child(self, condition:'any_') -> '_Node':
+        """ Returns the node a condition leads to, adding it to the index the first time it is seen.
+        """
+        key = build_expression_key(condition)
+
+        if node := self.children.get(key):
+            return node
+
+        node = self.children[key] = _Node()
+
+        if isinstance(condition, ContainsExpression):
+            for item in condition.container.value:
+                nodes = self.members.setdefault(item.value, [])
+
+                # Two literals of one list may be equal to each other, e.g. 1 and 1.0
+                if node not in nodes:
+                    nodes.append(node)
+
+        elif condition.type == 'eq':
+            self.equal.setdefault(condition.right.value, []).append(node)
+
+        else:
+            bound = condition.right.value
+
+            if not (range_index := self.ranges.get(type(bound))):
+                range_index = self.ranges[type(bound)] = _RangeIndex()
+
+            range_index.add(condition.type, bound, node)
+
+        return node
+
+    def get_value(self, data:'anydict', values:'anydict', key:'str') -> 'any_':
+        """ Reads this index's value out of an input once per input, telling the ones the index cannot vouch for apart.
+        """
+        if key in values:
+            return values[key]
+
+        # A value that cannot be read is one whose conditions have to be evaluated, to raise the way they do ..
+        try:
+            value = self.expression.evaluate(data)
+            _ = hash(value)
+        except Exception:
+            value = _unsafe
+
+        # .. and so is a number that no comparison can order.
+        else:
+            if isinstance(value, Decimal) and not value.is_finite():
+                value = _unsafe
+
+        values[key] = value
+        return value
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class DecisionIndex:
+    """ Picks out the rules of a ruleset that an input can fire, in rule order.
+    """
+
+    def __init__(self, cached_rules:'list[CachedRule]') -> 'None':
+
+        self.cached_rules = cached_rules
+        self.root = _Node()
+
+        # How many rules have at least one condition in the index - the others are evaluated for every input
+        self.indexed_count = 0
+
+        for position, cached_rule in enumerate(cached_rules):
+            conditions = self._get_indexed_conditions(cached_rule)
+
+            if conditions:
+                self.indexed_count += 1
+
+            node = self.root
+
+            for subject_key, subject, condition in conditions:
+
+                if not (subject_index := node.subjects.get(subject_key)):
+                    subject_index = node.subjects[subject_key] = _SubjectIndex(subject)
+
+                node = subject_index.get_child(condition)
+
+            node.positions.append(position)
+
+        _ = self._finalize(self.root)
+
+# ################################################################################################################################
+
+    def _get_indexed_conditions(self, cached_rule:'CachedRule') -> 'anylist':
+        """ Returns the leading conditions of a rule that the index can decide, in evaluation order.
+        """
+
+        # Our response to produce
+        out:'anylist' = []
+
+        # A rule with defaults evaluates a copy of the input they were filled into,
+        # which is not the input the index reads its values out of.
+        if cached_rule.rule.defaults:
+            return out
+
+        conditions:'anylist' = []
+        _flatten_and(cached_rule.rule.when_impl.statement.expression, conditions)
+
+        for condition in conditions:
+
+            # A constant that always holds decides nothing and stops nothing ..
+            if _is_always_true(condition):
+                continue
+
+            # .. and the first condition the index cannot decide ends what it can.
+            if (subject := _get_subject(condition)) is None:
+                break
+
+            subject_key = build_expression_key(subject)
+            out.append((subject_key, subject, condition))
+
+        return out
+
+# ################################################################################################################################
+
+    def _finalize(self, node:'_Node') -> 'intlist':
+        """ Sorts the range tests and notes every rule below each node, which is what an unsafe value makes candidates of.
+        """
+        all_positions = list(node.positions)
+
+        for subject_index in node.subjects.values():
+
+            for range_index in subject_index.ranges.values():
+                range_index.finalize()
+
+            for child in subject_index.children.values():
+                all_positions.extend(self._finalize(child))
+
+        node.all_positions = all_positions
+        return all_positions
+
+# ################################################################################################################################
+
+    def _collect(self, node:'_Node', data:'anydict', values:'anydict', out:'intlist') -> 'None':
+        """ Appends the positions of the rules below a node that an input can fire.
+        """
+        out.extend(node.positions)
+
+        for subject_key, subject_index in node.subjects.items():
+
+            value = subject_index.get_value(data, values, subject_key)
+
+            # A value the index cannot vouch for leaves every condition on it to the evaluation ..
+            if value is _unsafe:
+                for child in subject_index.children.values():
+                    out.extend(child.all_positions)
+                continue
+
+            # .. otherwise, the conditions it satisfies are followed further down ..
+            matching:'list[_Node]' = []
+
+            if nodes := subject_index.equal.get(value):
+                matching.extend(nodes)
+
+            if nodes := subject_index.members.get(value):
+                matching.extend(nodes)
+
+            for bound_type, range_index in subject_index.ranges.items():
+
+                # .. and a range test against a bound of another type raises, so it goes to the evaluation too.
+                if type(value) is bound_type:
+                    range_index.get_matching(value, matching)
+                else:
+                    for child in range_index.all_nodes:
+                        out.extend(child.all_positions)
+
+            for child in matching:
+                self._collect(child, data, values, out)
+
+# ################################################################################################################################
+
+    def get_candidates(self, data:'anydict') -> 'list[CachedRule]':
+        """ Returns the rules an input can fire, in rule order - every other rule would not fire if evaluated.
+        """
+        positions:'intlist' = []
+
+        # Each input value the conditions test is read once, however many levels test it
+        values:'anydict' = {}
+
+        self._collect(self.root, data, values, positions)
+        positions.sort()
+
+        out = [self.cached_rules[position] for position in positions]
+        return out
+
+# ################################################################################################################################
+# ################################################################################################################################
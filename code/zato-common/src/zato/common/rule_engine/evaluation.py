@@ -149,9 +149,14 @@ def evaluate_input(loaded:'LoadedRules', data:'anydict') -> 'anydict':
     actual = {}
     error = ''
 
+    # All the rules of one load belong to one ruleset, whose decision index picks out
+    # the ones this input can fire - the rest would not change the answer.
     cached_rules = []
-    for full_name in loaded.rule_names:
-        cached_rules.append(loaded.manager.cached_rules[full_name])
+
+    if loaded.rule_names:
+        first = loaded.manager.cached_rules[loaded.rule_names[0]]
+        ruleset = loaded.manager[first.rule.ruleset_name]
+        cached_rules = ruleset.get_candidates(data)
 
     try:
         outcome = evaluate_ruleset(cached_rules, data)
@@ -25,6 +25,7 @@ from zato.common.rule_engine.evaluation import evaluate_ruleset, RulesetOutcome
 
 if 0:
     from zato.common.rule_engine.cache import CachedRule
+    from zato.common.rule_engine.decision_index import DecisionIndex
     from zato.common.typing_ import anydict, dict_, dictlist, strdict
 
 # ################################################################################################################################
@@ -167,6 +168,7 @@ class Ruleset(Model):
     name: 'str'
     _rules: 'dict_[str, Rule]'
     _cached_rules: 'dict_[str, CachedRule]'
+    decision_index: 'DecisionIndex | None'
 
     def __init__(self, name:'str') -> 'None':
         self.name = name
@@ -177,6 +179,10 @@ class Ruleset(Model):
         self._rules = {}
         self._cached_rules = {}
 
+        # Built by the manager once all the rules are loaded, and dropped whenever they change,
+        # in which case every rule is evaluated until it is built again.
+        self.decision_index = None
+
     def __getitem__(self, name:'str') -> 'Rule':
         return getattr(self, name)
 
@@ -192,12 +198,34 @@ class Ruleset(Model):
     def add_rule(self, rule:'Rule', cached_rule:'CachedRule') -> 'None':
         self._rules[rule.full_name] = rule
         self._cached_rules[rule.full_name] = cached_rule
+        self.decision_index = None
 
 # ################################################################################################################################
 
     def delete_rule(self, full_name:'str') -> 'None':
         _ = self._rules.pop(full_name, None)
         _ = self._cached_rules.pop(full_name, None)
+        self.decision_index = None
+
+# ################################################################################################################################
+
+    def get_cached_rules(self) -> 'list[CachedRule]':
+        """ Returns all the rules in the form the ruleset answer evaluates, in rule order.
+        """
+        out = list(self._cached_rules.values())
+        return out
+
+# ################################################################################################################################
+
+    def get_candidates(self, data:'anydict') -> 'list[CachedRule]':
+        """ Returns the rules that one input can fire, in rule order - all of them if there is no decision index.
+        """
+        if self.decision_index is None:
+            out = self.get_cached_rules()
+        else:
+            out = self.decision_index.get_candidates(data)
+
+        return out
 
 # ################################################################################################################################
 
@@ -206,8 +234,11 @@ class Ruleset(Model):
 
         This is the same answer the REST door gives for the same input, from the same core,
         so a ruleset cannot decide one thing for a service in process and another over HTTP.
+
+        Only the rules the decision index says the input can fire are evaluated - the others
+        would neither fire nor raise, so the answer is the one evaluating all of them gives.
         """
-        out = evaluate_ruleset(self._cached_rules.values(), data)
+        out = evaluate_ruleset(self.get_candidates(data), data)
         return out
 
 # ################################################################################################################################
@@ -12,6 +12,7 @@ import time
 import signal
 import sys
 from pathlib import Path
+from random import Random
 from statistics import mean, median, stdev
 
 # Zato
@@ -27,10 +28,70 @@ if 0:
 # ################################################################################################################################
 # ################################################################################################################################
 
+# What the generated wide decision tables route on
+_wide_regions = ['EMEA', 'APAC', 'AMER', 'LATAM', 'ANZ', 'MEA', 'CIS', 'NORDICS']
+_wide_tiers = ['Gold', 'Silver', 'Bronze', 'Basic']
 
 # ################################################################################################################################
+
+def build_wide_table(column_count:'int', seed:'int'=0) -> 'anydict':
+    """ Builds a decision table with as many rule columns as requested, each of them routing one combination
+    of a region, a set of tiers and a score band - the shape of a table grown column by column over the years.
+    """
+    rng = Random(seed)
+    columns = []
+
+    # Column 0 is where a claim no other column claims goes
+    columns.append({'number': 0, 'cells': {}, 'actions': {'route': 'default'}})
+
+    for number in range(1, column_count + 1):
+
+        low = rng.randrange(0, 900, 10)
+        tiers = rng.sample(_wide_tiers, rng.randint(1, 2))
+
+        cells = {
+            'a': rng.choice(_wide_regions),
+            'b': 'in {' + ', '.join(tiers) + '}',
+            'c': f'{low}..{low + rng.randrange(10, 100, 10)}',
+        }
+
+        columns.append({'number': number, 'cells': cells, 'actions': {'route': f'queue_{number}'}})
+
+    out = {
+        'name': f'Wide routing {column_count}',
+        'docs': 'Where one claim goes, by region, tier and score.',
+        'filter': {'subject': 'claim.amount', 'cell': '> 0'},
+        'conditions': [
+            {'letter': 'a', 'subject': 'claim.region'},
+            {'letter': 'b', 'subject': 'claim.tier'},
+            {'letter': 'c', 'subject': 'claim.score'},
+        ],
+        'actions': [{'target': 'route'}],
+        'columns': columns,
+    }
+    return out
+
 # ################################################################################################################################
 
+def build_wide_inputs(count:'int', seed:'int'=0) -> 'anylist':
+    """ Builds inputs for the tables of build_wide_table, an occasional one without a score the way real input can be.
+    """
+    rng = Random(seed)
+    out = []
+
+    for _ in range(count):
+        claim = {
+            'amount': rng.randint(0, 5000),
+            'region': rng.choice(_wide_regions),
+            'tier': rng.choice(_wide_tiers),
+        }
+
+        if rng.random() > 0.05:
+            claim['score'] = rng.randint(0, 1000)
+
+        out.append({'claim': claim})
+
+    return out
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -16,6 +16,9 @@ from zato.hl7v2.base import (
 )
 from zato.hl7v2.validator import validate_message, ValidationResult, ValidationError  # pyright: ignore[reportAttributeAccessIssue]
 from zato.hl7v2.batch import HL7Batch, HL7File, parse_batch, parse_file, parse_batch_or_file, create_batch, create_file
+from zato.hl7v2.batch import iter_batch, iter_file, iter_batch_or_file
+from zato.hl7v2.parallel import ParallelOutput, ParallelResult, iter_batch_parallel, iter_file_parallel, \
+    iter_batch_or_file_parallel
 from zato.hl7v2.z_segments import ZAU, ZBE, ZDS, ZFD
 from zato.hl7v2_rs import ToleranceConfig
 
@@ -48,6 +51,14 @@ __all__ = [
     'parse_batch',
     'parse_file',
     'parse_batch_or_file',
+    'iter_batch',
+    'iter_file',
+    'iter_batch_or_file',
+    'iter_batch_parallel',
+    'iter_file_parallel',
+    'iter_batch_or_file_parallel',
+    'ParallelOutput',
+    'ParallelResult',
     'create_batch',
     'create_file',
     'ToleranceConfig',
@@ -10,14 +10,36 @@ Structure:
     MSH|...(msg 2)...
     BTS|2            <- Batch Trailer (message count)
     FTS|1            <- File Trailer (batch count)
+
+parse_batch and parse_file build the whole structure in memory, while iter_batch and iter_file
+read their input in chunks and yield one parsed message at a time, for inputs too large to hold at once.
 """
 from __future__ import annotations
 
+import codecs
+import os
+import re
 from dataclasses import dataclass, field
-from typing import Iterator, List, Optional
+from mmap import mmap
+from typing import IO, Callable, Iterator, List, Optional, Union
 
 from zato.hl7v2.base import HL7Message
 
+# What the streaming functions read from - a path, an open file in text or binary mode, an mmap or a bytes-like buffer.
+HL7Source = Union[str, "os.PathLike[str]", IO, mmap, bytes, bytearray, memoryview]
+
+# Whether a streamed message is validated - either for all of them or decided per message from its raw content.
+ValidateOption = Union[bool, Callable[[str], bool]]
+
+# How much of the input the streaming functions read at a time, in bytes or characters.
+_stream_chunk_size = 1024 * 1024
+
+# Segments are delimited by CR, though LF and CRLF are accepted too.
+_segment_separator = re.compile("[\r\n]")
+
+# Segments that open or close a message, a batch or a file.
+_envelope_segment_ids = frozenset({"MSH", "BHS", "BTS", "FHS", "FTS"})
+
 
 @dataclass
 class HL7Batch:
@@ -260,6 +282,276 @@ def parse_file(raw: str, validate: bool = True) -> HL7File:
     return hl7_file
 
 
+def _iter_chunks(source: HL7Source, encoding: str, chunk_size: int) -> Iterator[str]:
+    """Read the source in chunks of text, decoding bytes as they come in."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            yield from _iter_chunks(f, encoding, chunk_size)
+        return
+
+    # A multi-byte character may be split across two chunks, which an incremental decoder is prepared for
+    decoder = codecs.getincrementaldecoder(encoding)()
+
+    # Open files and mmaps are read from their current position ..
+    if hasattr(source, "read"):
+        while chunk := source.read(chunk_size):  # type: ignore[union-attr]
+            if isinstance(chunk, str):
+                yield chunk
+            else:
+                yield decoder.decode(chunk)
+
+    # .. while buffers are sliced without copying more than one chunk at a time.
+    else:
+        view = memoryview(source)  # type: ignore[arg-type]
+        for start in range(0, len(view), chunk_size):
+            yield decoder.decode(bytes(view[start:start + chunk_size]))
+
+    if tail := decoder.decode(b"", final=True):
+        yield tail
+
+
+def _iter_segments(source: HL7Source, encoding: str, chunk_size: int) -> Iterator[str]:
+    """Yield individual segment strings from the source, holding no more than one chunk in memory."""
+    pending = ""
+
+    for chunk in _iter_chunks(source, encoding, chunk_size):
+
+        # The last part may be a segment the next chunk continues, so it waits for that chunk
+        parts = _segment_separator.split(pending + chunk)
+        pending = parts.pop()
+
+        for part in parts:
+            if segment := part.strip():
+                yield segment
+
+    if segment := pending.strip():
+        yield segment
+
+
+def _get_trailer_count(segment: str) -> Optional[int]:
+    """Extract the count a BTS or FTS segment declares in its first field, if it declares one."""
+    fields = segment.split("|", 2)
+    if len(fields) > 1 and fields[1].strip().isdigit():
+        return int(fields[1])
+    return None
+
+
+def _check_trailer_count(segment: str, actual: int, what: str) -> None:
+    """Raise ValueError if a trailer declares a count other than what was actually read."""
+    expected = _get_trailer_count(segment)
+    if expected is not None and expected != actual:
+        raise ValueError(f"{_get_segment_id(segment)} declares {expected} {what}, found: {actual}")
+
+
+def iter_raw_messages(
+    source: HL7Source,
+    expected_header: Optional[str] = None,
+    check_counts: bool = True,
+    encoding: str = "utf-8",
+    chunk_size: int = _stream_chunk_size,
+) -> Iterator[str]:
+    """
+    Iterate over the raw ER7 strings of the messages of a batch, a file or either, without parsing them.
+
+    This is what the streaming and parallel parsers are built on - it finds message boundaries
+    and checks the trailer counts, leaving it to the caller what to do with each message.
+
+    Args:
+        source: A path, an open file in text or binary mode, an mmap or a bytes-like buffer
+        expected_header: "BHS" or "FHS" if the input must be a batch or a file, None for either
+        check_counts: If True, check the trailer counts and require the trailers to be present
+        encoding: How to decode the source if it is not text already
+        chunk_size: How much of the source to read at a time
+
+    Yields:
+        Raw messages with their segments delimited by CR, one at a time
+
+    Raises:
+        ValueError: If the structure is invalid or any of its trailer counts does not match
+    """
+    segments = _iter_segments(source, encoding, chunk_size)
+
+    first_segment = next(segments, None)
+    if first_segment is None:
+        raise ValueError("Empty content")
+
+    first_seg_id = _get_segment_id(first_segment)
+
+    if expected_header == "BHS" and first_seg_id == "FHS":
+        raise ValueError("Input contains FHS header - use iter_file() instead")
+
+    if expected_header == "FHS" and first_seg_id == "BHS":
+        raise ValueError("Input contains BHS header without FHS - use iter_batch() instead")
+
+    if expected_header and first_seg_id != expected_header:
+        raise ValueError(f"Input must start with {expected_header} segment, found: {first_seg_id}")
+
+    if first_seg_id not in ("BHS", "FHS"):
+        raise ValueError(f"Content must start with FHS or BHS, found: {first_seg_id}")
+
+    is_file = first_seg_id == "FHS"
+    in_batch = not is_file
+
+    batch_count = 0
+    message_count = 0
+    message_segments: List[str] = []
+    has_trailer = False
+
+    for segment in segments:
+        seg_id = _get_segment_id(segment)
+
+        # Anything other than an envelope segment belongs to the message being read, if there is one ..
+        if seg_id not in _envelope_segment_ids:
+            if message_segments:
+                message_segments.append(segment)
+            continue
+
+        # .. while an envelope segment always ends it.
+        if message_segments:
+            yield "\r".join(message_segments)
+            message_count += 1
+            message_segments = []
+
+        if seg_id == "MSH":
+            if in_batch:
+                message_segments = [segment]
+
+        elif seg_id == "BHS" and is_file:
+            if in_batch:
+                if check_counts:
+                    raise ValueError("Batch has no BTS trailer")
+                batch_count += 1
+            in_batch = True
+            message_count = 0
+
+        elif seg_id == "BTS" and in_batch:
+            if check_counts:
+                _check_trailer_count(segment, message_count, "messages")
+            batch_count += 1
+            in_batch = False
+            if not is_file:
+                has_trailer = True
+                break
+
+        elif seg_id == "FTS" and is_file:
+            if in_batch:
+                if check_counts:
+                    raise ValueError("Batch has no BTS trailer")
+                batch_count += 1
+            if check_counts:
+                _check_trailer_count(segment, batch_count, "batches")
+            has_trailer = True
+            break
+
+    # The input ended without its trailer, so what was read of the last message is all there is of it
+    if message_segments:
+        yield "\r".join(message_segments)
+
+    if check_counts and not has_trailer:
+        raise ValueError("File has no FTS trailer" if is_file else "Batch has no BTS trailer")
+
+
+def _iter_stream(
+    source: HL7Source,
+    expected_header: Optional[str],
+    validate: ValidateOption,
+    check_counts: bool,
+    encoding: str,
+    chunk_size: int,
+) -> Iterator[HL7Message]:
+    """Yield parsed messages from a batch, a file or either, depending on the header expected."""
+    from zato.hl7v2.v2_9 import parse_hl7
+
+    for msg_raw in iter_raw_messages(source, expected_header, check_counts, encoding, chunk_size):
+        should_validate = validate(msg_raw) if callable(validate) else validate
+        yield parse_hl7(msg_raw, validate=should_validate)
+
+
+def iter_batch(
+    source: HL7Source,
+    validate: ValidateOption = True,
+    check_counts: bool = True,
+    encoding: str = "utf-8",
+    chunk_size: int = _stream_chunk_size,
+) -> Iterator[HL7Message]:
+    """
+    Iterate over the messages of an HL7 batch (BHS...BTS) without reading it all into memory.
+
+    The source is read in chunks and each message is parsed only when the caller asks for it,
+    so memory use depends on the size of the largest message rather than of the whole batch.
+    Once all the messages are yielded, the count in BTS is checked against how many there were.
+
+    Args:
+        source: A path, an open file in text or binary mode, an mmap or a bytes-like buffer
+        validate: If True, validate each message, or a callable deciding it for each raw message
+        check_counts: If True, check the BTS count and require the trailer to be present
+        encoding: How to decode the source if it is not text already
+        chunk_size: How much of the source to read at a time
+
+    Yields:
+        Parsed HL7Message objects, one at a time
+
+    Raises:
+        ValueError: If batch structure is invalid or its trailer count does not match
+    """
+    return _iter_stream(source, "BHS", validate, check_counts, encoding, chunk_size)
+
+
+def iter_file(
+    source: HL7Source,
+    validate: ValidateOption = True,
+    check_counts: bool = True,
+    encoding: str = "utf-8",
+    chunk_size: int = _stream_chunk_size,
+) -> Iterator[HL7Message]:
+    """
+    Iterate over the messages of all the batches of an HL7 file (FHS...FTS) without reading it all into memory.
+
+    Works like iter_batch, with the count in each BTS checked as its batch ends
+    and the count in FTS checked once all the batches are read.
+
+    Args:
+        source: A path, an open file in text or binary mode, an mmap or a bytes-like buffer
+        validate: If True, validate each message, or a callable deciding it for each raw message
+        check_counts: If True, check the BTS and FTS counts and require the trailers to be present
+        encoding: How to decode the source if it is not text already
+        chunk_size: How much of the source to read at a time
+
+    Yields:
+        Parsed HL7Message objects, one at a time, in the order of their batches
+
+    Raises:
+        ValueError: If file structure is invalid or any of its trailer counts does not match
+    """
+    return _iter_stream(source, "FHS", validate, check_counts, encoding, chunk_size)
+
+
+def iter_batch_or_file(
+    source: HL7Source,
+    validate: ValidateOption = True,
+    check_counts: bool = True,
+    encoding: str = "utf-8",
+    chunk_size: int = _stream_chunk_size,
+) -> Iterator[HL7Message]:
+    """
+    Iterate over the messages of an HL7 batch or file, detecting which one it is from its first segment.
+
+    Args:
+        source: A path, an open file in text or binary mode, an mmap or a bytes-like buffer
+        validate: If True, validate each message, or a callable deciding it for each raw message
+        check_counts: If True, check the trailer counts and require the trailers to be present
+        encoding: How to decode the source if it is not text already
+        chunk_size: How much of the source to read at a time
+
+    Yields:
+        Parsed HL7Message objects, one at a time
+
+    Raises:
+        ValueError: If content is neither a valid batch nor file
+    """
+    return _iter_stream(source, None, validate, check_counts, encoding, chunk_size)
+
+
 def parse_batch_or_file(raw: str, validate: bool = True) -> HL7Batch | HL7File:
     """
     Parse raw HL7 content, automatically detecting if it's a batch or file.
@@ -0,0 +1,312 @@
+"""
+HL7 v2 Batch and File parsing across a pool of worker processes.
+
+Message boundaries are found in the calling process, by the same reader that iter_batch and iter_file use,
+while parsing and validating the messages is fanned out to a bounded pool of worker processes in chunks.
+Results are yielded in the order of the input, whatever order the workers finish in.
+
+What crosses the process boundary is a ParallelResult, holding the raw message and the outcome
+of parsing and validating it, so that nothing is required of the Rust-backed objects other than
+that they can be rebuilt from ER7 in the calling process. Depending on the output requested,
+they are rebuilt as typed HL7Message objects, as RawMessage objects or not at all.
+
+Rebuilding is a deliberate limitation rather than an oversight - a RawMessage lives in the Rust core,
+which gives Python neither a constructor for it nor a way to pickle it, and a typed HL7Message is only
+a view over one. This means that the Message and Raw outputs parse each message once more in the calling
+process, without validating it again, and only ParallelOutput.Result keeps parsing entirely in the workers.
+A caller that needs the speed of all the workers and only some of the messages, e.g. the invalid ones,
+asks for the Result output and rebuilds just what it needs.
+"""
+from __future__ import annotations
+
+import os
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing import get_context
+from typing import Any, Deque, Iterator, List, Optional, Tuple
+
+from zato.hl7v2.base import HL7ValidationError
+from zato.hl7v2.batch import HL7Source, _stream_chunk_size, iter_raw_messages
+
+# How many messages one worker parses per task - enough to make up for the cost of sending them over.
+_chunk_messages = 200
+
+# How many chunks per worker may be waiting for their results, which bounds how far ahead of the caller the input is read.
+_pending_chunks_per_worker = 2
+
+
+class ParallelOutput:
+    """What the parallel parsers yield for each message."""
+
+    # Typed HL7Message objects, as parse_batch and iter_batch return - each is parsed again in the calling process
+    Message = "message"
+
+    # RawMessage objects of the Rust core, skipping the typed layer - each is parsed again in the calling process too
+    Raw = "raw"
+
+    # ParallelResult objects, with nothing parsed in the calling process at all
+    Result = "result"
+
+
+@dataclass
+class ParallelResult:
+    """The outcome of parsing and, optionally, validating one message in a worker process."""
+
+    index: int
+    raw: str
+    structure_id: str = ""
+    errors: List[str] = field(default_factory=list)
+    parse_error: str = ""
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.parse_error and not self.errors
+
+
+def _parse_chunk(first_index: int, raw_messages: List[str], validate: bool) -> List[ParallelResult]:
+    """Parse and validate a chunk of raw messages - this is what runs in the worker processes."""
+    from zato.hl7v2_rs import parse_hl7, validate_parsed
+
+    out: List[ParallelResult] = []
+
+    for offset, raw in enumerate(raw_messages):
+        result = ParallelResult(index=first_index + offset, raw=raw)
+
+        try:
+            raw_message = parse_hl7(raw)
+        except Exception as e:
+            result.parse_error = str(e)
+        else:
+            result.structure_id = raw_message.structure_id
+            if validate:
+                validation = validate_parsed(raw_message)
+                if not validation.is_valid:
+                    result.errors = [f"{error.path}: {error.message}" for error in validation.errors]
+
+        out.append(result)
+
+    return out
+
+
+def _iter_message_chunks(raw_messages: Iterator[str], chunk_messages: int) -> Iterator[Tuple[int, List[str]]]:
+    """Group raw messages into chunks, each with the index of its first message."""
+    chunk: List[str] = []
+    first_index = 0
+
+    try:
+        for index, raw in enumerate(raw_messages):
+            chunk.append(raw)
+            if len(chunk) == chunk_messages:
+                yield first_index, chunk
+                first_index = index + 1
+                chunk = []
+
+    # A trailer count that does not match is found only after the last message,
+    # which still belongs to the input and is handed out before the error is.
+    except ValueError:
+        if chunk:
+            yield first_index, chunk
+        raise
+
+    if chunk:
+        yield first_index, chunk
+
+
+def _get_output(result: ParallelResult, output: str) -> Any:
+    """Turn what a worker returned into what the caller asked for, raising the same errors parse_hl7 would."""
+    if output == ParallelOutput.Result:
+        return result
+
+    if result.parse_error:
+        raise ValueError(result.parse_error)
+
+    if result.errors:
+        details = "; ".join(result.errors)
+        raise HL7ValidationError(f"Message validation failed: {details}")
+
+    # The workers validated the message already, so it is only rebuilt here - the Rust objects
+    # cannot be pickled, so parsing it again is the only way to bring it over ..
+    if output == ParallelOutput.Raw:
+        from zato.hl7v2_rs import parse_hl7 as parse_raw
+        return parse_raw(result.raw)
+
+    # .. either as a raw one or as a typed one.
+    from zato.hl7v2.v2_9 import parse_hl7
+    return parse_hl7(result.raw, validate=False)
+
+
+def _iter_parallel(
+    source: HL7Source,
+    expected_header: Optional[str],
+    workers: Optional[int],
+    validate: bool,
+    output: str,
+    check_counts: bool,
+    chunk_messages: int,
+    executor: Optional[Executor],
+    encoding: str,
+    chunk_size: int,
+) -> Iterator[Any]:
+    """Yield the messages of a batch, a file or either, parsed by a pool of worker processes."""
+    workers = workers or os.cpu_count() or 1
+
+    raw_messages = iter_raw_messages(source, expected_header, check_counts, encoding, chunk_size)
+    chunks = _iter_message_chunks(raw_messages, chunk_messages)
+
+    # Workers are spawned rather than forked, so that they do not inherit the caller's event loop
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+
+    max_pending = workers * _pending_chunks_per_worker
+    pending: Deque[Future] = deque()
+    reader_error: Optional[ValueError] = None
+    is_exhausted = False
+
+    try:
+        while True:
+
+            # Keep all the workers busy, without reading further ahead than a few chunks for each ..
+            while not is_exhausted and len(pending) < max_pending:
+                try:
+                    first_index, chunk = next(chunks)
+                except StopIteration:
+                    is_exhausted = True
+                except ValueError as e:
+                    reader_error = e
+                    is_exhausted = True
+                else:
+                    pending.append(executor.submit(_parse_chunk, first_index, chunk, validate))  # type: ignore[union-attr]
+
+            if not pending:
+                break
+
+            # .. and hand out results strictly in the order of the input.
+            for result in pending.popleft().result():
+                yield _get_output(result, output)
+
+        # A structural problem is reported only once everything read before it has been handed out
+        if reader_error is not None:
+            raise reader_error
+
+    finally:
+        for future in pending:
+            _ = future.cancel()
+
+        if own_executor:
+            executor.shutdown(wait=True, cancel_futures=True)  # type: ignore[union-attr]
+
+
+def iter_batch_parallel(
+    source: HL7Source,
+    workers: Optional[int] = None,
+    validate: bool = True,
+    output: str = ParallelOutput.Message,
+    check_counts: bool = True,
+    chunk_messages: int = _chunk_messages,
+    executor: Optional[Executor] = None,
+    encoding: str = "utf-8",
+    chunk_size: int = _stream_chunk_size,
+) -> Iterator[Any]:
+    """
+    Iterate over the messages of an HL7 batch (BHS...BTS), parsed and validated by a pool of worker processes.
+
+    Works like iter_batch, except that the messages are parsed in up to `workers` processes at a time,
+    while the calling process only finds their boundaries and waits for the results, in order.
+
+    Args:
+        source: A path, an open file in text or binary mode, an mmap or a bytes-like buffer
+        workers: How many worker processes to use, defaults to the number of CPUs
+        validate: If True, validate each message in its worker
+        output: One of the ParallelOutput values - what to yield for each message
+        check_counts: If True, check the BTS count and require the trailer to be present
+        chunk_messages: How many messages to send to a worker at a time
+        executor: An executor to reuse across calls, otherwise one is started and shut down by each call
+        encoding: How to decode the source if it is not text already
+        chunk_size: How much of the source to read at a time
+
+    Yields:
+        HL7Message, RawMessage or ParallelResult objects, depending on output, in the order of the batch
+
+    Raises:
+        ValueError: If batch structure is invalid or a message cannot be parsed
+        HL7ValidationError: If a message fails validation, unless output is ParallelOutput.Result
+    """
+    return _iter_parallel(
+        source, "BHS", workers, validate, output, check_counts, chunk_messages, executor, encoding, chunk_size)
+
+
+def iter_file_parallel(
+    source: HL7Source,
+    workers: Optional[int] = None,
+    validate: bool = True,
+    output: str = ParallelOutput.Message,
+    check_counts: bool = True,
+    chunk_messages: int = _chunk_messages,
+    executor: Optional[Executor] = None,
+    encoding: str = "utf-8",
+    chunk_size: int = _stream_chunk_size,
+) -> Iterator[Any]:
+    """
+    Iterate over the messages of all the batches of an HL7 file (FHS...FTS), parsed by a pool of worker processes.
+
+    Works like iter_batch_parallel, with the counts in BTS and FTS checked as in iter_file.
+
+    Args:
+        source: A path, an open file in text or binary mode, an mmap or a bytes-like buffer
+        workers: How many worker processes to use, defaults to the number of CPUs
+        validate: If True, validate each message in its worker
+        output: One of the ParallelOutput values - what to yield for each message
+        check_counts: If True, check the BTS and FTS counts and require the trailers to be present
+        chunk_messages: How many messages to send to a worker at a time
+        executor: An executor to reuse across calls, otherwise one is started and shut down by each call
+        encoding: How to decode the source if it is not text already
+        chunk_size: How much of the source to read at a time
+
+    Yields:
+        HL7Message, RawMessage or ParallelResult objects, depending on output, in the order of the file
+
+    Raises:
+        ValueError: If file structure is invalid or a message cannot be parsed
+        HL7ValidationError: If a message fails validation, unless output is ParallelOutput.Result
+    """
+    return _iter_parallel(
+        source, "FHS", workers, validate, output, check_counts, chunk_messages, executor, encoding, chunk_size)
+
+
+def iter_batch_or_file_parallel(
+    source: HL7Source,
+    workers: Optional[int] = None,
+    validate: bool = True,
+    output: str = ParallelOutput.Message,
+    check_counts: bool = True,
+    chunk_messages: int = _chunk_messages,
+    executor: Optional[Executor] = None,
+    encoding: str = "utf-8",
+    chunk_size: int = _stream_chunk_size,
+) -> Iterator[Any]:
+    """
+    Iterate over the messages of an HL7 batch or file, parsed by a pool of worker processes,
+    detecting which one it is from its first segment.
+
+    Args:
+        source: A path, an open file in text or binary mode, an mmap or a bytes-like buffer
+        workers: How many worker processes to use, defaults to the number of CPUs
+        validate: If True, validate each message in its worker
+        output: One of the ParallelOutput values - what to yield for each message
+        check_counts: If True, check the trailer counts and require the trailers to be present
+        chunk_messages: How many messages to send to a worker at a time
+        executor: An executor to reuse across calls, otherwise one is started and shut down by each call
+        encoding: How to decode the source if it is not text already
+        chunk_size: How much of the source to read at a time
+
+    Yields:
+        HL7Message, RawMessage or ParallelResult objects, depending on output
+
+    Raises:
+        ValueError: If content is neither a valid batch nor file, or a message cannot be parsed
+        HL7ValidationError: If a message fails validation, unless output is ParallelOutput.Result
+    """
+    return _iter_parallel(
+        source, None, workers, validate, output, check_counts, chunk_messages, executor, encoding, chunk_size)
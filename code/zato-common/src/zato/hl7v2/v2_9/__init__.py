@@ -1618,7 +1618,7 @@ from zato.hl7v2.v2_9.messages import (
 from zato.hl7v2.base import HL7Message, HL7ValidationError
 from zato.hl7v2_rs import parse_hl7 as _rust_parse, validate as _rust_validate, serialize as _rust_serialize, ValidationResult, ValidationError
 from zato.hl7v2_rs import apply_tolerance as _apply_tolerance, validate_parsed as _rust_validate_parsed, ToleranceConfig
-from zato.hl7v2.batch import parse_batch, parse_file, parse_batch_or_file
+from zato.hl7v2.batch import parse_batch, parse_file, parse_batch_or_file, iter_batch, iter_file, iter_batch_or_file
 
 __all__ = [
     "HL7Message",
@@ -1626,6 +1626,9 @@ __all__ = [
     "ToleranceConfig",
     "ValidationError",
     "ValidationResult",
+    "iter_batch",
+    "iter_batch_or_file",
+    "iter_file",
     "parse_batch",
     "parse_batch_or_file",
     "parse_file",
@@ -11,15 +11,15 @@ from zato.x12.ack import AckResult, ElementNoteResult, FunctionalAcknowledgment9
      SegmentNoteResult, SetAckResult, TA1Result, X12AckError, build_997, build_999, build_ta1, parse_997, parse_999, parse_ta1
 from zato.x12.base import X12GenericMessage, X12GenericSegment, X12HierarchicalLoop, X12Message, X12Segment
 from zato.x12.control import ControlNumberStore, SequenceDetails, get_control_db_path
-from zato.x12.envelope import X12EnvelopeError, X12FunctionalGroup, X12Interchange, parse_x12
+from zato.x12.envelope import X12EnvelopeError, X12FunctionalGroup, X12Interchange, iter_x12, parse_x12
 from zato.x12.preflight import check_usage_indicator, gs1_check_digit, is_valid_gtin, is_valid_sscc, preflight_invoice, \
      preflight_purchase_order, preflight_ship_notice
 from zato.x12.service import GE, GS, IEA, ISA, SE, ST, TA1
-from zato.x12.syntax import RawSegment, Separators, X12SyntaxError, default_separators, parse_isa, parse_segment, \
-     parse_segments, serialize_segment, split_segments
+from zato.x12.syntax import RawSegment, Separators, X12SyntaxError, default_separators, iter_split_segments, parse_isa, \
+     parse_segment, parse_segments, serialize_segment, split_segments
 from zato.x12.validation import SetValidationResult, ValidationIssue, X12ValidationError, extract_business_key, \
-     parse_x12_strict, validate_interchange, validate_snip_1, validate_snip_2, validate_snip_3, validate_snip_4, \
-     validate_transaction_set
+     iter_x12_strict, parse_x12_strict, validate_interchange, validate_snip_1, validate_snip_2, validate_snip_3, \
+     validate_snip_4, validate_transaction_set
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -66,6 +66,9 @@ __all__ = [
     'gs1_check_digit',
     'is_valid_gtin',
     'is_valid_sscc',
+    'iter_split_segments',
+    'iter_x12',
+    'iter_x12_strict',
     'parse_997',
     'parse_999',
     'parse_isa',
@@ -10,14 +10,16 @@ from __future__ import annotations
 
 # stdlib
 import json
-
+from codecs import getincrementaldecoder
 from datetime import datetime, timezone
+from itertools import chain
 
 # Zato
-from zato.common.typing_ import optional
+from zato.common.typing_ import generator_, optional
 from zato.x12.base import X12Message, _element_value
 from zato.x12.service import GE, GS, IEA, ISA, TA1
-from zato.x12.syntax import No_Repetition, RawSegment, Separators, default_separators, parse_isa, parse_segments
+from zato.x12.syntax import ISA_Total_Length, No_Repetition, RawSegment, Separators, default_separators, \
+     iter_split_segments, parse_isa, parse_segment, parse_segments
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -40,8 +42,12 @@ message_list     = list[X12Message]
 group_list       = list['X12FunctionalGroup']
 
 group_none            = optional['X12FunctionalGroup']
+message_none          = optional[X12Message]
 raw_segment_list_none = optional[raw_segment_list]
 
+strgen            = generator_[str, None, None]
+group_message_gen = generator_[tuple['X12FunctionalGroup', X12Message], None, None]
+
 # ################################################################################################################################
 # ################################################################################################################################
 
@@ -82,6 +88,12 @@ ISA_Date_Format = '%y%m%d'
 GS_Date_Format  = '%Y%m%d'
 Time_Format     = '%H%M'
 
+# How many characters or bytes a streaming read takes from its source at a time ..
+Stream_Chunk_Size = 1024 * 1024
+
+# .. and how the bytes are decoded, if the source returns bytes.
+Stream_Encoding = 'utf-8'
+
 # ################################################################################################################################
 # ################################################################################################################################
 
@@ -379,13 +391,11 @@ class X12Interchange:
 # ################################################################################################################################
 # ################################################################################################################################
 
-def _validate_envelope(interchange:'X12Interchange') -> 'None':
-    """ Checks the control number echoes and counts of a parsed interchange -
-    ISA13=IEA02, GS06=GE02, ST02=SE02, IEA01 is the group count, GE01 the set count,
-    SE01 the segment count including ST and SE - and rejects duplicate control numbers.
+def _validate_interchange_trailer(isa:'any_', iea:'any_', group_count:'int') -> 'None':
+    """ Checks that the IEA echoes ISA13 and that IEA01 is the actual group count.
     """
-    isa_control = interchange.isa.control_number
-    iea_control = interchange.iea.control_number
+    isa_control = isa.control_number
+    iea_control = iea.control_number
 
     isa_control_number = int(isa_control)
     iea_control_number = int(iea_control)
@@ -395,177 +405,330 @@ def _validate_envelope(interchange:'X12Interchange') -> 'None':
         raise X12EnvelopeError(f'ISA13 `{isa_control}` does not match IEA02 `{iea_control}`')
 
     # .. and carry the actual group count.
-    group_count = len(interchange.groups)
-    iea_group_count = int(interchange.iea.group_count)
+    iea_group_count = int(iea.group_count)
 
     if iea_group_count != group_count:
         raise X12EnvelopeError(f'IEA01 `{iea_group_count}` does not match the group count {group_count}')
 
-    seen_group_numbers:'intlist' = []
+# ################################################################################################################################
 
-    for group in interchange.groups:
-        gs_control = group.gs.control_number
-        ge_control = group.ge.control_number
+def _validate_group_trailer(gs:'any_', ge:'any_', set_count:'int', seen_group_numbers:'intlist') -> 'None':
+    """ Checks that the GE echoes GS06, that GE01 is the actual set count and that the group
+    control number is not used by any earlier group of the interchange, then records it as seen.
+    """
+    gs_control = gs.control_number
+    ge_control = ge.control_number
 
-        group_number = int(gs_control)
-        ge_group_number = int(ge_control)
+    group_number = int(gs_control)
+    ge_group_number = int(ge_control)
 
-        # The GE must echo the group control number ..
-        if group_number != ge_group_number:
-            raise X12EnvelopeError(f'GS06 `{gs_control}` does not match GE02 `{ge_control}`')
+    # The GE must echo the group control number ..
+    if group_number != ge_group_number:
+        raise X12EnvelopeError(f'GS06 `{gs_control}` does not match GE02 `{ge_control}`')
 
-        # .. which must be unique within the interchange ..
-        if group_number in seen_group_numbers:
-            raise X12EnvelopeError(f'Duplicate group control number `{gs_control}`')
-        seen_group_numbers.append(group_number)
+    # .. which must be unique within the interchange ..
+    if group_number in seen_group_numbers:
+        raise X12EnvelopeError(f'Duplicate group control number `{gs_control}`')
+    seen_group_numbers.append(group_number)
 
-        # .. and carry the actual transaction set count.
-        set_count = len(group.transaction_sets)
-        ge_set_count = int(group.ge.transaction_set_count)
+    # .. and carry the actual transaction set count.
+    ge_set_count = int(ge.transaction_set_count)
 
-        if ge_set_count != set_count:
-            raise X12EnvelopeError(f'GE01 `{ge_set_count}` does not match the transaction set count {set_count}')
+    if ge_set_count != set_count:
+        raise X12EnvelopeError(f'GE01 `{ge_set_count}` does not match the transaction set count {set_count}')
 
-        seen_set_numbers:'strlist' = []
+# ################################################################################################################################
 
-        for transaction_set in group.transaction_sets:
-            raw_segments = transaction_set._raw_segments
+def _validate_set_trailer(raw_segments:'raw_segment_list', seen_set_numbers:'strlist') -> 'None':
+    """ Checks that the SE echoes ST02, that SE01 is the actual segment count and that the set
+    control number is not used by any earlier set of the group, then records it as seen.
+    """
+    st_segment = raw_segments[0]
+    se_segment = raw_segments[-1]
 
-            st_segment = raw_segments[0]
-            se_segment = raw_segments[-1]
+    st_control = _element_value(st_segment, 2)
+    se_control = _element_value(se_segment, 2)
 
-            st_control = _element_value(st_segment, 2)
-            se_control = _element_value(se_segment, 2)
+    # The SE must echo the set control number exactly ..
+    if st_control != se_control:
+        raise X12EnvelopeError(f'ST02 `{st_control}` does not match SE02 `{se_control}`')
 
-            # The SE must echo the set control number exactly ..
-            if st_control != se_control:
-                raise X12EnvelopeError(f'ST02 `{st_control}` does not match SE02 `{se_control}`')
+    # .. which must be unique within the group ..
+    if st_control in seen_set_numbers:
+        raise X12EnvelopeError(f'Duplicate transaction set control number `{st_control}`')
+    seen_set_numbers.append(st_control)
 
-            # .. which must be unique within the group ..
-            if st_control in seen_set_numbers:
-                raise X12EnvelopeError(f'Duplicate transaction set control number `{st_control}`')
-            seen_set_numbers.append(st_control)
+    # .. and carry the actual segment count, ST and SE included.
+    segment_count = len(raw_segments)
+    se_count_value = _element_value(se_segment, 1)
+    se_segment_count = int(se_count_value)
 
-            # .. and carry the actual segment count, ST and SE included.
-            segment_count = len(raw_segments)
-            se_count_value = _element_value(se_segment, 1)
-            se_segment_count = int(se_count_value)
+    if se_segment_count != segment_count:
+        raise X12EnvelopeError(f'SE01 `{se_segment_count}` does not match the segment count {segment_count}')
 
-            if se_segment_count != segment_count:
-                raise X12EnvelopeError(f'SE01 `{se_segment_count}` does not match the segment count {segment_count}')
+# ################################################################################################################################
 
+def _validate_envelope(interchange:'X12Interchange') -> 'None':
+    """ Checks the control number echoes and counts of a parsed interchange -
+    ISA13=IEA02, GS06=GE02, ST02=SE02, IEA01 is the group count, GE01 the set count,
+    SE01 the segment count including ST and SE - and rejects duplicate control numbers.
+    """
+    group_count = len(interchange.groups)
+    _validate_interchange_trailer(interchange.isa, interchange.iea, group_count)
+
+    seen_group_numbers:'intlist' = []
+
+    for group in interchange.groups:
+
+        set_count = len(group.transaction_sets)
+        _validate_group_trailer(group.gs, group.ge, set_count, seen_group_numbers)
+
+        seen_set_numbers:'strlist' = []
+
+        for transaction_set in group.transaction_sets:
+            _validate_set_trailer(transaction_set._raw_segments, seen_set_numbers)
+
+# ################################################################################################################################
 # ################################################################################################################################
 
-def parse_x12(raw:'str') -> 'X12Interchange':
-    """ Parses wire text into an X12Interchange - the single public entry point.
-    The separators come from the fixed-width ISA, each ST/SE slice resolves to its
-    registered transaction set class by ST01 plus the GS08 version of its group,
-    and the envelope control numbers and counts are validated on the way.
+class _EnvelopeReader:
+    """ Walks the raw segments of one interchange in wire order, filling in its envelope
+    and resolving each ST/SE slice to its registered transaction set class as its SE arrives.
 
-    This lenient mode keeps unknown segments and unmapped elements reachable
-    positionally - nothing is ever unparseable. The strict mode of parse_x12_strict
-    in zato.x12.validation additionally applies the implementation guide syntax
-    checks (SNIP type 2) to every typed transaction set.
+    A reader that is streaming keeps no transaction sets once they have been handed out -
+    it validates each trailer as soon as it is read instead, keeping only the control numbers
+    and counts the trailers still to come will be checked against.
     """
 
-    # Our response to produce
-    out = X12Interchange()
-    out.is_built = False
+    def __init__(self, interchange:'X12Interchange', is_streaming:'bool') -> 'None':
 
-    # Leading whitespace never carries meaning in an interchange
-    raw = raw.lstrip()
+        # The interchange whose envelope is being read
+        self.interchange = interchange
 
-    # The ISA dictates the syntax characters of everything that follows ..
-    separators = parse_isa(raw)
-    out.separators = separators
+        # Whether the trailers are validated as they arrive rather than once the whole interchange is read
+        self.is_streaming = is_streaming
 
-    # .. so the whole interchange can now be split into raw segments.
-    raw_segments = parse_segments(raw, separators)
+        # The group and the raw segments of the set that are currently open, if any
+        self.current_group:'group_none' = None
+        self.current_set:'raw_segment_list_none' = None
 
-    current_group:'group_none' = None
-    current_set:'raw_segment_list_none' = None
+        # What a streaming reader checks the GE and IEA trailers against
+        self.group_count = 0
+        self.set_count = 0
+        self.seen_group_numbers:'intlist' = []
+        self.seen_set_numbers:'strlist' = []
 
-    for raw_segment in raw_segments:
+# ################################################################################################################################
+
+    def feed(self, raw_segment:'RawSegment') -> 'message_none':
+        """ Takes in the next segment, returning the transaction set it concludes, if it is an SE.
+        """
+        interchange = self.interchange
         tag = raw_segment.tag
 
         # The interchange envelope ..
         if tag == 'ISA':
-            out.isa = ISA.from_raw(raw_segment)
-            continue
+            interchange.isa = ISA.from_raw(raw_segment)
+            return
 
         if tag == 'IEA':
-            out.iea = IEA.from_raw(raw_segment)
-            continue
+            interchange.iea = IEA.from_raw(raw_segment)
+            return
 
         # .. interchange-level acknowledgments live between ISA and the first GS ..
         if tag == 'TA1':
-            if current_set is None:
+            if self.current_set is None:
                 ta1 = TA1.from_raw(raw_segment)
-                out.ta1_list.append(ta1)
-                continue
+                interchange.ta1_list.append(ta1)
+                return
 
         # .. the group envelope ..
         if tag == 'GS':
-            if current_group is not None:
+            if self.current_group is not None:
                 raise X12EnvelopeError('GS found before the previous group was closed with GE')
 
-            current_group = X12FunctionalGroup()
-            current_group.gs = GS.from_raw(raw_segment)
-            continue
+            self.current_group = X12FunctionalGroup()
+            self.current_group.gs = GS.from_raw(raw_segment)
+            return
 
         if tag == 'GE':
-            if current_group is None:
+            if self.current_group is None:
                 raise X12EnvelopeError('GE found without a matching GS')
 
-            current_group.ge = GE.from_raw(raw_segment)
-            out.groups.append(current_group)
-            current_group = None
-            continue
+            self.current_group.ge = GE.from_raw(raw_segment)
+
+            if self.is_streaming:
+                _validate_group_trailer(self.current_group.gs, self.current_group.ge, self.set_count, self.seen_group_numbers)
+                self.group_count += 1
+                self.set_count = 0
+                self.seen_set_numbers = []
+            else:
+                interchange.groups.append(self.current_group)
+
+            self.current_group = None
+            return
 
         # .. and the transaction sets themselves.
         if tag == 'ST':
-            if current_group is None:
+            if self.current_group is None:
                 raise X12EnvelopeError('ST found outside of a functional group')
-            if current_set is not None:
+            if self.current_set is not None:
                 raise X12EnvelopeError('ST found before the previous transaction set was closed with SE')
 
-            current_set = [raw_segment]
-            continue
+            self.current_set = [raw_segment]
+            return
 
-        if current_set is None:
+        if self.current_set is None:
             raise X12EnvelopeError(f'Segment `{tag}` found outside of a transaction set')
 
-        current_set.append(raw_segment)
+        self.current_set.append(raw_segment)
 
         # An SE concludes the current set, which resolves to its registered class.
         if tag == 'SE':
 
             # A GE is able to close the group while a set is still open, in which case
             # the SE of that set has no group to file under.
-            if current_group is None:
+            if self.current_group is None:
                 raise X12EnvelopeError('SE found outside of a functional group')
 
-            group_version = current_group.gs.version
-            message_class = X12Message.resolve_class(current_set, group_version)
-            message = message_class.from_raw(current_set, separators)
+            if self.is_streaming:
+                _validate_set_trailer(self.current_set, self.seen_set_numbers)
+                self.set_count += 1
+
+            group_version = self.current_group.gs.version
+            message_class = X12Message.resolve_class(self.current_set, group_version)
+            message = message_class.from_raw(self.current_set, interchange.separators)
+
+            if not self.is_streaming:
+                self.current_group.transaction_sets.append(message)
+
+            self.current_set = None
+
+            return message
+
+# ################################################################################################################################
+
+    def close(self) -> 'None':
+        """ Confirms that nothing is left open once the last segment has been read.
+        """
+        if self.current_set is not None:
+            raise X12EnvelopeError('Transaction set not closed with SE')
+
+        if self.current_group is not None:
+            raise X12EnvelopeError('Functional group not closed with GE')
 
-            current_group.transaction_sets.append(message)
-            current_set = None
+        if self.interchange.iea is None:
+            raise X12EnvelopeError('Interchange not closed with IEA')
 
-    # Whatever remains open at this point means a missing trailer.
-    if current_set is not None:
-        raise X12EnvelopeError('Transaction set not closed with SE')
+        # A streaming reader has checked everything below the IEA already
+        if self.is_streaming:
+            _validate_interchange_trailer(self.interchange.isa, self.interchange.iea, self.group_count)
 
-    if current_group is not None:
-        raise X12EnvelopeError('Functional group not closed with GE')
+# ################################################################################################################################
+# ################################################################################################################################
 
-    if out.iea is None:
-        raise X12EnvelopeError('Interchange not closed with IEA')
+def parse_x12(raw:'str') -> 'X12Interchange':
+    """ Parses wire text into an X12Interchange - the single public entry point.
+    The separators come from the fixed-width ISA, each ST/SE slice resolves to its
+    registered transaction set class by ST01 plus the GS08 version of its group,
+    and the envelope control numbers and counts are validated on the way.
+
+    This lenient mode keeps unknown segments and unmapped elements reachable
+    positionally - nothing is ever unparseable. The strict mode of parse_x12_strict
+    in zato.x12.validation additionally applies the implementation guide syntax
+    checks (SNIP type 2) to every typed transaction set.
+    """
+
+    # Our response to produce
+    out = X12Interchange()
+    out.is_built = False
+
+    # Leading whitespace never carries meaning in an interchange
+    raw = raw.lstrip()
 
-    # The envelope is structurally complete - now its numbers must agree.
+    # The ISA dictates the syntax characters of everything that follows ..
+    separators = parse_isa(raw)
+    out.separators = separators
+
+    # .. so the whole interchange can now be split into raw segments.
+    raw_segments = parse_segments(raw, separators)
+
+    reader = _EnvelopeReader(out, is_streaming=False)
+
+    for raw_segment in raw_segments:
+        _ = reader.feed(raw_segment)
+
+    # Whatever remains open at this point means a missing trailer ..
+    reader.close()
+
+    # .. and with the envelope structurally complete, its numbers must now agree.
     _validate_envelope(out)
 
     return out
 
+# ################################################################################################################################
+
+def _iter_text_chunks(source:'any_', chunk_size:'int', encoding:'str') -> 'strgen':
+    """ Reads a file object or an mmap in chunks, decoding them if they are bytes -
+    a multi-byte character split across two chunks is decoded once both have arrived.
+    """
+    decoder = getincrementaldecoder(encoding)()
+
+    while chunk := source.read(chunk_size):
+        if isinstance(chunk, bytes):
+            chunk = decoder.decode(chunk)
+        yield chunk
+
+    if remainder := decoder.decode(b'', final=True):
+        yield remainder
+
+# ################################################################################################################################
+
+def iter_x12(
+    source:'any_',
+    chunk_size:'int'=Stream_Chunk_Size,
+    encoding:'str'=Stream_Encoding,
+    ) -> 'group_message_gen':
+    """ Reads an interchange from a file object or an mmap, yielding a (group, transaction set) pair
+    as soon as each SE is read - only the transaction set being read is ever held in memory,
+    which is what interchanges of hundreds of megabytes need, e.g. 837 or 835 batches from payers.
+
+    The envelope is validated as it goes - each SE when it is read, each GE against the sets
+    of its group and the IEA against the groups of the whole interchange, which is why the last
+    pairs may still be followed by an X12EnvelopeError. A yielded group carries its GS, its GE
+    once that has been read, and never any transaction sets. The strict mode is iter_x12_strict
+    in zato.x12.validation.
+    """
+    chunks = _iter_text_chunks(source, chunk_size, encoding)
+
+    # Leading whitespace never carries meaning in an interchange,
+    # and enough of what follows is needed to read the fixed-width ISA ..
+    head = ''
+
+    for chunk in chunks:
+        head = (head + chunk).lstrip()
+        if len(head) >= ISA_Total_Length:
+            break
+
+    # .. which dictates the syntax characters of everything that follows ..
+    separators = parse_isa(head)
+
+    interchange = X12Interchange()
+    interchange.is_built = False
+    interchange.separators = separators
+
+    reader = _EnvelopeReader(interchange, is_streaming=True)
+
+    # .. so the rest of the interchange can now be read one segment at a time.
+    segment_texts = iter_split_segments(chain([head], chunks), separators)
+
+    for segment_text in segment_texts:
+        raw_segment = parse_segment(segment_text, separators)
+
+        if (message := reader.feed(raw_segment)) is not None:
+            yield reader.current_group, message
+
+    reader.close()
+
 # ################################################################################################################################
 # ################################################################################################################################
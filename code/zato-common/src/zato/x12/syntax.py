@@ -11,12 +11,17 @@ from __future__ import annotations
 # stdlib
 from typing import NamedTuple
 
+# Zato
+from zato.common.typing_ import generator_, iterator_
+
 # ################################################################################################################################
 # ################################################################################################################################
 
 #  Type aliases
 strlist     = list[str]
 strlistlist = list[list[str]]
+strgen      = generator_[str, None, None]
+striter     = iterator_[str]
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -178,40 +183,51 @@ def parse_isa(raw:'str') -> 'Separators':
 
 # ################################################################################################################################
 
-def split_segments(raw:'str', separators:'Separators') -> 'strlist':
-    """ Splits wire text into individual segment strings. There is no release character in X12,
-    so every occurrence of the terminator ends a segment and a plain split is exact - which also
-    keeps large interchanges fast, with memory proportional to the input size. Whitespace between
-    segments is ignored, including the CR/LF pairs and bare newlines real senders emit.
+def iter_split_segments(chunks:'striter', separators:'Separators') -> 'strgen':
+    """ Splits wire text arriving in chunks into individual segment strings, with the same rules
+    as split_segments - only the segment that is currently being read is ever held in memory,
+    no matter how large the whole interchange is or where the chunk boundaries fall.
     """
+    terminator = separators.terminator
 
-    # Our response to produce
-    out:'strlist' = []
+    # The text of a segment whose terminator has not arrived yet
+    pending = ''
 
-    terminator = separators.terminator
+    for chunk in chunks:
 
-    # Every terminator ends a segment ..
-    parts = raw.split(terminator)
+        # Every terminator ends a segment ..
+        parts = (pending + chunk).split(terminator)
 
-    # .. except that the text after the last one is not a complete segment.
-    last_part = parts[-1]
-    parts = parts[:-1]
+        # .. except that the text after the last one may continue in the next chunk.
+        pending = parts.pop()
 
-    for part in parts:
+        for part in parts:
 
-        # Whitespace before a segment is decorative and is dropped ..
-        part = part.lstrip(Inter_Segment_Whitespace)
+            # Whitespace before a segment is decorative and is dropped ..
+            part = part.lstrip(Inter_Segment_Whitespace)
 
-        # .. and anything else gets its terminator back.
-        if part:
-            segment_text = part + terminator
-            out.append(segment_text)
+            # .. and anything else gets its terminator back.
+            if part:
+                segment_text = part + terminator
+                yield segment_text
 
     # An interchange may lack the final terminator - keep whatever is left as the last segment.
-    remainder = last_part.strip()
+    remainder = pending.strip()
     if remainder:
-        out.append(remainder)
+        yield remainder
+
+# ################################################################################################################################
+
+def split_segments(raw:'str', separators:'Separators') -> 'strlist':
+    """ Splits wire text into individual segment strings. There is no release character in X12,
+    so every occurrence of the terminator ends a segment and a plain split is exact - which also
+    keeps large interchanges fast, with memory proportional to the input size. Whitespace between
+    segments is ignored, including the CR/LF pairs and bare newlines real senders emit.
+    """
+    chunks = iter([raw])
+    segments = iter_split_segments(chunks, separators)
 
+    out = list(segments)
     return out
 
 # ################################################################################################################################
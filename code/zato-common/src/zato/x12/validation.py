@@ -16,7 +16,7 @@ from zato.common.typing_ import optional
 from zato.edi.base import EDIComponent, EDIElement, EDIGroupAttr, EDISegmentAttr, EDIValidationError, Usage, \
      _composite_classes, _declared_attr_descriptors, _sort_by_position
 from zato.x12.base import X12GenericMessage, X12Message, _element_value
-from zato.x12.envelope import X12EnvelopeError, parse_x12
+from zato.x12.envelope import Stream_Chunk_Size, Stream_Encoding, X12EnvelopeError, iter_x12, parse_x12
 from zato.x12.syntax import RawSegment, X12SyntaxError
 
 # ################################################################################################################################
@@ -24,10 +24,11 @@ from zato.x12.syntax import RawSegment, X12SyntaxError
 
 if 0:
     from zato.common.typing_ import any_, anylist, strlist
-    from zato.x12.envelope import X12Interchange
+    from zato.x12.envelope import group_message_gen, X12Interchange
     any_ = any_
     anylist = anylist
     strlist = strlist
+    group_message_gen = group_message_gen
     X12Interchange = X12Interchange
 
 # ################################################################################################################################
@@ -446,6 +447,40 @@ def validate_transaction_set(message:'X12Message') -> 'issue_list':
 
 # ################################################################################################################################
 
+def _get_set_result(group_index:'int', set_index:'int', transaction_set:'X12Message') -> 'SetValidationResult':
+    """ Validates one transaction set, returning its result with its position in the interchange.
+    """
+
+    # Our response to produce
+    out = SetValidationResult()
+    out.group_index = group_index
+    out.set_index = set_index
+    out.message = transaction_set
+
+    raw_segments = transaction_set._raw_segments
+    st_segment = raw_segments[0]
+    out.identifier_code = _element_value(st_segment, 1)
+    out.control_number = _element_value(st_segment, 2)
+
+    out.issues = validate_transaction_set(transaction_set)
+
+    return out
+
+# ################################################################################################################################
+
+def _raise_on_issues(results:'set_result_list') -> 'None':
+    """ Raises X12ValidationError if any of the results has issues.
+    """
+    issue_count = 0
+    for result in results:
+        issue_count += len(result.issues)
+
+    if issue_count:
+        suffix = 'issue' if issue_count == 1 else 'issues'
+        raise X12ValidationError(f'Found {issue_count} validation {suffix}', results)
+
+# ################################################################################################################################
+
 def validate_interchange(interchange:'X12Interchange') -> 'set_result_list':
     """ Validates every transaction set of a parsed interchange, returning one result
     per set - this is what strict parsing raises on and what 997/999 building consumes.
@@ -456,19 +491,7 @@ def validate_interchange(interchange:'X12Interchange') -> 'set_result_list':
 
     for group_index, group in enumerate(interchange.groups):
         for set_index, transaction_set in enumerate(group.transaction_sets):
-
-            result = SetValidationResult()
-            result.group_index = group_index
-            result.set_index = set_index
-            result.message = transaction_set
-
-            raw_segments = transaction_set._raw_segments
-            st_segment = raw_segments[0]
-            result.identifier_code = _element_value(st_segment, 1)
-            result.control_number = _element_value(st_segment, 2)
-
-            result.issues = validate_transaction_set(transaction_set)
-
+            result = _get_set_result(group_index, set_index, transaction_set)
             out.append(result)
 
     return out
@@ -484,16 +507,39 @@ def parse_x12_strict(raw:'str') -> 'X12Interchange':
     out = parse_x12(raw)
 
     results = validate_interchange(out)
+    _raise_on_issues(results)
 
-    issue_count = 0
-    for result in results:
-        issue_count += len(result.issues)
+    return out
 
-    if issue_count:
-        suffix = 'issue' if issue_count == 1 else 'issues'
-        raise X12ValidationError(f'Found {issue_count} validation {suffix}', results)
+# ################################################################################################################################
 
-    return out
+def iter_x12_strict(
+    source:'any_',
+    chunk_size:'int'=Stream_Chunk_Size,
+    encoding:'str'=Stream_Encoding,
+    ) -> 'group_message_gen':
+    """ Streams an interchange the way iter_x12 does, applying the same dictionary-level checks
+    as parse_x12_strict to each transaction set before it is yielded - the first set with issues
+    raises X12ValidationError with the result of that set alone.
+    """
+    group_index = -1
+    set_index = 0
+    current_group = None
+
+    for group, transaction_set in iter_x12(source, chunk_size, encoding):
+
+        # Sets are numbered from zero within each group, as in validate_interchange
+        if group is not current_group:
+            current_group = group
+            group_index += 1
+            set_index = 0
+
+        result = _get_set_result(group_index, set_index, transaction_set)
+        _raise_on_issues([result])
+
+        set_index += 1
+
+        yield group, transaction_set
 
 # ################################################################################################################################
 # ################################################################################################################################
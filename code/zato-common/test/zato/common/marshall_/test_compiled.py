@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# stdlib
+from collections import defaultdict
+from dataclasses import asdict
+from unittest import main, TestCase
+
+# Zato
+from zato.common.ext.dataclasses import dataclass
+from zato.common.marshal_.api import ElementMissing, get_model_plan, MarshalAPI, Model, model_to_dict
+from zato.common.test.marshall_ import CreatePhoneListRequest, CreateUserRequest
+from zato.common.typing_ import cast_, list_, optional
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if 0:
+    from zato.common.typing_ import any_
+    from zato.server.service import Service
+    Service = Service
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+@dataclass(init=False)
+class Item(Model):
+    id: int
+    name: str
+    price: optional[str]
+
+@dataclass(init=False)
+class Order(Model):
+    id: int
+    items: list_[Item]
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class CompiledTestCase(TestCase):
+
+    def get_error_reason(self, func:'any_', data:'any_', class_:'any_') -> 'str':
+        service = cast_('Service', None)
+
+        with self.assertRaises(ElementMissing) as cm:
+            func(service, data, class_)
+
+        out = cm.exception.reason
+        return out
+
+# ################################################################################################################################
+
+    def test_plan_is_compiled_once(self) -> 'None':
+        """ A model's deserializer is compiled the first time it is needed, along with the ones of its nested models.
+        """
+        plan = get_model_plan(Order)
+
+        self.assertIsNotNone(plan)
+        self.assertIs(get_model_plan(Order), plan)
+        self.assertIsNotNone(get_model_plan(Item))
+
+        # Anything that is not a class is left to the interpreter
+        self.assertIsNone(get_model_plan(cast_('any_', 'Order')))
+
+# ################################################################################################################################
+
+    def test_same_result_as_interpreter(self) -> 'None':
+        """ The compiled deserializer returns the same models as the interpreter does.
+        """
+        api = MarshalAPI()
+        service = cast_('Service', None)
+
+        data = {
+            'request_id': '123',
+            'user': {'user_name': 'my.user', 'address': {'locality': 'my.locality'}},
+            'role_list': [{'type': 'my.type1', 'name': 'my.name1'}, {'type': 'my.type2', 'name': 'my.name2'}],
+        }
+
+        compiled = api.from_dict(service, data, CreateUserRequest)
+        interpreted = api.from_dict_interpreted(service, data, CreateUserRequest)
+
+        self.assertEqual(compiled.to_dict(), interpreted.to_dict())
+        self.assertEqual(compiled.request_id, 123)
+
+        data = {'phone_list': [{'attr_list': [{'type': 'my.type', 'name': 'my.name'}]}, {}]}
+
+        compiled = api.from_dict(service, data, CreatePhoneListRequest)
+        interpreted = api.from_dict_interpreted(service, data, CreatePhoneListRequest)
+
+        self.assertEqual(compiled.to_dict(), interpreted.to_dict())
+
+# ################################################################################################################################
+
+    def test_same_errors_as_interpreter(self) -> 'None':
+        """ The compiled deserializer reports missing elements under the same paths that the interpreter does.
+        """
+        api = MarshalAPI()
+
+        data = {'id': 1, 'items': [{'id': 1, 'name': 'a'}, {'id': 2}]}
+
+        compiled = self.get_error_reason(api.from_dict, data, Order)
+        interpreted = self.get_error_reason(api.from_dict_interpreted, data, Order)
+
+        self.assertEqual(compiled, interpreted)
+
+        data = {'request_id': 1, 'user': {'user_name': 'my.user'}}
+
+        compiled = self.get_error_reason(api.from_dict, data, CreateUserRequest)
+        interpreted = self.get_error_reason(api.from_dict_interpreted, data, CreateUserRequest)
+
+        self.assertEqual(compiled, interpreted)
+        self.assertEqual(compiled, 'Element missing: /user/address')
+
+# ################################################################################################################################
+
+    def test_to_dict(self) -> 'None':
+        """ Models serialize to the same dicts that dataclasses.asdict returns.
+        """
+        order = Order()
+        order.id = 1
+        order.items = []
+
+        for idx in range(3):
+            item = Item()
+            item.id = idx
+            item.name = f'name{idx}'
+            item.price = None
+            order.items.append(item)
+
+        self.assertEqual(model_to_dict(order), asdict(order))
+        self.assertEqual(order.to_dict(), asdict(order))
+
+        # Unlike asdict, a defaultdict does not need to be converted to a dict first
+        order.items = cast_('any_', defaultdict(list, {'key': [1, 2]}))
+
+        result = order.to_dict()['items']
+
+        self.assertIsInstance(result, defaultdict)
+        self.assertEqual(result, {'key': [1, 2]})
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if __name__ == '__main__':
+    _ = main()
+
+# ################################################################################################################################
+# ################################################################################################################################
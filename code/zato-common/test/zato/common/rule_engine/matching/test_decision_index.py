@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# stdlib
+import unittest
+from itertools import product
+
+# Zato
+from zato.common.rule_engine.demo_data import demo_table
+from zato.common.rule_engine.errors import RuleEvaluationError
+from zato.common.rule_engine.evaluation import evaluate_input, evaluate_ruleset
+from zato.common.rule_engine.loading import load_documents
+from zato.common.rule_engine.parser import parse_data_details
+from zato.common.rule_engine.perf_utils import build_wide_inputs, build_wide_table
+from zato.common.rule_engine.table_compile import compile_table
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if 0:
+    from zato.common.rule_engine.loading import LoadedRules
+    from zato.common.rule_engine.models import Ruleset
+    from zato.common.typing_ import any_, anydict, strlist
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+# Rules the index can decide only in part, or not at all - an or-chain, a regex, defaults,
+# and one whose leading condition is a negation.
+_rules_text = """
+rule
+    01_By_region
+docs
+    Large claims from one region go to its own queue.
+when
+    region is 'EMEA' and
+    reference matches 'CLM-[0-9]+' and
+    amount is more than 100
+then
+    route = 'emea'
+
+rule
+    02_Either_region
+docs
+    Either region is enough.
+when
+    region is 'APAC' or
+    region is 'AMER'
+then
+    route = 'americas_apac'
+
+rule
+    03_Reference
+docs
+    References that look like a claim number.
+when
+    reference matches 'CLM-[0-9]+'
+then
+    flagged = true
+
+rule
+    04_With_defaults
+docs
+    Tiers with a discount.
+defaults
+    discounted_tiers = ['Gold', 'Silver']
+when
+    tier is one of default.discounted_tiers
+then
+    discount = 5
+
+rule
+    05_Not_emea
+docs
+    Everything outside of EMEA.
+when
+    region is not 'EMEA' and
+    amount is more than 100
+then
+    outside = true
+"""
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def _get_ruleset(loaded:'LoadedRules') -> 'Ruleset':
+    first = loaded.manager.cached_rules[loaded.rule_names[0]]
+    out = loaded.manager[first.rule.ruleset_name]
+    return out
+
+# ################################################################################################################################
+
+def _evaluate(ruleset:'Ruleset', data:'anydict', is_indexed:'bool') -> 'any_':
+    """ Returns what evaluating a ruleset gives for one input, an error included, with or without its index.
+    """
+    if is_indexed:
+        cached_rules = ruleset.get_candidates(data)
+    else:
+        cached_rules = ruleset.get_cached_rules()
+
+    try:
+        outcome = evaluate_ruleset(cached_rules, data)
+    except RuleEvaluationError as e:
+        out = ('error', str(e))
+    else:
+        out = (outcome.then, outcome.fired)
+
+    return out
+
+# ################################################################################################################################
+
+def _get_candidate_names(ruleset:'Ruleset', data:'anydict') -> 'strlist':
+    out = [cached_rule.rule.name for cached_rule in ruleset.get_candidates(data)]
+    return out
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class TestDecisionIndexDemoTable(unittest.TestCase):
+    """ Tests the index of the demo decision table against evaluating every one of its columns.
+    """
+
+    def setUp(self) -> 'None':
+        self.loaded = load_documents(compile_table(demo_table()))
+        self.ruleset = _get_ruleset(self.loaded)
+
+# ################################################################################################################################
+
+    def test_index_is_built_when_loaded(self) -> 'None':
+        """ Loading the table compiles its index, with every column indexed on its filter at least.
+        """
+        decision_index = self.ruleset.decision_index
+
+        self.assertIsNotNone(decision_index)
+        self.assertEqual(decision_index.indexed_count, len(self.ruleset.get_cached_rules()))
+
+# ################################################################################################################################
+
+    def test_same_answer_for_every_combination(self) -> 'None':
+        """ Every combination of values, wrong types and missing ones included, gets the same answer either way.
+        """
+        severities = [0, 1, 2, 3, 4, 5, 2.5, None, 'high', True]
+        impacts = [True, False, None]
+        hours = [True, False]
+        ages = [0, 1, 2, 24, 25, None, '3']
+
+        error_count = 0
+
+        for severity, impact, business_hours, age in product(severities, impacts, hours, ages):
+            data = {
+                'incident': {
+                    'severity': severity,
+                    'customer_impact': impact,
+                    'business_hours': business_hours,
+                    'hours_open': age,
+                }
+            }
+
+            expected = _evaluate(self.ruleset, data, False)
+            self.assertEqual(_evaluate(self.ruleset, data, True), expected, data)
+
+            if expected[0] == 'error':
+                error_count += 1
+
+        # The combinations that cannot be evaluated are a real part of what was compared
+        self.assertGreater(error_count, 0)
+
+# ################################################################################################################################
+
+    def test_a_missing_subject_raises_as_before(self) -> 'None':
+        """ An input without the filter's subject makes every column a candidate, so it raises as it always did.
+        """
+        data = {'incident': {}}
+
+        self.assertEqual(len(self.ruleset.get_candidates(data)), len(self.ruleset.get_cached_rules()))
+
+        with self.assertRaises(RuleEvaluationError):
+            _ = self.ruleset.match(data)
+
+# ################################################################################################################################
+
+    def test_only_the_columns_an_input_can_fire_are_candidates(self) -> 'None':
+        """ Columns whose leading conditions an input fails are not evaluated at all.
+        """
+        data = {'incident': {'severity': 2, 'customer_impact': True, 'business_hours': True, 'hours_open': 2}}
+        self.assertEqual(_get_candidate_names(self.ruleset, data), ['column_0', 'column_2'])
+
+        # Outside of the filter, nothing is left
+        data = {'incident': {'severity': 7, 'customer_impact': True, 'business_hours': True, 'hours_open': 2}}
+        self.assertEqual(_get_candidate_names(self.ruleset, data), [])
+
+# ################################################################################################################################
+
+    def test_evaluate_input_uses_the_index(self) -> 'None':
+        """ The screens' door gives the same answer as the ruleset itself.
+        """
+        data = {'incident': {'severity': 1, 'customer_impact': True, 'business_hours': True, 'hours_open': 3}}
+
+        result = evaluate_input(self.loaded, data)
+        outcome = self.ruleset.match(data)
+
+        self.assertEqual(result['error'], '')
+        self.assertEqual(result['actual'], outcome.then)
+        self.assertEqual(result['fired'], outcome.fired)
+        self.assertEqual(result['actual'], {'outcome.queue': 'on_call', 'outcome.notify': 'manager'})
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class TestDecisionIndexWideTable(unittest.TestCase):
+    """ Tests the index of a table with hundreds of columns against evaluating every one of them.
+    """
+
+    def test_same_answer_for_random_inputs(self) -> 'None':
+        loaded = load_documents(compile_table(build_wide_table(300, seed=1)))
+        ruleset = _get_ruleset(loaded)
+
+        all_count = len(ruleset.get_cached_rules())
+        candidate_counts = []
+
+        for data in build_wide_inputs(500, seed=2):
+            self.assertEqual(_evaluate(ruleset, data, True), _evaluate(ruleset, data, False), data)
+            candidate_counts.append(len(ruleset.get_candidates(data)))
+
+        # An input is a candidate for a small part of the table only
+        self.assertLess(max(candidate_counts), all_count // 4)
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class TestDecisionIndexRules(unittest.TestCase):
+    """ Tests rules whose conditions the index can decide only in part, or not at all.
+    """
+
+    def setUp(self) -> 'None':
+        documents, errors = parse_data_details(_rules_text, 'claims')
+        if errors:
+            raise Exception(f'Unexpected parse errors -> {errors}')
+
+        self.loaded = load_documents(documents)
+        self.ruleset = _get_ruleset(self.loaded)
+
+# ################################################################################################################################
+
+    def test_undecidable_rules_are_always_candidates(self) -> 'None':
+        """ Or-chains, regexes, defaults and leading negations are always evaluated, only the first rule is left out.
+        """
+        data = {'region': 'ANZ', 'amount': 500, 'reference': 'CLM-1', 'tier': 'Gold'}
+
+        names = _get_candidate_names(self.ruleset, data)
+        self.assertEqual(names, ['02_Either_region', '03_Reference', '04_With_defaults', '05_Not_emea'])
+
+# ################################################################################################################################
+
+    def test_a_later_condition_is_still_evaluated(self) -> 'None':
+        """ The index decides the conditions before the first one it cannot and leaves the rest to the evaluation.
+        """
+        data = {'region': 'EMEA', 'amount': 50, 'reference': 'CLM-1', 'tier': 'Gold'}
+
+        self.assertIn('01_By_region', _get_candidate_names(self.ruleset, data))
+        self.assertEqual(_evaluate(self.ruleset, data, True), _evaluate(self.ruleset, data, False))
+
+# ################################################################################################################################
+
+    def test_a_range_against_another_type_raises_as_before(self) -> 'None':
+        """ A value a range test cannot compare keeps its rule a candidate, so the error it raises is unchanged.
+        """
+        data = {'region': 'EMEA', 'amount': 'many', 'reference': 'CLM-1', 'tier': 'Gold'}
+
+        self.assertIn('01_By_region', _get_candidate_names(self.ruleset, data))
+
+        expected = _evaluate(self.ruleset, data, False)
+
+        self.assertEqual(expected[0], 'error')
+        self.assertEqual(_evaluate(self.ruleset, data, True), expected)
+
+# ################################################################################################################################
+
+    def test_changing_the_rules_drops_the_index(self) -> 'None':
+        """ A rule deleted after loading leaves the ruleset without an index, evaluating all of its rules again.
+        """
+        full_name = self.loaded.rule_names[-1]
+        self.ruleset.delete_rule(full_name)
+
+        self.assertIsNone(self.ruleset.decision_index)
+
+        data = {'region': 'APAC', 'amount': 500, 'reference': '', 'tier': 'Gold'}
+        self.assertEqual(len(self.ruleset.get_candidates(data)), len(self.ruleset.get_cached_rules()))
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if __name__ == '__main__':
+    _ = unittest.main()
+
+# ################################################################################################################################
+# ################################################################################################################################
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# stdlib
+import argparse
+from datetime import datetime
+from time import perf_counter
+
+# Zato
+from zato.common.rule_engine.demo_data import demo_table
+from zato.common.rule_engine.errors import RuleEvaluationError
+from zato.common.rule_engine.evaluation import evaluate_ruleset
+from zato.common.rule_engine.loading import load_documents
+from zato.common.rule_engine.perf_utils import build_wide_inputs, build_wide_table
+from zato.common.rule_engine.table_compile import compile_table
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if 0:
+    from zato.common.rule_engine.models import Ruleset
+    from zato.common.rule_engine.cache import CachedRule
+    from zato.common.typing_ import any_, anydict, anylist
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+# Inputs for the demo table, one per column it routes to and one its filter turns away
+_demo_inputs = [
+    {'incident': {'severity': 1, 'customer_impact': False, 'business_hours': True, 'hours_open': 0}},
+    {'incident': {'severity': 2, 'customer_impact': True, 'business_hours': True, 'hours_open': 3}},
+    {'incident': {'severity': 2, 'customer_impact': False, 'business_hours': False, 'hours_open': 3}},
+    {'incident': {'severity': 4, 'customer_impact': False, 'business_hours': True, 'hours_open': 30}},
+    {'incident': {'severity': 3, 'customer_impact': False, 'business_hours': True, 'hours_open': 2}},
+    {'incident': {'severity': 9, 'customer_impact': False, 'business_hours': True, 'hours_open': 2}},
+]
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def _load_table(table:'anydict') -> 'Ruleset':
+    """ Loads a decision table the way publishing it does, its decision index included.
+    """
+    loaded = load_documents(compile_table(table))
+
+    first = loaded.manager.cached_rules[loaded.rule_names[0]]
+    out = loaded.manager[first.rule.ruleset_name]
+
+    return out
+
+# ################################################################################################################################
+
+def _evaluate(cached_rules:'list[CachedRule]', data:'anydict') -> 'any_':
+    """ Returns the answer for one input, which may also be the error an input without a score raises.
+    """
+    try:
+        outcome = evaluate_ruleset(cached_rules, data)
+    except RuleEvaluationError as e:
+        out = str(e)
+    else:
+        out = (outcome.then, outcome.fired)
+
+    return out
+
+# ################################################################################################################################
+
+def _time_inputs(ruleset:'Ruleset', inputs:'anylist', runs:'int', is_indexed:'bool') -> 'float':
+    """ Returns how many microseconds one input takes on average, evaluated with or without the decision index.
+    """
+    start = perf_counter()
+
+    for _ in range(runs):
+        for data in inputs:
+            if is_indexed:
+                cached_rules = ruleset.get_candidates(data)
+            else:
+                cached_rules = ruleset.get_cached_rules()
+            _ = _evaluate(cached_rules, data)
+
+    out = (perf_counter() - start) / (runs * len(inputs)) * 1_000_000
+    return out
+
+# ################################################################################################################################
+
+def _run_table(label:'str', ruleset:'Ruleset', inputs:'anylist', runs:'int') -> 'None':
+    """ Prints one line of the results - a table's rules, how many of them an input evaluates, and how long it takes.
+    """
+    rule_count = len(ruleset.get_cached_rules())
+    candidate_count = sum(len(ruleset.get_candidates(data)) for data in inputs) / len(inputs)
+
+    # Both ways have to give the same answer for the timings to mean anything
+    for data in inputs:
+        expected = _evaluate(ruleset.get_cached_rules(), data)
+        actual = _evaluate(ruleset.get_candidates(data), data)
+        if actual != expected:
+            raise Exception(f'Different answers for {data} -> {actual} != {expected}')
+
+    full_time = _time_inputs(ruleset, inputs, runs, False)
+    indexed_time = _time_inputs(ruleset, inputs, runs, True)
+
+    print(f'{label:<24} {rule_count:>7} {candidate_count:>11.1f} {full_time:>12.1f} {indexed_time:>12.1f} ' + \
+        f'{full_time / indexed_time:>8.1f}x')
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def main():
+    # Parse command-line arguments
+    parser = argparse.ArgumentParser(description='Compare evaluating decision tables with and without their decision index')
+    _ = parser.add_argument('--runs', type=int, default=20, help='Number of runs over all the inputs of a table')
+    _ = parser.add_argument('--inputs', type=int, default=200, help='Number of inputs per generated table')
+    _ = parser.add_argument('column_counts', nargs='*', type=int, help='Column counts of the generated tables (e.g., 100 300)')
+    args = parser.parse_args()
+
+    column_counts = args.column_counts or [10, 100, 300, 1000]
+
+    print(f'Starting decision table performance tests at {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}')
+    print()
+    print(f'{"Table":<24} {"Rules":>7} {"Candidates":>11} {"Full (us)":>12} {"Indexed (us)":>12} {"Speedup":>9}')
+
+    # The demo table first, which is small enough that the index mostly saves the columns its filter turns away ..
+    _run_table('Demo table', _load_table(demo_table()), _demo_inputs, args.runs * 10)
+
+    # .. and then generated tables, as wide as requested.
+    inputs = build_wide_inputs(args.inputs)
+
+    for column_count in column_counts:
+        ruleset = _load_table(build_wide_table(column_count))
+        _run_table(f'Generated, {column_count} columns', ruleset, inputs, args.runs)
+
+    print()
+    print(f'Completed decision table performance tests at {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}')
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if __name__ == '__main__':
+    main()
@@ -185,11 +185,14 @@ pub struct RecvEvent {
     pub reply_to_queue_manager: String,
     /// Hex-encoded message ID of the incoming message, empty for Kafka.
     pub message_id: String,
+    /// What the server keeps messages in order by - the message key or, for unkeyed messages, the partition (Kafka)
+    /// or the hex-encoded group ID, empty when the message is not part of a group (IBM MQ).
+    pub ordering_key: String,
 }
 
 impl RecvEvent {
     /// Creates a recv event with no headers and no reply metadata, as used by Kafka.
-    pub fn without_headers(channel_name: String, topic: String, service: String, payload: Vec<u8>) -> Self {
+    pub fn without_headers(channel_name: String, topic: String, service: String, payload: Vec<u8>, ordering_key: String) -> Self {
         Self {
             channel_name,
             topic,
@@ -199,6 +202,7 @@ impl RecvEvent {
             reply_to_queue: String::new(),
             reply_to_queue_manager: String::new(),
             message_id: String::new(),
+            ordering_key,
         }
     }
 }
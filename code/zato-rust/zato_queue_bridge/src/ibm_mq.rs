@@ -442,6 +442,16 @@ fn build_recv_event(config: &ChannelConfig, data: Vec<u8>, descriptor: &structs:
         reply_to_queue: mq_field_to_string(&descriptor.ReplyToQ),
         reply_to_queue_manager: mq_field_to_string(&descriptor.ReplyToQMgr),
         message_id: identifier_to_hex(&descriptor.MsgId),
+        ordering_key: group_id_to_ordering_key(&descriptor.GroupId),
+    }
+}
+
+/// Returns the hex-encoded group ID of a message, or an empty string if the message is not part of a group.
+fn group_id_to_ordering_key(group_id: &[u8]) -> String {
+    if group_id.iter().all(|byte| *byte == 0) {
+        String::new()
+    } else {
+        identifier_to_hex(group_id)
     }
 }
 
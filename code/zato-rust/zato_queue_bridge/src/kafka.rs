@@ -119,11 +119,18 @@ pub async fn consume_loop(
                                 Some(bytes) => bytes.to_vec(),
                                 None => continue,
                             };
+                            // Kafka keeps messages in order within a partition, and the ones with the same key
+                            // always land in the same partition, so the key is enough to order keyed messages by.
+                            let ordering_key = match borrowed_message.key() {
+                                Some(key) => format!("key:{}", String::from_utf8_lossy(key)),
+                                None => format!("partition:{}", borrowed_message.partition()),
+                            };
                             let event = RecvEvent::without_headers(
                                 config.name.clone(),
                                 borrowed_message.topic().to_string(),
                                 config.service.clone(),
                                 payload,
+                                ordering_key,
                             );
                             if message_sender.send(event).is_err() {
                                 return;
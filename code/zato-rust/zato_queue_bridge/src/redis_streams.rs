@@ -116,6 +116,8 @@ pub fn publish_recv_event(conn: &mut redis::Connection, event: &RecvEvent) {
         .arg(&event.reply_to_queue_manager)
         .arg("message_id")
         .arg(&event.message_id)
+        .arg("ordering_key")
+        .arg(&event.ordering_key)
         .query(conn);
 
     if let Err(err) = result {
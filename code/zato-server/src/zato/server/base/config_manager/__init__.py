@@ -23,7 +23,7 @@ from traceback import format_exc
 from zato.common.ext.bunch import bunchify
 
 # gevent
-from gevent import sleep
+from gevent import sleep, spawn
 
 # orjson
 from orjson import dumps
@@ -335,8 +335,9 @@ class ConfigManager(_ConfigManagerBase):
         self.amqp_api = ConnectorStore(Connector_Type.duplex.amqp, ConnectorAMQP, self.server)
         self.amqp_out_name_to_def = {} # Maps outgoing connection names to definition names, i.e. to connector names
 
-        # Caches
+        # Caches, with the listener that keeps the in-memory tier of response caching in line with the other servers
         self.cache_api = self._build_cache_api()
+        _ = spawn(self.cache_api.run_response_invalidation_listener)
 
         # Maps generic connection types to their API handler objects
         self.generic_conn_api = {
@@ -1380,6 +1381,7 @@ class ConfigManager(_ConfigManagerBase):
                 PubSubSubscription.push_type,
                 PubSubSubscription.push_service_name,
                 PubSubSubscription.rest_push_endpoint_id,
+                PubSubSubscription.rest_push_max_in_flight,
                 PubSubTopic.name,
                 SecurityBase.username,
                 SecurityBase.name.label('sec_name'),
@@ -1409,6 +1411,7 @@ class ConfigManager(_ConfigManagerBase):
                         'push_type': row.push_type,
                         'push_service_name': row.push_service_name,
                         'rest_push_endpoint_id': row.rest_push_endpoint_id,
+                        'rest_push_max_in_flight': row.rest_push_max_in_flight,
                     }
 
                     if row.push_type == 'rest' and row.rest_push_endpoint_id:
@@ -2851,6 +2854,7 @@ class ConfigManager(_ConfigManagerBase):
         push_type = getattr(msg, 'push_type', None)
         push_service_name = getattr(msg, 'push_service_name', None)
         rest_push_endpoint_id = getattr(msg, 'rest_push_endpoint_id', None)
+        rest_push_max_in_flight = getattr(msg, 'rest_push_max_in_flight', None)
 
         # .. resolve the REST endpoint URL from ODB if needed ..
         rest_push_url = ''
@@ -2878,6 +2882,7 @@ class ConfigManager(_ConfigManagerBase):
                 'push_service_name': push_service_name,
                 'rest_push_endpoint_id': rest_push_endpoint_id,
                 'rest_push_url': rest_push_url,
+                'rest_push_max_in_flight': rest_push_max_in_flight,
             }
             self._push_subs[sub_key].append(sub_config)
 
@@ -3273,6 +3278,7 @@ class ConfigManager(_ConfigManagerBase):
                 PubSubSubscription.push_type,
                 PubSubSubscription.push_service_name,
                 PubSubSubscription.rest_push_endpoint_id,
+                PubSubSubscription.rest_push_max_in_flight,
                 PubSubTopic.name,
             ).join(
                 PubSubSubscriptionTopic, PubSubSubscription.id == PubSubSubscriptionTopic.subscription_id
@@ -3291,6 +3297,7 @@ class ConfigManager(_ConfigManagerBase):
                     'push_type': row.push_type,
                     'push_service_name': row.push_service_name,
                     'rest_push_endpoint_id': row.rest_push_endpoint_id,
+                    'rest_push_max_in_flight': row.rest_push_max_in_flight,
                 }))
 
                 # .. re-add push delivery if needed ..
@@ -3301,6 +3308,7 @@ class ConfigManager(_ConfigManagerBase):
                         'push_type': row.push_type,
                         'push_service_name': row.push_service_name,
                         'rest_push_endpoint_id': row.rest_push_endpoint_id,
+                        'rest_push_max_in_flight': row.rest_push_max_in_flight,
                     }
 
                     if row.sub_key not in self._push_subs:
@@ -3357,6 +3365,7 @@ class ConfigManager(_ConfigManagerBase):
         sub_config.push_type = getattr(msg, 'push_type', None)
         sub_config.push_service_name = getattr(msg, 'push_service_name', None)
         sub_config.rest_push_endpoint_id = getattr(msg, 'rest_push_endpoint_id', None)
+        sub_config.rest_push_max_in_flight = getattr(msg, 'rest_push_max_in_flight', None)
 
         if topic_name not in self.config_store.pubsub_subs:
             self.config_store.pubsub_subs[topic_name] = []
@@ -34,7 +34,8 @@ from zato.common.config_dispatcher import ConfigDispatchReceiver, ConfigDispatch
 from zato.common.ext.bunch import Bunch, bunchify
 from zato.common.api import API_Key, AS4, DATA_FORMAT, EnvFile, EnvVariable, GENERIC, Groups, HotDeploy, PubSub, \
     SCHEDULER, SEC_DEF_TYPE, SERVER_STARTUP, SERVER_UP_STATUS, ZATO_ODB_POOL_NAME
-from zato.common.audit_log.api import AuditLog
+from zato.common.alerting.collectors import start_live_aggregator
+from zato.common.audit_log.api import get_audit_engine, AuditLog
 from zato.common.audit_log.scheduler import record_job_complete, record_job_start, record_job_timeout
 from zato.common.bearer_token import BearerTokenManager
 from zato.common.broker_message import HOT_DEPLOY, PUBSUB, SCHEDULER as SCHEDULER_MSG
@@ -45,8 +46,9 @@ from zato.common.json_internal import loads
 from zato.common.log_streaming import LogStreamingManager
 from zato.common.marshal_.api import MarshalAPI
 from zato.common.odb.api import PoolStore
-from zato.common.odb.model import Job, PubSubPermission, PubSubSubscription, SecurityBase
+from zato.common.odb.model import Job, PubSubPermission, PubSubSubscription, SecurityBase, Server
 from zato.common.odb.post_process import ODBPostProcess
+from zato.common.odb.schema import ensure_odb_columns
 from zato.common.odb.query.generic import connection_list
 from zato.common.pubsub.matcher import PatternMatcher
 from zato.common.pubsub.sql.backend import SQLPubSubBackend
@@ -90,10 +92,15 @@ from zato.server.generic.connection import GenericConnection
 from zato.server.groups.base import GroupsManager
 from zato.server.groups.ctx import SecurityGroupsCtxBuilder
 from zato.server.queue_bridge.client import QueueBridgeClient
+from zato.server.queue_bridge.dispatcher import RecvDispatcher
 from zato.server.quota_tiers import QuotaTiersManager
 from zato.server.rule_engine_api import start_rule_engine_change_listener
 from zato.server.scheduler_.adapter import SchedulerODBAdapter
 from zato.server.scheduler_.client import ModuleCtx as SchedulerStreamCtx, SchedulerClient
+from zato.server.scheduler_.pool import JobPool
+from zato.server.scheduler_.slots import JobSlots
+from zato.server.stream_reader import get_claim_min_idle, get_consumer_count as get_stream_consumer_count, \
+    get_consumer_name as get_stream_consumer_name, ModuleCtx as StreamsCtx, StreamEntries, StreamReader
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -846,6 +853,9 @@ class ParallelServer(ConfigDispatchReceiver, ConfigLoader):
         self.config.odb_data = self.get_config_odb_data(self)
         self.set_up_odb()
 
+        # An ODB created by an older release may be missing columns that the queries below read
+        ensure_odb_columns(self.odb.pool.engine)
+
         # Now try grabbing the basic server's data from the ODB. No point
         # in doing anything else if we can't get past this point.
         server:'any_' = self.odb.fetch_server(self.config.odb_data)
@@ -1030,6 +1040,10 @@ class ParallelServer(ConfigDispatchReceiver, ConfigLoader):
         if self.deploy_auto_from:
             self.handle_enmasse_auto_from()
 
+        # The alerting collectors read the newest traffic from memory from now on,
+        # so this starts before anything that writes audit events in the background.
+        self._start_live_aggregator()
+
         self._start_pubsub_backend()
 
         # Connect to the scheduler.
@@ -1167,26 +1181,35 @@ class ParallelServer(ConfigDispatchReceiver, ConfigLoader):
         fire_stream = SchedulerStreamCtx.Fire_Stream
         timeout_stream = SchedulerStreamCtx.Timeout_Stream
         group_name = 'server-fire'
-        consumer_name = 'server-fire-0'
 
         for stream in (fire_stream, timeout_stream):
             self._ensure_stream_group(fire_redis, stream, group_name)
 
-        def _fire_listener_loop() -> 'None':
-            logger.info('Scheduler fire listener loop entering')
+        # Runs execute through a pool that caps how many of them execute at the same time, with the rest queued,
+        # and all the consumers of this process hand their runs over to the same pool. The limits of individual jobs
+        # are slots in Redis, shared with every other process and server of the cluster.
+        pool = JobPool(slots=JobSlots(self._scheduler.redis))
+
+        def _fire_listener_loop(consumer_idx:'int') -> 'None':
+
+            # Each consumer reads under a name of its own, which is also what lets the ones of other servers
+            # and processes take over what it was given if this process goes away.
+            consumer_name = get_stream_consumer_name(group_name, self.name, consumer_idx)
+            reader = StreamReader(fire_redis, [fire_stream, timeout_stream], group_name, consumer_name)
+
+            logger.info('Scheduler fire listener loop entering, consumer=%s', consumer_name)
 
             error_since = 0.0
             last_logged = 0.0
 
             while True:
                 try:
-                    result = cast_('anylist', fire_redis.xreadgroup(
-                        groupname=group_name,
-                        consumername=consumer_name,
-                        streams={fire_stream: '>', timeout_stream: '>'},
-                        count=10,
-                        block=1000,
-                    ))
+                    # Nothing is read while the pool is full - the entries wait in the streams until it has room ..
+                    if not pool.wait_for_room(1.0):
+                        continue
+
+                    # .. and then, as many are read as it can take in.
+                    result = reader.read(pool.get_read_count(), 1000)
 
                     # We are able to read from the streams again, so the error condition, if any, has cleared.
                     if error_since:
@@ -1199,6 +1222,9 @@ class ParallelServer(ConfigDispatchReceiver, ConfigLoader):
                     len_result = len(result)
                     logger.info('Fire event: got %d %s in batch', len_result, 'stream' if len_result == 1 else 'streams')
 
+                    # All the entries read are acknowledged together, once they have been handed over to the pool
+                    pipeline = fire_redis.pipeline(transaction=False)
+
                     for stream_name, messages in result:
 
                         len_messages = len(messages)
@@ -1206,6 +1232,8 @@ class ParallelServer(ConfigDispatchReceiver, ConfigLoader):
                             stream_name, len_messages, 'message' if len_messages == 1 else 'messages',
                             type(stream_name).__name__)
 
+                        msg_ids = []
+
                         for msg_id, fields in messages:
 
                             logger.info('Fire event: msg_id=%s stream=%r matched_fire=%s matched_timeout=%s fields_keys=%s',
@@ -1215,15 +1243,19 @@ class ParallelServer(ConfigDispatchReceiver, ConfigLoader):
                                 list(fields.keys()))
 
                             if stream_name == fire_stream:
-                                _ = spawn(self._handle_fire_event, fields)
+                                self._submit_fire_event(pool, msg_id, fields)
                             elif stream_name == timeout_stream:
-                                _ = spawn(self._handle_timeout_event, fields)
+                                pool.submit(None, None, self._handle_timeout_event, fields)
                             else:
                                 logger.warning('Fire event: UNMATCHED stream_name=%r (type=%s) fire_stream=%r (type=%s)',
                                     stream_name, type(stream_name).__name__,
                                     fire_stream, type(fire_stream).__name__)
 
-                            _ = fire_redis.xack(stream_name, group_name, msg_id)
+                            msg_ids.append(msg_id)
+
+                        _ = pipeline.xack(stream_name, group_name, *msg_ids)
+
+                    _ = pipeline.execute()
 
                 except Exception as exc:
                     error_since, last_logged = self._handle_stream_listener_error(
@@ -1231,8 +1263,12 @@ class ParallelServer(ConfigDispatchReceiver, ConfigLoader):
                         error_since, last_logged)
                     sleep(1)
 
-        _ = spawn(_fire_listener_loop)
-        logger.info('Scheduler fire listener greenlet started')
+        consumer_count = get_stream_consumer_count(StreamsCtx.Env_Fire_Consumers)
+
+        for consumer_idx in range(consumer_count):
+            _ = spawn(_fire_listener_loop, consumer_idx)
+
+        logger.info('Scheduler fire listener %s started (%d)', 'greenlet' if consumer_count == 1 else 'greenlets', consumer_count)
 
 # ################################################################################################################################
 
@@ -1288,13 +1324,24 @@ class ParallelServer(ConfigDispatchReceiver, ConfigLoader):
 
 # ################################################################################################################################
 
-    def _handle_fire_event(self, fields:'dict') -> 'None':
-        """ Processes a fire event from the scheduler - invokes the target service.
+    def _submit_fire_event(self, pool:'JobPool', msg_id:'str', fields:'dict') -> 'None':
+        """ Hands a fire event over to the pool, which executes it when there is a free slot for its job.
         """
-        logger.info('Fire event: handler entered, fields_keys=%s', list(fields.keys()))
+        try:
+            ctx = json_loads(fields['payload'])
+            planned_at = datetime.fromisoformat(ctx['planned_fire_time_iso']).timestamp()
+        except Exception:
+            logger.warning('Fire event: invalid payload msg_id=%s traceback=%s', msg_id, format_exc())
+            return
 
-        payload_json = fields['payload']
-        ctx = json_loads(payload_json)
+        pool.submit(ctx['job_id'], planned_at, self._handle_fire_event, ctx)
+
+# ################################################################################################################################
+
+    def _handle_fire_event(self, ctx:'anydict') -> 'None':
+        """ Processes a fire event from the scheduler - invokes the target service.
+        """
+        logger.info('Fire event: handler entered, ctx_keys=%s', list(ctx.keys()))
 
         job_id = ctx['job_id']
         job_name = ctx['name']
@@ -1707,24 +1754,46 @@ class ParallelServer(ConfigDispatchReceiver, ConfigLoader):
 
         recv_stream = 'zato:queue_bridge:stream:recv'
         group_name = 'server-recv'
-        consumer_name = 'server-recv-0'
 
         self._ensure_stream_group(recv_redis, recv_stream, group_name)
 
-        def _recv_listener_loop() -> 'None':
+        # Messages run in greenlets, each channel's according to its processing mode, and all the consumers
+        # of this process hand their messages over to the same dispatcher. What it holds stays pending
+        # with the first of the consumers, which keeps it from being taken over.
+        entries = StreamEntries(recv_redis, group_name, get_stream_consumer_name(group_name, self.name, 0))
+        dispatcher = RecvDispatcher(self._handle_queue_bridge_message, entries, self._queue_bridge.get_channel_config)
+
+        def _keep_alive_loop() -> 'None':
+
+            # Messages are claimed again well before they could be taken over, even if one attempt fails
+            interval = get_claim_min_idle() / 3
+
+            while True:
+                sleep(interval)
+
+                try:
+                    dispatcher.keep_alive()
+                except Exception:
+                    logger.warning('Queue bridge recv messages could not be kept from being taken over -> %s', format_exc())
+
+        def _recv_listener_loop(consumer_idx:'int') -> 'None':
+
+            # A message is acknowledged only once its service has completed, so if this process goes away
+            # while it is being processed, a consumer of another server or process takes it over.
+            consumer_name = get_stream_consumer_name(group_name, self.name, consumer_idx)
+            reader = StreamReader(recv_redis, [recv_stream], group_name, consumer_name)
 
             error_since = 0.0
             last_logged = 0.0
 
             while True:
                 try:
-                    result = cast_('anylist', recv_redis.xreadgroup(
-                        groupname=group_name,
-                        consumername=consumer_name,
-                        streams={recv_stream: '>'},
-                        count=10,
-                        block=1000,
-                    ))
+                    # Nothing is read while the dispatcher is full - the entries wait in the stream until it has room ..
+                    if not dispatcher.wait_for_room(1.0):
+                        continue
+
+                    # .. and then, as many are read as it can take in.
+                    result = reader.read(dispatcher.get_read_count(), 1000)
 
                     # We are able to read from the stream again, so the error condition, if any, has cleared.
                     if error_since:
@@ -1736,47 +1805,58 @@ class ParallelServer(ConfigDispatchReceiver, ConfigLoader):
 
                     for stream_name, messages in result:
                         for msg_id, fields in messages:
-                            service_name = fields['service']
-                            payload_b64 = fields['payload']
-                            payload = b64decode(payload_b64)
-
-                            headers_json = fields['headers']
-                            if headers_json:
-                                headers = json_loads(headers_json)
-                            else:
-                                headers = {}
-
-                            response = self._invoke_queue_service(service_name, payload, headers)
-
-                            # Messages that carry a reply-to queue get the service's response
-                            # sent back automatically, with no action needed in the service itself.
-                            reply_to_queue = fields['reply_to_queue']
-                            if reply_to_queue and response:
-                                if isinstance(response, bytes):
-                                    reply_data = response
-                                elif isinstance(response, str):
-                                    reply_data = response.encode('utf8')
-                                else:
-                                    reply_data = json_dumps(response).encode('utf8')
-
-                                _ = self._queue_bridge.send_reply(
-                                    fields['channel_name'],
-                                    reply_to_queue,
-                                    fields['reply_to_queue_manager'],
-                                    fields['message_id'],
-                                    reply_data,
-                                )
-
-                            _ = recv_redis.xack(stream_name, group_name, msg_id)
+                            dispatcher.submit(stream_name, msg_id, fields)
 
                 except Exception as exc:
                     error_since, last_logged = self._handle_stream_listener_error(
                         'queue bridge recv', exc, recv_redis, (recv_stream,), group_name, error_since, last_logged)
                     sleep(1)
 
-        _ = spawn(_recv_listener_loop)
+        consumer_count = get_stream_consumer_count(StreamsCtx.Env_Recv_Consumers)
+
+        for consumer_idx in range(consumer_count):
+            _ = spawn(_recv_listener_loop, consumer_idx)
 
-        logger.info('Queue bridge recv listener greenlet started')
+        _ = spawn(_keep_alive_loop)
+
+        logger.info('Queue bridge recv listener %s started (%d)', 'greenlet' if consumer_count == 1 else 'greenlets', consumer_count)
+
+# ################################################################################################################################
+
+    def _handle_queue_bridge_message(self, fields:'anydict') -> 'None':
+        """ Processes one message received through the queue bridge - invokes its channel's service
+        and sends the response back if the message asks for it.
+        """
+        service_name = fields['service']
+        payload_b64 = fields['payload']
+        payload = b64decode(payload_b64)
+
+        headers_json = fields['headers']
+        if headers_json:
+            headers = json_loads(headers_json)
+        else:
+            headers = {}
+
+        response = self._invoke_queue_service(service_name, payload, headers)
+
+        # Messages that carry a reply-to queue get the service's response
+        # sent back automatically, with no action needed in the service itself.
+        reply_to_queue = fields['reply_to_queue']
+        if reply_to_queue and response:
+            if isinstance(response, bytes):
+                reply_data = response
+            elif isinstance(response, str):
+                reply_data = response.encode('utf8')
+            else:
+                reply_data = json_dumps(response).encode('utf8')
+
+            _ = self._queue_bridge.send_reply(
+                fields['channel_name'],
+                reply_to_queue,
+                fields['reply_to_queue_manager'],
+                fields['message_id'],
+                reply_data,
+            )
 
 # ################################################################################################################################
 
@@ -1800,14 +1880,36 @@ class ParallelServer(ConfigDispatchReceiver, ConfigLoader):
         except Exception:
             logger.warning('Rule engine change listener could not be started: %s', format_exc())
 
+# ################################################################################################################################
+
+    def _start_live_aggregator(self) -> 'None':
+        """ Starts the in-memory view of the audit traffic the alerting collectors read, seeded from the audit database.
+        Without it, the collectors keep reading everything from the database, which is why a failure here is only logged.
+        """
+        try:
+            # Every server of a cluster writes to the same audit database unless told otherwise,
+            # and this one sees only its own events, so it may measure from memory only if it is the only server.
+            with closing(self.odb.session()) as session:
+                server_count = session.query(Server).filter(Server.cluster_id == self.cluster_id).count()
+
+            is_only_writer = server_count == 1
+
+            if start_live_aggregator(get_audit_engine(), utcnow(), is_only_writer=is_only_writer):
+                logger.info('Alerting live aggregator started')
+            else:
+                logger.info('Alerting live aggregator not started, servers in cluster: %d', server_count)
+        except Exception:
+            logger.warning('Alerting live aggregator could not be started: %s', format_exc())
+
 # ################################################################################################################################
 
     def _start_pubsub_backend(self):
 
         # Messages, queues and delivery state live in the pub/sub database,
         # selected through the Zato_PubSub_DB_* environment variables
-        # and defaulting to an SQLite file next to the audit log's one.
-        audit_log = AuditLog(self.name)
+        # and defaulting to an SQLite file next to the audit log's one. Nothing reads the ids
+        # of pub/sub audit events back, so they are buffered instead of costing a transaction each.
+        audit_log = AuditLog(self.name, is_buffered_by_default=True)
 
         self.pubsub_backend = SQLPubSubBackend(
             audit_log=audit_log,
@@ -18,6 +18,11 @@ from traceback import format_exc
 from gevent import sleep, spawn
 from gevent.event import Event
 from gevent.lock import RLock
+from gevent.pool import Pool
+
+# requests
+from requests import Session
+from requests.adapters import HTTPAdapter
 
 # Zato
 from zato.common.api import PubSub
@@ -30,7 +35,7 @@ from zato.common.util.api import utcnow
 if 0:
     from gevent import Greenlet
     from zato.common.pubsub.sql.backend import SQLPubSubBackend
-    from zato.common.typing_ import anydict, intlist, strlist, strset
+    from zato.common.typing_ import anydict, anylist, intlist, strlist, strset
     from zato.server.base.parallel import ParallelServer
 
 # ################################################################################################################################
@@ -50,7 +55,15 @@ _retry_interval_initial = PubSub.Delivery.Retry_Interval_Initial
 _retry_interval_max = PubSub.Delivery.Retry_Interval_Max
 _retry_jitter_percent = PubSub.Delivery.Retry_Jitter_Percent
 
+_max_in_flight_default = PubSub.Delivery.Max_In_Flight_Default
+_max_in_flight_limit = PubSub.Delivery.Max_In_Flight_Limit
+
+# How many connections the session of each REST endpoint keeps alive for reuse - as many as the largest
+# in-flight window may need. Connections are opened only on demand, so an endpoint that never needs this many never has them.
+_rest_pool_size = _max_in_flight_limit
+
 sub_key_greenlet_dict = dict[str, 'Greenlet']
+url_session_dict = dict[str, Session]
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -70,6 +83,10 @@ class PushDelivery:
         self._paused:'strset' = set()
         self._lock = RLock()
 
+        # One session per REST endpoint, so that pushes to it reuse kept-alive connections
+        # rather than each one opening a new TCP and TLS connection of its own.
+        self._rest_sessions:'url_session_dict' = {}
+
 # ################################################################################################################################
 
     def start_sub_key(self, sub_key:'str') -> 'None':
@@ -138,6 +155,11 @@ class PushDelivery:
                 greenlet.kill()
             self._greenlets.clear()
 
+        for session in self._rest_sessions.values():
+            session.close()
+
+        self._rest_sessions.clear()
+
 # ################################################################################################################################
 
     def _delivery_loop(self, sub_key:'str') -> 'None':
@@ -174,6 +196,22 @@ class PushDelivery:
 
         logger.info('PubSub delivery greenlet stopped for sub_key `%s`', sub_key)
 
+# ################################################################################################################################
+
+    def _get_max_in_flight(self, config_list:'anylist') -> 'int':
+        """ Returns how many messages of one subscriber may be outstanding at once - more than one
+        only for REST endpoints whose subscriptions ask for it, within the limit all subscriptions share.
+        """
+        out = _max_in_flight_default
+
+        for config in config_list:
+            if config['push_type'] == PubSub.Push_Type.REST:
+                if max_in_flight := config.get('rest_push_max_in_flight'):
+                    out = min(max_in_flight, _max_in_flight_limit)
+                break
+
+        return out
+
 # ################################################################################################################################
 
     def _deliver_batch(self, messages:'list', sub_key:'str') -> 'None':
@@ -181,6 +219,8 @@ class PushDelivery:
         acknowledge the whole batch in one transaction. An acknowledgement removes
         this subscriber's delivery rows only - a message expired or undeliverable
         for this subscriber stays behind for every other subscriber that needs it.
+        With an in-flight window, up to that many messages are delivered at once,
+        but acknowledgements still cover only an unbroken run from the start of the batch.
         """
         config_list = self.server.config_manager._push_subs[sub_key]
 
@@ -191,24 +231,46 @@ class PushDelivery:
         msg_ids:'strlist' = []
         sequence_ids:'intlist' = []
 
-        for message in messages:
+        def _deliver(message:'anydict') -> 'bool':
 
             # A queue asked to pause stops between two of its messages, and what is left of the batch
             # stays in the queue, to go out when the queue starts again.
             if sub_key in self._paused:
-                break
+                return False
 
             topic_name = message['topic_name']
             sub_config = config_by_topic[topic_name]
 
             # A message the pause interrupted has not been concluded either way, so it is not acked
-            is_concluded = self._deliver_with_retry(message, sub_config, sub_key)
+            out = self._deliver_with_retry(message, sub_config, sub_key)
+            return out
 
-            if not is_concluded:
-                break
+        max_in_flight = self._get_max_in_flight(config_list)
+
+        # With no window, each message goes out only once the previous one is concluded ..
+        if max_in_flight == 1:
+            pool = None
+            outcomes = map(_deliver, messages)
+
+        # .. while a window keeps that many deliveries going at once, with the outcomes still read in the batch's order.
+        else:
+            pool = Pool(max_in_flight)
+            outcomes = pool.imap(_deliver, messages)
 
-            msg_ids.append(message['msg_id'])
-            sequence_ids.append(message['sequence_id'])
+        try:
+            for message, is_concluded in zip(messages, outcomes):
+
+                # Everything after a message that was not concluded stays in the queue, even if it went out already,
+                # which is the same at-least-once trade-off that a pause makes anyway.
+                if not is_concluded:
+                    break
+
+                msg_ids.append(message['msg_id'])
+                sequence_ids.append(message['sequence_id'])
+
+        finally:
+            if pool is not None:
+                pool.kill()
 
         # Delivered, expired and given-up messages all leave the queue - retrying
         # ran its course above, so nothing here is awaiting another attempt.
@@ -392,17 +454,34 @@ class PushDelivery:
 
         self.server.invoke(service_name, payload)
 
+# ################################################################################################################################
+
+    def _get_rest_session(self, url:'str') -> 'Session':
+        """ Returns the session that all the pushes to one REST endpoint share.
+        """
+        if not (session := self._rest_sessions.get(url)):
+
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=_rest_pool_size)
+
+            session = Session()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+
+            self._rest_sessions[url] = session
+
+        return session
+
 # ################################################################################################################################
 
     def _deliver_to_rest(self, message:'anydict', sub_config:'anydict') -> 'None':
-        """ Deliver a raw message by posting to a REST endpoint.
+        """ Deliver a raw message by posting to a REST endpoint, over a connection kept alive between the pushes.
         """
         from json import dumps
-        from requests import post as requests_post
 
         url = sub_config['rest_push_url']
+        session = self._get_rest_session(url)
 
-        response = requests_post(url, data=dumps(message), headers={'Content-Type': 'application/json'})
+        response = session.post(url, data=dumps(message), headers={'Content-Type': 'application/json'})
         response.raise_for_status()
 
 # ################################################################################################################################
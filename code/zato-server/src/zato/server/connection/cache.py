@@ -11,17 +11,24 @@ Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
 from fnmatch import fnmatch
 from json import dumps, loads
 from logging import getLogger
+from time import time
+from traceback import format_exc
+
+# gevent
+from gevent import sleep
 
 # Zato
 from zato.common.api import HTTP_SOAP
 from zato.common.typing_ import cast_
+from zato.server.connection.http_soap.response_cache.common import ModuleCtx as ResponseCacheCtx
+from zato.server.connection.http_soap.response_cache.local import local_cache
 
 # ################################################################################################################################
 # ################################################################################################################################
 
 if 0:
     from redis import Redis
-    from zato.common.typing_ import any_
+    from zato.common.typing_ import any_, anytuple, iterator_, stranydict, strlist
     from zato.server.base.config_manager import ConfigManager
 
 # ################################################################################################################################
@@ -35,6 +42,9 @@ logger = getLogger(__name__)
 _Key_Prefix = 'zato:cache:'
 _response_cache = HTTP_SOAP.ResponseCache
 
+# How many keys are deleted in one round trip
+_Delete_Batch_Size = 500
+
 # ################################################################################################################################
 # ################################################################################################################################
 
@@ -118,21 +128,153 @@ class CacheAPI:
         redis_key = self._make_key(key)
         self.redis.delete(redis_key)
 
+# ################################################################################################################################
+
+    def _delete_keys(self, redis_keys:'iterator_') -> 'None':
+        """ Deletes the given keys, many of them per round trip.
+        """
+        batch:'strlist' = []
+
+        for redis_key in redis_keys:
+            batch.append(redis_key)
+
+            if len(batch) == _Delete_Batch_Size:
+                _ = self.redis.delete(*batch)
+                batch.clear()
+
+        if batch:
+            _ = self.redis.delete(*batch)
+
 # ################################################################################################################################
 
     def delete_by_prefix(self, prefix:'str') -> 'None':
         """ Deletes all the keys that start with the given prefix. No-op if none match.
         """
         match = self._make_key(prefix) + '*'
+        self._delete_keys(self.redis.scan_iter(match=match, count=_Delete_Batch_Size))
+
+# ################################################################################################################################
+
+    def get_response(self, key:'str', channel_id:'int') -> 'anytuple':
+        """ Returns a cached response along with the current generation of its channel, both read in one round trip.
+        A response stored before the channel was last purged is returned as None.
+        """
+        generation_key = self._make_key(_response_cache.Generation_Key.format(channel_id))
+        raw, raw_generation = self.redis.mget(self._make_key(key), generation_key)
+
+        generation = int(raw_generation or 0)
+
+        if raw is None:
+            value = None
+        else:
+            value = loads(raw)
 
-        for redis_key in self.redis.scan_iter(match=match):
-            _ = self.redis.delete(redis_key)
+            # Only full entries carry a generation - markers are one-byte strings
+            if isinstance(value, dict):
+                if value.get('generation') != generation:
+                    value = None
+
+        out = (value, generation)
+        return out
+
+# ################################################################################################################################
+
+    def get_response_generation(self, channel_id:'int') -> 'int':
+        """ Returns the current generation of a channel's cached responses.
+        """
+        raw = self.redis.get(self._make_key(_response_cache.Generation_Key.format(channel_id)))
+
+        out = int(raw or 0)
+        return out
+
+# ################################################################################################################################
+
+    def set_response(self, key:'str', entry:'stranydict', expiry:'int', channel_id:'int') -> 'None':
+        """ Stores a cached response and adds it to its channel's index, in one round trip.
+        Index members of entries that have expired by now are dropped on the way.
+        """
+        redis_key = self._make_key(key)
+        index_key = self._make_key(_response_cache.Index_Key.format(channel_id))
+
+        now = time()
+        member = redis_key + _response_cache.Index_Separator + entry['path']
+
+        pipeline = self.redis.pipeline(transaction=False)
+        _ = pipeline.set(redis_key, dumps(entry), ex=int(expiry))
+        _ = pipeline.zadd(index_key, {member: now + expiry})
+        _ = pipeline.zremrangebyscore(index_key, '-inf', now)
+        _ = pipeline.execute()
+
+# ################################################################################################################################
+
+    def purge_responses(self, channel_id:'int') -> 'int':
+        """ Makes all the cached responses of a channel stale by incrementing its generation, which takes
+        the same time no matter how many there are. The stale entries are not read again and expire on their own.
+        Returns the new generation.
+        """
+        generation_key = self._make_key(_response_cache.Generation_Key.format(channel_id))
+        index_key = self._make_key(_response_cache.Index_Key.format(channel_id))
+
+        pipeline = self.redis.pipeline(transaction=False)
+        _ = pipeline.incr(generation_key)
+        _ = pipeline.delete(index_key)
+        generation, _ = pipeline.execute()
+
+        out = int(generation)
+        return out
+
+# ################################################################################################################################
+
+    def _delete_responses_by_pattern(self, channel_id:'int', pattern:'str') -> 'None':
+        """ Deletes the cached responses of a channel whose path and query match the pattern,
+        finding them through the channel's index rather than by reading the entries.
+        """
+        index_key = self._make_key(_response_cache.Index_Key.format(channel_id))
+        separator = _response_cache.Index_Separator
+
+        # Redis matches the same way fnmatch does as long as the pattern uses no character classes or escapes,
+        # in which case it can filter the index on its own end. Either way, fnmatch has the final say.
+        if '[' in pattern or '\\' in pattern:
+            match = None
+        else:
+            match = '*' + separator + pattern
+
+        batch:'strlist' = []
+
+        for member, _ in self.redis.zscan_iter(index_key, match=match, count=_Delete_Batch_Size):
+            member = cast_('str', member)
+            _, path = member.split(separator, 1)
+
+            if not fnmatch(path, pattern):
+                continue
+
+            batch.append(member)
+
+            if len(batch) == _Delete_Batch_Size:
+                self._delete_index_members(index_key, batch)
+                batch.clear()
+
+        if batch:
+            self._delete_index_members(index_key, batch)
+
+# ################################################################################################################################
+
+    def _delete_index_members(self, index_key:'str', members:'strlist') -> 'None':
+        """ Deletes a batch of cached responses along with their index members, in one round trip.
+        """
+        separator = _response_cache.Index_Separator
+        redis_keys = [member.split(separator, 1)[0] for member in members]
+
+        pipeline = self.redis.pipeline(transaction=False)
+        _ = pipeline.delete(*redis_keys)
+        _ = pipeline.zrem(index_key, *members)
+        _ = pipeline.execute()
 
 # ################################################################################################################################
 
     def invalidate_response(self, channel_name:'str', pattern:'str'='') -> 'None':
-        """ Invalidates cached responses of a REST or SOAP channel. Without a pattern, the channel's whole
-        key space is purged. With a pattern, only the entries whose path and query match it are deleted,
+        """ Invalidates cached responses of a REST or SOAP channel. Without a pattern, all of the channel's
+        responses become stale at once. With a pattern, only the entries whose path and query match it are deleted,
         e.g. '/api/customers*' - admission markers are left alone because they carry no path to match.
         """
 
@@ -144,28 +286,68 @@ class CacheAPI:
             raise Exception(f'Channel not found: `{channel_name}` (invalidate-response)')
 
         channel_id = channel['id']
-        prefix = _response_cache.Key_Prefix.format(channel_id)
 
-        # .. without a pattern, the whole prefix goes away ..
+        # .. without a pattern, the whole channel goes away ..
         if not pattern:
-            self.delete_by_prefix(prefix)
-            return
+            generation = self.purge_responses(channel_id)
 
-        # .. with a pattern, each entry's stored path and query decides its fate.
-        match = self._make_key(prefix) + '*'
+        # .. while with a pattern, its index tells which entries match.
+        else:
+            generation = None
+            self._delete_responses_by_pattern(channel_id, pattern)
 
-        for redis_key in self.redis.scan_iter(match=match):
-            raw = self.redis.get(redis_key)
+        self.publish_response_invalidation(channel_id, pattern, generation)
 
-            if raw is None:
-                continue
+# ################################################################################################################################
+
+    def publish_response_invalidation(self, channel_id:'int', pattern:'str'='', generation:'int | None'=None) -> 'None':
+        """ Drops cached responses of a channel from the memory of this server right away
+        and tells all the other servers to do the same. A purge of the whole channel comes with its new generation.
+        """
+        local_cache.invalidate(channel_id, pattern, generation)
 
-            value = loads(cast_('str', raw))
+        message = dumps({'channel_id': channel_id, 'pattern': pattern, 'generation': generation})
+        _ = self.redis.publish(ResponseCacheCtx.Invalidation_Channel, message)
 
-            # Only full entries carry a path - markers are one-byte strings
-            if isinstance(value, dict):
-                if fnmatch(value['path'], pattern):
-                    _ = self.redis.delete(redis_key)
+# ################################################################################################################################
+
+    def run_response_invalidation_listener(self) -> 'None':
+        """ Runs forever in its own greenlet, dropping cached responses from the memory of this server
+        whenever any server invalidates them. The in-memory tier is used only while this listener is subscribed.
+        """
+        while True:
+
+            # The Redis client may be replaced when the configuration changes, in which case we subscribe anew
+            redis = self.redis
+            pubsub = None
+
+            try:
+                pubsub = redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(ResponseCacheCtx.Invalidation_Channel)
+
+                # Whatever was published while we were not subscribed is lost, so we start from an empty tier
+                local_cache.clear()
+                local_cache.is_active = True
+
+                while self.redis is redis:
+                    message = pubsub.get_message(timeout=ResponseCacheCtx.Invalidation_Poll_Timeout)
+
+                    if message:
+                        data = loads(message['data'])
+                        local_cache.invalidate(data['channel_id'], data['pattern'], data.get('generation'))
+
+            except Exception:
+                local_cache.is_active = False
+
+                logger.warning('Response cache invalidation listener error, retrying in %ss -> %s',
+                    ResponseCacheCtx.Invalidation_Retry_Delay, format_exc())
+                sleep(ResponseCacheCtx.Invalidation_Retry_Delay)
+
+            finally:
+                local_cache.is_active = False
+
+                if pubsub:
+                    pubsub.close()
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -11,9 +11,15 @@ from io import BytesIO
 from json import dumps
 from logging import getLogger, INFO
 from mimetypes import guess_type as guess_mime_type
+from smtplib import SMTPServerDisconnected
 from time import monotonic
 from traceback import format_exc
 
+# gevent
+from gevent.lock import RLock
+from gevent.pool import Pool
+from gevent.queue import Empty, Queue
+
 # Outbox
 from zato.server.ext.outbox import AnonymousOutbox, Attachment, Email, Outbox
 
@@ -31,8 +37,9 @@ from zato.server.store import BaseAPI, BaseStore
 
 if 0:
     from O365.mailbox import MailBox
-    from zato.common.typing_ import any_, anylist, stranydict
+    from zato.common.typing_ import any_, anylist, callable_, stranydict
     MailBox = MailBox
+    callable_ = callable_
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -57,6 +64,20 @@ _default_ca_certs_path    = ''
 _default_helo_hostname    = ''
 _default_from_address     = ''
 _default_needs_tls_verify = True
+_default_pool_size        = 5
+
+# How long a caller waits for a free pooled session before giving up, in seconds
+_pool_acquire_timeout = 30
+
+# A session idle for longer than this, in seconds, is checked with a NOOP before it is used again,
+# because servers drop idle clients on their own, often without telling them.
+_pool_noop_after = 10
+
+# How many messages of one send_many batch a Microsoft 365 connection sends at a time - it has no sessions of its own to bound it
+_ms365_send_many_concurrency = 5
+
+# What a session that the server dropped in the meantime fails with - a message is retried on a new session once
+_disconnect_errors = (SMTPServerDisconnected, ConnectionError)
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -135,6 +156,205 @@ def _build_send_attachment_envelope(name:'str', contents:'bytes') -> 'any_':
     out = build_attachment(name, mime_type, contents)
     return out
 
+def _send_many(
+    send_func:'callable_',
+    messages:'anylist',
+    from_:'any_',
+    cid:'str',
+    concurrency:'int',
+    ) -> 'anylist':
+    """ Sends a batch of messages through a connection's send function, up to the given number of them at a time.
+    Returns one outcome per message, in the order the messages were given.
+    """
+    def _send(msg:'any_') -> 'bool':
+        out = send_func(msg, from_, cid)
+        return out
+
+    # Each greenlet sends one message, so the pool's size is how many are in flight at once
+    pool = Pool(concurrency)
+    out = pool.map(_send, messages)
+
+    return out
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class SMTPSessionPool:
+    """ A pool of connected and authenticated SMTP sessions of one connection. Sessions are built lazily,
+    up to the pool's size, and reused across sends, so that a message pays for TCP, TLS and AUTH only
+    when no session is left to reuse. A session idle for a while is checked with a NOOP before it is used,
+    a session that failed a send is reset with an RSET before it is returned, and one that fails either check
+    is closed to make room for a new one.
+    """
+
+    def __init__(self, conn_name:'str', new_session:'callable_', size:'int') -> 'None':
+        self.conn_name = conn_name
+        self.new_session = new_session
+        self.size = size
+
+        # Guards the creation counter so the pool never grows beyond its size
+        self._lock = RLock()
+
+        # Sessions that are connected and idle, each along with when it was last used
+        self._idle = Queue()
+
+        # How many sessions exist, idle or borrowed
+        self._created = 0
+
+        # Once the pool is closed, returned sessions are disconnected instead of being pooled again
+        self._is_closed = False
+
+# ################################################################################################################################
+
+    def _connect(self) -> 'any_':
+        """ Builds one new session, giving its room in the pool back if it cannot connect or authenticate.
+        """
+        try:
+            session = self.new_session()
+            session.connect()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+        return session
+
+# ################################################################################################################################
+
+    def _checkout(self) -> 'any_':
+        """ Returns a session ready to send through, and whether it was connected just now.
+        """
+        while True:
+
+            # An idle session is used right away and connecting a new one is preferred over waiting ..
+            with self._lock:
+                try:
+                    session, last_used = self._idle.get_nowait()
+                except Empty:
+                    session = None
+                    should_connect = self._created < self.size
+                    if should_connect:
+                        self._created += 1
+                else:
+                    should_connect = False
+
+            # .. there was room for a new session, so one is connected - outside the lock, because this is network I/O ..
+            if should_connect:
+                session = self._connect()
+                out = (session, True)
+                return out
+
+            # .. with the pool exhausted, wait until someone returns a session.
+            if session is None:
+                try:
+                    session, last_used = self._idle.get(timeout=_pool_acquire_timeout)
+                except Empty:
+                    raise Exception(f'No free pooled SMTP session for `{self.conn_name}` after {_pool_acquire_timeout}s')
+
+            # A session that was idle for a while may have been dropped by the server,
+            # in which case it is discarded and the loop connects or waits for another one.
+            if monotonic() - last_used > _pool_noop_after:
+                try:
+                    session.noop()
+                except Exception:
+                    logger.info('Discarding a pooled SMTP session of `%s` that failed a NOOP', self.conn_name)
+                    self._discard(session)
+                    continue
+
+            out = (session, False)
+            return out
+
+# ################################################################################################################################
+
+    def _checkin(self, session:'any_', is_clean:'bool') -> 'None':
+        """ Returns a session to the pool. One that failed a send is reset first and discarded if it cannot be.
+        """
+        if self._is_closed:
+            self._discard(session)
+            return
+
+        if not is_clean:
+            try:
+                session.reset()
+            except Exception:
+                logger.info('Discarding a pooled SMTP session of `%s` that failed an RSET', self.conn_name)
+                self._discard(session)
+                return
+
+        self._idle.put((session, monotonic()))
+
+# ################################################################################################################################
+
+    def _discard(self, session:'any_') -> 'None':
+        """ Disconnects a session that is no longer usable and makes room in the pool for its replacement.
+        """
+        try:
+            session.disconnect()
+        except Exception:
+            # The session is already unusable, so failures while closing it change nothing
+            pass
+
+        with self._lock:
+            self._created -= 1
+
+# ################################################################################################################################
+
+    def send(self, email:'any_', attachments:'anylist', from_:'any_') -> 'None':
+        """ Sends one email through a pooled session. A reused session that turns out to have been dropped
+        by the server is discarded and the email goes out through a newly connected one instead.
+        """
+        session, is_new = self._checkout()
+
+        try:
+            session.send(email, attachments, from_)
+
+        except _disconnect_errors:
+
+            # There is nothing to retry if even a session connected just now was dropped ..
+            self._discard(session)
+
+            if is_new:
+                raise
+
+            # .. otherwise, the server closed an idle session without us noticing, so the email gets one more try.
+            logger.info('Reconnecting a pooled SMTP session of `%s` that the server dropped', self.conn_name)
+
+            with self._lock:
+                self._created += 1
+
+            session = self._connect()
+
+            try:
+                session.send(email, attachments, from_)
+            except Exception:
+                self._checkin(session, False)
+                raise
+            else:
+                self._checkin(session, True)
+
+        except Exception:
+            self._checkin(session, False)
+            raise
+
+        else:
+            self._checkin(session, True)
+
+# ################################################################################################################################
+
+    def close(self) -> 'None':
+        """ Disconnects all the idle sessions and marks the pool closed, which makes any session
+        still borrowed disconnect upon its return.
+        """
+        self._is_closed = True
+
+        while True:
+            try:
+                session, _ = self._idle.get_nowait()
+            except Empty:
+                break
+            else:
+                self._discard(session)
+
 # ################################################################################################################################
 # ################################################################################################################################
 
@@ -180,6 +400,11 @@ class SMTPConnection(BaseConnection):
         else:
             needs_tls_verify = _default_needs_tls_verify
 
+        if 'pool_size' in config:
+            pool_size = config['pool_size']
+        else:
+            pool_size = _default_pool_size
+
         # .. and they may be empty strings in the configuration while the underlying transport expects None in such cases.
         if not ca_certs_path:
             ca_certs_path = None
@@ -190,6 +415,11 @@ class SMTPConnection(BaseConnection):
         if not from_address:
             from_address = None
 
+        if not pool_size:
+            pool_size = _default_pool_size
+
+        self.pool_size = int(pool_size)
+
         self.conn_kwargs:'stranydict' = {
             'needs_tls_verify': needs_tls_verify,
             'ca_certs_path': ca_certs_path,
@@ -216,6 +446,24 @@ class SMTPConnection(BaseConnection):
         else:
             self.conn_class = AnonymousOutbox
 
+        # Sessions are connected and authenticated on first use, not here
+        self.pool = SMTPSessionPool(self.config.name, self._new_session, self.pool_size)
+
+# ################################################################################################################################
+
+    def _new_session(self) -> 'any_':
+        """ Builds one not yet connected session for the pool.
+        """
+        out = self.conn_class(*self.conn_args, **self.conn_kwargs)
+        return out
+
+# ################################################################################################################################
+
+    def close(self) -> 'None':
+        """ Disconnects all the pooled sessions, e.g. when the connection is being edited or deleted.
+        """
+        self.pool.close()
+
 # ################################################################################################################################
 
     def ping(self) -> 'str':
@@ -314,9 +562,9 @@ class SMTPConnection(BaseConnection):
 
         send_start = monotonic()
 
+        # The message goes out through a pooled session, which is connected and authenticated only if none is idle
         try:
-            with self.conn_class(*self.conn_args, **self.conn_kwargs) as conn:
-                conn.send(email, atts, from_ or msg.from_)
+            self.pool.send(email, atts, from_ or msg.from_)
         except Exception as e:
 
             # Log what happened ..
@@ -345,6 +593,15 @@ class SMTPConnection(BaseConnection):
             # .. and tell the caller that the message was sent successfully.
             return True
 
+# ################################################################################################################################
+
+    def send_many(self, messages:'anylist', from_:'any_'=None, cid:'str'='') -> 'anylist':
+        """ Sends a batch of messages concurrently, as many at a time as there are pooled sessions.
+        Returns one outcome per message, the same one send returns, in the order the messages were given.
+        """
+        out = _send_many(self.send, messages, from_, cid, self.pool_size)
+        return out
+
 # ################################################################################################################################
 # ################################################################################################################################
 
@@ -509,6 +766,20 @@ class Microsoft365SMTPConnection(BaseConnection):
             # .. and tell the caller that the message was sent successfully.
             return True
 
+# ################################################################################################################################
+
+    def send_many(self, messages:'anylist', from_:'any_'=None, cid:'str'='') -> 'anylist':
+        """ Sends a batch of messages concurrently. Returns one outcome per message, in the order the messages were given.
+        """
+        out = _send_many(self.send, messages, from_, cid, _ms365_send_many_concurrency)
+        return out
+
+# ################################################################################################################################
+
+    def close(self) -> 'None':
+        """ Graph sends hold no sessions open between messages, so there is nothing to close.
+        """
+
 # ################################################################################################################################
 # ################################################################################################################################
 
@@ -516,6 +787,15 @@ class SMTPAPI(BaseAPI):
     """ API to obtain SMTP connections through.
     """
 
+    def send_many(self, name:'str', messages:'anylist', from_:'any_'=None, cid:'str'='') -> 'anylist':
+        """ Sends a batch of messages through the connection of that name - e.g. self.email.smtp.send_many('My SMTP', messages).
+        Returns one outcome per message, True for each one sent, in the order the messages were given.
+        """
+        item = self.get(name)
+        out = item.conn.send_many(messages, from_, cid)
+
+        return out
+
 # ################################################################################################################################
 # ################################################################################################################################
 
@@ -554,5 +834,18 @@ class SMTPConnStore(BaseStore):
 
         return instance
 
+    def _delete(self, name:'str') -> 'None':
+
+        # An edited or deleted connection disconnects its pooled sessions before it goes away
+        item = self.items.get(name)
+
+        if item and item.impl:
+            try:
+                item.impl.close()
+            except Exception:
+                logger.warning('Could not close SMTP connection `%s`, e:`%s`', name, format_exc())
+
+        super()._delete(name)
+
 # ################################################################################################################################
 # ################################################################################################################################
@@ -8,8 +8,11 @@ Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
 
 # stdlib
 import os
+from collections.abc import Iterable
+from contextlib import contextmanager
 from hashlib import sha256
-from tempfile import mkstemp
+from io import BufferedReader, RawIOBase
+from tempfile import mkstemp, SpooledTemporaryFile
 from time import monotonic
 from traceback import format_exc
 
@@ -21,15 +24,18 @@ from humanize import naturalsize
 
 # Zato
 from zato.common.audit_log.api import AuditOutcome
+from zato.common.audit_log.attachment import get_max_attachment_size
 from zato.common.audit_log.file_transfer import record_file_transfer, Operation_Delete, Operation_Move, Operation_Read, \
     Operation_Store
+from zato.common.typing_ import any_, generator_
 
 # ################################################################################################################################
 # ################################################################################################################################
 
 if 0:
-    from zato.common.typing_ import any_, stranydict
-    any_ = any_
+    from zato.common.typing_ import byteslist, bytesnone, stranydict
+    byteslist = byteslist
+    bytesnone = bytesnone
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -49,12 +55,26 @@ Key_Remote_Path = 'remote_path'
 # What a spool file's name ends with, so a stray one can be told apart in the temporary directory.
 _spool_suffix = '-zato-file-delivery-spool.dat'
 
+# How many bytes at a time a file is streamed in, between the remote server, the local disk and the caller
+Default_Chunk_Size = 1024 * 1024
+
+# The modes a remote file can be opened in
+Mode_Read  = 'rb'
+Mode_Write = 'wb'
+
+# What a read's audit event says when its caller stopped before the end of the file
+_read_stopped_error = 'The caller stopped reading after {} bytes'
+
 # ################################################################################################################################
 # ################################################################################################################################
 
 # A list of the info objects a directory listing turns into
 file_info_list = list['FileInfo']
 
+# What the streaming writes take in and the streaming reads produce
+anyiterable = Iterable[any_]
+bytesgen    = generator_[bytes, None, None]
+
 # ################################################################################################################################
 # ################################################################################################################################
 
@@ -68,20 +88,177 @@ def _elapsed_ms(start:'float') -> 'int':
 # ################################################################################################################################
 # ################################################################################################################################
 
-def spool_file_payload(data:'bytes') -> 'str':
-    """ Writes the bytes of one queued file transfer to a local spool file, returning its path -
-    what the publication puts in its envelope in place of the bytes themselves. The write runs
-    in its own thread so as not to block the event loop.
+def iter_bytes(chunks:'anyiterable', encoding:'str' = 'utf8') -> 'bytesgen':
+    """ Yields each chunk as bytes, encoding the ones that are strings.
+    """
+    for chunk in chunks:
+        if not isinstance(chunk, bytes):
+            chunk = chunk.encode(encoding)
+        yield chunk
+
+# ################################################################################################################################
+
+def iter_local_file(local_path:'str', chunk_size:'int' = Default_Chunk_Size) -> 'bytesgen':
+    """ Reads a local file chunk by chunk, in its own thread so as not to block the event loop.
+    """
+    thread_file = FileObjectThread(local_path, 'rb')
+
+    try:
+        while chunk := thread_file.read(chunk_size):
+            yield chunk
+    finally:
+        thread_file.close()
+
+# ################################################################################################################################
+
+def spool_file_chunks(chunks:'anyiterable', encoding:'str' = 'utf8') -> 'str':
+    """ Writes the chunks of one file to a local spool file as they arrive, returning its path.
+    The writes run in their own thread so as not to block the event loop, and a spool file
+    that could not be written in full is removed before the caller learns about it.
     """
     spool_fd, spool_path = mkstemp(suffix=_spool_suffix)
     os.close(spool_fd)
 
     thread_file = FileObjectThread(spool_path, 'wb')
-    _ = thread_file.write(data)
+
+    try:
+        for chunk in iter_bytes(chunks, encoding):
+            _ = thread_file.write(chunk)
+    except Exception:
+        thread_file.close()
+        os.remove(spool_path)
+        raise
+
     thread_file.close()
 
     return spool_path
 
+# ################################################################################################################################
+
+def spool_file_payload(data:'bytes') -> 'str':
+    """ Writes the bytes of one queued file transfer to a local spool file, returning its path -
+    what the publication puts in its envelope in place of the bytes themselves. The write runs
+    in its own thread so as not to block the event loop.
+    """
+    out = spool_file_chunks([data])
+    return out
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class TransferDigest:
+    """ The size and SHA-256 checksum of a file, computed chunk by chunk as the file moves, along with
+    its bytes for the audit log when the connection keeps them - but only for as long as they fit
+    under the attachment cap, past which they would be dropped by the audit log anyway.
+    """
+
+    def __init__(self, should_store_content:'bool') -> 'None':
+        self.should_store_content = should_store_content
+        self.max_content_size = get_max_attachment_size()
+
+        self.size = 0
+        self.hasher = sha256()
+        self.chunks:'byteslist' = []
+
+# ################################################################################################################################
+
+    def update(self, chunk:'bytes') -> 'None':
+
+        self.size += len(chunk)
+        self.hasher.update(chunk)
+
+        if self.should_store_content:
+            if self.size <= self.max_content_size:
+                self.chunks.append(chunk)
+            else:
+                self.chunks.clear()
+
+# ################################################################################################################################
+
+    @property
+    def checksum(self) -> 'str':
+        out = self.hasher.hexdigest()
+        return out
+
+# ################################################################################################################################
+
+    @property
+    def content(self) -> 'bytesnone':
+        """ The file's bytes when the connection keeps them - empty if the file went past the cap.
+        """
+        if self.should_store_content:
+            out = b''.join(self.chunks)
+        else:
+            out = None
+
+        return out
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class _ChunkReader(RawIOBase):
+    """ A read-only file object over a stream of chunks - what open returns, once buffered, for reading.
+    """
+
+    def __init__(self, chunks:'bytesgen') -> 'None':
+        super().__init__()
+        self.chunks = chunks
+        self.pending = memoryview(b'')
+
+    def readable(self) -> 'bool':
+        return True
+
+    def readinto(self, buffer:'any_') -> 'int':
+
+        # The next chunk is fetched only once the previous one was fully handed out ..
+        if not self.pending:
+            chunk = next(self.chunks, b'')
+            self.pending = memoryview(chunk)
+
+        # .. and it fills as much of the buffer as it can, an empty chunk meaning the end of the file.
+        count = min(len(buffer), len(self.pending))
+        buffer[:count] = self.pending[:count]
+        self.pending = self.pending[count:]
+
+        return count
+
+    def close(self) -> 'None':
+
+        # Closing the stream early lets it give its client back to the pool
+        if not self.closed:
+            self.chunks.close()
+
+        super().close()
+
+# ################################################################################################################################
+
+@contextmanager
+def open_remote_file(conn:'any_', remote_path:'str', mode:'str', chunk_size:'int') -> 'any_':
+    """ Opens a remote file of any file transfer connection, streaming it in chunks. A file opened
+    for reading is a buffered reader over the connection's read_iter. A file opened for writing
+    is spooled locally, in memory up to one chunk and on disk past that, and goes out through
+    write_iter once the block ends without an exception.
+    """
+    if mode == Mode_Read:
+        chunks = conn.read_iter(remote_path, chunk_size)
+        reader = BufferedReader(_ChunkReader(chunks), chunk_size)
+
+        try:
+            yield reader
+        finally:
+            reader.close()
+
+    elif mode == Mode_Write:
+        with SpooledTemporaryFile(max_size=chunk_size) as spool_file:
+            yield spool_file
+
+            _ = spool_file.seek(0)
+            chunks = iter(lambda: spool_file.read(chunk_size), b'')
+            conn.write_iter(chunks, remote_path)
+
+    else:
+        raise Exception(f'Unsupported mode `{mode}`, expected `{Mode_Read}` or `{Mode_Write}`')
+
 # ################################################################################################################################
 # ################################################################################################################################
 
@@ -358,22 +535,51 @@ class FileTransferConnection:
                 outcome=AuditOutcome.Error, duration_ms=duration_ms, error=error)
             raise
 
-        # The bytes themselves are kept only when the connection asked for that.
-        if self.wrapper.should_store_content:
-            content = out
-        else:
-            content = None
-
-        hasher = sha256(out)
-        checksum = hasher.hexdigest()
+        digest = TransferDigest(self.wrapper.should_store_content)
+        digest.update(out)
 
-        size = len(out)
         duration_ms = _elapsed_ms(start)
-        self._record_transfer(Operation_Read, remote_path,
-            outcome=AuditOutcome.OK, size=size, duration_ms=duration_ms, checksum=checksum, content=content)
+        self._record_transfer(Operation_Read, remote_path, outcome=AuditOutcome.OK, size=digest.size,
+            duration_ms=duration_ms, checksum=digest.checksum, content=digest.content)
 
         return out
 
+# ################################################################################################################################
+
+    def read_iter(self, remote_path:'str', chunk_size:'int' = Default_Chunk_Size) -> 'bytesgen':
+        """ Reads a remote file chunk by chunk, so that a file of any size never sits in memory as a whole.
+        The size and checksum are computed as the chunks go by and the read is recorded once the last one
+        was handed out - or once the read failed or its caller stopped early. A client of the pool
+        is held for as long as the caller keeps reading.
+        """
+        start = monotonic()
+        digest = TransferDigest(self.wrapper.should_store_content)
+
+        # A failed read is recorded too, as is one whose caller did not read it to the end.
+        try:
+            with self.wrapper.client(should_block=True, block_timeout=_pool_block_timeout) as client:
+                for chunk in client.read_iter(remote_path, chunk_size):
+                    digest.update(chunk)
+                    yield chunk
+
+        except GeneratorExit:
+            duration_ms = _elapsed_ms(start)
+            error = _read_stopped_error.format(digest.size)
+            self._record_transfer(Operation_Read, remote_path,
+                outcome=AuditOutcome.Error, size=digest.size, duration_ms=duration_ms, error=error)
+            raise
+
+        except Exception:
+            duration_ms = _elapsed_ms(start)
+            error = format_exc()
+            self._record_transfer(Operation_Read, remote_path,
+                outcome=AuditOutcome.Error, size=digest.size, duration_ms=duration_ms, error=error)
+            raise
+
+        duration_ms = _elapsed_ms(start)
+        self._record_transfer(Operation_Read, remote_path, outcome=AuditOutcome.OK, size=digest.size,
+            duration_ms=duration_ms, checksum=digest.checksum, content=digest.content)
+
 # ################################################################################################################################
 
     def write(self, data:'any_', remote_path:'str', encoding:'str' = 'utf8') -> 'None':
@@ -396,42 +602,77 @@ class FileTransferConnection:
                 outcome=AuditOutcome.Error, size=size, duration_ms=duration_ms, error=error)
             raise
 
-        # The bytes themselves are kept only when the connection asked for that.
-        if self.wrapper.should_store_content:
-            content = data
-        else:
-            content = None
+        digest = TransferDigest(self.wrapper.should_store_content)
+        digest.update(data)
+
+        duration_ms = _elapsed_ms(start)
+        self._record_transfer(Operation_Store, remote_path, outcome=AuditOutcome.OK, size=size,
+            duration_ms=duration_ms, checksum=digest.checksum, content=digest.content)
+
+# ################################################################################################################################
+
+    def write_iter(self, chunks:'anyiterable', remote_path:'str', encoding:'str' = 'utf8') -> 'None':
+        """ Writes a remote file out of chunks, e.g. a generator or an open file read piece by piece,
+        so that a file of any size never sits in memory as a whole. The size and checksum are computed
+        as the chunks go by. Strings are encoded on the way.
+        """
+        start = monotonic()
+        digest = TransferDigest(self.wrapper.should_store_content)
 
-        hasher = sha256(data)
-        checksum = hasher.hexdigest()
+        def _get_chunks() -> 'bytesgen':
+            for chunk in iter_bytes(chunks, encoding):
+                digest.update(chunk)
+                yield chunk
+
+        # A failed store is recorded too, before the caller learns about it.
+        try:
+            with self.wrapper.client(should_block=True, block_timeout=_pool_block_timeout) as client:
+                client.write_iter(remote_path, _get_chunks())
+        except Exception:
+            duration_ms = _elapsed_ms(start)
+            error = format_exc()
+            self._record_transfer(Operation_Store, remote_path,
+                outcome=AuditOutcome.Error, size=digest.size, duration_ms=duration_ms, error=error)
+            raise
 
         duration_ms = _elapsed_ms(start)
-        self._record_transfer(Operation_Store, remote_path,
-            outcome=AuditOutcome.OK, size=size, duration_ms=duration_ms, checksum=checksum, content=content)
+        self._record_transfer(Operation_Store, remote_path, outcome=AuditOutcome.OK, size=digest.size,
+            duration_ms=duration_ms, checksum=digest.checksum, content=digest.content)
+
+# ################################################################################################################################
+
+    def open(self, remote_path:'str', mode:'str' = Mode_Read, chunk_size:'int' = Default_Chunk_Size) -> 'any_':
+        """ Opens a remote file as a context manager, for reading or writing it in chunks - e.g.
+        with self.ftp['My Connection'].open('/data/partner.csv') as remote_file: ...
+        """
+        out = open_remote_file(self, remote_path, mode, chunk_size)
+        return out
 
 # ################################################################################################################################
 
     def upload(self, local_path:'str', remote_path:'str') -> 'None':
 
-        # Read the local file in using a separate thread so as not to block the event loop ..
-        thread_file = FileObjectThread(local_path, 'rb')
-        data = thread_file.read()
-        thread_file.close()
+        # The local file is read in chunks, in a separate thread so as not to block the event loop ..
+        chunks = iter_local_file(local_path)
 
-        # .. and write it out to the remote location.
-        self.write(data, remote_path)
+        # .. and each chunk goes out to the remote location as soon as it was read.
+        self.write_iter(chunks, remote_path)
 
 # ################################################################################################################################
 
     def download_file(self, remote_path:'str', local_path:'str') -> 'None':
 
-        # Read the remote file in first ..
-        data = self.read(remote_path)
+        # The remote file is read in chunks ..
+        chunks = self.read_iter(remote_path)
 
-        # .. and write it out locally using a separate thread so as not to block the event loop.
+        # .. and each one is written out locally as soon as it arrives, in a separate thread so as not to block the event loop.
         thread_file = FileObjectThread(local_path, 'wb')
-        _ = thread_file.write(data)
-        thread_file.close()
+
+        try:
+            for chunk in chunks:
+                _ = thread_file.write(chunk)
+        finally:
+            thread_file.close()
 
     download = download_file
 
@@ -442,12 +683,16 @@ class FileTransferConnection:
         The bytes go to a local spool file and only its path travels through the queue, so a file
         of any size is delivered with retries, backoff and an audit event per attempt.
         """
+        out = self.publish_iter([data], remote_path, encoding)
+        return out
 
-        # Data to be written out must be always bytes.
-        if not isinstance(data, bytes):
-            data = data.encode(encoding)
+# ################################################################################################################################
 
-        spool_path = spool_file_payload(data)
+    def publish_iter(self, chunks:'anyiterable', remote_path:'str', encoding:'str' = 'utf8') -> 'any_':
+        """ Queues one file for guaranteed delivery the way publish does, taking it in chunks -
+        each one is written to the spool file as soon as it arrives.
+        """
+        spool_path = spool_file_chunks(chunks, encoding)
 
         envelope = {
             Key_Spool_Path: spool_path,
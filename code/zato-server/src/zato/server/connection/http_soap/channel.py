@@ -328,8 +328,10 @@ class RequestDispatcher:
         self.default_error_message = default_error_message
         self.http_methods_allowed = http_methods_allowed
 
-        # All requests to and responses from user-defined REST channels go to the audit log
-        self.audit_log = AuditLog(server.name)
+        # All requests to and responses from user-defined REST channels go to the audit log,
+        # buffered, because nothing here reads the ids of the events back and a transaction per request
+        # would be the most expensive part of many a request.
+        self.audit_log = AuditLog(server.name, is_buffered_by_default=True)
 
 # ################################################################################################################################
 
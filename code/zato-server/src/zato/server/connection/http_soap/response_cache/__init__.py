@@ -11,6 +11,7 @@ from zato.server.connection.http_soap.response_cache.coalesce import counters, i
 from zato.server.connection.http_soap.response_cache.common import ModuleCtx, ResponseCacheConfig, ResponseCacheContext
 from zato.server.connection.http_soap.response_cache.config import get_default_config, parse_config
 from zato.server.connection.http_soap.response_cache.keys import get_context
+from zato.server.connection.http_soap.response_cache.local import local_cache, LocalResponseCache
 from zato.server.connection.http_soap.response_cache.store import lookup, purge_channel, store
 
 __all__ = [
@@ -18,6 +19,8 @@ __all__ = [
     'get_context',
     'get_default_config',
     'invoke_coalesced',
+    'local_cache',
+    'LocalResponseCache',
     'lookup',
     'ModuleCtx',
     'parse_config',
@@ -12,6 +12,7 @@ from dataclasses import dataclass
 
 # Zato
 from zato.server.connection.http_soap.response_cache.common import ModuleCtx
+from zato.server.connection.http_soap.response_cache.local import local_cache
 from zato.server.connection.http_soap.response_cache.store import serve_hit
 from zato.server.metrics import zato_rest_channel_cache_operations_total
 
@@ -127,8 +128,15 @@ def invoke_coalesced(ctx:'ResponseCacheContext', invoke_func:'callable_', invoke
         return out
 
     try:
-        # The previous holder may have filled the cache while this request waited ..
-        value = ctx.cache_api.get(ctx.key)
+        # The previous holder may have filled the cache while this request waited,
+        # in which case the in-memory tier, if the channel has it, has the entry too ..
+        value = None
+
+        if ctx.config.is_local_cache_enabled:
+            value = local_cache.get(ctx.key)
+
+        if value is None:
+            value, _ = ctx.cache_api.get_response(ctx.key, ctx.channel_id)
 
         if isinstance(value, dict):
             counters.coalesced_count += 1
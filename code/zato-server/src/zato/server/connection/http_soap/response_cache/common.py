@@ -40,8 +40,10 @@ class ModuleCtx:
     Cache_Hit  = 'Hit'
     Cache_Miss = 'Miss'
 
-    # Outcome labels of the per-channel metrics counter
-    Outcome_Hit              = 'hit'
+    # Outcome labels of the per-channel metrics counter, with hits from this server's memory
+    # and hits from Redis counted separately
+    Outcome_Hit_L1           = 'hit_l1'
+    Outcome_Hit_L2           = 'hit_l2'
     Outcome_Miss             = 'miss'
     Outcome_Stored           = 'stored'
     Outcome_Marker_Stored    = 'marker_stored'
@@ -60,6 +62,25 @@ class ModuleCtx:
     # Response directives that keep a response out of the cache
     Uncacheable_Directives = ('no-store', 'no-cache', 'private')
 
+    # How many bytes of responses each server may keep in its own memory, unless the environment says otherwise ..
+    Env_Local_Max_Bytes     = 'Zato_Response_Cache_Local_Max_Bytes'
+    Default_Local_Max_Bytes = 64 * 1024 * 1024
+
+    # .. and for how many seconds at most, whatever the channel's TTL is, in case an invalidation is missed.
+    Env_Local_Max_TTL     = 'Zato_Response_Cache_Local_Max_TTL'
+    Default_Local_Max_TTL = 60
+
+    # What each response kept in memory costs on top of its body, in bytes
+    Local_Entry_Overhead = 512
+
+    # The Redis channel through which servers tell one another to drop responses from their memory
+    Invalidation_Channel = 'zato:cache:response-cache:invalidate'
+
+    # How long the invalidation listener waits for a message before checking if its Redis client was replaced,
+    # and how long it waits before subscribing again after an error, both in seconds.
+    Invalidation_Poll_Timeout = 1.0
+    Invalidation_Retry_Delay  = 5.0
+
 # ################################################################################################################################
 # ################################################################################################################################
 
@@ -102,6 +123,7 @@ class ResponseCacheConfig:
     cache_on_second_request: 'bool'
     needs_etag: 'bool'
     coalesce_timeout: 'float'
+    is_local_cache_enabled: 'bool'
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -115,6 +137,7 @@ class ResponseCacheContext:
     channel_id: 'int'
     channel_name: 'str'
     key: 'str'
+    generation: 'int | None'
     path_and_query: 'str'
     skip_lookup: 'bool'
     is_admitted: 'bool'
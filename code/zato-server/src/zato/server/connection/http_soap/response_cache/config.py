@@ -95,6 +95,7 @@ def parse_config(raw:'stranydict', transport:'str') -> 'ResponseCacheConfig':
     out.cache_on_second_request = bool(config['cache_on_second_request'])
     out.needs_etag              = bool(config['needs_etag'])
     out.coalesce_timeout        = int(config['coalesce_timeout'])
+    out.is_local_cache_enabled  = bool(config['is_local_cache_enabled'])
 
     return out
 
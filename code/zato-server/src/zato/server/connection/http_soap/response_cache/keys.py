@@ -161,6 +161,9 @@ def get_context(
     out.channel_id = channel_id
     out.channel_name = channel_name
     out.key = key_prefix + material_hash
+
+    # The generation of the channel's responses is only known after the lookup
+    out.generation = None
     out.path_and_query = path_and_query
     out.wsgi_environ = wsgi_environ
 
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# stdlib
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from fnmatch import fnmatch
+from time import time
+
+# Zato
+from zato.server.connection.http_soap.response_cache.common import ModuleCtx
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if 0:
+    from zato.common.typing_ import stranydict
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+@dataclass(init=False)
+class _LocalEntry:
+    """ One response kept in memory, along with what its eviction needs to know.
+    """
+    entry: 'stranydict'
+    channel_id: 'int'
+    generation: 'int'
+    size: 'int'
+    expires_at: 'float'
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def get_local_max_bytes() -> 'int':
+    """ Returns how many bytes of responses this server may keep in its own memory.
+    """
+    if value := os.environ.get(ModuleCtx.Env_Local_Max_Bytes, ''):
+        out = int(value)
+    else:
+        out = ModuleCtx.Default_Local_Max_Bytes
+
+    return out
+
+# ################################################################################################################################
+
+def get_local_max_ttl() -> 'int':
+    """ Returns for how many seconds at most a response is kept in this server's memory.
+    """
+    if value := os.environ.get(ModuleCtx.Env_Local_Max_TTL, ''):
+        out = int(value)
+    else:
+        out = ModuleCtx.Default_Local_Max_TTL
+
+    return out
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class LocalResponseCache:
+    """ The in-memory tier in front of Redis - entries exactly as they are stored in Redis, already deserialized,
+    so a hit costs neither a round trip nor a JSON parse.
+
+    The tier is bounded by the total size of what it holds, evicting the least recently used entries first,
+    and each entry expires when its Redis copy does, or sooner, after the local TTL cap.
+    An entry stored under a generation of its channel older than the newest one this server has seen
+    is never served, so a purge that lands while a response is being stored cannot leave it behind in memory.
+    Nothing is served from it unless the invalidation listener is subscribed, since otherwise
+    a purge on another server might go unnoticed.
+
+    All the methods run to completion without yielding to other greenlets, so no lock is needed.
+    """
+
+    def __init__(self, max_bytes:'int | None'=None, max_ttl:'int | None'=None) -> 'None':
+
+        # How much the tier may hold, in bytes, and for how long, in seconds.
+        self.max_bytes = get_local_max_bytes() if max_bytes is None else max_bytes
+        self.max_ttl = get_local_max_ttl() if max_ttl is None else max_ttl
+
+        # Set by the invalidation listener - the tier is used only while it is True.
+        self.is_active = False
+
+        # Entries by cache key, the least recently used one first ..
+        self._entries:'OrderedDict[str, _LocalEntry]' = OrderedDict()
+
+        # .. the keys of each channel, so that purging a channel does not scan the other channels' entries ..
+        self._keys_by_channel:'dict[int, dict[str, None]]' = {}
+
+        # .. how many bytes all of them take up ..
+        self.current_bytes = 0
+
+        # .. and the newest generation of each channel's responses that this server has seen.
+        self._generations:'dict[int, int]' = {}
+
+# ################################################################################################################################
+
+    def __len__(self) -> 'int':
+        return len(self._entries)
+
+# ################################################################################################################################
+
+    def _delete(self, key:'str') -> 'None':
+        local_entry = self._entries.pop(key)
+        self.current_bytes -= local_entry.size
+
+        channel_keys = self._keys_by_channel[local_entry.channel_id]
+        del channel_keys[key]
+
+        if not channel_keys:
+            del self._keys_by_channel[local_entry.channel_id]
+
+# ################################################################################################################################
+
+    def get(self, key:'str') -> 'stranydict | None':
+        """ Returns the entry stored under the key, or None if there is no such entry or it has expired.
+        """
+        if not self.is_active:
+            return None
+
+        if not (local_entry := self._entries.get(key)):
+            return None
+
+        # An expired entry is dropped as soon as it is found, and so is one from before its channel was last purged ..
+        if local_entry.expires_at <= time() or local_entry.generation < self._generations.get(local_entry.channel_id, 0):
+            self._delete(key)
+            return None
+
+        # .. while a live one becomes the most recently used one.
+        self._entries.move_to_end(key)
+
+        return local_entry.entry
+
+# ################################################################################################################################
+
+    def set(self, key:'str', entry:'stranydict', channel_id:'int', ttl_seconds:'int') -> 'None':
+        """ Keeps an entry in memory until its Redis copy expires, evicting the least recently used entries
+        if the tier has no room for it.
+        """
+        if not self.is_active:
+            return
+
+        # An entry from before its channel was last purged is stale already ..
+        generation = entry['generation']
+        current_generation = self._generations.get(channel_id, 0)
+
+        if generation < current_generation:
+            return
+
+        # .. while one from after it tells us of a purge that we have not heard of yet.
+        if generation > current_generation:
+            self._generations[channel_id] = generation
+
+        size = len(entry['body']) + ModuleCtx.Local_Entry_Overhead
+
+        # An entry bigger than the whole budget would only push everything else out
+        if size > self.max_bytes:
+            return
+
+        # The Redis copy expires TTL seconds after it was stored, which may have been on another server
+        expires_at = min(entry['stored_at'] + ttl_seconds, time() + self.max_ttl)
+
+        if key in self._entries:
+            self._delete(key)
+
+        while self._entries and self.current_bytes + size > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._delete(oldest_key)
+
+        local_entry = _LocalEntry()
+        local_entry.entry = entry
+        local_entry.channel_id = channel_id
+        local_entry.generation = generation
+        local_entry.size = size
+        local_entry.expires_at = expires_at
+
+        self._entries[key] = local_entry
+        self._keys_by_channel.setdefault(channel_id, {})[key] = None
+        self.current_bytes += size
+
+# ################################################################################################################################
+
+    def invalidate(self, channel_id:'int', pattern:'str'='', generation:'int | None'=None) -> 'None':
+        """ Drops the entries of one channel - all of them, or only those whose path and query match the pattern.
+        A purge of the whole channel also comes with its new generation, below which no entry will be kept from now on.
+        """
+        if generation is not None:
+            if generation > self._generations.get(channel_id, 0):
+                self._generations[channel_id] = generation
+
+        if not (channel_keys := self._keys_by_channel.get(channel_id)):
+            return
+
+        for key in list(channel_keys):
+            if pattern:
+                if not fnmatch(self._entries[key].entry['path'], pattern):
+                    continue
+
+            self._delete(key)
+
+# ################################################################################################################################
+
+    def clear(self) -> 'None':
+        """ Drops all the entries.
+        """
+        self._entries.clear()
+        self._keys_by_channel.clear()
+        self._generations.clear()
+        self.current_bytes = 0
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+# The one in-memory tier of this server
+local_cache = LocalResponseCache()
+
+# ################################################################################################################################
+# ################################################################################################################################
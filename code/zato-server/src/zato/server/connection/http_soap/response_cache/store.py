@@ -12,9 +12,9 @@ from http.client import MULTIPLE_CHOICES, NOT_MODIFIED, OK
 from time import time
 
 # Zato
-from zato.common.api import HTTP_SOAP
 from zato.common.exception import HTTP_RESPONSES
 from zato.server.connection.http_soap.response_cache.common import ModuleCtx, parse_cache_control
+from zato.server.connection.http_soap.response_cache.local import local_cache
 from zato.server.metrics import zato_rest_channel_cache_operations_total
 
 # ################################################################################################################################
@@ -30,8 +30,6 @@ if 0:
 # ################################################################################################################################
 # ################################################################################################################################
 
-_response_cache = HTTP_SOAP.ResponseCache
-
 # HTTP status lines, e.g. 200 -> '200 OK'
 _status_response = {}
 for _code, _reason in HTTP_RESPONSES.items():
@@ -88,7 +86,16 @@ def lookup(ctx:'ResponseCacheContext') -> 'strnone':
         zato_rest_channel_cache_operations_total.labels(ctx.channel_name, ModuleCtx.Outcome_Not_Cached).inc()
         return None
 
-    value = ctx.cache_api.get(ctx.key)
+    # A channel with the in-memory tier may have the entry at hand, with no need to ask Redis ..
+    if ctx.config.is_local_cache_enabled:
+        if entry := local_cache.get(ctx.key):
+            ctx.is_admitted = True
+
+            out = serve_hit(ctx, entry, ModuleCtx.Outcome_Hit_L1)
+            return out
+
+    # .. otherwise, Redis is asked, which also tells us the channel's generation for the store that may follow.
+    value, ctx.generation = ctx.cache_api.get_response(ctx.key, ctx.channel_id)
 
     # Nothing under the key at all - a first-ever miss
     if value is None:
@@ -101,10 +108,13 @@ def lookup(ctx:'ResponseCacheContext') -> 'strnone':
         zato_rest_channel_cache_operations_total.labels(ctx.channel_name, ModuleCtx.Outcome_Miss).inc()
         return None
 
-    # A full entry - serve it as is
+    # A full entry - serve it as is, keeping it in memory for the next requests if the channel wants it
     ctx.is_admitted = True
 
-    out = serve_hit(ctx, value, ModuleCtx.Outcome_Hit)
+    if ctx.config.is_local_cache_enabled:
+        local_cache.set(ctx.key, value, ctx.channel_id, ctx.config.ttl_seconds)
+
+    out = serve_hit(ctx, value, ModuleCtx.Outcome_Hit_L2)
     return out
 
 # ################################################################################################################################
@@ -165,6 +175,10 @@ def store(ctx:'ResponseCacheContext', body:'any_', status_code:'int') -> 'None':
     else:
         etag = ''
 
+    # A request that skipped the lookup does not know its channel's generation yet
+    if ctx.generation is None:
+        ctx.generation = ctx.cache_api.get_response_generation(ctx.channel_id)
+
     entry = {
         'body': body,
         'content_type': headers['Content-Type'],
@@ -172,18 +186,25 @@ def store(ctx:'ResponseCacheContext', body:'any_', status_code:'int') -> 'None':
         'stored_at': time(),
         'etag': etag,
         'path': ctx.path_and_query,
+        'generation': ctx.generation,
     }
 
-    ctx.cache_api.set(ctx.key, entry, ctx.config.ttl_seconds)
+    ctx.cache_api.set_response(ctx.key, entry, ctx.config.ttl_seconds, ctx.channel_id)
+
+    # The in-memory tier will not keep the entry if the channel has been purged since its generation was read
+    if ctx.config.is_local_cache_enabled:
+        local_cache.set(ctx.key, entry, ctx.channel_id, ctx.config.ttl_seconds)
+
     zato_rest_channel_cache_operations_total.labels(ctx.channel_name, ModuleCtx.Outcome_Stored).inc()
 
 # ################################################################################################################################
 
 def purge_channel(cache_api:'CacheAPI', channel_id:'int') -> 'None':
-    """ Deletes all the cached responses of one channel - a prefix delete over its key space.
+    """ Makes all the cached responses of one channel stale by moving it to a new generation,
+    then tells all the servers to drop the channel's responses from their memory.
     """
-    prefix = _response_cache.Key_Prefix.format(channel_id)
-    cache_api.delete_by_prefix(prefix)
+    generation = cache_api.purge_responses(channel_id)
+    cache_api.publish_response_invalidation(channel_id, generation=generation)
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -19,6 +19,7 @@ from regex import compile as re_compile
 # Zato
 from zato.common.api import HTTP_SOAP
 from zato.common.util.url_dispatcher import Match_Slash_Default, to_internal_accept
+from zato.server.connection.http_soap.url_tree import URLPathTree
 
 http_any_internal = HTTP_SOAP.ACCEPT.ANY_INTERNAL
 
@@ -82,6 +83,7 @@ class Matcher:
 
         self.group_names:'strlist' = []
         self.pattern = pattern
+        self.match_slash = match_slash
         self.matcher = None
         self.is_static = True
         self._brace_pattern = re_compile(r'\{[\w \$.\-:|=~^\/]+\}', stdlib_re.UNICODE)
@@ -160,6 +162,15 @@ class PyURLData:
         # Every Accept value that some channel names, in the form incoming headers are turned into
         self.channel_accepts:'strset' = set()
 
+        # Channels by the segments of their URL paths, which is what a target the caches do not know
+        # is narrowed down with, rather than with a scan of every channel's pattern.
+        self.url_path_tree = URLPathTree()
+
+        # Maps the identity of each channel item to where it is in the channel data, which is what
+        # the channels the tree preselects are tried in, so that the first one to match is the same
+        # one a scan of the whole list would have stopped at.
+        self.channel_position:'anydict' = {}
+
         self.rebuild_match_target_index()
 
         self.has_trace1 = logger.isEnabledFor(TRACE1)
@@ -180,6 +191,50 @@ class PyURLData:
         self.match_target_index = index
         self.channel_accepts = accepts
 
+        self._update_url_path_tree()
+
+# ################################################################################################################################
+
+    def _update_url_path_tree(self) -> 'None':
+        """ Brings the URL path tree in line with the channel data, adding and removing only the channels
+        that changed, and records where in the channel data each channel is now.
+        """
+        position = {}
+
+        for idx, item in enumerate(self.channel_data):
+            position[id(item)] = idx
+
+        # A channel created or edited is a new item, so anything no longer in the channel data is gone ..
+        tree = self.url_path_tree
+        current = {id(item): item for item in self.channel_data}
+
+        for item in tree.iter_items():
+            if id(item) not in current:
+                tree.remove(item)
+
+        # .. and anything the tree does not have yet is new.
+        for item in self.channel_data:
+            if item not in tree:
+                tree.add(item)
+
+        self.channel_position = position
+
+# ################################################################################################################################
+
+    def _get_candidates(self, url_path:'str') -> 'anylist':
+        """ Returns the channels whose URL paths can possibly match the given one, in the order
+        they are in in the channel data.
+        """
+        out = self.url_path_tree.get_candidates(url_path)
+        out.sort(key=self._get_position)
+
+        return out
+
+# ################################################################################################################################
+
+    def _get_position(self, item:'anydict') -> 'int':
+        return self.channel_position[id(item)]
+
 # ################################################################################################################################
 
     def _bucket_accept(self, http_accept:'str') -> 'str':
@@ -299,7 +354,7 @@ class PyURLData:
 
         channel_items = []
 
-        for item in self.channel_data:
+        for item in self._get_candidates(url_path):
 
             if needs_user and item['match_target_compiled'].is_internal:
                 continue
@@ -376,10 +431,12 @@ class PyURLData:
         # The channels that name a method of their own and that this target did not match. Should
         # the scan below end without a match, these are the only ones that have anything to say
         # about which methods the path does accept, so gathering them as they go past is what
-        # spares a second walk of every channel there is.
+        # spares a second walk of the candidates.
         method_channels = []
 
-        for item in self.channel_data:
+        # Only the channels whose URL paths can possibly match this one are tried, in the order
+        # they are in in the channel data, so the cost of a miss does not grow with the number of channels.
+        for item in self._get_candidates(url_path):
 
             matcher = item['match_target_compiled']
             if needs_user and matcher.is_internal:
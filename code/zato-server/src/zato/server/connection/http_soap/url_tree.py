@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if 0:
+    from zato.common.typing_ import anydict, anylist, tuple_
+    anydict = anydict
+    anylist = anylist
+    tuple_ = tuple_
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+# What a channel's URL path and a request's own path are split into segments by
+_segment_sep = '/'
+
+# What opens a path parameter in a channel's URL path
+_param_start = '{'
+
+# What closes one
+_param_end = '}'
+
+# Where in a node a channel is kept
+_kind_terminal = 'terminal'
+_kind_catch_all = 'catch_all'
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class PathNode:
+    """ One segment of the channels' URL paths, along with the segments that follow it.
+    """
+    __slots__ = ('static', 'param', 'terminal', 'catch_all')
+
+    def __init__(self) -> 'None':
+
+        # Segments spelled out literally, by what they spell out
+        self.static:'anydict' = {}
+
+        # The segment a path parameter stands in, for channels whose parameters take in one segment only
+        self.param:'PathNode | None' = None
+
+        # Channels whose URL path ends with this very segment
+        self.terminal:'anylist' = []
+
+        # Channels whose URL path, from the segment after this one on, may take in any number of segments
+        self.catch_all:'anylist' = []
+
+# ################################################################################################################################
+
+    def is_empty(self) -> 'bool':
+        out = not (self.static or self.param or self.terminal or self.catch_all)
+        return out
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def _is_param_segment(segment:'str') -> 'bool':
+    """ Whether the whole of a segment is one path parameter and nothing else.
+    """
+    if not segment.startswith(_param_start):
+        return False
+
+    if not segment.endswith(_param_end):
+        return False
+
+    # Exactly one parameter, rather than two of them next to each other, such as `{a}{b}`
+    out = segment.count(_param_start) == 1
+    return out
+
+# ################################################################################################################################
+
+def _get_tree_key(url_path:'str', match_slash:'bool') -> 'tuple_':
+    """ Returns the segments leading to the node a channel of the given URL path is kept in, each one
+    either a literal or None for a one-segment parameter, and which list of that node the channel goes to.
+    """
+    out:'anylist' = []
+
+    for segment in url_path.split(_segment_sep):
+
+        # Nothing in this segment is left open, so it is compared as it is ..
+        if _param_start not in segment:
+            out.append(segment)
+            continue
+
+        # .. a parameter that takes in this one segment alone is a slot of its own ..
+        if (not match_slash) and _is_param_segment(segment):
+            out.append(None)
+            continue
+
+        # .. while anything else that is left open may take in any number of segments, or only part
+        # .. of this one, which is where the tree stops telling channels apart and the channel's
+        # .. own pattern is what the rest of the path is compared against.
+        return tuple(out), _kind_catch_all
+
+    return tuple(out), _kind_terminal
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class URLPathTree:
+    """ Keeps channels in a tree of their URL path segments, which is what narrows a request's path down
+    to the few channels that can possibly match it, rather than to every channel there is.
+
+    The tree only ever preselects channels - it is each channel's own compiled pattern that decides
+    whether a request matches it, and the order of the channels that decides which one of several answers,
+    so the tree never changes what a request resolves to, only how many patterns are tried to find out.
+    """
+
+    def __init__(self) -> 'None':
+        self.root = PathNode()
+
+        # Maps the identity of each channel item kept to where it is kept, so that a channel
+        # going away is taken out of its node without a walk of the whole tree.
+        self.keys:'anydict' = {}
+
+        # Maps the identity of each channel item kept to the item itself
+        self.items:'anydict' = {}
+
+# ################################################################################################################################
+
+    def __len__(self) -> 'int':
+        return len(self.keys)
+
+# ################################################################################################################################
+
+    def __contains__(self, channel_item:'anydict') -> 'bool':
+        return id(channel_item) in self.keys
+
+# ################################################################################################################################
+
+    def iter_items(self) -> 'anylist':
+        """ Returns each channel item kept, in no particular order.
+        """
+        out = list(self.items.values())
+        return out
+
+# ################################################################################################################################
+
+    def add(self, channel_item:'anydict') -> 'None':
+        """ Adds a channel to the node its URL path leads to.
+        """
+        url_path = channel_item.get('url_path')
+
+        # A channel without a path of its own is compared against every request there is
+        if url_path is None:
+            key = ((), _kind_catch_all)
+        else:
+            match_slash = channel_item['match_target_compiled'].match_slash
+            key = _get_tree_key(url_path, match_slash)
+
+        segments, kind = key
+        node = self.root
+
+        for segment in segments:
+
+            if segment is None:
+                if node.param is None:
+                    node.param = PathNode()
+                node = node.param
+            else:
+                child = node.static.get(segment)
+                if child is None:
+                    child = PathNode()
+                    node.static[segment] = child
+                node = child
+
+        if kind == _kind_terminal:
+            node.terminal.append(channel_item)
+        else:
+            node.catch_all.append(channel_item)
+
+        self.keys[id(channel_item)] = key
+        self.items[id(channel_item)] = channel_item
+
+# ################################################################################################################################
+
+    def remove(self, channel_item:'anydict') -> 'None':
+        """ Removes a channel from the tree, along with each node nothing is kept in or under any longer.
+        """
+        key = self.keys.pop(id(channel_item), None)
+
+        # This channel was never added, so there is nothing to remove either
+        if key is None:
+            return
+
+        del self.items[id(channel_item)]
+
+        segments, kind = key
+        node = self.root
+        path:'anylist' = []
+
+        for segment in segments:
+            path.append((node, segment))
+
+            if segment is None:
+                node = node.param # type: ignore
+            else:
+                node = node.static[segment]
+
+        items = node.terminal if kind == _kind_terminal else node.catch_all
+
+        # Compared by identity, so that two channels holding equal data cannot be confused for each other
+        for idx, item in enumerate(items):
+            if item is channel_item:
+                del items[idx]
+                break
+
+        # Nodes left empty are pruned from the bottom up, so that channels coming and going
+        # over a server's lifetime do not leave a trail of nodes behind them.
+        for parent, segment in reversed(path):
+
+            if not node.is_empty():
+                break
+
+            if segment is None:
+                parent.param = None
+            else:
+                del parent.static[segment]
+
+            node = parent
+
+# ################################################################################################################################
+
+    def get_candidates(self, url_path:'str') -> 'anylist':
+        """ Returns each channel whose URL path can possibly match the given one, in no particular order.
+        """
+        out:'anylist' = []
+
+        segments = url_path.split(_segment_sep)
+        segment_count = len(segments)
+
+        # Each element is a node reached and the index of the segment that is to be compared against
+        # its children next. More than one node can be reached at a time, because a segment may be
+        # a literal for some channels and a parameter's value for others.
+        to_visit = [(self.root, 0)]
+
+        while to_visit:
+
+            node, idx = to_visit.pop()
+
+            # Whatever the rest of the path is, these channels' patterns are what decides about it
+            if node.catch_all:
+                out.extend(node.catch_all)
+
+            # The whole path has been walked through, so it is the channels ending here that it may match ..
+            if idx == segment_count:
+                if node.terminal:
+                    out.extend(node.terminal)
+                continue
+
+            # .. otherwise, it goes on to the next segment, both as a literal ..
+            segment = segments[idx]
+            child = node.static.get(segment)
+
+            if child is not None:
+                to_visit.append((child, idx + 1))
+
+            # .. and as a parameter's value, which is never empty.
+            if node.param is not None:
+                if segment:
+                    to_visit.append((node.param, idx + 1))
+
+        return out
+
+# ################################################################################################################################
+# ################################################################################################################################
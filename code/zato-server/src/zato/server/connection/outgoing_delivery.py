@@ -18,9 +18,6 @@ import os
 from json import loads
 from logging import getLogger
 
-# gevent
-from gevent.fileobject import FileObjectThread
-
 # Zato
 from zato.common.api import GENERIC
 from zato.common.pubsub.outgoing import OutgoingType, register_outgoing_conn_type
@@ -158,19 +155,6 @@ def _locate_ftp(server:'ParallelServer', conn_id:'int') -> 'anytuple':
 
 # ################################################################################################################################
 
-def _read_spool_file(spool_path:'str') -> 'bytes':
-    """ Reads the bytes one queued file transfer spooled to the local disk - the queue itself carries
-    only the spool path, so a file of any size travels without ever touching a pub/sub row.
-    The read runs in its own thread so as not to block the event loop.
-    """
-    thread_file = FileObjectThread(spool_path, 'rb')
-    out = thread_file.read()
-    thread_file.close()
-
-    return out
-
-# ################################################################################################################################
-
 def _deliver_to_sftp(server:'ParallelServer', cid:'str', wrapper:'any_', data:'str') -> 'None':
     """ Hands one queued file over to an outgoing SFTP connection - the bytes come from the local
     spool file the publication left behind and go to the remote path it named. The write overwrites,
@@ -184,10 +168,9 @@ def _deliver_to_sftp(server:'ParallelServer', cid:'str', wrapper:'any_', data:'s
 
     envelope = loads(data)
 
-    payload = _read_spool_file(envelope[Key_Spool_Path])
-
+    # The spool file is uploaded as it is, without its bytes ever being read into memory
     conn = SFTPConnection(cid, wrapper)
-    conn.write(payload, envelope[Key_Remote_Path], overwrite=True)
+    _ = conn.upload(envelope[Key_Spool_Path], envelope[Key_Remote_Path], recursive=False, overwrite=True)
 
     # Only a delivered file's spool is removed - a failed delivery raised above,
     # keeping the bytes in place for the retry.
@@ -205,10 +188,9 @@ def _deliver_to_smb(server:'ParallelServer', cid:'str', wrapper:'any_', data:'st
 
     envelope = loads(data)
 
-    payload = _read_spool_file(envelope[Key_Spool_Path])
-
+    # The spool file is streamed out chunk by chunk
     conn = SMBConnection(cid, wrapper)
-    conn.write(payload, envelope[Key_Remote_Path])
+    conn.upload(envelope[Key_Spool_Path], envelope[Key_Remote_Path])
 
     # Only a delivered file's spool is removed - a failed delivery raised above,
     # keeping the bytes in place for the retry.
@@ -225,10 +207,9 @@ def _deliver_to_ftp(server:'ParallelServer', cid:'str', wrapper:'any_', data:'st
     spool_path = envelope[Key_Spool_Path]
     remote_path = envelope[Key_Remote_Path]
 
-    payload = _read_spool_file(spool_path)
-
+    # The spool file is streamed out chunk by chunk
     conn = FTPConnection(cid, wrapper)
-    conn.write(payload, remote_path)
+    conn.upload(spool_path, remote_path)
 
     # Only a delivered file's spool is removed - a failed delivery raised above,
     # keeping the bytes in place for the retry.
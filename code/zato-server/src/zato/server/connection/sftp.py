@@ -8,7 +8,6 @@ Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
 
 # stdlib
 from datetime import date, datetime
-from hashlib import sha256
 from logging import getLogger
 from os.path import getsize, isfile
 from tempfile import NamedTemporaryFile
@@ -25,6 +24,8 @@ from humanize import naturalsize
 from zato.common.audit_log.api import AuditOutcome
 from zato.common.audit_log.file_transfer import record_file_transfer, Operation_Delete, Operation_Move, Operation_Read, \
     Operation_Store
+from zato.server.connection.file_transfer_base import iter_bytes, iter_local_file, open_remote_file, spool_file_chunks, \
+    Default_Chunk_Size, Key_Remote_Path, Key_Spool_Path, Mode_Read, TransferDigest
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -32,7 +33,10 @@ from zato.common.audit_log.file_transfer import record_file_transfer, Operation_
 if 0:
     from zato.common.sftp import SFTPOutput
     from zato.common.typing_ import any_, stranydict
+    from zato.server.connection.file_transfer_base import anyiterable, bytesgen
     from zato.server.generic.api.outconn_sftp import OutconnSFTPWrapper
+    anyiterable = anyiterable
+    bytesgen = bytesgen
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -726,19 +730,51 @@ class SFTPConnection:
             payload = data.encode('utf8')
 
         # The bytes themselves are kept only when the connection asked for that
-        if self.wrapper.should_store_content:
-            content = payload
-        else:
-            content = None
-
-        checksum = sha256(payload).hexdigest()
+        digest = TransferDigest(self.wrapper.should_store_content)
+        digest.update(payload)
 
         duration_ms = int((monotonic() - start) * 1000)
-        self._record_transfer(Operation_Read, remote_path,
-            outcome=AuditOutcome.OK, size=len(payload), duration_ms=duration_ms, checksum=checksum, content=content)
+        self._record_transfer(Operation_Read, remote_path, outcome=AuditOutcome.OK, size=digest.size,
+            duration_ms=duration_ms, checksum=digest.checksum, content=digest.content)
 
         return data
 
+# ################################################################################################################################
+
+    def read_iter(self, remote_path:'str', chunk_size:'int'=Default_Chunk_Size, log_level:'int'=0) -> 'bytesgen':
+        """ Reads a remote file chunk by chunk - it is downloaded to a temporary file first, which is then
+        handed out one chunk at a time, so a file of any size never sits in memory as a whole.
+        The size and checksum are computed as the chunks go by.
+        """
+        start = monotonic()
+        digest = TransferDigest(self.wrapper.should_store_content)
+
+        with NamedTemporaryFile(suffix='zato-sftp-read.txt') as local_file:
+
+            # A failed read is recorded too, as is one whose caller did not read it to the end.
+            try:
+                _ = self.download_file(remote_path, local_file.name, log_level, _needs_audit=False)
+
+                for chunk in iter_local_file(local_file.name, chunk_size):
+                    digest.update(chunk)
+                    yield chunk
+
+            except GeneratorExit:
+                duration_ms = int((monotonic() - start) * 1000)
+                self._record_transfer(Operation_Read, remote_path, outcome=AuditOutcome.Error, size=digest.size,
+                    duration_ms=duration_ms, error=f'The caller stopped reading after {digest.size} bytes')
+                raise
+
+            except Exception:
+                duration_ms = int((monotonic() - start) * 1000)
+                self._record_transfer(Operation_Read, remote_path,
+                    outcome=AuditOutcome.Error, size=digest.size, duration_ms=duration_ms, error=format_exc())
+                raise
+
+        duration_ms = int((monotonic() - start) * 1000)
+        self._record_transfer(Operation_Read, remote_path, outcome=AuditOutcome.OK, size=digest.size,
+            duration_ms=duration_ms, checksum=digest.checksum, content=digest.content)
+
 # ################################################################################################################################
 
     def _overwrite_if_needed(self, remote_path:'str', overwrite:'bool', log_level:'int') -> 'None':
@@ -786,19 +822,16 @@ class SFTPConnection:
 
         if isfile(local_path):
 
-            # With the archive on, the bytes are read once and serve both purposes ..
-            if self.wrapper.should_store_content:
-                with open(local_path, 'rb') as local_file:
-                    content = local_file.read()
-                checksum = sha256(content).hexdigest()
+            # The file is digested chunk by chunk, keeping its bytes for the archive
+            # only when that is on and only for as long as they fit under its cap.
+            digest = TransferDigest(self.wrapper.should_store_content)
 
-            # .. and without it, the file is digested chunk by chunk.
-            else:
-                digest = sha256()
-                with open(local_path, 'rb') as local_file:
-                    while chunk := local_file.read(_hash_chunk_size):
-                        digest.update(chunk)
-                checksum = digest.hexdigest()
+            with open(local_path, 'rb') as local_file:
+                while chunk := local_file.read(_hash_chunk_size):
+                    digest.update(chunk)
+
+            checksum = digest.checksum
+            content = digest.content
 
         start = monotonic()
 
@@ -852,6 +885,50 @@ class SFTPConnection:
                 # Now we can close the file too
                 thread_file.close()
 
+# ################################################################################################################################
+
+    def write_iter(
+        self,
+        chunks:'anyiterable',
+        remote_path:'str',
+        overwrite:'bool'=False,
+        log_level:'int'=0,
+        encoding:'str'='utf8'
+        ) -> 'None':
+        """ Writes a remote file out of chunks - they are spooled to a temporary file as they arrive,
+        which is then uploaded, so a file of any size never sits in memory as a whole.
+        """
+
+        # Will raise an exception or delete the remote location, depending on what is needed
+        self._overwrite_if_needed(remote_path, overwrite, log_level)
+
+        # A temporary file to write the chunks to ..
+        with NamedTemporaryFile('w+b', suffix='zato-sftp-write.txt') as local_path:
+
+            # .. wrap the file in separate thread so as not to block the event loop ..
+            thread_file = FileObjectThread(local_path, mode='w+b')
+
+            for chunk in iter_bytes(chunks, encoding):
+                _ = thread_file.write(chunk)
+
+            thread_file.flush()
+
+            try:
+                # .. and with all of the chunks written out, upload the file to the remote location.
+                _ = self.upload(local_path.name, remote_path, False, overwrite, log_level, False)
+
+            finally:
+                thread_file.close()
+
+# ################################################################################################################################
+
+    def open(self, remote_path:'str', mode:'str'=Mode_Read, chunk_size:'int'=Default_Chunk_Size) -> 'any_':
+        """ Opens a remote file as a context manager, for reading or writing it in chunks - e.g.
+        with self.sftp['My Connection'].open('/data/partner.csv') as remote_file: ...
+        """
+        out = open_remote_file(self, remote_path, mode, chunk_size)
+        return out
+
 # ################################################################################################################################
 
     def publish(self, data:'any_', remote_path:'str', encoding:'str'='utf8') -> 'any_':
@@ -859,15 +936,16 @@ class SFTPConnection:
         The bytes go to a local spool file and only its path travels through the queue, so a file
         of any size is delivered with retries, backoff and an audit event per attempt.
         """
+        out = self.publish_iter([data], remote_path, encoding)
+        return out
 
-        # Imported here to avoid circular imports
-        from zato.server.connection.file_transfer_base import spool_file_payload, Key_Remote_Path, Key_Spool_Path
-
-        # Data to be written out must be always bytes
-        if not isinstance(data, bytes):
-            data = data.encode(encoding)
+# ################################################################################################################################
 
-        spool_path = spool_file_payload(data)
+    def publish_iter(self, chunks:'anyiterable', remote_path:'str', encoding:'str'='utf8') -> 'any_':
+        """ Queues one file for guaranteed delivery the way publish does, taking it in chunks -
+        each one is written to the spool file as soon as it arrives.
+        """
+        spool_path = spool_file_chunks(chunks, encoding)
 
         envelope = {
             Key_Spool_Path: spool_path,
@@ -242,6 +242,22 @@ class Outbox:
     def disconnect(self):
         self._conn.quit()
 
+    def noop(self) -> 'None':
+        """ Confirms that the server still answers on an already connected session, raising if it does not.
+        """
+        code, response = self._conn.noop()
+
+        if code != 250:
+            raise smtplib.SMTPResponseException(code, response)
+
+    def reset(self) -> 'None':
+        """ Aborts whatever mail transaction the session may be in the middle of, so that the next message starts clean.
+        """
+        code, response = self._conn.rset()
+
+        if code != 250:
+            raise smtplib.SMTPResponseException(code, response)
+
     def send(self, email, attachments=(), from_=None):
         """ Send an email. Connect/Disconnect if not already connected.
         Arguments:
@@ -263,7 +279,8 @@ class Outbox:
         if isinstance(bcc, basestring):
             bcc = [elem.strip() for elem in bcc.split(',')]
 
-        recipients = email.recipients
+        # A copy, so that sending the same email again, e.g. over a reconnected session, does not repeat its CC and BCC
+        recipients = list(email.recipients)
         recipients.extend(cc)
         recipients.extend(bcc)
 
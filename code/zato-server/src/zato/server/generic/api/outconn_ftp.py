@@ -10,7 +10,7 @@ Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
 from ftplib import error_perm, FTP, FTP_TLS
 from io import BytesIO
 from logging import getLogger
-from ssl import create_default_context, CERT_NONE
+from ssl import create_default_context, CERT_NONE, SSLSocket
 from traceback import format_exc
 
 # Zato
@@ -27,7 +27,10 @@ if 0:
     from zato.common.ext.bunch import Bunch
     from zato.common.typing_ import anylist, stranydict
     from zato.server.base.parallel import ParallelServer
+    from zato.server.connection.file_transfer_base import anyiterable, bytesgen
+    anyiterable = anyiterable
     Bunch = Bunch
+    bytesgen = bytesgen
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -292,6 +295,58 @@ class FTPClient:
         finally:
             self._disconnect(ftp)
 
+# ################################################################################################################################
+
+    def read_iter(self, remote_path:'str', chunk_size:'int') -> 'bytesgen':
+        """ Reads a remote file chunk by chunk, straight off the data connection - the same RETR exchange
+        that retrbinary runs, except that each chunk is handed out as soon as it arrives.
+        """
+        ftp = self._connect()
+
+        try:
+            _ = ftp.voidcmd('TYPE I')
+
+            command = 'RETR ' + remote_path
+
+            with ftp.transfercmd(command) as data_conn:
+                while chunk := data_conn.recv(chunk_size):
+                    yield chunk
+
+                # With SSL on, the data connection is shut down cleanly before the server confirms the transfer.
+                if isinstance(data_conn, SSLSocket):
+                    _ = data_conn.unwrap()
+
+            _ = ftp.voidresp()
+
+        finally:
+            self._disconnect(ftp)
+
+# ################################################################################################################################
+
+    def write_iter(self, remote_path:'str', chunks:'anyiterable') -> 'None':
+        """ Writes a remote file chunk by chunk, the same STOR exchange that storbinary runs,
+        except that the chunks come from any iterable rather than from a file object.
+        """
+        ftp = self._connect()
+
+        try:
+            _ = ftp.voidcmd('TYPE I')
+
+            # A store always overwrites, which is what the STOR command does on its own.
+            command = 'STOR ' + remote_path
+
+            with ftp.transfercmd(command) as data_conn:
+                for chunk in chunks:
+                    data_conn.sendall(chunk)
+
+                if isinstance(data_conn, SSLSocket):
+                    _ = data_conn.unwrap()
+
+            _ = ftp.voidresp()
+
+        finally:
+            self._disconnect(ftp)
+
 # ################################################################################################################################
 
     def remove(self, remote_path:'str') -> 'None':
@@ -29,7 +29,10 @@ if 0:
     from zato.common.ext.bunch import Bunch
     from zato.common.typing_ import any_, anylist, stranydict
     from zato.server.base.parallel import ParallelServer
+    from zato.server.connection.file_transfer_base import anyiterable, bytesgen
+    anyiterable = anyiterable
     Bunch = Bunch
+    bytesgen = bytesgen
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -203,6 +206,31 @@ class SMBClient:
         with smbclient.open_file(unc_path, mode='xb', **self.conn_kwargs) as remote_file:
             _ = remote_file.write(data)
 
+# ################################################################################################################################
+
+    def read_iter(self, remote_path:'str', chunk_size:'int') -> 'bytesgen':
+
+        unc_path = self.to_unc(remote_path)
+
+        with smbclient.open_file(unc_path, mode='rb', **self.conn_kwargs) as remote_file:
+            while chunk := remote_file.read(chunk_size):
+                yield chunk
+
+# ################################################################################################################################
+
+    def write_iter(self, remote_path:'str', chunks:'anyiterable') -> 'None':
+
+        unc_path = self.to_unc(remote_path)
+
+        # Writing always overwrites, the same way it does in self.write ..
+        if self.exists(remote_path):
+            self.remove(remote_path)
+
+        # .. and each chunk goes out as soon as it arrives.
+        with smbclient.open_file(unc_path, mode='xb', **self.conn_kwargs) as remote_file:
+            for chunk in chunks:
+                _ = remote_file.write(chunk)
+
 # ################################################################################################################################
 
     def remove(self, remote_path:'str') -> 'None':
@@ -232,6 +232,51 @@ zato_pubsub_messages_delivered_total = _get_or_create_counter(
     ('topic_name',),
 )
 
+zato_pubsub_subscriber_index_lookups_total = _get_or_create_counter(
+    'zato_pubsub_subscriber_index_lookups_total',
+    'Total lookups of topic subscribers during publication, by whether the in-process index answered them',
+    ('result',),
+)
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+# Rate limiting metrics
+
+zato_rate_limiting_keys = _get_or_create_gauge(
+    'zato_rate_limiting_keys',
+    'Number of client keys whose rate limiting state is currently kept in memory, by registry',
+    ('registry',),
+)
+
+zato_rate_limiting_evictions_total = _get_or_create_counter(
+    'zato_rate_limiting_evictions_total',
+    'Total client keys whose rate limiting state was dropped from memory, by registry and reason',
+    ('registry', 'reason'),
+)
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+# Scheduler metrics
+
+zato_scheduler_jobs_running = _get_or_create_gauge(
+    'zato_scheduler_jobs_running',
+    'Number of scheduler job runs currently executing on this server',
+)
+
+zato_scheduler_jobs_queued = _get_or_create_gauge(
+    'zato_scheduler_jobs_queued',
+    'Number of scheduler job runs received by this server and waiting for a free slot',
+)
+
+zato_scheduler_job_delay_seconds = _get_or_create_histogram(
+    'zato_scheduler_job_delay_seconds',
+    'Delay between the planned fire time of scheduler job runs and the moment they started executing, in seconds',
+    (),
+    zato_histogram_buckets,
+)
+
 # ################################################################################################################################
 # ################################################################################################################################
 
@@ -67,8 +67,19 @@ class QueueBridgeClient:
                 decode_responses=True,
             )
 
+        # The configuration of each channel, by name, which is what the recv listener processes its messages by
+        self.channels:'anydict' = {}
+
         self._ensure_reply_group()
 
+# ################################################################################################################################
+
+    def get_channel_config(self, name:'str') -> 'anydict | None':
+        """ Returns the configuration of a channel by its name, or None if there is no such channel.
+        """
+        out = self.channels.get(name)
+        return out
+
 # ################################################################################################################################
 
     def new_redis_conn(self) -> 'Redis':
@@ -168,11 +179,13 @@ class QueueBridgeClient:
             'channels': channels if channels is not None else [],
             'outgoing': outgoing if outgoing is not None else [],
         }
+        self.channels = {item['name']: item for item in payload['channels']}
         self.invoke('reload', payload, needs_reply=True)
 
 # ################################################################################################################################
 
     def add_channel(self, config:'anydict') -> 'None':
+        self.channels[config['name']] = config
         self.invoke('add_channel', config)
 
 # ################################################################################################################################
@@ -183,6 +196,7 @@ class QueueBridgeClient:
 # ################################################################################################################################
 
     def delete_channel(self, name:'str') -> 'None':
+        _ = self.channels.pop(name, None)
         self.invoke('delete_channel', {'name': name})
 
 # ################################################################################################################################
@@ -193,6 +207,12 @@ class QueueBridgeClient:
 # ################################################################################################################################
 
     def edit_channel(self, config:'anydict') -> 'None':
+
+        # A channel may have been renamed
+        if old_name := config.get('old_name'):
+            _ = self.channels.pop(old_name, None)
+
+        self.channels[config['name']] = config
         self.invoke('edit_channel', config)
 
 # ################################################################################################################################
@@ -0,0 +1,547 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# stdlib
+import logging
+import os
+from collections import deque
+from dataclasses import dataclass
+from traceback import format_exc
+
+# gevent
+from gevent import spawn, spawn_later
+from gevent.event import Event
+
+# Zato
+from zato.server.stream_reader import get_max_deliveries
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if 0:
+    from zato.common.typing_ import any_, anydict, callable_, strlist
+    from zato.server.stream_reader import StreamEntries
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+logger = logging.getLogger(__name__)
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class ModuleCtx:
+
+    # How many messages a server process may hold at a time, running or waiting, across all the channels ..
+    Env_Max_In_Flight = 'Zato_Queue_Bridge_Max_In_Flight'
+    Default_Max_In_Flight = 1000
+
+    # .. and how many of them may belong to one channel, so that a busy channel leaves room for the others.
+    # A channel's messages read past that are held by their IDs alone, and read again once the channel has room.
+    Env_Max_Held_Per_Channel = 'Zato_Queue_Bridge_Max_Held_Per_Channel'
+    Default_Max_Held_Per_Channel = 100
+
+    # How many messages may be held by their IDs alone, across all the channels, before nothing more is read
+    Max_Deferred = 100_000
+
+    # How many stream entries one read may return - as many as there is room for, within these bounds
+    Min_Read_Count = 1
+    Max_Read_Count = 100
+
+    # The channel options that say how its messages are processed ..
+    Processing_Mode_Key = 'processing_mode'
+    Window_Key = 'max_in_flight'
+
+    # .. with how many of its messages may run at the same time, unless a channel says otherwise.
+    Default_Window = 10
+
+    # How long, in seconds, a failed message of a sequential or ordered channel waits before it runs again,
+    # doubling with each attempt up to the maximum.
+    Retry_Interval = 1.0
+    Max_Retry_Interval = 60.0
+
+    # How long, in seconds, to wait before reading held messages again if the previous attempt failed
+    Fetch_Retry_Interval = 1.0
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class ProcessingMode:
+
+    # One message of a channel at a time, in the order they arrived in
+    Sequential = 'sequential'
+
+    # Up to the channel's window of messages at a time, in any order
+    Unordered = 'unordered'
+
+    # Up to the channel's window of messages at a time, but only one at a time with the same ordering key,
+    # i.e. the same Kafka message key or partition or the same IBM MQ group ID.
+    Ordered = 'ordered'
+
+    Default = Sequential
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def _get_int_from_env(name:'str', default:'int') -> 'int':
+    if value := os.environ.get(name, ''):
+        out = int(value)
+    else:
+        out = default
+
+    return out
+
+# ################################################################################################################################
+
+def get_max_in_flight() -> 'int':
+    """ Returns how many messages a server process may hold at a time.
+    """
+    out = _get_int_from_env(ModuleCtx.Env_Max_In_Flight, ModuleCtx.Default_Max_In_Flight)
+    return out
+
+# ################################################################################################################################
+
+def get_max_held_per_channel() -> 'int':
+    """ Returns how many messages of one channel a server process may hold at a time.
+    """
+    out = _get_int_from_env(ModuleCtx.Env_Max_Held_Per_Channel, ModuleCtx.Default_Max_Held_Per_Channel)
+    return out
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+@dataclass(init=False)
+class _Message:
+    """ One message read from a stream, from when it is read until it is acknowledged.
+    """
+    stream: 'str'
+    msg_id: 'str'
+
+    # None while the message is held by its ID alone
+    fields: 'anydict | None'
+
+    # Messages with the same lane run one after another, None meaning the message has no lane
+    lane: 'str | None'
+
+    # How many times the message has run in this process
+    attempts: 'int'
+
+    is_done: 'bool'
+    should_ack: 'bool'
+
+# ################################################################################################################################
+
+class _Channel:
+    """ The messages of one channel that have been read and not acknowledged yet.
+    """
+    def __init__(self, name:'str', mode:'str', window:'int') -> 'None':
+        self.name = name
+        self.mode = mode
+        self.window = window
+
+        # How many messages are running now ..
+        self.running_count = 0
+
+        # .. which ones can start as soon as there is room in the window ..
+        self.ready:'deque[_Message]' = deque()
+
+        # .. which ones wait for an earlier message of their lane, the lanes with a message ready or running
+        # being the keys here, even if nothing waits for them ..
+        self.lanes:'dict[str, deque[_Message]]' = {}
+
+        # .. which ones are held by their IDs alone, until there is room for them, in the order they were read in ..
+        self.deferred:'deque[_Message]' = deque()
+
+        # .. how many are held with their fields, i.e. ready, waiting or running ..
+        self.held_count = 0
+
+        # .. whether the deferred ones are being read again at the moment ..
+        self.is_fetching = False
+
+        # .. and all of them, in the order they were read in, which is the order they are acknowledged in.
+        self.unacked:'deque[_Message]' = deque()
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class RecvDispatcher:
+    """ Runs the messages received from the queue bridge in greenlets, each channel according to its processing mode,
+    so that a slow service of one channel no longer holds up any other channel.
+
+    Whatever the mode, the messages of a channel are acknowledged in the order they were read in - a message is
+    acknowledged only once it and all the earlier ones of its channel have completed, so a process that goes away
+    leaves behind everything from its oldest incomplete message on, for another consumer to take over.
+    For as long as the process holds them, the messages are periodically claimed again, through keep_alive,
+    so that no other consumer takes them over merely because they waited here for their turn.
+
+    A message whose service raised an exception in a sequential or ordered channel runs again, after a delay,
+    before anything else of its lane does, and once it has run as many times as a stream entry may be delivered,
+    it is moved to a dead-letter stream and its lane goes on. In an unordered channel, such a message
+    is not acknowledged, so that it is taken over and processed again, until the stream reader moves it
+    to a dead-letter stream once it has been delivered too many times.
+
+    Each channel holds no more than its share of messages with their fields - the ones it is given past that
+    are held by their IDs alone and read again, in order, once there is room for them, so one busy channel
+    does not take up all the room the others need.
+
+    All the methods run to completion without yielding to other greenlets, so no lock is needed,
+    other than keep_alive and the greenlets talking to Redis, which change nothing while they wait for it.
+    """
+
+    def __init__(
+        self,
+        handle_message:'callable_',
+        entries:'StreamEntries',
+        get_channel_config:'callable_',
+        max_in_flight:'int | None'=None,
+        max_held_per_channel:'int | None'=None,
+        ) -> 'None':
+
+        # Processes one message, given its fields ..
+        self.handle_message = handle_message
+
+        # .. acknowledges, keeps, reads again and dead-letters entries in their streams ..
+        self.entries = entries
+
+        # .. and returns the configuration of a channel by its name.
+        self.get_channel_config = get_channel_config
+
+        self.max_in_flight = max_in_flight or get_max_in_flight()
+        self.max_held_per_channel = max_held_per_channel or get_max_held_per_channel()
+        self.max_attempts = get_max_deliveries()
+
+        # Channels with messages that have not been acknowledged yet, by name
+        self._channels:'dict[str, _Channel]' = {}
+
+        # The streams of all of these messages, by message ID, so that an entry taken over again while it is still here
+        # does not run twice, and so that each of them can be kept from being taken over by other consumers.
+        self._streams_by_msg_id:'dict[str, str]' = {}
+
+        # How many messages are held with their fields and how many by their IDs alone, across all the channels
+        self._held_count = 0
+        self._deferred_count = 0
+
+        # Set whenever there is room for more messages, so that a reader waiting for it can go on
+        self._has_room = Event()
+        self._has_room.set()
+
+# ################################################################################################################################
+
+    @property
+    def in_flight_count(self) -> 'int':
+        return self._held_count
+
+# ################################################################################################################################
+
+    @property
+    def deferred_count(self) -> 'int':
+        return self._deferred_count
+
+# ################################################################################################################################
+
+    def get_read_count(self) -> 'int':
+        """ Returns how many stream entries the next read should ask for.
+        """
+        out = min(self.max_in_flight - self._held_count, ModuleCtx.Max_Read_Count)
+        out = max(out, ModuleCtx.Min_Read_Count)
+
+        return out
+
+# ################################################################################################################################
+
+    def wait_for_room(self, timeout:'float') -> 'bool':
+        """ Blocks until more messages can be taken in or the timeout passes, returning True if they can.
+        """
+        out = self._has_room.wait(timeout)
+        return out
+
+# ################################################################################################################################
+
+    def submit(self, stream:'str', msg_id:'str', fields:'anydict') -> 'None':
+        """ Takes in a message read from a stream, which runs as soon as its channel's mode and window let it.
+        """
+        if msg_id in self._streams_by_msg_id:
+            return
+
+        channel = self._get_channel(fields['channel_name'])
+
+        message = _Message()
+        message.stream = stream
+        message.msg_id = msg_id
+        message.fields = None
+        message.lane = None
+        message.attempts = 0
+        message.is_done = False
+        message.should_ack = False
+
+        self._streams_by_msg_id[msg_id] = stream
+        channel.unacked.append(message)
+
+        # A channel that holds as many messages as it may, or that has messages waiting for room or being read again,
+        # keeps only the ID of this one, so it is read again, in order, once the channel has room ..
+        if channel.deferred or channel.is_fetching or channel.held_count >= self.max_held_per_channel:
+            channel.deferred.append(message)
+            self._deferred_count += 1
+
+        # .. while otherwise, the message is taken in as it is.
+        else:
+            self._hold(channel, message, fields)
+            self._dispatch(channel)
+
+        self._update_state()
+
+# ################################################################################################################################
+
+    def _hold(self, channel:'_Channel', message:'_Message', fields:'anydict') -> 'None':
+        """ Puts a message with its fields in its lane, the messages of a channel being held in the order they were read in.
+        """
+        message.fields = fields
+
+        if channel.mode == ProcessingMode.Unordered:
+            message.lane = None
+        elif channel.mode == ProcessingMode.Ordered:
+            message.lane = fields.get('ordering_key', '')
+        else:
+            message.lane = ''
+
+        channel.held_count += 1
+        self._held_count += 1
+
+        # A message whose lane is idle can start once there is room in the window ..
+        if message.lane is None or message.lane not in channel.lanes:
+            if message.lane is not None:
+                channel.lanes[message.lane] = deque()
+            channel.ready.append(message)
+
+        # .. while otherwise, it waits for the earlier messages of its lane.
+        else:
+            channel.lanes[message.lane].append(message)
+
+# ################################################################################################################################
+
+    def _get_channel(self, name:'str') -> '_Channel':
+
+        # A channel's configuration is read when the first of its messages arrives after a period with none in flight,
+        # so changes to it apply from the next such period on.
+        if not (channel := self._channels.get(name)):
+
+            config = self.get_channel_config(name) or {}
+            mode = config.get(ModuleCtx.Processing_Mode_Key) or ProcessingMode.Default
+
+            if mode == ProcessingMode.Sequential:
+                window = 1
+            else:
+                window = int(config.get(ModuleCtx.Window_Key) or ModuleCtx.Default_Window)
+
+            channel = _Channel(name, mode, window)
+            self._channels[name] = channel
+
+        return channel
+
+# ################################################################################################################################
+
+    def _dispatch(self, channel:'_Channel') -> 'None':
+        """ Starts ready messages of a channel for as long as there is room in its window.
+        """
+        while channel.ready and channel.running_count < channel.window:
+            message = channel.ready.popleft()
+            channel.running_count += 1
+            _ = spawn(self._run, channel, message)
+
+# ################################################################################################################################
+
+    def _run(self, channel:'_Channel', message:'_Message') -> 'None':
+
+        message.attempts += 1
+
+        try:
+            self.handle_message(message.fields)
+        except Exception:
+            logger.warning('Queue bridge message msg_id=%s of channel `%s` could not be processed (attempt %d) -> %s',
+                message.msg_id, channel.name, message.attempts, format_exc())
+            is_ok = False
+        else:
+            is_ok = True
+
+        # A failed message of a lane runs again before anything else of its lane does, for as long as it may ..
+        if not is_ok and message.lane is not None:
+
+            if message.attempts < self.max_attempts:
+                self._retry_later(channel, message)
+                return
+
+            # .. after which, it is given up on, and only then does its lane go on.
+            try:
+                self.entries.dead_letter(message.stream, message.msg_id, message.fields, message.attempts)
+            except Exception:
+                # The message stays pending and another consumer will take it over
+                logger.warning('Queue bridge message msg_id=%s of channel `%s` could not be dead-lettered -> %s',
+                    message.msg_id, channel.name, format_exc())
+
+        # A message whose service completed is acknowledged in its turn, while a dead-lettered one
+        # was acknowledged when it was moved.
+        message.should_ack = is_ok
+        message.is_done = True
+        message.fields = None
+
+        channel.running_count -= 1
+        channel.held_count -= 1
+        self._held_count -= 1
+
+        # The next message of the lane, if any, is ready now ..
+        if message.lane is not None:
+            if waiting := channel.lanes[message.lane]:
+                channel.ready.append(waiting.popleft())
+            else:
+                del channel.lanes[message.lane]
+
+        # .. the messages held by their IDs alone may be read again ..
+        self._fetch_deferred(channel)
+
+        # .. the acknowledgements may advance ..
+        self._ack_completed(channel)
+
+        # .. and more messages may start.
+        self._dispatch(channel)
+        self._update_state()
+
+# ################################################################################################################################
+
+    def _retry_later(self, channel:'_Channel', message:'_Message') -> 'None':
+        """ Has a failed message of a lane run again after a delay, while its lane waits for it.
+        """
+        channel.running_count -= 1
+
+        delay = min(ModuleCtx.Retry_Interval * 2 ** (message.attempts - 1), ModuleCtx.Max_Retry_Interval)
+        _ = spawn_later(delay, self._retry, channel, message)
+
+        # Other lanes of the channel may use the room in its window in the meantime
+        self._dispatch(channel)
+
+# ################################################################################################################################
+
+    def _retry(self, channel:'_Channel', message:'_Message') -> 'None':
+        channel.ready.append(message)
+        self._dispatch(channel)
+
+# ################################################################################################################################
+
+    def _fetch_deferred(self, channel:'_Channel') -> 'None':
+        """ Starts reading again the oldest messages a channel holds by their IDs alone, as many as it has room for.
+        """
+        if channel.is_fetching or not channel.deferred:
+            return
+
+        if (room := self.max_held_per_channel - channel.held_count) <= 0:
+            return
+
+        messages:'list[_Message]' = []
+
+        while channel.deferred and len(messages) < room:
+            messages.append(channel.deferred.popleft())
+
+        channel.is_fetching = True
+        _ = spawn(self._fetch, channel, messages)
+
+# ################################################################################################################################
+
+    def _fetch(self, channel:'_Channel', messages:'list[_Message]') -> 'None':
+
+        fields_by_msg_id:'anydict' = {}
+
+        try:
+            for stream in {message.stream for message in messages}:
+                msg_ids = [message.msg_id for message in messages if message.stream == stream]
+                fields_by_msg_id.update(self.entries.fetch(stream, msg_ids))
+
+        except Exception:
+            logger.warning('Queue bridge messages of channel `%s` could not be read again -> %s', channel.name, format_exc())
+
+            # The messages go back to where they were, to be read again in a moment
+            channel.deferred.extendleft(reversed(messages))
+            channel.is_fetching = False
+
+            _ = spawn_later(ModuleCtx.Fetch_Retry_Interval, self._fetch_deferred, channel)
+            return
+
+        channel.is_fetching = False
+
+        # The messages are taken in in the order they were read in, which keeps the order of their lanes ..
+        for message in messages:
+
+            self._deferred_count -= 1
+
+            if fields := fields_by_msg_id.get(message.msg_id):
+                self._hold(channel, message, fields)
+
+            # .. except for the ones deleted from the stream in the meantime, which there is nothing to do about
+            # other than to acknowledge them.
+            else:
+                logger.warning('Queue bridge message msg_id=%s of channel `%s` was deleted from its stream before it ran',
+                    message.msg_id, channel.name)
+
+                message.is_done = True
+                message.should_ack = True
+
+        # Some of the messages may have been deleted, so there may be room for more
+        self._fetch_deferred(channel)
+
+        self._ack_completed(channel)
+        self._dispatch(channel)
+        self._update_state()
+
+# ################################################################################################################################
+
+    def _ack_completed(self, channel:'_Channel') -> 'None':
+        """ Acknowledges the completed messages of a channel that come before its oldest incomplete one.
+        """
+        msg_ids_by_stream:'dict[str, strlist]' = {}
+
+        while channel.unacked and channel.unacked[0].is_done:
+            message = channel.unacked.popleft()
+            _ = self._streams_by_msg_id.pop(message.msg_id, None)
+
+            if message.should_ack:
+                msg_ids_by_stream.setdefault(message.stream, []).append(message.msg_id)
+
+        # A channel with nothing in flight is forgotten, so that its next messages use its configuration as it is then
+        if not channel.unacked:
+            _ = self._channels.pop(channel.name, None)
+
+        for stream, msg_ids in msg_ids_by_stream.items():
+            try:
+                self.entries.ack(stream, msg_ids)
+            except Exception:
+                # The messages stay pending and another consumer will take them over
+                logger.warning('Queue bridge messages of channel `%s` could not be acknowledged -> %s',
+                    channel.name, format_exc())
+
+# ################################################################################################################################
+
+    def keep_alive(self) -> 'None':
+        """ Claims again all the messages held, so that other consumers do not take them over while they wait here -
+        a message read ahead may wait for its turn for longer than a consumer that went away would hold it.
+        """
+        msg_ids_by_stream:'dict[str, strlist]' = {}
+
+        for msg_id, stream in self._streams_by_msg_id.items():
+            msg_ids_by_stream.setdefault(stream, []).append(msg_id)
+
+        for stream, msg_ids in msg_ids_by_stream.items():
+            self.entries.keep(stream, msg_ids)
+
+# ################################################################################################################################
+
+    def _update_state(self) -> 'None':
+        if self._held_count < self.max_in_flight and self._deferred_count < ModuleCtx.Max_Deferred:
+            self._has_room.set()
+        else:
+            self._has_room.clear()
+
+# ################################################################################################################################
+# ################################################################################################################################
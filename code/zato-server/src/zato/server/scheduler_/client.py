@@ -19,6 +19,10 @@ from redis import Redis
 # requests
 import requests
 
+# Zato
+from zato.server.scheduler_.pool import ModuleCtx as PoolCtx
+from zato.server.scheduler_.slots import set_all_job_limits, set_job_limit
+
 # ################################################################################################################################
 # ################################################################################################################################
 
@@ -169,21 +173,39 @@ class SchedulerClient:
     def stop(self, timeout_s:'float'=30.0) -> 'None':
         self.invoke('stop', needs_reply=True)
 
+# ################################################################################################################################
+
+    def _get_max_concurrency(self, job_data:'anydict') -> 'int':
+        """ Returns how many runs of a job may execute at the same time, 0 meaning that only the server-wide limit applies.
+        """
+        out = int(job_data.get(PoolCtx.Job_Max_Concurrency_Key) or 0)
+        return out
+
+# ################################################################################################################################
+
+    def _set_max_concurrency(self, job_id:'int', job_data:'anydict') -> 'None':
+        """ Stores in Redis how many runs of a job may execute at the same time, where every server of the cluster reads it from.
+        """
+        set_job_limit(self.redis, job_id, self._get_max_concurrency(job_data))
+
 # ################################################################################################################################
 
     def create_job(self, job_id:'int', job_data:'anydict') -> 'None':
         job_data['id'] = job_id
+        self._set_max_concurrency(job_id, job_data)
         self.invoke('create_job', {'job_id': job_id, 'job_data': job_data})
 
 # ################################################################################################################################
 
     def edit_job(self, job_id:'int', job_data:'anydict') -> 'None':
         job_data['id'] = job_id
+        self._set_max_concurrency(job_id, job_data)
         self.invoke('edit_job', {'job_id': job_id, 'job_data': job_data})
 
 # ################################################################################################################################
 
     def delete_job(self, job_id:'int') -> 'None':
+        set_job_limit(self.redis, job_id, 0)
         self.invoke('delete_job', {'job_id': job_id})
 
 # ################################################################################################################################
@@ -215,11 +237,18 @@ class SchedulerClient:
 
         raw_jobs = odb_adapter.get_scheduler_jobs()
         jobs = []
+        limits = {}
+
         for job_id, entry in raw_jobs.items():
             job = dict(entry)
             job['id'] = job_id
             jobs.append(job)
 
+            if max_concurrency := self._get_max_concurrency(job):
+                limits[job_id] = max_concurrency
+
+        set_all_job_limits(self.redis, limits)
+
         self.invoke('reload', {'jobs': jobs}, needs_reply=True)
 
 # ################################################################################################################################
@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# stdlib
+import logging
+import os
+from collections import deque
+from dataclasses import dataclass
+from time import time
+from traceback import format_exc
+
+# gevent
+from gevent import sleep, spawn, spawn_later
+from gevent.event import Event
+
+# Zato
+from zato.server.metrics import zato_scheduler_job_delay_seconds, zato_scheduler_jobs_queued, zato_scheduler_jobs_running
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if 0:
+    from zato.common.typing_ import any_, anytuple, callable_, strnone
+    from zato.server.scheduler_.slots import JobSlots
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+logger = logging.getLogger(__name__)
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class ModuleCtx:
+
+    # How many runs may execute at the same time and how many more may wait for their turn
+    Env_Max_Running = 'Zato_Scheduler_Max_Running_Jobs'
+    Env_Max_Queued = 'Zato_Scheduler_Max_Queued_Jobs'
+
+    Default_Max_Running = 100
+    Default_Max_Queued = 10_000
+
+    # How many stream entries one read may return - as many as the pool has room for, within these bounds
+    Min_Read_Count = 10
+    Max_Read_Count = 500
+
+    # The name of the job option limiting how many runs of that one job may execute at the same time
+    Job_Max_Concurrency_Key = 'max_concurrency'
+
+    # How often runs of a job whose slots are all taken try again - the slots may be freed by other servers,
+    # which this one is not told about.
+    Slot_Retry_Interval = 1.0
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def _get_int_from_env(name:'str', default:'int') -> 'int':
+    if value := os.environ.get(name, ''):
+        out = int(value)
+    else:
+        out = default
+
+    return out
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+@dataclass(init=False)
+class _QueuedRun:
+    """ A run waiting for a free slot.
+    """
+    job_id: 'int | None'
+    planned_at: 'float | None'
+    func: 'callable_'
+    args: 'anytuple'
+    slot_token: 'strnone'
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class JobPool:
+    """ Executes scheduler runs in greenlets, at most max_running of them at a time, with the rest queued in arrival order.
+
+    A job can also be limited to a number of runs of its own that execute at the same time, across the whole cluster.
+    Each such run holds one of the job's slots, kept in Redis, while it executes. A run of a job whose slots are all
+    taken is set aside, without holding up the runs of other jobs queued after it, and it is the next one of that job
+    to execute when a slot is free again - when a run of the job completes here, or when a periodic retry finds one
+    that a run on another server gave back.
+    """
+
+    def __init__(
+        self,
+        max_running:'int | None'=None,
+        max_queued:'int | None'=None,
+        slots:'JobSlots | None'=None,
+        ) -> 'None':
+
+        self.max_running = max_running or _get_int_from_env(ModuleCtx.Env_Max_Running, ModuleCtx.Default_Max_Running)
+        self.max_queued = max_queued or _get_int_from_env(ModuleCtx.Env_Max_Queued, ModuleCtx.Default_Max_Queued)
+
+        # The cluster-wide slots of the jobs that have limits of their own, if any are enforced
+        self.slots = slots
+
+        # Runs waiting for a free slot, the oldest first ..
+        self._queue:'deque[_QueuedRun]' = deque()
+
+        # .. runs set aside because their jobs are at their limits, by job ID ..
+        self._waiting_by_job:'dict[int, deque[_QueuedRun]]' = {}
+
+        # .. the jobs whose runs set aside will try again soon ..
+        self._retry_scheduled:'set[int]' = set()
+
+        # .. how many runs are executing ..
+        self.running_count = 0
+
+        # .. and how many are queued or set aside in total.
+        self.queued_count = 0
+
+        # Set whenever there is room for more runs, so that a reader waiting for it can go on
+        self._has_room = Event()
+        self._has_room.set()
+
+# ################################################################################################################################
+
+    def get_free_capacity(self) -> 'int':
+        """ Returns how many more runs the pool can take in right now, counting the free slots and the room in the queue.
+        """
+        out = self.max_running + self.max_queued - self.running_count - self.queued_count
+        out = max(out, 0)
+
+        return out
+
+# ################################################################################################################################
+
+    def get_read_count(self) -> 'int':
+        """ Returns how many stream entries the next read should ask for.
+        """
+        out = min(self.get_free_capacity(), ModuleCtx.Max_Read_Count)
+        out = max(out, ModuleCtx.Min_Read_Count)
+
+        return out
+
+# ################################################################################################################################
+
+    def wait_for_room(self, timeout:'float') -> 'bool':
+        """ Blocks until the pool can take in more runs or the timeout passes, returning True if it can.
+        """
+        out = self._has_room.wait(timeout)
+        return out
+
+# ################################################################################################################################
+
+    def submit(self, job_id:'int | None', planned_at:'float | None', func:'callable_', *args:'any_') -> 'None':
+        """ Executes a run right away if there is a free slot for it, or queues it otherwise. Runs are never rejected -
+        the pool's capacity is what the caller reads more entries by, which keeps the queue bounded.
+        """
+        run = _QueuedRun()
+        run.job_id = job_id
+        run.planned_at = planned_at
+        run.func = func
+        run.args = args
+        run.slot_token = None
+
+        self._queue.append(run)
+        self.queued_count += 1
+
+        self._dispatch()
+
+# ################################################################################################################################
+
+    def _acquire_slot(self, run:'_QueuedRun') -> 'bool':
+        """ Takes one of the slots of a run's job, returning False if they are all taken.
+        """
+
+        # Runs that do not belong to jobs, e.g. timeouts, are never limited ..
+        if run.job_id is None or not self.slots:
+            return True
+
+        # .. and if the slots cannot be read, the run waits rather than risks overlapping with another one.
+        try:
+            token = self.slots.acquire(run.job_id)
+        except Exception:
+            logger.warning('Could not acquire a slot of job_id=%s -> %s', run.job_id, format_exc())
+            return False
+
+        if token is None:
+            return False
+
+        run.slot_token = token
+        return True
+
+# ################################################################################################################################
+
+    def _release_slot(self, run:'_QueuedRun') -> 'None':
+
+        # Only a run that holds a slot has one to give back
+        if not run.slot_token:
+            return
+
+        try:
+            self.slots.release(run.job_id, run.slot_token) # type: ignore[union-attr]
+        except Exception:
+            logger.warning('Could not release a slot of job_id=%s, it will expire -> %s', run.job_id, format_exc())
+
+# ################################################################################################################################
+
+    def _keep_slot(self, run:'_QueuedRun') -> 'None':
+        """ Renews the lease of a run's slot for as long as the run executes.
+        """
+        interval = self.slots.lease_seconds / 3 # type: ignore[union-attr]
+
+        while True:
+            sleep(interval)
+
+            try:
+                if not self.slots.renew(run.job_id, run.slot_token): # type: ignore[union-attr]
+                    logger.warning('Slot of job_id=%s expired while its run was still executing', run.job_id)
+                    return
+            except Exception:
+                logger.warning('Could not renew a slot of job_id=%s -> %s', run.job_id, format_exc())
+
+# ################################################################################################################################
+
+    def _set_aside(self, run:'_QueuedRun') -> 'None':
+        """ Keeps a run of a job at its limit until the job has a free slot, trying again periodically.
+        """
+        job_id:'int' = run.job_id # type: ignore[assignment]
+        self._waiting_by_job.setdefault(job_id, deque()).append(run)
+
+        self._schedule_retry(job_id)
+
+# ################################################################################################################################
+
+    def _schedule_retry(self, job_id:'int') -> 'None':
+        """ Has the runs of a job set aside try again soon, unless they are going to already.
+        """
+        if job_id not in self._retry_scheduled:
+            self._retry_scheduled.add(job_id)
+            _ = spawn_later(ModuleCtx.Slot_Retry_Interval, self._retry, job_id)
+
+# ################################################################################################################################
+
+    def _retry(self, job_id:'int') -> 'None':
+        self._retry_scheduled.discard(job_id)
+        self._dispatch(job_id)
+
+# ################################################################################################################################
+
+    def _dispatch_waiting(self, job_id:'int') -> 'None':
+        """ Starts the runs of a job set aside earlier, for as long as the job has free slots.
+        """
+        while (waiting := self._waiting_by_job.get(job_id)) and self.running_count < self.max_running:
+
+            run = waiting[0]
+
+            # The job is still at its limit ..
+            if not self._acquire_slot(run):
+                break
+
+            # .. or the oldest of its runs starts.
+            _ = waiting.popleft()
+
+            if not waiting:
+                del self._waiting_by_job[job_id]
+
+            self._start(run)
+
+        # Whatever could not start, because of the job's limit or because the pool is full, tries again later
+        if job_id in self._waiting_by_job:
+            self._schedule_retry(job_id)
+
+# ################################################################################################################################
+
+    def _dispatch(self, job_id:'int | None'=None) -> 'None':
+        """ Starts queued runs for as long as there are free slots.
+        """
+
+        # Runs of a job that has just completed a run, or is being retried, may be waiting for exactly that ..
+        if job_id is not None:
+            self._dispatch_waiting(job_id)
+
+        # .. other than that, runs start in the order they arrived in.
+        while self._queue and self.running_count < self.max_running:
+            run = self._queue.popleft()
+
+            # Earlier runs of the job are waiting already, or the job is at its limit,
+            # so the run waits for one of the job's slots to be free.
+            if run.job_id in self._waiting_by_job or not self._acquire_slot(run):
+                self._set_aside(run)
+                continue
+
+            self._start(run)
+
+        self._update_state()
+
+# ################################################################################################################################
+
+    def _start(self, run:'_QueuedRun') -> 'None':
+
+        self.queued_count -= 1
+        self.running_count += 1
+
+        # How late the run starts compared to when it was meant to
+        if run.planned_at is not None:
+            delay = max(time() - run.planned_at, 0.0)
+            zato_scheduler_job_delay_seconds.observe(delay)
+
+        _ = spawn(self._run, run)
+
+# ################################################################################################################################
+
+    def _run(self, run:'_QueuedRun') -> 'None':
+
+        # A run holding a slot keeps it for as long as it executes
+        keeper = spawn(self._keep_slot, run) if run.slot_token else None
+
+        try:
+            run.func(*run.args)
+        except Exception:
+            logger.warning('Scheduler run of job_id=%s raised an exception -> %s', run.job_id, format_exc())
+        finally:
+            if keeper:
+                keeper.kill(block=False)
+
+            self._release_slot(run)
+            self.running_count -= 1
+
+            self._dispatch(run.job_id)
+
+# ################################################################################################################################
+
+    def _update_state(self) -> 'None':
+
+        zato_scheduler_jobs_running.set(self.running_count)
+        zato_scheduler_jobs_queued.set(self.queued_count)
+
+        if self.get_free_capacity():
+            self._has_room.set()
+        else:
+            self._has_room.clear()
+
+# ################################################################################################################################
+# ################################################################################################################################
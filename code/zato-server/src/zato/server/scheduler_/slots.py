@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# Cluster-wide limits of how many runs of one job may execute at the same time.
+#
+# Fire events of one job are read by any server of a cluster, by any of its processes, so a job's limit
+# cannot be kept by each of them on its own. The limits live in Redis instead, next to the scheduler's
+# streams - one hash of each job's limit, written whenever a job is created, edited, deleted or reloaded,
+# and one sorted set per job of the runs executing, each holding a slot until its lease expires.
+#
+# A run takes a slot before it starts and gives it back when it completes. While it executes,
+# it keeps renewing its lease, so a slot outlives its run only when the process executing it is gone,
+# and then only until the lease expires.
+
+# stdlib
+import logging
+import os
+from uuid import uuid4
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if 0:
+    from redis import Redis
+    from zato.common.typing_ import strnone
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+logger = logging.getLogger(__name__)
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+# The same per-environment prefix the scheduler's streams are under, read the way the scheduler client reads it
+_stream_prefix = os.environ.get('Zato_Scheduler_Stream_Prefix', 'zato:scheduler')
+
+class ModuleCtx:
+
+    # Each job's limit, by job ID
+    Limits_Key = f'{_stream_prefix}:job:max_concurrency'
+
+    # The runs of one job that hold slots, by their tokens, each scored with the time its lease expires at
+    Slots_Key_Prefix = f'{_stream_prefix}:job:slots:'
+
+    # How long a slot is held for unless its run renews it
+    Env_Lease_Seconds = 'Zato_Scheduler_Job_Slot_Lease_Seconds'
+    Default_Lease_Seconds = 60
+
+    # What a run of a job without a limit is given instead of a token - there is no slot to give back
+    No_Limit = ''
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+# Takes a slot if the job has one free, returning the token it is held under, or nothing if all of them are taken.
+# The time comes from Redis itself, so that the leases of all the servers are measured by one clock.
+_acquire_script = """
+local limit = tonumber(redis.call('HGET', KEYS[1], ARGV[1]))
+if not limit or limit <= 0 then
+    return ''
+end
+
+local now = redis.call('TIME')
+local now_ms = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', now_ms)
+
+if redis.call('ZCARD', KEYS[2]) >= limit then
+    return false
+end
+
+local lease_ms = tonumber(ARGV[3])
+redis.call('ZADD', KEYS[2], now_ms + lease_ms, ARGV[2])
+redis.call('PEXPIRE', KEYS[2], lease_ms)
+
+return ARGV[2]
+"""
+
+# Extends the lease of a slot that is still held - one that has expired is not taken again.
+_renew_script = """
+local now = redis.call('TIME')
+local now_ms = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+local lease_ms = tonumber(ARGV[2])
+
+local expires_at = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if not expires_at or tonumber(expires_at) <= now_ms then
+    return 0
+end
+
+redis.call('ZADD', KEYS[1], 'XX', now_ms + lease_ms, ARGV[1])
+
+if redis.call('PTTL', KEYS[1]) < lease_ms then
+    redis.call('PEXPIRE', KEYS[1], lease_ms)
+end
+
+return 1
+"""
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class JobSlots:
+    """ Slots of the jobs that limit how many of their runs may execute at the same time, shared by all the servers.
+    """
+
+    def __init__(self, redis_conn:'Redis', lease_seconds:'float | None'=None) -> 'None':
+
+        self.redis = redis_conn
+
+        if not lease_seconds:
+            lease_seconds = float(os.environ.get(ModuleCtx.Env_Lease_Seconds) or ModuleCtx.Default_Lease_Seconds)
+
+        self.lease_seconds = lease_seconds
+        self._lease_ms = int(lease_seconds * 1000)
+
+        self._acquire = self.redis.register_script(_acquire_script)
+        self._renew = self.redis.register_script(_renew_script)
+
+# ################################################################################################################################
+
+    def acquire(self, job_id:'int') -> 'strnone':
+        """ Takes a slot of a job, returning its token - or ModuleCtx.No_Limit if the job has no limit,
+        or None if all of its slots are taken.
+        """
+        token = uuid4().hex
+        keys = [ModuleCtx.Limits_Key, ModuleCtx.Slots_Key_Prefix + str(job_id)]
+
+        out = self._acquire(keys=keys, args=[job_id, token, self._lease_ms])
+        return out
+
+# ################################################################################################################################
+
+    def renew(self, job_id:'int', token:'str') -> 'bool':
+        """ Extends the lease of a slot that its run still holds, returning False if the slot has expired in the meantime.
+        """
+        keys = [ModuleCtx.Slots_Key_Prefix + str(job_id)]
+
+        out = bool(self._renew(keys=keys, args=[token, self._lease_ms]))
+        return out
+
+# ################################################################################################################################
+
+    def release(self, job_id:'int', token:'str') -> 'None':
+        """ Gives a slot back once its run completes.
+        """
+        _ = self.redis.zrem(ModuleCtx.Slots_Key_Prefix + str(job_id), token)
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def set_job_limit(redis_conn:'Redis', job_id:'int', max_concurrency:'int') -> 'None':
+    """ Stores the limit of one job, or removes it if the job has none.
+    """
+    if max_concurrency > 0:
+        _ = redis_conn.hset(ModuleCtx.Limits_Key, str(job_id), max_concurrency)
+    else:
+        _ = redis_conn.hdel(ModuleCtx.Limits_Key, str(job_id))
+
+# ################################################################################################################################
+
+def set_all_job_limits(redis_conn:'Redis', limits:'dict[int, int]') -> 'None':
+    """ Replaces the limits of all the jobs at once, e.g. when the jobs are reloaded.
+    """
+    pipeline = redis_conn.pipeline(transaction=True)
+    _ = pipeline.delete(ModuleCtx.Limits_Key)
+
+    if limits:
+        mapping = {str(job_id): max_concurrency for job_id, max_concurrency in limits.items()}
+        _ = pipeline.hset(ModuleCtx.Limits_Key, mapping=mapping)
+
+    _ = pipeline.execute()
+
+# ################################################################################################################################
+# ################################################################################################################################
@@ -354,6 +354,204 @@ class PatternsFacade:
 
 # ################################################################################################################################
 
+class LazyFacade:
+    """ A facade that a service builds the first time it is accessed, bound to the service's cid at that point,
+    rather than one built for each invocation up front - most services never reach most of their facades.
+
+    The facade built is stored in the instance's own __dict__, under the name this descriptor was assigned to,
+    and because the descriptor has no __set__ of its own, that is what each later access finds directly.
+    """
+    __slots__ = ('factory', 'name')
+
+    def __init__(self, factory:'callable_') -> 'None':
+        self.factory = factory
+        self.name = ''
+
+    def __set_name__(self, owner:'any_', name:'str') -> 'None':
+        self.name = name
+
+    def __get__(self, instance:'any_', owner:'any_'=None) -> 'any_':
+
+        # Accessed through the class rather than through a service
+        if instance is None:
+            return self
+
+        out = self.factory(instance)
+        instance.__dict__[self.name] = out
+
+        return out
+
+# ################################################################################################################################
+
+def _new_outgoing(service:'Service') -> 'Outgoing':
+    config_manager = service._config_manager
+
+    out = Outgoing(
+        service.amqp,
+        GraphQLFacade(),
+        KafkaFacade(),
+        service._config_store.out_odoo,
+        config_manager.config_store.out_plain_http,
+        service._config_store.out_soap,
+        config_manager.sql_pool_store,
+        config_manager.outconn_ldap,
+        as2=config_manager.outconn_as2,
+        as4=config_manager.config_store.out_as4,
+        config_manager=config_manager,
+    )
+
+    out.kafka.init(config_manager)
+    out.graphql.init(config_manager)
+
+    return out
+
+# ################################################################################################################################
+
+def _get_outgoing(service:'Service') -> 'Outgoing':
+    return service.out
+
+# ################################################################################################################################
+
+def _new_as2(service:'Service') -> 'AS2Facade':
+    out = AS2Facade()
+    out.init(service.cid, service._config_manager)
+    return out
+
+# ################################################################################################################################
+
+def _new_as4(service:'Service') -> 'AS4Facade':
+    out = AS4Facade()
+    out.init(service.cid, service._config_manager.config_store.out_as4)
+    return out
+
+# ################################################################################################################################
+
+def _new_rest(service:'Service') -> 'RESTFacade':
+    out = RESTFacade()
+    out.init(service.cid, service._config_manager.config_store.out_plain_http)
+    return out
+
+# ################################################################################################################################
+
+def _new_soap(service:'Service') -> 'SOAPFacade':
+    out = SOAPFacade()
+    out.init(service.cid, service._config_store.out_soap)
+    return out
+
+# ################################################################################################################################
+
+def _new_fhir(service:'Service') -> 'FHIRFacade':
+    out = FHIRFacade()
+    out.init(service._config_manager)
+    return out
+
+# ################################################################################################################################
+
+def _new_ibm_mq(service:'Service') -> 'IBMMQFacade':
+    out = IBMMQFacade()
+    out.init(service._config_manager)
+    return out
+
+# ################################################################################################################################
+
+def _new_mllp(service:'Service') -> 'MLLPFacade':
+    out = MLLPFacade()
+    out.init(service._config_manager)
+    return out
+
+# ################################################################################################################################
+
+def _new_odata(service:'Service') -> 'ODataFacade':
+    out = ODataFacade()
+    out.init(service._config_manager.outconn_odata)
+    return out
+
+# ################################################################################################################################
+
+# SAP runs on the OData implementation
+def _new_sap(service:'Service') -> 'ODataFacade':
+    out = ODataFacade()
+    out.init(service._config_manager.outconn_sap)
+    return out
+
+# ################################################################################################################################
+
+def _new_salesforce(service:'Service') -> 'SalesforceFacade':
+    out = SalesforceFacade()
+    out.init(service._config_manager.cloud_salesforce)
+    return out
+
+# ################################################################################################################################
+
+def _new_sftp(service:'Service') -> 'SFTPFacade':
+    out = SFTPFacade()
+    out.init(service.cid, service._config_manager)
+    return out
+
+# ################################################################################################################################
+
+def _new_smb(service:'Service') -> 'SMBFacade':
+    out = SMBFacade()
+    out.init(service.cid, service._config_manager)
+    return out
+
+# ################################################################################################################################
+
+def _new_ftp(service:'Service') -> 'FTPFacade':
+    out = FTPFacade()
+    out.init(service.cid, service._config_manager)
+    return out
+
+# ################################################################################################################################
+
+def _new_mongodb(service:'Service') -> 'MongoDBFacade':
+    out = MongoDBFacade()
+    out.init(service.cid, service._config_manager)
+    return out
+
+# ################################################################################################################################
+
+def _new_es(service:'Service') -> 'ESFacade':
+    out = ESFacade()
+    out.init(service.cid, service._config_manager)
+    return out
+
+# ################################################################################################################################
+
+def _new_grpc(service:'Service') -> 'GRPCFacade':
+    out = GRPCFacade()
+    out.init(service.cid, service._config_manager)
+    return out
+
+# ################################################################################################################################
+
+# What the service says about its channel's destinations, starting with the service having said nothing
+def _new_destination(service:'Service') -> 'DestinationFacade':
+    out = DestinationFacade()
+    out.init(service.request.raw)
+    return out
+
+# ################################################################################################################################
+
+def _new_keysight(service:'Service') -> 'KeysightContainer':
+    out = KeysightContainer()
+    out.init(service.cid, service._config_manager.config_store.out_plain_http)
+    return out
+
+# ################################################################################################################################
+
+def _new_security(service:'Service') -> 'SecurityFacade':
+    out = SecurityFacade(service.server)
+    return out
+
+# ################################################################################################################################
+
+def _new_pubsub(service:'Service') -> 'PubSubFacade':
+    out = PubSubFacade(service.server, service.name)
+    return out
+
+# ################################################################################################################################
+
 class Service:
     """ A base class for all services deployed on Zato servers, no matter the transport and protocol, be it REST, AMQP
     or any other, regardless whether they arere built-in or user-defined ones.
@@ -362,12 +560,7 @@ class Service:
     logger: 'Logger'
     process_name:'str' = 'No name'
 
-    as2: 'AS2Facade'
-    as4: 'AS4Facade'
-    rest: 'RESTFacade'
     schedule: 'SchedulerFacade'
-    security: 'SecurityFacade'
-    pubsub: 'PubSubFacade'
 
     call_hooks:'bool' = True
     _filter_by = None
@@ -410,8 +603,31 @@ class Service:
     # Crypto operations
     crypto:'ServerCryptoManager'
 
+    # Facades, each built on first access, for the cid the service has at that point - see LazyFacade
+    out = LazyFacade(_new_outgoing)
+    outgoing = LazyFacade(_get_outgoing)
+    as2 = LazyFacade(_new_as2)
+    as4 = LazyFacade(_new_as4)
+    rest = LazyFacade(_new_rest)
+    soap = LazyFacade(_new_soap)
+    fhir = LazyFacade(_new_fhir)
+    ibm_mq = LazyFacade(_new_ibm_mq)
+    mllp = LazyFacade(_new_mllp)
+    odata = LazyFacade(_new_odata)
+    sap = LazyFacade(_new_sap)
+    salesforce = LazyFacade(_new_salesforce)
+    sftp = LazyFacade(_new_sftp)
+    smb = LazyFacade(_new_smb)
+    ftp = LazyFacade(_new_ftp)
+    mongodb = LazyFacade(_new_mongodb)
+    es = LazyFacade(_new_es)
+    grpc = LazyFacade(_new_grpc)
+    destination = LazyFacade(_new_destination)
+    security = LazyFacade(_new_security)
+    pubsub = LazyFacade(_new_pubsub)
+
     # Vendors - Keysight
-    keysight: 'KeysightContainer'
+    keysight = LazyFacade(_new_keysight)
 
     server: 'ParallelServer'
     config_dispatcher: 'ConfigDispatcher'
@@ -474,71 +690,6 @@ class Service:
         self.usage = 0 # How many times the service has been invoked
         self.slow_threshold = maxint # After how many ms to consider the response came too late
 
-        self.out = self.outgoing = Outgoing(
-            self.amqp,
-            GraphQLFacade(),
-            KafkaFacade(),
-            self._config_store.out_odoo,
-            self._config_manager.config_store.out_plain_http,
-            self._config_store.out_soap,
-            self._config_manager.sql_pool_store,
-            self._config_manager.outconn_ldap,
-            as2=self._config_manager.outconn_as2,
-            as4=self._config_manager.config_store.out_as4,
-            config_manager=self._config_manager,
-        ) # type: Outgoing
-
-        # AS2 facade for outgoing connections
-        self.as2 = AS2Facade()
-
-        # AS4 facade for outgoing connections
-        self.as4 = AS4Facade()
-
-        # REST facade for outgoing connections
-        self.rest = RESTFacade()
-
-        # SOAP facade for outgoing connections
-        self.soap = SOAPFacade()
-
-        # FHIR facade for outgoing connections
-        self.fhir = FHIRFacade()
-
-        # IBM MQ facade for outgoing connections
-        self.ibm_mq = IBMMQFacade()
-
-        # MLLP facade for outgoing connections
-        self.mllp = MLLPFacade()
-
-        # OData facade for outgoing connections
-        self.odata = ODataFacade()
-
-        # SAP facade for outgoing connections - runs on the OData implementation
-        self.sap = ODataFacade()
-
-        # Salesforce facade for cloud connections
-        self.salesforce = SalesforceFacade()
-
-        # SFTP facade for outgoing connections
-        self.sftp = SFTPFacade()
-
-        # SMB facade for outgoing connections
-        self.smb = SMBFacade()
-
-        # FTP facade for outgoing connections
-        self.ftp = FTPFacade()
-
-        # MongoDB facade for outgoing connections
-        self.mongodb = MongoDBFacade()
-
-        # Elasticsearch facade for outgoing connections
-        self.es = ESFacade()
-
-        # gRPC facade for outgoing connections
-        self.grpc = GRPCFacade()
-
-        # What this service says about what its channel's destinations receive
-        self.destination = DestinationFacade()
-
 # ################################################################################################################################
 
     @staticmethod
@@ -654,68 +805,6 @@ class Service:
         self.kvdb = self.redis
         self.cache = self.redis
 
-        # AS2 facade
-        self.as2.init(self.cid, self._config_manager)
-
-        # AS4 facade
-        self.as4.init(self.cid, self._config_manager.config_store.out_as4)
-
-        # REST facade
-        self.rest.init(self.cid, self._config_manager.config_store.out_plain_http)
-
-        # SOAP facade
-        self.soap.init(self.cid, self._config_store.out_soap)
-
-        # Kafka facade
-        self.out.kafka.init(self._config_manager)
-
-        # IBM MQ facade
-        self.ibm_mq.init(self._config_manager)
-
-        # GraphQL facade
-        self.out.graphql.init(self._config_manager)
-
-        # FHIR facade
-        self.fhir.init(self._config_manager)
-
-        # MLLP facade
-        self.mllp.init(self._config_manager)
-
-        # OData facade
-        self.odata.init(self._config_manager.outconn_odata)
-
-        # SAP facade - runs on the OData implementation
-        self.sap.init(self._config_manager.outconn_sap)
-
-        # Salesforce facade
-        self.salesforce.init(self._config_manager.cloud_salesforce)
-
-        # SFTP facade
-        self.sftp.init(self.cid, self._config_manager)
-
-        # SMB facade
-        self.smb.init(self.cid, self._config_manager)
-
-        # FTP facade
-        self.ftp.init(self.cid, self._config_manager)
-
-        # MongoDB facade
-        self.mongodb.init(self.cid, self._config_manager)
-
-        # Elasticsearch facade
-        self.es.init(self.cid, self._config_manager)
-
-        # gRPC facade
-        self.grpc.init(self.cid, self._config_manager)
-
-        # Destination facade - what the service says about its channel's destinations,
-        # starting each invocation with the service having said nothing
-        self.destination.init(self.request.raw)
-
-        # Vendors - Keysight
-        self.keysight = KeysightContainer()
-        self.keysight.init(self.cid, self._config_manager.config_store.out_plain_http)
-
 # ################################################################################################################################
 
     def set_response_data(self, service:'Service', **kwargs:'any_') -> 'any_':
@@ -1384,8 +1473,6 @@ class Service:
         service.user_config = server.user_config
         service.static_config = server.static_config
         service.time = server.time_util
-        service.security = SecurityFacade(service.server)
-        service.pubsub = PubSubFacade(service.server, service.name)
         service.metrics = ServiceMetrics(service)
 
         if channel_params:
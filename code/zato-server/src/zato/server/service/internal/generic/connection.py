@@ -206,6 +206,9 @@ skip_simple_type = {
 # outgoing connection's counts, sizes, timeouts and ids are among them because they travel as
 # opaque attributes rather than as columns of their own, so nothing else says they are numbers.
 int_attrs = ['pool_size', 'ping_interval', 'pings_missed_threshold', 'socket_read_timeout', 'socket_write_timeout']
+
+# How many messages of a Kafka or IBM MQ channel may be processed at the same time
+int_attrs = int_attrs + ['max_in_flight']
 int_attrs = int_attrs + list(MLLP_Channel_Int_Names) + list(MLLP_Outgoing_Int_Names)
 
 # ################################################################################################################################
@@ -7,6 +7,7 @@ Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
 """
 
 # stdlib
+import os
 from datetime import datetime, timezone
 from fnmatch import fnmatch
 from traceback import format_exc
@@ -20,6 +21,7 @@ from zato.common.audit_log.common import AuditEvent, AuditOutcome
 from zato.common.audit_log.file_transfer import record_schedule_event
 from zato.common.model.file_transfer_ import FileTransferItem
 from zato.common.util.api import new_cid_server
+from zato.server.connection.file_transfer_base import spool_file_chunks
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -267,13 +269,17 @@ def _process_one_file(
             return _status_skipped
         current_path = claim_path
 
+    # Where the file is downloaded to - it exists only for as long as the target service runs.
+    spool_path = ''
+
     try:
-        # Download the file ..
-        data = conn.read(current_path)
+        # Download the file to the local disk chunk by chunk, so that a file of any size never sits in memory ..
+        chunks = conn.read_iter(current_path)
+        spool_path = spool_file_chunks(chunks)
 
-        # .. and hand it over to the target service, once per file.
+        # .. and hand it over to the target service, once per file - the service reads it in only if it needs to.
         item = FileTransferItem(conn_type, conn_name, schedule_name, directory, file_name, full_path,
-            entry.size, entry.last_modified_iso, data)
+            entry.size, entry.last_modified_iso, local_path=spool_path)
 
         _ = service.invoke(service_name, item)
 
@@ -299,6 +305,10 @@ def _process_one_file(
 
         return _status_failed
 
+    finally:
+        if spool_path:
+            os.remove(spool_path)
+
     # The target service took the file, which is recorded before the file is moved or deleted.
     _ = record_schedule_event(audit_log, conn_name, AuditEvent.Delivered, full_path,
         cid=file_cid, correl_id=run_cid, schedule=schedule_name, outcome=AuditOutcome.OK,
@@ -87,6 +87,22 @@ class LogCSV(Service):
 # ################################################################################################################################
 # ################################################################################################################################
 
+class LogHL7(Service):
+    """ Picks up HL7 v2 batch and file documents and logs their messages, reading them from disk one message at a time.
+    """
+    def handle(self) -> 'None':
+
+        # Imported here because most servers never pick up HL7 documents
+        from zato.hl7v2.batch import iter_batch_or_file
+
+        raw_request = cast_('stranydict', self.request.raw)
+
+        for idx, message in enumerate(iter_batch_or_file(raw_request['full_path'], validate=False), 1):
+            self.logger.info('HL7 message #%s `%s`', idx, message.serialize())
+
+# ################################################################################################################################
+# ################################################################################################################################
+
 class _Updater(Service):
     pickup_action: 'ValueConstant'
 
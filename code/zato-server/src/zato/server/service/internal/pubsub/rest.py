@@ -21,7 +21,7 @@ from zato.server.service import AsIs, Int, Service
 # ################################################################################################################################
 
 if 0:
-    from zato.common.typing_ import anydict
+    from zato.common.typing_ import anydict, anylist, strnone
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -40,6 +40,9 @@ _max_messages_limit = 1000
 _max_len_default = PubSub.Message.Default_Max_Len
 _max_len_limit = PubSub.Message.Default_Max_Len
 
+# How many messages one publish-many request may carry
+_max_publish_many_messages = 1000
+
 _status_ok = PubSub.Status.OK
 _status_bad_request = PubSub.Status.Bad_Request
 _status_unauthorized = PubSub.Status.Unauthorized
@@ -147,21 +150,18 @@ class PubSubRESTService(Service):
 # ################################################################################################################################
 # ################################################################################################################################
 
-class Publish(PubSubRESTService):
-    """ Publish a message to a topic.
+class _PublishBase(PubSubRESTService):
+    """ What the services publishing through the REST API have in common - checking that the caller
+    may publish to a topic and reading the options of each message.
     """
-    name = 'pubsub.rest.publish'
-
-    input = 'topic_name', AsIs('data'), '-priority', '-expiration', AsIs('-correl_id'), AsIs('-in_reply_to'), AsIs('-ext_client_id'), '-pub_time'
-    output = AsIs('-msg_id'), '-is_ok', '-cid', AsIs('-status'), '-details'
-
-# ################################################################################################################################
 
-    def handle(self) -> 'None':
+    def _get_publisher(self, topic_name:'str') -> 'strnone':
+        """ Returns the username of the caller if it may publish to the topic,
+        or None after filling in the error response if it may not.
+        """
 
         # Local aliases
         cid = self.cid
-        input = self.request.input
 
         # Authenticate
         username, error = self.authenticate()
@@ -169,10 +169,7 @@ class Publish(PubSubRESTService):
             self.response.payload.is_ok = False
             self.response.payload.cid = cid
             self.response.payload.details, self.response.payload.status, self.response.status_code = error
-            return
-
-        # Get topic name
-        topic_name = input.topic_name
+            return None
 
         # Validate topic name
         try:
@@ -183,7 +180,7 @@ class Publish(PubSubRESTService):
             self.response.payload.status = _status_bad_request
             self.response.payload.details = str(e)
             self.response.status_code = BAD_REQUEST
-            return
+            return None
 
         # Check permissions
         matcher = self.server.pubsub_pattern_matcher
@@ -195,7 +192,7 @@ class Publish(PubSubRESTService):
             self.response.payload.status = _status_unauthorized
             self.response.payload.details = 'Permission denied'
             self.response.status_code = UNAUTHORIZED
-            return
+            return None
 
         # Check if the topic is active ..
         if not self.server.config_manager.is_pubsub_topic_active(topic_name):
@@ -204,35 +201,29 @@ class Publish(PubSubRESTService):
             self.response.payload.status = _status_forbidden
             self.response.payload.details = f'Topic {topic_name} is inactive'
             self.response.status_code = FORBIDDEN
-            return
+            return None
 
-        # Get message data
-        data = input.data
+        return username
 
-        if data is None:
-            self.response.payload.is_ok = False
-            self.response.payload.cid = cid
-            self.response.payload.status = _status_bad_request
-            self.response.payload.details = "Invalid input: 'data' element missing"
-            self.response.status_code = BAD_REQUEST
-            return
+# ################################################################################################################################
+
+    def _get_publish_options(self, source:'anydict') -> 'anydict':
+        """ Reads the optional parameters of one message, with safe parsing.
+        """
+        priority = source.get('priority')
+        expiration = source.get('expiration')
 
         # Get optional parameters with safe parsing
         try:
-            priority = int(input.priority) if input.priority not in (None, '') else _default_priority
+            priority = int(priority) if priority not in (None, '') else _default_priority
         except (ValueError, TypeError):
             priority = _default_priority
 
         try:
-            expiration = int(input.expiration) if input.expiration not in (None, '') else _default_expiration
+            expiration = int(expiration) if expiration not in (None, '') else _default_expiration
         except (ValueError, TypeError):
             expiration = _default_expiration
 
-        correl_id = input.correl_id or cid
-        in_reply_to = input.in_reply_to or ''
-        ext_client_id = input.ext_client_id or ''
-        pub_time = input.pub_time or ''
-
         # Validate priority
         if priority < _min_priority or priority > _max_priority:
             priority = _default_priority
@@ -241,6 +232,58 @@ class Publish(PubSubRESTService):
         if expiration < 1:
             expiration = 1
 
+        out = {
+            'priority': priority,
+            'expiration': expiration,
+            'correl_id': source.get('correl_id') or self.cid,
+            'in_reply_to': source.get('in_reply_to') or '',
+            'ext_client_id': source.get('ext_client_id') or '',
+            'pub_time': source.get('pub_time') or '',
+        }
+
+        return out
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class Publish(_PublishBase):
+    """ Publish a message to a topic.
+    """
+    name = 'pubsub.rest.publish'
+
+    input = 'topic_name', AsIs('data'), '-priority', '-expiration', AsIs('-correl_id'), AsIs('-in_reply_to'), AsIs('-ext_client_id'), '-pub_time'
+    output = AsIs('-msg_id'), '-is_ok', '-cid', AsIs('-status'), '-details'
+
+# ################################################################################################################################
+
+    def handle(self) -> 'None':
+
+        # Local aliases
+        cid = self.cid
+        input = self.request.input
+
+        # Get topic name
+        topic_name = input.topic_name
+
+        # Make sure the caller may publish to the topic
+        username = self._get_publisher(topic_name)
+        if not username:
+            return
+
+        # Get message data
+        data = input.data
+
+        if data is None:
+            self.response.payload.is_ok = False
+            self.response.payload.cid = cid
+            self.response.payload.status = _status_bad_request
+            self.response.payload.details = "Invalid input: 'data' element missing"
+            self.response.status_code = BAD_REQUEST
+            return
+
+        # Get optional parameters
+        options = self._get_publish_options(input)
+
         # .. publish either to the AMQP broker or to the pub/sub database, depending on the topic's backend ..
         backend_config = self.server.config_manager.get_pubsub_topic_backend(topic_name)
 
@@ -250,14 +293,9 @@ class Publish(PubSubRESTService):
             result = self.server.pubsub_backend.publish(
                 topic_name,
                 data,
-                priority=priority,
-                expiration=expiration,
-                correl_id=correl_id,
-                in_reply_to=in_reply_to,
-                ext_client_id=ext_client_id,
                 publisher=username,
-                pub_time=pub_time,
                 cid=cid,
+                **options,
             )
 
         # Build response
@@ -269,6 +307,86 @@ class Publish(PubSubRESTService):
 # ################################################################################################################################
 # ################################################################################################################################
 
+class PublishMany(_PublishBase):
+    """ Publish many messages to a topic in one request, all of them committed together.
+    """
+    name = 'pubsub.rest.publish-many'
+
+    input = 'topic_name', AsIs('messages')
+    output = AsIs('-msg_ids'), '-is_ok', '-cid', AsIs('-status'), '-details'
+
+# ################################################################################################################################
+
+    def _set_bad_request(self, details:'str') -> 'None':
+        self.response.payload.is_ok = False
+        self.response.payload.cid = self.cid
+        self.response.payload.status = _status_bad_request
+        self.response.payload.details = details
+        self.response.status_code = BAD_REQUEST
+
+# ################################################################################################################################
+
+    def handle(self) -> 'None':
+
+        # Local aliases
+        cid = self.cid
+        input = self.request.input
+
+        # Get topic name
+        topic_name = input.topic_name
+
+        # Make sure the caller may publish to the topic
+        username = self._get_publisher(topic_name)
+        if not username:
+            return
+
+        # Get the messages, each of which must have its data ..
+        messages = input.messages
+
+        if not isinstance(messages, list) or not messages:
+            self._set_bad_request("Invalid input: 'messages' must be a non-empty list")
+            return
+
+        message_count = len(messages)
+
+        if message_count > _max_publish_many_messages:
+            self._set_bad_request(f"Invalid input: 'messages' may have at most {_max_publish_many_messages} elements")
+            return
+
+        items:'anylist' = []
+
+        for idx, message in enumerate(messages):
+
+            if not isinstance(message, dict) or message.get('data') is None:
+                self._set_bad_request(f"Invalid input: 'data' element missing in message #{idx}")
+                return
+
+            # .. with any of its optional parameters ..
+            options = self._get_publish_options(message)
+            options['data'] = message['data']
+
+            items.append(options)
+
+        # .. publish either to the AMQP broker or to the pub/sub database, depending on the topic's backend ..
+        backend_config = self.server.config_manager.get_pubsub_topic_backend(topic_name)
+
+        if backend_config:
+            results:'anylist' = []
+            for item in items:
+                result = self.server.config_manager.pubsub_publish_to_amqp(backend_config, item['data'], topic_name, cid)
+                results.append(result)
+        else:
+            results = self.server.pubsub_backend.publish_many(topic_name, items, publisher=username, cid=cid)
+
+        # Build response
+        self.response.payload.is_ok = True
+        self.response.payload.cid = cid
+        self.response.payload.msg_ids = [result.msg_id for result in results]
+        self.response.payload.status = _status_ok
+
+# ################################################################################################################################
+# ################################################################################################################################
+
 class GetMessages(PubSubRESTService):
     """ Retrieve messages for the authenticated user.
     """
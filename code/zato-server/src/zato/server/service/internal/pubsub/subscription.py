@@ -86,7 +86,7 @@ def _build_topic_objects_list(topic_data_list:'any_'=None, topics:'any_'=None, t
 
 if 0:
     from zato.common.ext.bunch import Bunch
-    from zato.common.typing_ import any_, anydict, anylist, strdict
+    from zato.common.typing_ import any_, anydict, anylist, intnone, strdict
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -99,6 +99,24 @@ class ModuleCtx:
 # ################################################################################################################################
 
 _push_type = PubSub.Push_Type
+_max_in_flight_limit = PubSub.Delivery.Max_In_Flight_Limit
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def get_rest_push_max_in_flight(value:'any_') -> 'intnone':
+    """ Validates how many messages a REST push subscriber may have outstanding at once, None meaning one at a time.
+    """
+    if value in (None, ''):
+        return None
+
+    out = int(value)
+
+    if not 1 <= out <= _max_in_flight_limit:
+        msg = f'REST push max in-flight must be between 1 and {_max_in_flight_limit}, got `{value}`'
+        raise Exception(msg)
+
+    return out
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -123,7 +141,7 @@ class GetList(AdminService):
     input = 'cluster_id', '-needs_password', *query_parameters
     output = 'id', 'sub_key', 'is_delivery_active', 'is_pub_active', 'created', AsIs('topic_link_list'), 'sec_base_id', \
         'sec_name', 'security', 'username', 'delivery_type', 'push_type', 'rest_push_endpoint_id', 'push_service_name', \
-        '-rest_push_endpoint_name', AsIs('-topic_name_list'), '-password', Int('-pending_depth')
+        '-rest_push_endpoint_name', Int('-rest_push_max_in_flight'), AsIs('-topic_name_list'), '-password', Int('-pending_depth')
 
     def get_data(self, session:'any_') -> 'anylist':
 
@@ -235,7 +253,8 @@ class Create(AdminService):
     """ Creates a new pub/sub subscription.
     """
     input = 'cluster_id', AsIs('topic_name_list'), 'sec_base_id', 'delivery_type', \
-        '-is_delivery_active', '-is_pub_active', '-push_type', '-rest_push_endpoint_id', '-push_service_name', '-sub_key'
+        '-is_delivery_active', '-is_pub_active', '-push_type', '-rest_push_endpoint_id', '-push_service_name', '-sub_key', \
+        '-rest_push_max_in_flight'
     output = 'id', 'sub_key', 'is_delivery_active', 'is_pub_active', 'created', 'sec_name', 'security', 'delivery_type', \
         AsIs('-topic_name_list'), AsIs('-topic_link_list')
 
@@ -329,6 +348,7 @@ class Create(AdminService):
                 sub.delivery_type = input.delivery_type
                 sub.push_type = input.push_type
                 sub.push_service_name = input.push_service_name
+                sub.rest_push_max_in_flight = get_rest_push_max_in_flight(input.get('rest_push_max_in_flight'))
 
                 # For push subscriptions, set the endpoint
                 if input.delivery_type == 'push' and input.get('rest_push_endpoint_id'):
@@ -389,6 +409,7 @@ class Create(AdminService):
                 pubsub_msg.push_type = sub.push_type
                 pubsub_msg.rest_push_endpoint_id = sub.rest_push_endpoint_id
                 pubsub_msg.push_service_name = sub.push_service_name
+                pubsub_msg.rest_push_max_in_flight = sub.rest_push_max_in_flight
                 pubsub_msg.action = PUBSUB.SUBSCRIPTION_CREATE.value
 
                 # .. our own process we invoke directly ..
@@ -417,7 +438,8 @@ class Edit(AdminService):
     """ Updates a pub/sub subscription.
     """
     input = 'sub_key', 'cluster_id', AsIs('topic_name_list'), 'sec_base_id', 'delivery_type', \
-        '-is_delivery_active', '-is_pub_active', '-push_type', '-rest_push_endpoint_id', '-push_service_name'
+        '-is_delivery_active', '-is_pub_active', '-push_type', '-rest_push_endpoint_id', '-push_service_name', \
+        '-rest_push_max_in_flight'
     output = 'id', 'sub_key', 'is_delivery_active', 'is_pub_active', 'sec_name', 'security', 'delivery_type', \
         AsIs('-topic_name_list'), AsIs('-topic_link_list')
 
@@ -447,6 +469,9 @@ class Edit(AdminService):
                         value = input[key]
                         setattr(sub, key, value)
 
+                if 'rest_push_max_in_flight' in input:
+                    sub.rest_push_max_in_flight = get_rest_push_max_in_flight(input.rest_push_max_in_flight)
+
                 # Get the security definition
                 sec_base = session.query(SecurityBase).\
                     filter(SecurityBase.id==sub.sec_base_id).\
@@ -569,6 +594,7 @@ class Edit(AdminService):
                 pubsub_msg.push_type = sub.push_type
                 pubsub_msg.rest_push_endpoint_id = sub.rest_push_endpoint_id
                 pubsub_msg.push_service_name = sub.push_service_name
+                pubsub_msg.rest_push_max_in_flight = sub.rest_push_max_in_flight
                 pubsub_msg.action = PUBSUB.SUBSCRIPTION_EDIT.value
 
                 # .. our own process we invoke directly ..
@@ -658,7 +684,7 @@ class _BaseModifyTopicList(AdminService):
     action = '<Action-Not-Set>'
 
     input = AsIs('topic_name_list'), '-username', '-sec_name', '-is_delivery_active', '-delivery_type', '-push_type', \
-        '-rest_push_endpoint_id', '-push_service_name', '-sub_key'
+        '-rest_push_endpoint_id', '-push_service_name', '-sub_key', '-rest_push_max_in_flight'
     output = AsIs('-topic_name_list'),
 
 # ################################################################################################################################
@@ -730,6 +756,7 @@ class _BaseModifyTopicList(AdminService):
                         create_request.push_type = input.push_type
                         create_request.rest_push_endpoint_id = input.rest_push_endpoint_id
                         create_request.push_service_name = input.push_service_name
+                        create_request.rest_push_max_in_flight = input.rest_push_max_in_flight
 
                         # .. invoke the Create service ..
                         _ = self.invoke('zato.pubsub.subscription.create', create_request)
@@ -809,6 +836,7 @@ class _BaseModifyTopicList(AdminService):
                 request.push_service_name = current_sub.push_service_name
                 request.push_type = current_sub.push_type
                 request.rest_push_endpoint_id = current_sub.rest_push_endpoint_id
+                request.rest_push_max_in_flight = current_sub.get('rest_push_max_in_flight')
 
                 # Update the subscription
                 _ = self.invoke('zato.pubsub.subscription.edit', request)
@@ -47,7 +47,7 @@ logger = logging.getLogger(__name__)
 _service_name_prefix = 'zato.scheduler.job.'
 _entity_type = 'scheduler'
 _ib_params = ('weeks', 'days', 'hours', 'minutes', 'seconds')
-_new_params = ('jitter_ms', 'timezone', 'max_execution_time_ms',
+_new_params = ('jitter_ms', 'timezone', 'max_execution_time_ms', 'max_concurrency',
     'on_success_service', 'on_success_job', 'on_error_service', 'on_error_job')
 
 # This one is stored in the job's opaque attributes only - it points back to the IMAP connection
@@ -109,7 +109,7 @@ def _keep_unsent_job_fields(self:'any_', input:'any_') -> 'None':
         existing_is_active = job_row.is_active
         existing_opaque = parse_instance_opaque_attr(job_row)
 
-    # The optional fields - run timeouts, jitter, timezone and the four hooks
+    # The optional fields - run timeouts, concurrency, jitter, timezone and the four hooks
     for param in _new_params:
         if input.get(param) in _not_sent:
             existing_value = existing_opaque.get(param)
@@ -503,7 +503,7 @@ class _CreateEdit(_SchedulerAdmin):
     input = 'cluster_id', 'name', '-is_active', 'job_type', 'service', 'start_date', \
         Int('-id'), '-extra', '-weeks', '-days', '-hours', '-minutes', '-seconds', '-repeats', \
         '-cron_definition', '-should_ignore_existing', \
-        '-jitter_ms', '-timezone', '-max_execution_time_ms', \
+        '-jitter_ms', '-timezone', '-max_execution_time_ms', '-max_concurrency', \
         '-on_success_service', '-on_success_job', '-on_error_service', '-on_error_job', \
         '-imap_conn_id', '-link_conn_type', '-link_conn_id', '-link_kind'
     output = '-id', '-name', '-cron_definition'
@@ -519,7 +519,7 @@ class _Get(_SchedulerAdmin):
     """
     output = 'id', 'name', 'is_active', 'job_type', 'start_date', 'service_id', 'service_name', \
         '-extra', '-weeks', '-days', '-hours', '-minutes', '-seconds', '-repeats', '-cron_definition', \
-        '-jitter_ms', '-timezone', '-max_execution_time_ms', \
+        '-jitter_ms', '-timezone', '-max_execution_time_ms', '-max_concurrency', \
         '-on_success_service', '-on_success_job', '-on_error_service', '-on_error_job', \
         '-imap_conn_id', '-link_conn_type', '-link_conn_id', '-link_kind', '-last_run_utc', Int('-last_duration_ms')
 
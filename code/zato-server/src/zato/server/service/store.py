@@ -38,7 +38,6 @@ except ImportError:
 
 # Zato
 from zato.common.api import DONT_DEPLOY_ATTR_NAME, SourceCodeInfo, TRACE1
-from zato.common.facade import PubSubFacade, SecurityFacade
 from zato.common.json_internal import dumps
 from zato.common.marshal_.api import Model as DataClassModel
 from zato.common.marshal_.io import DataClassIO
@@ -672,8 +671,6 @@ class ServiceStore:
         service.config = self.server.user_config
         service.user_config = self.server.user_config
         service.time = self.server.time_util
-        service.security = SecurityFacade(service.server)
-        service.pubsub = PubSubFacade(service.server, service.name)
 
         # .. and return everything to our caller.
         return service, is_active
@@ -0,0 +1,352 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# stdlib
+import logging
+import os
+from time import monotonic
+
+# Zato
+from zato.common.typing_ import cast_
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if 0:
+    from zato.common.typing_ import any_, anydict, anylist, strlist
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+logger = logging.getLogger(__name__)
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class ModuleCtx:
+
+    # How many consumer greenlets each server process runs for the scheduler's fire events and for the queue bridge's messages
+    Env_Fire_Consumers = 'Zato_Scheduler_Fire_Consumers'
+    Env_Recv_Consumers = 'Zato_Queue_Bridge_Recv_Consumers'
+    Default_Consumers = 1
+
+    # How long, in seconds, an entry must have been pending with a consumer before another consumer may take it over -
+    # long enough for any live consumer to have finished with it, since an entry is acknowledged only when it is.
+    Env_Claim_Min_Idle = 'Zato_Stream_Claim_Min_Idle'
+    Default_Claim_Min_Idle = 300
+
+    # How often, in seconds, each consumer looks for entries to take over
+    Claim_Interval = 30
+
+    # How many entries are taken over in one call, and how many are kept from being taken over in one
+    Claim_Count = 100
+    Keep_Count = 1000
+
+    # How many times an entry may be delivered before it is given up on - an entry whose processing keeps failing
+    # would otherwise be taken over again and again, forever. Such an entry is moved to a dead-letter stream,
+    # named after its own one, which keeps only the most recent entries.
+    Env_Max_Deliveries = 'Zato_Stream_Max_Deliveries'
+    Default_Max_Deliveries = 5
+    Dead_Letter_Suffix = ':dead_letter'
+    Dead_Letter_Max_Len = 10_000
+
+    # How long, in seconds, a consumer with no pending entries must have been idle before it is removed from its group -
+    # consumers of processes that no longer exist would otherwise pile up there, since each process has its own names.
+    Dead_Consumer_Idle = 3600
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def get_consumer_count(env_name:'str') -> 'int':
+    """ Returns how many consumer greenlets of one kind each server process runs.
+    """
+    if value := os.environ.get(env_name, ''):
+        out = max(int(value), 1)
+    else:
+        out = ModuleCtx.Default_Consumers
+
+    return out
+
+# ################################################################################################################################
+
+def get_consumer_name(group_name:'str', server_name:'str', idx:'int') -> 'str':
+    """ Returns the name a consumer greenlet reads under, unique to its server, process and position in the process,
+    so that what one consumer holds pending can be told apart from what all the others do.
+    """
+    out = f'{group_name}-{server_name}-{os.getpid()}-{idx}'
+    return out
+
+# ################################################################################################################################
+
+def get_claim_min_idle() -> 'int':
+    """ Returns how long, in seconds, an entry must have been pending before another consumer may take it over.
+    """
+    if value := os.environ.get(ModuleCtx.Env_Claim_Min_Idle, ''):
+        out = int(value)
+    else:
+        out = ModuleCtx.Default_Claim_Min_Idle
+
+    return out
+
+# ################################################################################################################################
+
+def get_max_deliveries() -> 'int':
+    """ Returns how many times an entry may be delivered before it is moved to its dead-letter stream.
+    """
+    if value := os.environ.get(ModuleCtx.Env_Max_Deliveries, ''):
+        out = max(int(value), 1)
+    else:
+        out = ModuleCtx.Default_Max_Deliveries
+
+    return out
+
+# ################################################################################################################################
+
+def get_dead_letter_stream(stream:'str') -> 'str':
+    """ Returns the name of the stream that entries of another one are moved to once they have been delivered too many times.
+    """
+    out = stream + ModuleCtx.Dead_Letter_Suffix
+    return out
+
+# ################################################################################################################################
+
+def move_to_dead_letter(
+    redis_conn:'any_',
+    stream:'str',
+    group_name:'str',
+    msg_id:'str',
+    fields:'anydict',
+    deliveries:'int',
+    ) -> 'None':
+    """ Gives up on an entry that has been delivered too many times - it is kept in the dead-letter stream,
+    along with where it came from, and acknowledged only once it is there, so that it cannot be lost in between.
+    """
+    dead_letter_stream = get_dead_letter_stream(stream)
+
+    dead_letter = dict(fields)
+    dead_letter['original_stream'] = stream
+    dead_letter['original_msg_id'] = msg_id
+    dead_letter['delivery_count'] = deliveries
+
+    _ = redis_conn.xadd(dead_letter_stream, dead_letter, maxlen=ModuleCtx.Dead_Letter_Max_Len, approximate=True)
+    _ = redis_conn.xack(stream, group_name, msg_id)
+
+    logger.warning('Moved entry %s of stream %s to %s after %d deliveries', msg_id, stream, dead_letter_stream, deliveries)
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class StreamReader:
+    """ Reads entries for one consumer of a consumer group. New entries are read as usual, and every now and then
+    the reader first takes over the entries that other consumers, such as ones of a server that went down,
+    have been holding without acknowledging them for too long. An entry taken over more times than it may be delivered
+    is not returned again - it is moved to a dead-letter stream instead.
+    """
+
+    def __init__(
+        self,
+        redis_conn:'any_',
+        streams:'strlist',
+        group_name:'str',
+        consumer_name:'str',
+        ) -> 'None':
+
+        self.redis_conn = redis_conn
+        self.streams = streams
+        self.group_name = group_name
+        self.consumer_name = consumer_name
+
+        self.claim_min_idle_ms = get_claim_min_idle() * 1000
+        self.max_deliveries = get_max_deliveries()
+
+        # The first read of each consumer takes over what is there to take
+        self._next_claim_at = 0.0
+
+# ################################################################################################################################
+
+    def read(self, count:'int', block:'int') -> 'anylist':
+        """ Returns entries for this consumer in the same format that XREADGROUP returns them in.
+        """
+
+        # Entries whose consumers stopped acknowledging them come first ..
+        if monotonic() >= self._next_claim_at:
+            self._next_claim_at = monotonic() + ModuleCtx.Claim_Interval
+
+            if out := self._claim(count):
+                return out
+
+        # .. and new ones otherwise.
+        streams = dict.fromkeys(self.streams, '>')
+
+        out = cast_('anylist', self.redis_conn.xreadgroup(
+            groupname=self.group_name,
+            consumername=self.consumer_name,
+            streams=streams,
+            count=count,
+            block=block,
+        ))
+
+        return out
+
+# ################################################################################################################################
+
+    def _claim(self, count:'int') -> 'anylist':
+        """ Takes over the entries pending with any consumer for longer than the minimum idle time,
+        and removes the consumers that have nothing pending and have not been seen for a long time.
+        """
+        out:'anylist' = []
+        count = min(count, ModuleCtx.Claim_Count)
+
+        for stream in self.streams:
+
+            response = self.redis_conn.xautoclaim(
+                stream,
+                self.group_name,
+                self.consumer_name,
+                min_idle_time=self.claim_min_idle_ms,
+                start_id='0-0',
+                count=count,
+            )
+
+            # Entries deleted from the stream in the meantime are claimed with no fields
+            # and there is nothing to do about them other than to acknowledge them.
+            messages = []
+            deleted = []
+
+            for msg_id, fields in response[1]:
+                if fields is None:
+                    deleted.append(msg_id)
+                else:
+                    messages.append((msg_id, fields))
+
+            if deleted:
+                _ = self.redis_conn.xack(stream, self.group_name, *deleted)
+
+            # Entries that have already been delivered too many times are given up on ..
+            if messages:
+                messages = self._move_undeliverable(stream, messages)
+
+            if messages:
+                logger.info('Consumer %s took over %d stale %s from stream %s',
+                    self.consumer_name, len(messages), 'entry' if len(messages) == 1 else 'entries', stream)
+                out.append([stream, messages])
+
+            self._delete_dead_consumers(stream)
+
+        return out
+
+# ################################################################################################################################
+
+    def _move_undeliverable(self, stream:'str', messages:'anylist') -> 'anylist':
+        """ Moves to the dead-letter stream the entries just taken over that have been delivered too many times,
+        returning the ones that may still be processed.
+        """
+        out:'anylist' = []
+
+        # Taking an entry over counts as delivering it, so what is pending now includes the delivery just made.
+        # The entries were claimed in the order of their IDs, so they are all within the range of the first and last one.
+        pending = self.redis_conn.xpending_range(
+            stream,
+            self.group_name,
+            min=messages[0][0],
+            max=messages[-1][0],
+            count=len(messages),
+            consumername=self.consumer_name,
+        )
+
+        deliveries_by_msg_id = {item['message_id']: item['times_delivered'] for item in pending}
+
+        for msg_id, fields in messages:
+
+            # .. an entry that may be delivered again is processed as usual ..
+            deliveries = deliveries_by_msg_id.get(msg_id, 0)
+
+            if deliveries <= self.max_deliveries:
+                out.append((msg_id, fields))
+                continue
+
+            # .. while one that may not is kept in the dead-letter stream.
+            move_to_dead_letter(self.redis_conn, stream, self.group_name, msg_id, fields, deliveries)
+
+        return out
+
+# ################################################################################################################################
+
+    def _delete_dead_consumers(self, stream:'str') -> 'None':
+
+        dead_idle_ms = ModuleCtx.Dead_Consumer_Idle * 1000
+
+        for consumer in self.redis_conn.xinfo_consumers(stream, self.group_name):
+            if consumer['name'] == self.consumer_name:
+                continue
+
+            if consumer['pending'] == 0 and consumer['idle'] > dead_idle_ms:
+                _ = self.redis_conn.xgroup_delconsumer(stream, self.group_name, consumer['name'])
+                logger.info('Removed idle consumer %s from group %s of stream %s', consumer['name'], self.group_name, stream)
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class StreamEntries:
+    """ What a process does with the entries its consumers of a group read, for as long as it holds them -
+    acknowledges them, keeps them from being taken over, reads them again and gives up on them.
+    """
+
+    def __init__(self, redis_conn:'any_', group_name:'str', consumer_name:'str') -> 'None':
+        self.redis_conn = redis_conn
+        self.group_name = group_name
+
+        # The consumer that the entries kept from being taken over are pending with from then on
+        self.consumer_name = consumer_name
+
+# ################################################################################################################################
+
+    def ack(self, stream:'str', msg_ids:'strlist') -> 'None':
+        _ = self.redis_conn.xack(stream, self.group_name, *msg_ids)
+
+# ################################################################################################################################
+
+    def keep(self, stream:'str', msg_ids:'strlist') -> 'None':
+        """ Claims entries that are still being held for this consumer again, which resets how long they have been idle
+        for, so that no consumer takes them over. JUSTID does not count that as delivering them.
+        """
+        for idx in range(0, len(msg_ids), ModuleCtx.Keep_Count):
+            _ = self.redis_conn.xclaim(
+                stream,
+                self.group_name,
+                self.consumer_name,
+                min_idle_time=0,
+                message_ids=msg_ids[idx:idx + ModuleCtx.Keep_Count],
+                justid=True,
+            )
+
+# ################################################################################################################################
+
+    def fetch(self, stream:'str', msg_ids:'strlist') -> 'anydict':
+        """ Reads the fields of entries again, by their IDs, leaving out the ones deleted from the stream in the meantime.
+        """
+        pipeline = self.redis_conn.pipeline(transaction=False)
+
+        for msg_id in msg_ids:
+            _ = pipeline.xrange(stream, msg_id, msg_id, count=1)
+
+        out:'anydict' = {}
+
+        for entries in pipeline.execute():
+            for msg_id, fields in entries:
+                out[msg_id] = fields
+
+        return out
+
+# ################################################################################################################################
+
+    def dead_letter(self, stream:'str', msg_id:'str', fields:'anydict', deliveries:'int') -> 'None':
+        move_to_dead_letter(self.redis_conn, stream, self.group_name, msg_id, fields, deliveries)
+
+# ################################################################################################################################
+# ################################################################################################################################
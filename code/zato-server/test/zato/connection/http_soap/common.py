@@ -11,7 +11,8 @@ from json import dumps, loads
 
 # Zato
 from zato.common.api import URL_TYPE
-from zato.common.typing_ import any_, anydict
+from zato.common.typing_ import any_, anydict, anylist
+from zato.server.connection.http_soap.response_cache import local_cache
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -22,22 +23,48 @@ class FakeCacheAPI:
     def __init__(self) -> 'None':
         self.data:'anydict' = {}
         self.ttl:'anydict' = {}
+        self.invalidations:'anylist' = []
+        self.generations:'anydict' = {}
 
     def get(self, key:'str') -> 'any_':
         if key in self.data:
             return loads(self.data[key])
         return None
 
+    def get_response(self, key:'str', channel_id:'int') -> 'any_':
+        value = self.get(key)
+        generation = self.get_response_generation(channel_id)
+
+        if isinstance(value, dict):
+            if value['generation'] != generation:
+                value = None
+
+        return value, generation
+
+    def get_response_generation(self, channel_id:'int') -> 'int':
+        return self.generations.get(channel_id, 0)
+
     def set(self, key:'str', value:'any_', expiry:'int'=0) -> 'None':
         self.data[key] = dumps(value)
         self.ttl[key] = expiry
 
+    def set_response(self, key:'str', entry:'anydict', expiry:'int', channel_id:'int') -> 'None':
+        self.set(key, entry, expiry)
+
+    def purge_responses(self, channel_id:'int') -> 'int':
+        self.generations[channel_id] = self.get_response_generation(channel_id) + 1
+        return self.generations[channel_id]
+
     def delete_by_prefix(self, prefix:'str') -> 'None':
         for key in list(self.data):
             if key.startswith(prefix):
                 del self.data[key]
                 del self.ttl[key]
 
+    def publish_response_invalidation(self, channel_id:'int', pattern:'str'='', generation:'int | None'=None) -> 'None':
+        local_cache.invalidate(channel_id, pattern, generation)
+        self.invalidations.append((channel_id, pattern))
+
 # ################################################################################################################################
 # ################################################################################################################################
 
@@ -54,6 +81,7 @@ def make_raw_config(**overrides:'any_') -> 'anydict':
         'cache_on_second_request': False,
         'needs_etag': False,
         'coalesce_timeout': 5,
+        'is_local_cache_enabled': False,
     }
     out.update(overrides)
 
@@ -43,6 +43,9 @@ class FakeCacheAPI:
             return loads(self.data[key])
         return None
 
+    def get_response(self, key:'str', channel_id:'int') -> 'any_':
+        return self.get(key), 0
+
     def set(self, key:'str', value:'any_', expiry:'int'=0) -> 'None':
         self.data[key] = dumps(value)
 
@@ -61,6 +64,7 @@ def make_ctx(cache_api:'any_', key:'str', is_admitted:'bool', coalesce_timeout:'
     config.cache_on_second_request = True
     config.needs_etag = False
     config.coalesce_timeout = coalesce_timeout
+    config.is_local_cache_enabled = False
 
     ctx = ResponseCacheContext()
     ctx.cache_api = cache_api
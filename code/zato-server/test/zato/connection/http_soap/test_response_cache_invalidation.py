@@ -13,11 +13,13 @@ if not monkey.is_module_patched('threading'):
     _ = monkey.patch_all()
 
 # stdlib
+from fnmatch import fnmatch
 from http.client import OK
+from json import loads
 from unittest import TestCase, main
 
 # Zato
-from zato.common.typing_ import any_, anydict, cast_
+from zato.common.typing_ import any_, anydict, anylist, cast_
 from zato.server.connection.cache import CacheAPI
 from zato.server.connection.http_soap.response_cache import get_context, store, ResponseCacheContext
 
@@ -27,26 +29,84 @@ from test.zato.connection.http_soap.common import make_channel_item, make_enviro
 # ################################################################################################################################
 # ################################################################################################################################
 
+class FakePipeline:
+    """ Queues the calls made to it and runs them against the fake Redis when executed.
+    """
+    def __init__(self, redis:'FakeRedis') -> 'None':
+        self.redis = redis
+        self.calls:'anylist' = []
+
+    def __getattr__(self, name:'str') -> 'any_':
+        def queue(*args:'any_', **kwargs:'any_') -> 'None':
+            self.calls.append((name, args, kwargs))
+        return queue
+
+    def execute(self) -> 'anylist':
+        out = [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+        self.redis.round_trips += 1
+        return out
+
+# ################################################################################################################################
+# ################################################################################################################################
+
 class FakeRedis:
-    """ A fake Redis exposing just what CacheAPI needs.
+    """ A fake Redis exposing just what CacheAPI needs, counting the round trips and the reads of values.
     """
     def __init__(self) -> 'None':
         self.data:'anydict' = {}
+        self.sorted_sets:'anydict' = {}
+        self.published:'anylist' = []
+        self.get_count = 0
+        self.round_trips = 0
+
+    def pipeline(self, transaction:'bool'=True) -> 'FakePipeline':
+        return FakePipeline(self)
 
     def get(self, key:'str') -> 'any_':
+        self.get_count += 1
         return self.data.get(key)
 
+    def mget(self, *keys:'str') -> 'anylist':
+        self.get_count += 1
+        return [self.data.get(key) for key in keys]
+
     def set(self, key:'str', value:'any_', ex:'any_'=None) -> 'None':
         self.data[key] = value
 
-    def delete(self, key:'str') -> 'None':
-        if key in self.data:
-            del self.data[key]
+    def incr(self, key:'str') -> 'int':
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+    def delete(self, *keys:'str') -> 'None':
+        for key in keys:
+            _ = self.data.pop(key, None)
+            _ = self.sorted_sets.pop(key, None)
+
+    def zadd(self, key:'str', mapping:'anydict') -> 'None':
+        self.sorted_sets.setdefault(key, {}).update(mapping)
+
+    def zrem(self, key:'str', *members:'str') -> 'None':
+        for member in members:
+            del self.sorted_sets[key][member]
+
+    def zremrangebyscore(self, key:'str', min:'any_', max:'float') -> 'None':
+        members = self.sorted_sets.get(key, {})
+        for member, score in list(members.items()):
+            if score <= max:
+                del members[member]
+
+    def zscan_iter(self, key:'str', match:'any_'=None, count:'any_'=None) -> 'any_':
+        for member, score in list(self.sorted_sets.get(key, {}).items()):
+            if match is None or fnmatch(member, match):
+                yield member, score
+
+    def publish(self, channel:'str', message:'str') -> 'None':
+        self.published.append((channel, message))
 
     def exists(self, key:'str') -> 'int':
         return int(key in self.data)
 
-    def scan_iter(self, match:'str') -> 'any_':
+    def scan_iter(self, match:'str', count:'any_'=None) -> 'any_':
         prefix = match[:-1]
         for key in list(self.data):
             if key.startswith(prefix):
@@ -86,12 +146,22 @@ class InvalidationTestCase(TestCase):
 # ################################################################################################################################
 
     def test_invalidate_whole_channel(self) -> 'None':
-        _ = self.store_entry('/api/customers')
-        _ = self.store_entry('/api/orders')
+        ctx_customers = self.store_entry('/api/customers')
+        ctx_orders = self.store_entry('/api/orders')
 
+        round_trips = self.fake_redis.round_trips
         self.cache_api.invalidate_response('test.channel')
 
-        self.assertEqual(self.fake_redis.data, {})
+        # The whole channel goes away in one round trip, however many entries it has ..
+        self.assertEqual(self.fake_redis.round_trips, round_trips + 1)
+        self.assertEqual(self.fake_redis.sorted_sets, {})
+
+        # .. and the entries still in Redis are stale.
+        self.assertIsNone(self.cache_api.get_response(ctx_customers.key, 123)[0])
+        self.assertIsNone(self.cache_api.get_response(ctx_orders.key, 123)[0])
+
+        ctx_customers = self.store_entry('/api/customers')
+        self.assertIsNotNone(self.cache_api.get_response(ctx_customers.key, 123)[0])
 
 # ################################################################################################################################
 
@@ -99,11 +169,43 @@ class InvalidationTestCase(TestCase):
         ctx_customers = self.store_entry('/api/customers', 'a=1')
         ctx_orders = self.store_entry('/api/orders')
 
+        get_count = self.fake_redis.get_count
         self.cache_api.invalidate_response('test.channel', '/api/customers*')
 
+        # The entries are found through the index, without reading any of them ..
+        self.assertEqual(self.fake_redis.get_count, get_count)
+
         self.assertIsNone(self.cache_api.get(ctx_customers.key))
         self.assertIsNotNone(self.cache_api.get(ctx_orders.key))
 
+        # .. and the deleted ones leave the index too.
+        index = self.fake_redis.sorted_sets['zato:cache:cache:channel-index:123']
+        self.assertEqual([member.split('|', 1)[1] for member in index], ['/api/orders'])
+
+# ################################################################################################################################
+
+    def test_invalidate_by_pattern_with_character_class(self) -> 'None':
+        ctx_customers = self.store_entry('/api/customers')
+        ctx_orders = self.store_entry('/api/orders')
+
+        self.cache_api.invalidate_response('test.channel', '/api/[!c]*')
+
+        self.assertIsNotNone(self.cache_api.get(ctx_customers.key))
+        self.assertIsNone(self.cache_api.get(ctx_orders.key))
+
+# ################################################################################################################################
+
+    def test_invalidation_is_published(self) -> 'None':
+        self.cache_api.invalidate_response('test.channel')
+        self.cache_api.invalidate_response('test.channel', '/api/customers*')
+
+        messages = [loads(message) for _, message in self.fake_redis.published]
+
+        self.assertEqual(messages, [
+            {'channel_id': 123, 'pattern': '', 'generation': 1},
+            {'channel_id': 123, 'pattern': '/api/customers*', 'generation': None},
+        ])
+
 # ################################################################################################################################
 
     def test_invalidate_unknown_channel_raises(self) -> 'None':
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (C) 2026, Zato Source s.r.o. https://zato.io
+
+Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
+"""
+
+# gevent - must run before threading is imported by the module under test
+from gevent import monkey
+
+if not monkey.is_module_patched('threading'):
+    _ = monkey.patch_all()
+
+# stdlib
+from http.client import OK
+from time import time
+from unittest import TestCase, main
+
+# Zato
+from zato.common.typing_ import any_, anydict
+from zato.server.connection.http_soap.response_cache import get_context, local_cache, LocalResponseCache, lookup, \
+    purge_channel, store, ResponseCacheContext
+from zato.server.connection.http_soap.response_cache.common import ModuleCtx
+
+# Zato - test helpers
+from test.zato.connection.http_soap.common import FakeCacheAPI, make_channel_item, make_environ, make_raw_config
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+def _make_entry(body:'str', path:'str'='/api/customers', stored_at:'float | None'=None, generation:'int'=0) -> 'anydict':
+    out = {
+        'body': body,
+        'content_type': 'application/json',
+        'status_code': OK,
+        'stored_at': time() if stored_at is None else stored_at,
+        'etag': '',
+        'path': path,
+        'generation': generation,
+    }
+    return out
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class LocalResponseCacheTestCase(TestCase):
+    """ The in-memory tier on its own - its size budget, expiry and invalidation.
+    """
+
+    def setUp(self) -> 'None':
+        self.cache = LocalResponseCache(max_bytes=3 * (100 + ModuleCtx.Local_Entry_Overhead), max_ttl=60)
+        self.cache.is_active = True
+
+    def test_inactive_tier_is_bypassed(self) -> 'None':
+        self.cache.is_active = False
+        self.cache.set('key', _make_entry('x'), 1, 60)
+
+        self.assertEqual(len(self.cache), 0)
+        self.assertIsNone(self.cache.get('key'))
+
+# ################################################################################################################################
+
+    def test_least_recently_used_is_evicted(self) -> 'None':
+        for name in 'abc':
+            self.cache.set(name, _make_entry('x' * 100), 1, 60)
+
+        # Reading 'a' makes 'b' the least recently used entry ..
+        self.assertIsNotNone(self.cache.get('a'))
+
+        # .. which is what makes room for the next one.
+        self.cache.set('d', _make_entry('x' * 100), 1, 60)
+
+        self.assertIsNone(self.cache.get('b'))
+        self.assertIsNotNone(self.cache.get('a'))
+        self.assertIsNotNone(self.cache.get('d'))
+        self.assertLessEqual(self.cache.current_bytes, self.cache.max_bytes)
+
+# ################################################################################################################################
+
+    def test_entry_above_budget_is_not_kept(self) -> 'None':
+        self.cache.set('big', _make_entry('x' * self.cache.max_bytes), 1, 60)
+        self.assertEqual(len(self.cache), 0)
+
+# ################################################################################################################################
+
+    def test_entry_expires_with_its_redis_copy(self) -> 'None':
+
+        # Stored in Redis long enough ago for its TTL to have passed
+        self.cache.set('key', _make_entry('x', stored_at=time() - 61), 1, 60)
+
+        self.assertIsNone(self.cache.get('key'))
+        self.assertEqual(self.cache.current_bytes, 0)
+
+# ################################################################################################################################
+
+    def test_invalidate_channel_and_pattern(self) -> 'None':
+        self.cache.set('c1', _make_entry('x', '/api/customers?a=1'), 1, 60)
+        self.cache.set('o1', _make_entry('x', '/api/orders'), 1, 60)
+        self.cache.set('other', _make_entry('x', '/api/customers'), 2, 60)
+
+        self.cache.invalidate(1, '/api/customers*')
+
+        self.assertIsNone(self.cache.get('c1'))
+        self.assertIsNotNone(self.cache.get('o1'))
+
+        self.cache.invalidate(1)
+
+        self.assertIsNone(self.cache.get('o1'))
+        self.assertIsNotNone(self.cache.get('other'))
+
+# ################################################################################################################################
+
+    def test_entry_from_older_generation_is_not_served(self) -> 'None':
+        self.cache.set('old', _make_entry('x'), 1, 60)
+
+        # An entry of a newer generation means the channel has been purged since 'old' was stored ..
+        self.cache.set('new', _make_entry('x', generation=1), 1, 60)
+
+        self.assertIsNone(self.cache.get('old'))
+        self.assertIsNotNone(self.cache.get('new'))
+
+        # .. and an older one arriving late is not kept at all.
+        self.cache.set('late', _make_entry('x'), 1, 60)
+        self.assertIsNone(self.cache.get('late'))
+        self.assertEqual(len(self.cache), 1)
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+class LocalTierLookupTestCase(TestCase):
+    """ Lookups through the in-memory tier, backed by a fake Redis that counts its reads.
+    """
+
+    def setUp(self) -> 'None':
+        self.cache = FakeCacheAPI()
+        self.get_count = 0
+
+        original_get = self.cache.get
+
+        def counting_get(key:'str') -> 'any_':
+            self.get_count += 1
+            return original_get(key)
+
+        self.cache.get = counting_get
+
+        local_cache.clear()
+        local_cache.is_active = True
+
+    def tearDown(self) -> 'None':
+        local_cache.clear()
+        local_cache.is_active = False
+
+    def get_ctx(self, **config_overrides:'any_') -> 'ResponseCacheContext':
+        config_overrides.setdefault('is_local_cache_enabled', True)
+        channel_item = make_channel_item(make_raw_config(**config_overrides))
+        ctx = get_context(self.cache, channel_item, make_environ(), b'')
+        assert ctx is not None
+        ctx.wsgi_environ['zato.http.response.headers']['Content-Type'] = 'application/json'
+
+        return ctx
+
+# ################################################################################################################################
+
+    def test_hit_served_from_memory(self) -> 'None':
+        store(self.get_ctx(), '{"result":"ok"}', OK)
+
+        ctx = self.get_ctx()
+        out = lookup(ctx)
+
+        self.assertEqual(out, '{"result":"ok"}')
+        self.assertEqual(ctx.wsgi_environ['zato.http.response.headers']['X-Cache'], 'Hit')
+        self.assertEqual(self.get_count, 0)
+
+# ################################################################################################################################
+
+    def test_redis_hit_is_kept_in_memory(self) -> 'None':
+        store(self.get_ctx(), '{"result":"ok"}', OK)
+        local_cache.clear()
+
+        # The first lookup goes to Redis ..
+        self.assertEqual(lookup(self.get_ctx()), '{"result":"ok"}')
+        self.assertEqual(self.get_count, 1)
+
+        # .. and the next one does not.
+        self.assertEqual(lookup(self.get_ctx()), '{"result":"ok"}')
+        self.assertEqual(self.get_count, 1)
+
+# ################################################################################################################################
+
+    def test_channel_without_local_tier(self) -> 'None':
+        store(self.get_ctx(is_local_cache_enabled=False), '{"result":"ok"}', OK)
+
+        self.assertEqual(len(local_cache), 0)
+        self.assertEqual(lookup(self.get_ctx(is_local_cache_enabled=False)), '{"result":"ok"}')
+        self.assertEqual(self.get_count, 1)
+
+# ################################################################################################################################
+
+    def test_purge_reaches_memory(self) -> 'None':
+        ctx = self.get_ctx()
+        store(ctx, '{"result":"ok"}', OK)
+
+        purge_channel(self.cache, ctx.channel_id) # type: ignore[arg-type]
+
+        self.assertIsNone(lookup(self.get_ctx()))
+        self.assertEqual(self.cache.invalidations, [(ctx.channel_id, '')])
+
+# ################################################################################################################################
+
+    def test_purge_between_lookup_and_store(self) -> 'None':
+
+        # The lookup reads the channel's generation ..
+        ctx = self.get_ctx()
+        self.assertIsNone(lookup(ctx))
+
+        # .. the channel is purged while the service is still running ..
+        purge_channel(self.cache, ctx.channel_id) # type: ignore[arg-type]
+
+        # .. and the response it stores afterwards is stale in Redis, so it is not kept in memory either.
+        store(ctx, '{"result":"old"}', OK)
+
+        self.assertEqual(len(local_cache), 0)
+        self.assertIsNone(lookup(self.get_ctx()))
+
+# ################################################################################################################################
+
+    def test_purge_heard_of_after_store(self) -> 'None':
+
+        # The channel is purged on another server, which this one does not hear of before its store ..
+        ctx = self.get_ctx()
+        self.assertIsNone(lookup(ctx))
+
+        generation = self.cache.purge_responses(ctx.channel_id)
+        store(ctx, '{"result":"old"}', OK)
+
+        # .. but the invalidation that arrives next drops the entry.
+        local_cache.invalidate(ctx.channel_id, '', generation)
+
+        self.assertEqual(len(local_cache), 0)
+        self.assertIsNone(lookup(self.get_ctx()))
+
+# ################################################################################################################################
+# ################################################################################################################################
+
+if __name__ == '__main__':
+    _ = main()
+
+# ################################################################################################################################
+# ################################################################################################################################
@@ -175,16 +175,24 @@ class StorageRulesTestCase(TestCase):
 
 # ################################################################################################################################
 
-    def test_purge_channel_empties_the_prefix(self) -> 'None':
+    def test_purge_channel_makes_entries_stale(self) -> 'None':
         ctx = self.get_ctx()
         ctx.wsgi_environ['zato.http.response.headers']['Content-Type'] = 'application/json'
         store(ctx, '{"result":"ok"}', OK)
 
+        purge_channel(self.cache, ctx.channel_id)
+
+        # The entry is still in Redis until it expires, but no lookup returns it ..
         self.assertEqual(len(self.cache.data), 1)
+        self.assertIsNone(lookup(self.get_ctx()))
 
-        purge_channel(self.cache, ctx.channel_id)
+        # .. and what is stored next belongs to the new generation.
+        ctx2 = self.get_ctx()
+        _ = lookup(ctx2)
+        ctx2.wsgi_environ['zato.http.response.headers']['Content-Type'] = 'application/json'
+        store(ctx2, '{"result":"fresh"}', OK)
 
-        self.assertEqual(self.cache.data, {})
+        self.assertEqual(lookup(self.get_ctx()), '{"result":"fresh"}')
 
 # ################################################################################################################################
 # ################################################################################################################################
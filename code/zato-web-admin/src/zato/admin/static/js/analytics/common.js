@@ -32,6 +32,7 @@ $.fn.zato.analytics.dashboard.theme = {
 
 // How each range is presented in the chart pill, keyed by its minute equivalent
 $.fn.zato.analytics.dashboard.range_minutes = {
+    hour: 60,
     day: 1440,
     week: 10080,
     month: 43200,
@@ -39,6 +40,7 @@ $.fn.zato.analytics.dashboard.range_minutes = {
 };
 
 $.fn.zato.analytics.dashboard.range_names = {
+    60: 'Last hour',
     1440: 'Last 24 hours',
     10080: 'Last 7 days',
     43200: 'Last 30 days',
@@ -23,9 +23,15 @@
 
         var current_page = 1;
         var total_count = 0;
+        var total_capped = false;
         var last_ts = '';
         var show_all = false;
 
+        // Where each page starts, as the poll reported it along with the page before - a page
+        // whose cursor is known is read on from it instead of being skipped to, for the polls
+        // that report one. Page 1 never needs one.
+        var cursors = {};
+
         function build_request(extra) {
             var data = {action: action, id: object_id};
             for (var fk in filters) {
@@ -41,6 +47,16 @@
             return Math.ceil(total_count / page_size) || 1;
         }
 
+        // A poll that stopped counting at a limit has at least this many, perhaps more
+        function format_total(n) {
+            return kit.format_number_full(n) + (total_capped ? '+' : '');
+        }
+
+        function apply_response(data) {
+            total_count = data.total;
+            total_capped = data.is_total_capped === true;
+        }
+
         function render_controls(selector) {
             var $c = $(selector);
             if (!$c.length) return;
@@ -48,7 +64,7 @@
             if (show_all) {
                 var html = '<span class="detail-pagination-row">';
                 html += '<span class="detail-pagination-info">' +
-                    kit.format_number_full(total_count) + ' total</span>';
+                    format_total(total_count) + ' total</span>';
                 html += '<span class="detail-page-sep">|</span><a href="#" class="detail-page-paginate">Paginate</a>';
                 html += '</span>';
                 $c.html(html);
@@ -62,7 +78,7 @@
 
             var tp = total_pages();
             var has_prev = current_page > 1;
-            var has_next = current_page < tp;
+            var has_next = current_page < tp || (total_capped && cursors[current_page + 1] !== undefined);
             var is_empty = total_count === 0;
 
             var html = '<span class="detail-pagination-row">';
@@ -74,13 +90,13 @@
             if (is_empty) {
                 html += '<span class="detail-pagination-info"><span class="detail-page-disabled">Page ' +
                     kit.format_number_full(current_page) + ' of ' +
-                    kit.format_number_full(tp) +
-                    ' \u00b7 ' + kit.format_number_full(total_count) + ' total</span></span>';
+                    format_total(tp) +
+                    ' \u00b7 ' + format_total(total_count) + ' total</span></span>';
             } else {
                 html += '<span class="detail-pagination-info">Page ' +
                     kit.format_number_full(current_page) + ' of ' +
-                    kit.format_number_full(tp) +
-                    ' \u00b7 ' + kit.format_number_full(total_count) + ' total</span>';
+                    format_total(tp) +
+                    ' \u00b7 ' + format_total(total_count) + ' total</span>';
             }
             if (has_next) {
                 html += '<a href="#" class="detail-page-next">Next</a>';
@@ -126,13 +142,18 @@
 
         function fetch_page(page) {
             if (page < 1) page = 1;
-            if (total_count > 0 && page > total_pages()) page = total_pages();
+            if (total_count > 0 && !total_capped && page > total_pages()) page = total_pages();
             current_page = page;
 
+            var page_request = {page: page, page_size: page_size};
+            if (page > 1 && cursors[page]) {
+                page_request.cursor = cursors[page];
+            }
+
             $.ajax({
                 url: poll_url,
                 type: 'POST',
-                data: JSON.stringify(build_request({page: page, page_size: page_size})),
+                data: JSON.stringify(build_request(page_request)),
                 contentType: 'application/json',
                 headers: {'X-CSRFToken': csrf_token()},
                 success: function(data) {
@@ -140,9 +161,14 @@
                         data = JSON.parse(data);
                     }
                     var rows = data.rows;
-                    total_count = data.total;
+                    apply_response(data);
                     current_page = data.page;
 
+                    // The next page, if there is one, starts where this one ended
+                    if (data.next_cursor) {
+                        cursors[current_page + 1] = data.next_cursor;
+                    }
+
                     render_page($body, rows, total_count);
 
                     update_last_ts(rows);
@@ -172,7 +198,7 @@
                         data = JSON.parse(data);
                     }
                     var rows = data.rows;
-                    total_count = data.total;
+                    apply_response(data);
                     render_page($body, rows, total_count);
                     update_last_ts(rows);
                     update_controls();
@@ -208,7 +234,7 @@
                     if (rows.length === 0) return;
 
                     update_last_ts(rows);
-                    total_count = data.total;
+                    apply_response(data);
 
                     render_new($body, rows, show_all ? Infinity : page_size);
 
@@ -225,11 +251,14 @@
             for (var key in new_filters) {
                 filters[key] = new_filters[key];
             }
+
+            // The cursors belonged to the pages of the previous filters
+            cursors = {};
         }
 
         if (config.initial_data) {
             var initialRows = config.initial_data.rows;
-            total_count = config.initial_data.total;
+            apply_response(config.initial_data);
             current_page = config.initial_data.page;
             render_page($body, initialRows, total_count);
             update_last_ts(initialRows);
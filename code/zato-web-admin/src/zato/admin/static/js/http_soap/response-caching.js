@@ -36,7 +36,8 @@
         'response-caching-ignored-query-parameters': 'These query parameters are left out of the cache key, e.g. tracking parameters that never change the response.',
         'response-caching-max-body-size': 'Requests and responses larger than this bypass the cache entirely.',
         'response-caching-needs-etag': 'Each cached response gets an ETag and a request whose If-None-Match matches it receives 304 Not Modified without the body.',
-        'response-caching-coalesce-timeout': 'On a cache miss, concurrent identical requests wait up to this long for one of them to fill the cache, instead of all of them invoking the service.'
+        'response-caching-coalesce-timeout': 'On a cache miss, concurrent identical requests wait up to this long for one of them to fill the cache, instead of all of them invoking the service.',
+        'response-caching-is-local-cache-enabled': 'Each server also keeps recently used responses in its own memory and serves them without asking Redis. Clearing or invalidating the cache reaches all the servers.'
     };
 
     // ////////////////////////////////////////////////////////////////////////
@@ -69,6 +70,7 @@
         document.getElementById('response-caching-needs-etag').checked = config.needs_etag;
         document.getElementById('response-caching-max-body-size').value = config.max_body_size;
         document.getElementById('response-caching-coalesce-timeout').value = config.coalesce_timeout;
+        document.getElementById('response-caching-is-local-cache-enabled').checked = config.is_local_cache_enabled;
 
         document.getElementById('response-caching-vary-by-headers').value = config.vary_by_headers.join(', ');
         document.getElementById('response-caching-ignored-query-parameters').value = config.ignored_query_parameters.join(', ');
@@ -116,6 +118,7 @@
             needs_etag: document.getElementById('response-caching-needs-etag').checked,
             max_body_size: parseInt(document.getElementById('response-caching-max-body-size').value, 10),
             coalesce_timeout: parseInt(document.getElementById('response-caching-coalesce-timeout').value, 10),
+            is_local_cache_enabled: document.getElementById('response-caching-is-local-cache-enabled').checked,
             vary_by_headers: $.fn.zato.response_caching.split_list(document.getElementById('response-caching-vary-by-headers').value),
             ignored_query_parameters: $.fn.zato.response_caching.split_list(
                 document.getElementById('response-caching-ignored-query-parameters').value)
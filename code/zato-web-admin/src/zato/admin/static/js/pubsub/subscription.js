@@ -742,6 +742,7 @@ $.fn.zato.pubsub.subscription.data_table.new_row = function(item, data, include_
     row += String.format("<td class='ignore'>{0}</td>", item.push_service_name);
     row += String.format("<td class='ignore'>{0}</td>", item.topic_name_list);
     row += String.format("<td class='ignore'>{0}</td>", pendingDepth);
+    row += String.format("<td class='ignore'>{0}</td>", item.rest_push_max_in_flight || '');
 
     if(include_tr) {
         row += '</tr>';
@@ -809,6 +810,7 @@ $.fn.zato.pubsub.subscription.edit = function(instance_id) {
     form.find('#id_edit-push_type').val(instance.push_type);
     form.find('#id_edit-rest_push_endpoint_id').val(instance.rest_push_endpoint_id);
     form.find('#id_edit-push_service_name').val(instance.push_service_name);
+    form.find('#id_edit-rest_push_max_in_flight').val(instance.rest_push_max_in_flight || '');
 
 
     // Handle security definition display as link instead of select
@@ -84,6 +84,12 @@ class CreateForm(forms.Form):
         required=False,
         widget=forms.Select()
     )
+    rest_push_max_in_flight = forms.IntegerField(
+        required=False,
+        min_value=1,
+        max_value=PubSub.Delivery.Max_In_Flight_Limit,
+        widget=forms.NumberInput(attrs={'style':'width:60px', 'placeholder':'1'})
+    )
 
     def __init__(self, prefix:'strnone'=None, post_data:'any_'=None, req:'any_'=None) -> 'None':
         super().__init__(post_data, prefix=prefix)
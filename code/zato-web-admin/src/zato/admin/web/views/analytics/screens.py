@@ -6,7 +6,7 @@ Copyright (C) 2026, Zato Source s.r.o. https://zato.io
 Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
 """
 
-# The analytics screens - fixed pages answering fixed questions over the hourly
+# The analytics screens - fixed pages answering fixed questions over the tiered
 # aggregate store the rollup maintains. They read the analytics store only,
 # never the live tables, and each screen exports its table as CSV too.
 
@@ -23,8 +23,8 @@ from django.template.response import TemplateResponse
 # Zato
 from zato.admin.web.views import method_allowed
 from zato.common.analytics.csv_export import channel_csv, consumer_csv, overview_csv
-from zato.common.analytics.query import get_channel, get_consumer, get_overview, Default_Range, Range_Day, Range_Hours, \
-    Range_Label, Range_Month, Range_Quarter, Range_Week
+from zato.common.analytics.query import get_channel, get_consumer, get_overview, Default_Range, Range_Day, Range_Hour, \
+    Range_Hours, Range_Label, Range_Month, Range_Quarter, Range_Week
 from zato.common.defaults import default_cluster_id
 
 # ################################################################################################################################
@@ -92,7 +92,7 @@ def _get_ranges() -> 'dictlist':
     # Our response to produce
     out:'dictlist' = []
 
-    for value in (Range_Day, Range_Week, Range_Month, Range_Quarter):
+    for value in (Range_Hour, Range_Day, Range_Week, Range_Month, Range_Quarter):
         out.append({'value': value, 'label': Range_Label[value]})
 
     return out
@@ -13,8 +13,8 @@ from zato.admin.web.views.audit_log.columns.labels import _all_sources_section_t
     _event_type_label, _source_endpoint_label, _source_event_label, _source_except_label, _source_label, \
     _source_object_label, _source_title
 from zato.admin.web.views.audit_log.columns.tables import _all_sources_columns, _data_preview_length, _default_page, \
-    _default_page_size, _flow_columns, _get_outcomes, _poll_url, _preview_length, _row_columns, _row_numeric_columns, \
-    _search_columns, _source_attr_columns, _source_body_preview, _source_columns, _status_outstanding
+    _default_page_size, _flow_columns, _get_outcomes, _max_counted_events, _poll_url, _preview_length, _row_columns, \
+    _row_numeric_columns, _search_columns, _source_attr_columns, _source_body_preview, _source_columns, _status_outstanding
 from zato.admin.web.views.audit_log.columns.urls import _endpoint_page_url, _object_page_url, _run_page_url, \
     _source_page_url
 
@@ -41,6 +41,7 @@ _endpoint_page_url = _endpoint_page_url
 _event_type_label = _event_type_label
 _flow_columns = _flow_columns
 _get_outcomes = _get_outcomes
+_max_counted_events = _max_counted_events
 _object_page_url = _object_page_url
 _poll_url = _poll_url
 _preview_length = _preview_length
@@ -9,6 +9,7 @@ Licensed under AGPLv3, see LICENSE.txt for terms and conditions.
 # Zato
 from zato.common.api import SCHEDULER
 from zato.common.audit_log.common import AuditOutcome
+from zato.common.audit_log.search import Search_Columns
 
 # ################################################################################################################################
 # ################################################################################################################################
@@ -27,6 +28,10 @@ _poll_url = '/zato/audit-log/poll/'
 _default_page = 1
 _default_page_size = 25
 
+# How many of the events after a page's start are counted at most - past it, a page
+# says there are at least that many, so a poll costs the same whatever the log holds.
+_max_counted_events = 10_000
+
 # How many characters of the payload are shown in the table.
 _data_preview_length = 200
 
@@ -43,9 +48,8 @@ _flow_columns = _row_columns + ('cid_sequence',)
 # The row columns holding numbers.
 _row_numeric_columns = ('id', 'size', 'duration_ms', 'cid_sequence')
 
-# The columns the free-text search covers.
-_search_columns = ('data', 'event_type', 'msg_id', 'correl_id', 'endpoint', 'ext_client_id',
-    'status', 'classification', 'sub_key')
+# The columns the free-text search covers - the same ones the audit log indexes for it.
+_search_columns = Search_Columns
 
 # The status query parameter value narrowing the page down to open exchanges.
 _status_outstanding = 'outstanding'
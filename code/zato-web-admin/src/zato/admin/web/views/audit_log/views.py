@@ -16,7 +16,7 @@ import logging
 from datetime import datetime, timezone
 
 # SQLAlchemy
-from sqlalchemy import func, select
+from sqlalchemy import and_, func, or_, select
 
 # Django
 from django.http import HttpResponse, HttpResponseNotFound, HttpResponseServerError
@@ -26,9 +26,10 @@ from django.template.response import TemplateResponse
 from zato.admin.web.views import action_json_response, invoke_action_handler, method_allowed, \
     Action_Message_Max_Length, _traceback_marker
 from zato.admin.web.views.audit_log.columns import _all_sources_columns, _all_sources_section_title, _all_sources_title, \
-    _data_preview_length, _default_page, _endpoint_page_url, _event_type_label, _flow_columns, _get_outcomes, _object_page_url, \
-    _poll_url, _preview_length, _row_columns, _run_page_url, _source_columns, _source_endpoint_label, _source_event_label, \
-    _source_except_label, _source_label, _source_object_label, _source_page_url, _source_title, _status_outstanding
+    _data_preview_length, _default_page, _endpoint_page_url, _event_type_label, _flow_columns, _get_outcomes, \
+    _max_counted_events, _object_page_url, _poll_url, _preview_length, _row_columns, _run_page_url, _source_columns, \
+    _source_endpoint_label, _source_event_label, _source_except_label, _source_label, _source_object_label, _source_page_url, \
+    _source_title, _status_outstanding
 from zato.admin.web.views.audit_log.query import _build_where, _hydrate_rows, _normalize_row
 from zato.admin.web.views.audit_log.sources import get_resubmit_labels, _source_outstanding, _source_parse, \
     _source_resubmit, render_scheduler_record, render_view_record
@@ -222,9 +223,32 @@ def object_index(req:'any_') -> 'TemplateResponse':
 
 # ################################################################################################################################
 
+def _get_keyset_condition(cursor:'anydict', is_ascending:'bool') -> 'any_':
+    """ Returns the condition reading on from where the previous page ended - the time and id
+    of its last row - so that a page deep in the log does not make the database read and throw
+    away every row before it, the way an offset does.
+    """
+    cursor_time = cursor['event_time_iso']
+    cursor_id = cursor['id']
+
+    time_column = event_table.c.event_time_iso
+    id_column = event_table.c.id
+
+    # The pair is compared one column at a time rather than as a tuple, which not every database takes
+    if is_ascending:
+        out = or_(time_column > cursor_time, and_(time_column == cursor_time, id_column > cursor_id))
+    else:
+        out = or_(time_column < cursor_time, and_(time_column == cursor_time, id_column < cursor_id))
+
+    return out
+
+# ################################################################################################################################
+
 @method_allowed('POST')
 def poll(req:'any_') -> 'HttpResponse':
     """ Returns one page of audit events as JSON, in the shape the detail-kit pagination expects.
+    A page asked for along with the cursor of the one before it is read on from that cursor,
+    any other one by its offset.
     """
     body = json.loads(req.body)
 
@@ -242,12 +266,17 @@ def poll(req:'any_') -> 'HttpResponse':
     page = body['page']
     page_size = body['page_size']
 
+    # Where the previous page ended, if the frontend knows it
+    cursor = body.get('cursor')
+
     if page < _default_page:
         page = _default_page
 
+    engine = get_audit_engine()
+
     where_conditions = _build_where(
         sources, object_names, outcomes, query, status, time_from, time_to, event_types,
-        sources_excluded=sources_excluded, object_names_excluded=object_names_excluded)
+        sources_excluded=sources_excluded, object_names_excluded=object_names_excluded, engine=engine)
 
     rows:'anylist' = []
 
@@ -263,33 +292,58 @@ def poll(req:'any_') -> 'HttpResponse':
     # event happened that orders them, not the order they were written in, so that a page
     # and the window it is read through agree on what newest means. Two events of the same
     # moment are told apart by their ids.
-    if status == _status_outstanding:
+    is_ascending = status == _status_outstanding
+
+    if is_ascending:
         order_by = [event_table.c.event_time_iso.asc(), event_table.c.id.asc()]
     else:
         order_by = [event_table.c.event_time_iso.desc(), event_table.c.id.desc()]
 
-    # Build both queries upfront ..
-    event_count = func.count()
+    offset = (page - 1) * page_size
 
-    count_query = select(event_count)
-    count_query = count_query.select_from(event_table)
-    count_query = count_query.where(*where_conditions)
+    # A page read on from a cursor starts right after it, with nothing to skip ..
+    if cursor:
+        page_conditions = [*where_conditions, _get_keyset_condition(cursor, is_ascending)]
+        page_offset = 0
 
-    offset = (page - 1) * page_size
+        # .. and its count starts there too, with everything before it known to be there ..
+        counted_base = offset
+        counted_limit = _max_counted_events
+
+    # .. while any other page is skipped to and counted from the top.
+    else:
+        page_conditions = where_conditions
+        page_offset = offset
+
+        counted_base = 0
+        counted_limit = offset + _max_counted_events
+
+    # Build both queries upfront - the count stops just past its limit rather than go through every
+    # matching event, which for a broad filter over a big log is most of the table ..
+    counted_ids = select(event_table.c.id)
+    counted_ids = counted_ids.where(*page_conditions)
+    counted_ids = counted_ids.limit(counted_limit + 1)
+    counted_ids = counted_ids.subquery()
+
+    count_query = select(func.count())
+    count_query = count_query.select_from(counted_ids)
 
     page_query = select(*select_columns)
-    page_query = page_query.where(*where_conditions)
+    page_query = page_query.where(*page_conditions)
     page_query = page_query.order_by(*order_by)
     page_query = page_query.limit(page_size)
-    page_query = page_query.offset(offset)
+    page_query = page_query.offset(page_offset)
 
     # .. and run them against the shared audit log database.
-    engine = get_audit_engine()
-
     with engine.connect() as connection:
 
         count_result = connection.execute(count_query)
-        total = count_result.scalar()
+        counted = count_result.scalar()
+
+        # A count that went past its limit means there are at least this many events, perhaps more
+        is_total_capped = counted > counted_limit
+
+        total = counted_base + min(counted, counted_limit)
 
         page_result = connection.execute(page_query)
 
@@ -321,7 +375,20 @@ def poll(req:'any_') -> 'HttpResponse':
         for row in rows:
             row['data'] = row['data'][:_data_preview_length]
 
-    response_json = json.dumps({'rows': rows, 'total': total, 'page': page})
+    # A full page may have another one after it, which is read on from its last row
+    if len(rows) == page_size:
+        last_row = rows[-1]
+        next_cursor = {'event_time_iso': last_row['event_time_iso'], 'id': last_row['id']}
+    else:
+        next_cursor = None
+
+    response_json = json.dumps({
+        'rows': rows,
+        'total': total,
+        'is_total_capped': is_total_capped,
+        'page': page,
+        'next_cursor': next_cursor,
+    })
     response_bytes = response_json.encode('utf-8')
 
     out = HttpResponse(response_bytes, content_type='application/json')
@@ -380,15 +447,15 @@ def strip(req:'any_') -> 'HttpResponse':
     if bucket_count < _strip_min_buckets:
         bucket_count = _strip_min_buckets
 
+    engine = get_audit_engine()
+
     where_conditions = _build_where(
         sources, object_names, outcomes, query, status, time_from, time_to, event_types,
-        sources_excluded=sources_excluded, object_names_excluded=object_names_excluded)
+        sources_excluded=sources_excluded, object_names_excluded=object_names_excluded, engine=engine)
 
     events_query = select(event_table.c.event_time_iso, event_table.c.outcome)
     events_query = events_query.where(*where_conditions)
 
-    engine = get_audit_engine()
-
     # Each matching event as its moment in epoch ms and its outcome
     events:'anylist' = []
 
@@ -68,7 +68,7 @@ class Index(_Index):
     input_required = 'cluster_id',
     output_required = 'id', 'sub_key', 'is_delivery_active', 'is_pub_active', 'created', 'sec_base_id', 'security', 'delivery_type', \
         'push_type', 'rest_push_endpoint_id', 'rest_push_endpoint_name', 'push_service_name', 'topic_name_list', \
-        'topic_link_list', 'pending_depth'
+        'topic_link_list', 'pending_depth', 'rest_push_max_in_flight'
     output_repeated = True
 
     def on_before_append_item(self, item:'any_') -> 'any_':
@@ -167,7 +167,7 @@ class Create(_CreateEdit):
     service_name = 'zato.pubsub.subscription.create'
 
     input_required = 'cluster_id', 'topic_name', 'sec_base_id', 'delivery_type'
-    input_optional = 'is_delivery_active', 'push_type', 'rest_push_endpoint_id', 'push_service_name'
+    input_optional = 'is_delivery_active', 'push_type', 'rest_push_endpoint_id', 'push_service_name', 'rest_push_max_in_flight'
     output_required = 'id', 'sub_key', 'is_delivery_active', 'created', 'security', 'delivery_type', \
         'topic_name_list', 'topic_link_list',
 
@@ -180,7 +180,8 @@ class Create(_CreateEdit):
             'delivery_type': 'delivery_type',
             'is_delivery_active': 'is_delivery_active',
             'is_pub_active': 'is_pub_active',
-            'rest_push_endpoint_id': 'rest_push_endpoint_id'
+            'rest_push_endpoint_id': 'rest_push_endpoint_id',
+            'rest_push_max_in_flight': 'rest_push_max_in_flight',
         }
 
     def pre_process_input_dict(self, input_dict:'anydict') -> 'None':
@@ -200,7 +201,8 @@ class Edit(_CreateEdit):
     service_name = 'zato.pubsub.subscription.edit'
 
     input_required = 'sub_key', 'cluster_id', 'topic_id_list', 'sec_base_id', 'delivery_type'
-    input_optional = 'is_delivery_active', 'is_pub_active', 'push_type', 'rest_push_endpoint_id', 'push_service_name'
+    input_optional = 'is_delivery_active', 'is_pub_active', 'push_type', 'rest_push_endpoint_id', 'push_service_name', \
+        'rest_push_max_in_flight'
     output_required = 'id', 'sub_key', 'security', 'delivery_type', 'is_delivery_active', 'topic_name_list', 'topic_link_list'
 
     def _get_input_dict(self) -> 'anydict':
@@ -216,11 +218,15 @@ class Edit(_CreateEdit):
             f'{prefix}push_type': 'push_type',
             f'{prefix}rest_push_endpoint_id': 'rest_push_endpoint_id',
             f'{prefix}push_service_name': 'push_service_name',
+            f'{prefix}rest_push_max_in_flight': 'rest_push_max_in_flight',
         }
 
     def pre_process_input_dict(self, input_dict:'anydict') -> 'None':
         self._pre_process_input_dict_common(input_dict, 'edit-')
 
+        # An empty in-flight window is still sent, as this is how it goes back to the default
+        input_dict.setdefault('rest_push_max_in_flight', self.req.POST.get('edit-rest_push_max_in_flight', ''))
+
     def success_message(self, item:'any_') -> 'str':
         return 'Successfully updated pub/sub subscription'
 